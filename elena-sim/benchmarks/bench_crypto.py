@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк крипто-бэкендов: якорь, хеш транзакции, ключи, подпись, проверка.
+Запуск: python3 benchmarks/bench_crypto.py [--iterations 2000] [--backend ed25519]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.crypto import CRYPTO_BACKENDS, CryptoBackend
+
+
+def _ops_per_sec(fn: Callable[[int], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed > 0 else float("inf")
+
+
+def bench_backend(backend: CryptoBackend, iterations: int) -> Dict[str, float]:
+    """Замеряет операции одного бэкенда (оп/с) и возвращает их вместе с модельными параметрами."""
+    pub, priv = backend.generate_keypair()
+    anchor = backend.compute_anchor(1000.0, [], 1, 1.0)
+    parents = [backend.tx_content_hash("a", "b", 1.0, i, anchor, [], 1.0) for i in range(5)]
+    data = f"node_1|node_2|10.0|42|{anchor}|1.0"
+    signature = backend.sign(data, priv)
+    return {
+        "compute_anchor": _ops_per_sec(lambda i: backend.compute_anchor(1000.0 - i, parents[:2], i, 1.0 + i), iterations),
+        "tx_content_hash": _ops_per_sec(
+            lambda i: backend.tx_content_hash("node_1", "node_2", 10.0, i, anchor, parents, 1.0), iterations
+        ),
+        "generate_keypair": _ops_per_sec(lambda i: backend.generate_keypair(), max(1, iterations // 10)),
+        "sign": _ops_per_sec(lambda i: backend.sign(f"{data}|{i}", priv), iterations),
+        "verify": _ops_per_sec(lambda i: backend.verify(data, signature, pub), iterations),
+        "signature_size": backend.signature_size,
+        "digest_size": backend.digest_size,
+        "verify_cost_us": backend.verify_cost_us,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Микро-бенчмарк крипто-бэкендов сети Елена")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--backend", choices=tuple(CRYPTO_BACKENDS), default=None, help="Только один бэкенд")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    names = [args.backend] if args.backend else list(CRYPTO_BACKENDS)
+    results = {name: bench_backend(CRYPTO_BACKENDS[name](), args.iterations) for name in names}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    cols = ("compute_anchor", "tx_content_hash", "generate_keypair", "sign", "verify")
+    print(f"{'Бэкенд':<10}" + "".join(f"{c:>18}" for c in cols) + f"{'подпись, Б':>12}{'проверка, мкс':>15}")
+    for name, r in results.items():
+        print(
+            f"{name:<10}"
+            + "".join(f"{r[c]:>16,.0f}/s" for c in cols)
+            + f"{r['signature_size']:>12}{r['verify_cost_us']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
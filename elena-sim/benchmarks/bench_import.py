@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк времени запуска: python -X importtime для main.py (и других модулей) в чистом
+интерпретаторе. Проверяет бюджет на импорт и что тяжёлые зависимости не загружаются
+в безголовом прогоне. Код выхода 1 — бюджет превышен или загружен запрещённый модуль.
+Запуск: python3 benchmarks/bench_import.py [--module main] [--budget-ms 500] [--repeat 5]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Загружаются только при использовании своей функции (--viz, графики, метрики пути)
+HEAVY_MODULES = ("fastapi", "uvicorn", "starlette", "matplotlib", "plotly", "pandas", "networkx")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> Tuple[Dict[str, int], List[str]]:
+    """Один запуск: {модуль: кумулятивное время, мкс} и список загруженных тяжёлых модулей."""
+    code = (
+        "import sys; sys.argv = ['main.py']; "
+        f"import {module}; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative, json.loads(proc.stdout.strip().splitlines()[-1].replace("'", '"'))
+
+
+def bench(module: str, repeat: int, top: int) -> Dict[str, object]:
+    runs = [measure(module) for _ in range(repeat)]
+    # Минимум по повторам: первый запуск дополнительно платит за чтение с диска и компиляцию .pyc
+    best, heavy = min(runs, key=lambda r: r[0].get(module, 0))
+    top_level = {name: us for name, us in best.items() if "." not in name and name != module}
+    return {
+        "module": module,
+        "import_ms": best.get(module, 0) / 1000,
+        "heavy_loaded": heavy,
+        "top": sorted(((name, us / 1000) for name, us in top_level.items()), key=lambda x: -x[1])[:top],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк времени импорта сети Елена")
+    parser.add_argument("--module", nargs="+", default=["main"], help="Модули для измерения")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Бюджет на импорт модуля, мс")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Сколько самых дорогих пакетов показать")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    results = [bench(m, args.repeat, args.top) for m in args.module]
+    failed = [r for r in results if r["import_ms"] > args.budget_ms or r["heavy_loaded"]]
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        for r in results:
+            status = "OK" if r not in failed else "ПРЕВЫШЕН"
+            print(f"{r['module']}: {r['import_ms']:.0f} мс (бюджет {args.budget_ms:.0f} мс) — {status}")
+            if r["heavy_loaded"]:
+                print(f"   загружены тяжёлые зависимости: {', '.join(r['heavy_loaded'])}")
+            for name, ms in r["top"]:
+                print(f"   {name:<24} {ms:8.1f} мс")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк живой трансляции (simulation/live.py): накладные расходы на цикл симуляции.
+Сравнивает время шагов без трансляции и с LiveStream, у которого есть подписчик,
+забирающий слитые дельты в отдельном потоке (как медленный клиент дашборда).
+Запуск: python3 benchmarks/bench_live.py [--nodes 2000] [--steps 200] [--clients 4]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.live import LiveStream
+from simulation.runner import SimulationRunner
+
+
+def _run(nodes: int, steps: int, live) -> float:
+    runner = SimulationRunner(num_nodes=nodes, num_evil=1, seed=0, vectorized_propagation=True, live=live)
+    runner.build_network()
+    start = time.perf_counter()
+    for step in range(steps):
+        runner.step(step)
+    return time.perf_counter() - start
+
+
+def bench(nodes: int, steps: int, clients: int, client_delay: float) -> Dict[str, float]:
+    base = _run(nodes, steps, None)
+    live = LiveStream()
+    done = threading.Event()
+    frames = [0] * clients
+    bytes_sent = [0] * clients
+
+    def client(k: int) -> None:
+        wake = threading.Event()
+        sub = live.subscribe(wake.set)
+        while not done.is_set():
+            wake.wait(0.05)
+            wake.clear()
+            frame = sub.take()
+            if frame is not None:
+                frames[k] += 1
+                bytes_sent[k] += len(frame) if isinstance(frame, bytes) else 0
+                time.sleep(client_delay)  # медленная сеть: дельты за это время сливаются
+        sub.close()
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(clients)]
+    for t in threads:
+        t.start()
+    streamed = _run(nodes, steps, live)
+    done.set()
+    for t in threads:
+        t.join()
+    return {
+        "nodes": nodes,
+        "steps": steps,
+        "clients": clients,
+        "base_s": base,
+        "live_s": streamed,
+        "overhead_pct": 100.0 * (streamed - base) / base,
+        "frames_per_client": sum(frames) / max(1, clients),
+        "kb_per_client": sum(bytes_sent) / max(1, clients) / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк живой трансляции сети Елена")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--client-delay", type=float, default=0.02, help="Задержка клиента на кадр (с)")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    r = bench(args.nodes, args.steps, args.clients, args.client_delay)
+    if args.json:
+        print(json.dumps(r, indent=2))
+        return
+    print(f"Узлов: {r['nodes']}, шагов: {r['steps']}, клиентов: {r['clients']}")
+    print(f"Без трансляции: {r['base_s']:.2f} с; с трансляцией: {r['live_s']:.2f} с ({r['overhead_pct']:+.1f}%)")
+    print(f"Кадров на клиента: {r['frames_per_client']:.0f} из {r['steps']} шагов, {r['kb_per_client']:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
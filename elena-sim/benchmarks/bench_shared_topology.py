@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк общей топологии (core/shared_topology.py): параллельные прогоны на одной сети.
+Сравнивает сборку сети в каждом воркере (рёбра + ключи) с подключением к сегменту
+shared_memory, а также пиковую память воркера (ru_maxrss) после сборки и после шагов.
+Общими в сегменте остаются только массивы (CSR, ключи, начальное состояние); объекты Node и
+списки пиров каждый воркер строит сам — их размер выводится отдельно.
+Запуск: python3 benchmarks/bench_shared_topology.py [--nodes 2000] [--workers 4] [--crypto sha512]
+"""
+
+import argparse
+import json
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.shared_topology import SharedTopology
+from simulation.runner import SimulationRunner
+
+
+def _worker(nodes: int, crypto: str, shared: Optional[str], steps: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    if shared:
+        runner = SimulationRunner(crypto_backend=crypto, shared_topology=shared, vectorized_propagation=True)
+    else:
+        runner = SimulationRunner(num_nodes=nodes, num_evil=1, crypto_backend=crypto, vectorized_propagation=True)
+    runner.build_network()
+    build = time.perf_counter() - start
+    build_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    nodes_list = list(runner.graph.nodes.values())
+    # Списки пиров: массив указателей каждого списка (рёбра хранятся дважды — у обоих концов)
+    peers_mb = sum(sys.getsizeof(node.peers) for node in nodes_list) / 1e6
+    node_objects_mb = sum(sys.getsizeof(node) + sys.getsizeof(node.__dict__) for node in nodes_list) / 1e6
+    for step in range(steps):
+        runner.step(step)
+    return {
+        "build_s": build,
+        "build_rss_mb": build_rss,
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peers_mb": peers_mb,
+        "node_objects_mb": node_objects_mb,
+    }
+
+
+def bench(nodes: int, workers: int, crypto: str, steps: int) -> Dict[str, float]:
+    result: Dict[str, float] = {"nodes": nodes, "workers": workers}
+    start = time.perf_counter()
+    topology = SharedTopology.publish(nodes, num_evil=1, seed=0, crypto_backend=crypto)
+    result["publish_s"] = time.perf_counter() - start
+    result["segment_mb"] = topology.nbytes / 1e6
+    try:
+        for label, shared in (("own", None), ("shared", topology.name)):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                runs = list(pool.map(_worker, [nodes] * workers, [crypto] * workers, [shared] * workers, [steps] * workers))
+            result[f"{label}_build_s"] = sum(r["build_s"] for r in runs) / workers
+            result[f"{label}_build_rss_mb"] = max(r["build_rss_mb"] for r in runs)
+            result[f"{label}_maxrss_mb"] = max(r["maxrss_mb"] for r in runs)
+            result[f"{label}_peers_mb"] = max(r["peers_mb"] for r in runs)
+            result[f"{label}_node_objects_mb"] = max(r["node_objects_mb"] for r in runs)
+    finally:
+        topology.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк общей топологии сети Елена")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--crypto", choices=("null", "sha512", "blake2b", "ed25519"), default="sha512")
+    parser.add_argument("--steps", type=int, default=5, help="Шагов симуляции в каждом воркере")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    r = bench(args.nodes, args.workers, args.crypto, args.steps)
+    if args.json:
+        print(json.dumps(r, indent=2))
+        return
+    print(f"Узлов: {r['nodes']}, воркеров: {r['workers']}, сегмент {r['segment_mb']:.1f} МБ (публикация {r['publish_s']:.2f} с)")
+    for label, title in (("own", "Своя сеть в воркере:"), ("shared", "Общая топология:    ")):
+        print(
+            f"{title} сборка {r[label + '_build_s']:.2f} с, память после сборки {r[label + '_build_rss_mb']:.0f} МБ, "
+            f"пик {r[label + '_maxrss_mb']:.0f} МБ"
+        )
+    print(
+        f"Не общее в каждом воркере: объекты Node {r['shared_node_objects_mb']:.1f} МБ, "
+        f"списки пиров {r['shared_peers_mb']:.1f} МБ"
+    )
+
+
+if __name__ == "__main__":
+    main()
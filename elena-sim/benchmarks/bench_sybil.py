@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обнаружения Сибил-узлов (core/sybil.py): точность, полнота и время детектора
+на топологии с сибил-кластером (core.topology.sybil_region_edges).
+Запуск: python3 benchmarks/bench_sybil.py [--nodes 10000 30000 100000] [--sybil-frac 0.1] [--attack-ratio 0.1]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.sybil import SybilDetector, precision_recall
+from core.topology import edges_to_csr, sybil_region_edges
+
+
+def bench_sybil(num_nodes: int, sybil_frac: float, attack_ratio: float, num_seeds: int, seed: int = 0) -> Dict[str, float]:
+    """num_nodes — всего узлов; attack_ratio — рёбер атаки на один сибил-узел."""
+    num_sybil = int(num_nodes * sybil_frac)
+    num_honest = num_nodes - num_sybil
+    attack_edges = max(1, int(num_sybil * attack_ratio))
+    start = time.perf_counter()
+    edges = sybil_region_edges(num_honest, num_sybil, attack_edges, rng=random.Random(seed))
+    indptr, indices = edges_to_csr(num_nodes, edges)
+    build = time.perf_counter() - start
+    is_sybil = np.zeros(num_nodes, dtype=bool)
+    is_sybil[num_honest:] = True
+    seeds = np.random.default_rng(seed).choice(num_honest, size=min(num_seeds, num_honest), replace=False)
+    detector = SybilDetector(seed=seed)
+    flagged = detector.detect(indptr, indices, seeds, num_sybil)
+    precision, recall = precision_recall(flagged, is_sybil)
+    return {
+        "nodes": num_nodes,
+        "sybil": num_sybil,
+        "attack_edges": attack_edges,
+        "build_sec": build,
+        "detect_ms": 1000 * detector.last_runtime,
+        "precision": precision,
+        "recall": recall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк обнаружения Сибил-узлов сети Елена")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10000, 30000, 100000])
+    parser.add_argument("--sybil-frac", type=float, default=0.1, help="Доля сибил-узлов")
+    parser.add_argument("--attack-ratio", type=float, default=0.1, help="Рёбер атаки на сибил-узел")
+    parser.add_argument("--seeds", type=int, default=100, help="Доверенных честных узлов")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    results: List[Dict[str, float]] = [
+        bench_sybil(n, args.sybil_frac, args.attack_ratio, args.seeds) for n in args.nodes
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Узлов':>8}{'Сибил':>8}{'Рёбер атаки':>13}{'Детектор':>12}{'Точность':>10}{'Полнота':>9}")
+    for r in results:
+        print(
+            f"{r['nodes']:>8}{r['sybil']:>8}{r['attack_edges']:>13}{r['detect_ms']:>10.0f}мс"
+            f"{r['precision']:>10.3f}{r['recall']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
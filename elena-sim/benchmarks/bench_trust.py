@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк глобального доверия (core/trust.py): время пересчёта на большой сети.
+Наблюдения синтетические: каждая транзакция доходит до случайной доли сети.
+Запуск: python3 benchmarks/bench_trust.py [--nodes 100000] [--interval 10] [--tx-per-step 10]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import Node, NetworkGraph, set_backend
+from core.topology import generate_edges
+from core.trust import GlobalTrust
+
+
+def build_graph(num_nodes: int) -> NetworkGraph:
+    set_backend("null")  # ключи не нужны — только топология
+    g = NetworkGraph()
+    nodes = [Node(f"node_{i}") for i in range(num_nodes)]
+    for n in nodes:
+        g.add_node(n)
+    for i, j in generate_edges(num_nodes, 3, 10):
+        g.add_edge(nodes[i].id, nodes[j].id)
+    return g
+
+
+def bench_trust(g: NetworkGraph, interval: int, tx_per_step: int, rounds: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    n = len(g.nodes)
+    trust = GlobalTrust(g, interval=interval)
+    times, iterations = [], []
+    for _ in range(rounds):
+        for _ in range(interval * tx_per_step):
+            reach = rng.uniform(0.5, 1.0)
+            trust.observe_flood(np.flatnonzero(rng.random(n) < reach))
+        for observer in rng.integers(0, n, size=20):
+            trust.observe_conflict(f"node_{observer}", "node_0")
+        start = time.perf_counter()
+        iterations.append(trust.update())
+        times.append(time.perf_counter() - start)
+    return {
+        "nodes": n,
+        "edges": trust.stats()["edges"],
+        "cold_update_ms": 1000 * times[0],
+        "warm_update_ms": 1000 * float(np.mean(times[1:])) if rounds > 1 else None,
+        "cold_iterations": iterations[0],
+        "warm_iterations": float(np.mean(iterations[1:])) if rounds > 1 else None,
+        "per_step_ms": 1000 * float(np.mean(times)) / interval,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк глобального доверия сети Елена")
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--interval", type=int, default=10, help="Шагов между пересчётами")
+    parser.add_argument("--tx-per-step", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=4, help="Число пересчётов")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    g = build_graph(args.nodes)
+    build = time.perf_counter() - start
+    result = bench_trust(g, args.interval, args.tx_per_step, args.rounds)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Узлов: {result['nodes']}, рёбер доверия: {result['edges']} (граф построен за {build:.1f} с)")
+    print(f"Первый пересчёт: {result['cold_update_ms']:.0f} мс, {result['cold_iterations']} итераций")
+    if result["warm_update_ms"] is not None:
+        print(f"Тёплый старт: {result['warm_update_ms']:.0f} мс, {result['warm_iterations']:.1f} итераций")
+    print(f"В среднем на шаг симуляции: {result['per_step_ms']:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
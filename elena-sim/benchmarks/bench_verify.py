@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пакетной проверки подписей (режим настоящей криптографии).
+Сравнивает поузловую проверку с пакетной для разного размера пула: транзакций/с симуляции.
+Запуск: python3 benchmarks/bench_verify.py [--nodes 200 --steps 20 --crypto ed25519]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.crypto import set_backend
+from simulation.runner import SimulationRunner
+
+
+def run(nodes: int, steps: int, tx_per_step: int, crypto: str, batch_verify: bool, workers: int) -> dict:
+    random.seed(7)
+    runner = SimulationRunner(
+        num_nodes=nodes,
+        num_evil=0,
+        tx_per_step=tx_per_step,
+        rewiring_interval=0,
+        chaff_prob=0,
+        crypto_backend=crypto,
+        batch_verify=batch_verify,
+        verify_workers=workers,
+    )
+    runner.build_network()
+    start = time.perf_counter()
+    for step in range(steps):
+        runner.step(step)
+    elapsed = time.perf_counter() - start
+    if runner.verifier is not None:
+        runner.verifier.close()
+    txs = len(runner.graph.transactions)
+    return {"tx_per_sec": txs / elapsed if elapsed else 0.0, "signature_checks": runner.graph.signature_checks}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетной проверки подписей")
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--tx-per-step", type=int, default=50)
+    parser.add_argument("--crypto", default="ed25519")
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    print(f"Узлов: {args.nodes}, шагов: {args.steps}, tx/шаг: {args.tx_per_step}, бэкенд: {args.crypto}, ядер: {cores}")
+    base = run(args.nodes, args.steps, args.tx_per_step, args.crypto, False, 1)
+    print(f"{'поузловая проверка':<24} {base['tx_per_sec']:>10.1f} tx/s  проверок: {base['signature_checks']}")
+    workers = 1
+    while True:
+        r = run(args.nodes, args.steps, args.tx_per_step, args.crypto, True, workers)
+        print(f"{f'пакетная, пул={workers}':<24} {r['tx_per_sec']:>10.1f} tx/s  проверок: {r['signature_checks']}")
+        if workers >= cores:
+            break
+        workers = min(cores, workers * 2)
+    set_backend("sha512")
+
+
+if __name__ == "__main__":
+    main()
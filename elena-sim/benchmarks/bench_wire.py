@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк проводного формата: core.wire против JSON и pickle — размер, кодирование, декодирование.
+Запуск: python3 benchmarks/bench_wire.py [--messages 20000] [--backend blake2b]
+"""
+
+import argparse
+import json
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import Node, NetworkGraph, Transaction
+from core import wire
+from core.crypto import CRYPTO_BACKENDS, set_backend
+from simulation.actors import JsonCodec
+
+
+def _make_transactions(count: int) -> List[Transaction]:
+    g = NetworkGraph()
+    nodes = [Node(f"node_{i}") for i in range(50)]
+    for n in nodes:
+        g.add_node(n)
+    # Малые суммы — чтобы баланса хватило на все транзакции
+    return [nodes[i % 50].create_transaction(f"node_{(i + 1) % 50}", 0.01 * (1 + i % 7)) for i in range(count)]
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_codecs(txs: List[Transaction]) -> Dict[str, Dict[str, float]]:
+    """Байт на сообщение и сообщений/с (кодирование, декодирование) для каждого формата."""
+    n = len(txs)
+    codec = JsonCodec()
+    results = {}
+
+    encoded = [wire.encode_transaction(tx) for tx in txs]
+    batch = wire.encode_batch(txs)
+    results["wire"] = {
+        "bytes": sum(map(len, encoded)) / n,
+        "encode": n / _timed(lambda: [wire.encode_transaction(tx) for tx in txs]),
+        "decode": n / _timed(lambda: [wire.decode_transaction(b) for b in encoded]),
+    }
+    results["wire batch"] = {
+        "bytes": len(batch) / n,
+        "encode": n / _timed(lambda: wire.encode_batch(txs)),
+        "decode": n / _timed(lambda: wire.decode_batch(batch)),
+    }
+    # Ленивое чтение: только id и отправитель (маршрутизация без полного декодирования)
+    results["wire view"] = {
+        "bytes": results["wire"]["bytes"],
+        "encode": results["wire"]["encode"],
+        "decode": n / _timed(lambda: [(v.id, v.from_id) for v in map(wire.TransactionView, encoded)]),
+    }
+    encoded = [codec.encode("tx", tx) for tx in txs]
+    results["json"] = {
+        "bytes": sum(map(len, encoded)) / n,
+        "encode": n / _timed(lambda: [codec.encode("tx", tx) for tx in txs]),
+        "decode": n / _timed(lambda: [codec.decode(b) for b in encoded]),
+    }
+    encoded = [pickle.dumps(tx, protocol=pickle.HIGHEST_PROTOCOL) for tx in txs]
+    results["pickle"] = {
+        "bytes": sum(map(len, encoded)) / n,
+        "encode": n / _timed(lambda: [pickle.dumps(tx, protocol=pickle.HIGHEST_PROTOCOL) for tx in txs]),
+        "decode": n / _timed(lambda: [pickle.loads(b) for b in encoded]),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк проводного формата сети Елена")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--backend", choices=tuple(CRYPTO_BACKENDS), default="sha512")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+    set_backend(args.backend)
+    results = bench_codecs(_make_transactions(args.messages))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Бэкенд: {args.backend}, сообщений: {args.messages}")
+    print(f"{'Формат':<12}{'байт/сообщ.':>14}{'кодирование':>18}{'декодирование':>18}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['bytes']:>14.1f}{r['encode']:>16,.0f}/s{r['decode']:>16,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк генератора нагрузки (simulation/workload.py): транзакций в секунду по моделям прихода и
+отправителей при разном числе узлов. Скорость не должна зависеть от размера сети.
+Запуск: python3 benchmarks/bench_workload.py [--nodes 1000 1000000] [--tx-per-step 100000] [--steps 50]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.workload import ARRIVAL_MODELS, SENDER_MODELS, WorkloadGenerator
+
+
+def bench(num_nodes: int, tx_per_step: int, steps: int, arrival: str, senders: str) -> dict:
+    gen = WorkloadGenerator(tx_per_step, arrival=arrival, senders=senders, rng=random.Random(0))
+    started = time.perf_counter()
+    offsets, _, _, _ = gen.generate(steps, num_nodes)
+    elapsed = time.perf_counter() - started
+    return {
+        "nodes": num_nodes,
+        "arrival": arrival,
+        "senders": senders,
+        "transactions": int(offsets[-1]),
+        "mtx_per_s": offsets[-1] / elapsed / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Скорость генератора нагрузки")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 1_000_000])
+    parser.add_argument("--tx-per-step", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+    args = parser.parse_args()
+    rows = [
+        bench(n, args.tx_per_step, args.steps, arrival, senders)
+        for n in args.nodes
+        for arrival in ARRIVAL_MODELS
+        for senders in SENDER_MODELS
+    ]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for r in rows:
+        print(f"{r['nodes']:>9} узлов  {r['arrival']:>8}/{r['senders']:<8}  {r['mtx_per_s']:6.1f} млн tx/с")
+
+
+if __name__ == "__main__":
+    main()
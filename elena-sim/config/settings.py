@@ -7,13 +7,43 @@ SIMULATION_PARAMS = {
     "chaff_probability": 0,  # по умолчанию без chaff (оптимально по нагрузке; для шума задать в CLI)
     "rewiring_interval": 100,
     "max_steps": 10000,
-    "tx_per_step": 10,
+    "tx_per_step": 10,  # средняя нагрузка: транзакций за шаг (simulation/workload.py)
+    "workload_arrival": "uniform",  # uniform (ровно tx_per_step) | poisson | mmpp (всплески по цепи Маркова)
+    "workload_senders": "uniform",  # uniform | zipf (горячие отправители)
+    "workload_zipf_exponent": 1.1,  # показатель Zipf: узел ранга k шлёт ~1/k^s транзакций
+    "workload_burst_factor": 10.0,  # mmpp: во сколько раз всплеск интенсивнее тихого состояния
+    "workload_burst_enter": 0.05,  # mmpp: вероятность начала всплеска за шаг
+    "workload_burst_exit": 0.3,  # mmpp: вероятность конца всплеска за шаг
     "reputation_threshold": 0.8,  # для арбитров
     "confidence_threshold": 0.99,  # для финальности
     "alert_priority_multiplier": 10,  # приоритет алертов
     "initial_balance": 1000.0,
     "peer_degree_min": 3,
     "peer_degree_max": 10,
+    "crypto_backend": "sha512",  # null | sha512 | blake2b | ed25519 (core/crypto.py)
+    "signature_size_bytes": None,  # модельный размер подписи; None — значение бэкенда
+    "verify_cost_us": None,  # модельная стоимость проверки подписи; None — значение бэкенда
+    "batch_verify": False,  # пакетная проверка подписей шага в пуле (core/verify_pool.py)
+    "verify_workers": None,  # размер пула проверки; None — число ядер
+    "probe_sample_per_step": 2,  # транзакций на шаг под пробы уверенности (0 — выключено)
+    "probe_panel_size": 16,  # узлов в панели опроса уверенности
+    "probe_max_age": 20,  # пробы на возрастах 1..probe_max_age шагов
+    "vectorized_propagation": False,  # пакетное распространение транзакций шага (core/propagation.py)
+    "trust_interval": 0,  # пересчёт глобального доверия (core/trust.py) каждые N шагов; 0 — выключено
+    "memory_interval": 0,  # учёт памяти по подсистемам (simulation/memory.py) каждые N шагов; 0 — выключено
+    "metrics_sink": None,  # потоковая запись пошаговых метрик (simulation/streaming.py): jsonl | npz; None — выключено
+    "metrics_dir": None,  # каталог приёмника; None — results/metrics_<дата>
+    "metrics_history": None,  # сколько последних шагов держать в памяти; None — все
+    "churn_arrival_rate": 0.0,  # приход узлов (core/churn.py): среднее число новых узлов за шаг (пуассоновский поток)
+    "churn_session_mean": 0,  # средняя длительность сессии узла в шагах; 0 — узлы не уходят
+    "churn_session_distribution": "exponential",  # exponential | lognormal | pareto
+    "sync_on_join": False,  # новый узел догружает историю сверкой множеств с пирами (core/reconcile.py)
+    "sync_sketch_cells": 256,  # ячеек на раздел таблицы узла (степень двойки); ёмкость ~1.5 · cells сообщений разности
+    "sync_fanout": 2,  # с каким числом пиров сверяется новый узел
+    "sync_fetch_batch": 128,  # ключей в одном запросе тел недостающих сообщений
+    "timeline_interval": 0,  # ключевой кадр шкалы состояний (simulation/timeline.py) каждые N шагов; 0 — выключено
+    "sybil_quarantine_fraction": 0.1,  # сценарий 4: доля узлов с наименьшим доверием, уходящих в карантин за раунд
+    "actor_transport": None,  # режим акторов asyncio: inprocess | tcp | unix; None — синхронный граф
 }
 
 REPUTATION_PARAMS = {
@@ -1,7 +1,7 @@
 """Core components of Elena decentralized payment network simulator."""
 
 from .transaction import Transaction, Alert
-from .crypto import compute_anchor, sign_data, verify_signature, generate_keypair
+from .crypto import compute_anchor, sign_data, verify_signature, generate_keypair, get_backend, set_backend
 from .node import Node
 from .quantum_node import QuantumEvilNode
 from .graph import NetworkGraph
@@ -13,6 +13,8 @@ __all__ = [
     "sign_data",
     "verify_signature",
     "generate_keypair",
+    "get_backend",
+    "set_backend",
     "Node",
     "QuantumEvilNode",
     "NetworkGraph",
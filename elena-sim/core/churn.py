@@ -0,0 +1,312 @@
+"""
+Динамика топологии: rewiring и вход/выход узлов за O(1) на изменённое ребро.
+ChurnEngine держит массив рёбер (ключ min·2³² + max по индексам узлов) и позицию каждого
+ребра в нём: случайное ребро выбирается по позиции, удаление — обмен с последним, а при
+rewiring новое ребро просто занимает место старого.
+Новый сосед ищется отбраковкой случайных живых узлов, без списка всех «не-соседей».
+Процессы: приход узлов — пуассоновский с интенсивностью arrival_rate за шаг; время жизни —
+из распределения сессий (exponential | lognormal | pareto) со средним session_mean шагов;
+соседи ушедшего узла, у которых осталось меньше min_degree пиров, переподключаются.
+Если в графе включена синхронизация состояния (core/reconcile.py), новый узел сразу сверяет
+историю с новыми соседями.
+Изменения графа, сделанные в обход движка (add_edge и т. п.), замечаются по версии топологии —
+индекс перестраивается за O(N + E).
+"""
+
+import heapq
+import math
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .node import Node
+
+SESSION_DISTRIBUTIONS = ("exponential", "lognormal", "pareto")
+_SHIFT = 32
+_MASK = (1 << _SHIFT) - 1
+_MAX_TRIES = 64  # попыток отбраковки на одного нового соседа
+
+
+def _poisson(rnd, lam: float) -> int:
+    """Пуассоновская величина: число экспоненциальных интервалов, уложившихся в lam."""
+    count, total = 0, rnd.expovariate(1.0) if lam > 0 else 1.0
+    while total < lam:
+        count += 1
+        total += rnd.expovariate(1.0)
+    return count
+
+
+def _binomial(rnd, n: int, p: float) -> int:
+    """Биномиальная величина за O(успехов): геометрические пропуски между успехами."""
+    if p <= 0 or n <= 0:
+        return 0
+    if p >= 1:
+        return n
+    log_q = math.log1p(-p)
+    count, i = 0, -1
+    while True:
+        i += int(math.log(1.0 - rnd.random()) / log_q) + 1
+        if i >= n:
+            return count
+        count += 1
+
+
+def sample_session(rnd, distribution: str, mean: float) -> float:
+    """Длительность сессии в шагах со средним mean."""
+    if distribution == "exponential":
+        return rnd.expovariate(1.0 / mean)
+    if distribution == "lognormal":
+        sigma = 1.0
+        return rnd.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+    if distribution == "pareto":
+        alpha = 1.5  # тяжёлый хвост: большинство сессий короткие, немногие — очень длинные
+        return mean * (alpha - 1) / alpha * rnd.paretovariate(alpha)
+    raise ValueError(f"Неизвестное распределение сессий: {distribution} (доступны: {', '.join(SESSION_DISTRIBUTIONS)})")
+
+
+class ChurnEngine:
+    """Индекс рёбер NetworkGraph для быстрого rewiring и процессы входа/выхода узлов."""
+
+    def __init__(
+        self,
+        graph,
+        arrival_rate: float = 0.0,
+        session_mean: float = 0.0,
+        session_distribution: str = "exponential",
+        attach_degree: int = 4,
+        min_degree: int = 2,
+        node_factory: Optional[Callable[[str], Node]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        if session_distribution not in SESSION_DISTRIBUTIONS:
+            raise ValueError(f"Неизвестное распределение сессий: {session_distribution}")
+        self.graph = graph
+        self.arrival_rate = arrival_rate
+        self.session_mean = session_mean
+        self.session_distribution = session_distribution
+        self.attach_degree = attach_degree
+        self.min_degree = min_degree
+        self.node_factory = node_factory or (lambda nid: Node(node_id=nid))
+        self.rng = rng or random
+        # Счётчики
+        self.rewired = 0
+        self.joined = 0
+        self.departed = 0
+        self.reattached = 0
+        self._version = None
+        self._seq = 0
+        self._id_seq: Optional[int] = None
+        self._departures: List[Tuple[float, int, str]] = []  # куча (шаг ухода, порядок, id)
+        self._sessions_started = False
+
+    # --- индекс ---
+
+    def _sync(self) -> None:
+        """Перестраивает индекс, если граф менялся в обход движка."""
+        if self._version == self.graph._topology_version:
+            return
+        self._nodes: List[Optional[Node]] = []
+        self._index: Dict[str, int] = {}
+        self._alive: List[int] = []
+        self._alive_pos: Dict[int, int] = {}
+        for node in self.graph.nodes.values():
+            self._register(node)
+        self._edges: List[int] = []
+        self._edge_pos: Dict[int, int] = {}
+        for i, node in enumerate(self._nodes):
+            for peer in node.peers:
+                j = self._index.get(peer.id)
+                if j is not None and i < j:
+                    self._insert(i, j)
+        self._version = self.graph._topology_version
+
+    def _register(self, node: Node) -> int:
+        i = len(self._nodes)
+        self._nodes.append(node)
+        self._index[node.id] = i
+        self._alive_pos[i] = len(self._alive)
+        self._alive.append(i)
+        return i
+
+    def _insert(self, i: int, j: int) -> None:
+        key = (min(i, j) << _SHIFT) | max(i, j)
+        self._edge_pos[key] = len(self._edges)
+        self._edges.append(key)
+
+    def _delete(self, i: int, j: int) -> None:
+        key = (min(i, j) << _SHIFT) | max(i, j)
+        pos = self._edge_pos.pop(key)
+        last = self._edges.pop()
+        if last != key:
+            self._edges[pos] = last
+            self._edge_pos[last] = pos
+
+    def _link(self, i: int, j: int) -> None:
+        a, b = self._nodes[i], self._nodes[j]
+        a.peers.append(b)
+        b.peers.append(a)
+        self._insert(i, j)
+
+    def _unlink(self, i: int, j: int) -> None:
+        a, b = self._nodes[i], self._nodes[j]
+        a.peers.remove(b)
+        b.peers.remove(a)
+        self._delete(i, j)
+
+    def _random_peer_for(self, i: int) -> Optional[int]:
+        """Случайный живой узел, ещё не связанный с i (отбраковка; None — не нашли)."""
+        node = self._nodes[i]
+        alive = self._alive
+        if len(node.peers) >= len(alive) - 1:
+            return None
+        for _ in range(_MAX_TRIES):
+            j = alive[self.rng.randrange(len(alive))]
+            if j != i and self._nodes[j] not in node.peers:
+                return j
+        return None
+
+    def _touched(self) -> None:
+        self.graph._topology_version += 1
+        self._version = self.graph._topology_version
+
+    @property
+    def num_edges(self) -> int:
+        self._sync()
+        return len(self._edges)
+
+    # --- rewiring ---
+
+    def rewire(self, rewiring_prob: float = 0.1) -> int:
+        """
+        ~rewiring_prob · N случайных рёбер: один конец (не остающийся без пиров) отцепляется,
+        другой подключается к случайному узлу, с которым ещё не связан. Случайные числа
+        раунда выбираются одним вызовом NumPy; новое ребро занимает позицию старого в массиве.
+        Возвращает число перестроенных рёбер.
+        """
+        self._sync()
+        edges, pos, nodes, alive = self._edges, self._edge_pos, self._nodes, self._alive
+        if len(alive) < 3 or not edges:
+            return 0
+        count = min(_binomial(self.rng, len(alive), rewiring_prob), len(edges))
+        gen = np.random.default_rng(self.rng.getrandbits(64))
+        slots = gen.choice(len(edges), size=count, replace=False).tolist()
+        flips = (gen.random(count) < 0.5).tolist()
+        picks = gen.integers(0, len(alive), size=count).tolist()
+        done = 0
+        for slot, flip, pick in zip(slots, flips, picks):
+            key = edges[slot]
+            i, j = (key & _MASK, key >> _SHIFT) if flip else (key >> _SHIFT, key & _MASK)
+            a, b = nodes[i], nodes[j]
+            # i оставляет ребро за собой, j теряет соседа
+            if len(b.peers) <= 1:
+                i, j, a, b = j, i, b, a
+                if len(b.peers) <= 1:
+                    continue
+            k = alive[pick]
+            c = nodes[k]
+            if k == i or c in a.peers:
+                k = self._random_peer_for(i)
+                if k is None:
+                    continue
+                c = nodes[k]
+            b.peers.remove(a)
+            a.peers[a.peers.index(b)] = c
+            c.peers.append(a)
+            new_key = (min(i, k) << _SHIFT) | max(i, k)
+            del pos[key]
+            edges[slot] = new_key
+            pos[new_key] = slot
+            done += 1
+        if done:
+            self._touched()
+        self.rewired += done
+        return done
+
+    # --- вход и выход узлов ---
+
+    def _schedule(self, node: Node, step: int) -> None:
+        if self.session_mean > 0 and not getattr(node, "is_evil", False):
+            leave = step + sample_session(self.rng, self.session_distribution, self.session_mean)
+            heapq.heappush(self._departures, (leave, self._seq, node.id))
+            self._seq += 1
+
+    def _new_id(self) -> str:
+        if self._id_seq is None:
+            self._id_seq = len(self.graph.nodes)
+        while True:
+            nid = f"node_{self._id_seq}"
+            self._id_seq += 1
+            if nid not in self.graph.nodes:
+                return nid
+
+    def join(self, step: int = 0) -> Node:
+        """Новый узел с attach_degree соседями среди живых узлов."""
+        self._sync()
+        node = self.node_factory(self._new_id())
+        self.graph.add_node(node)
+        i = self._register(node)
+        for _ in range(min(self.attach_degree, len(self._alive) - 1)):
+            j = self._random_peer_for(i)
+            if j is not None:
+                self._link(i, j)
+        if self.graph.state_sync is not None:
+            self.graph.state_sync.catch_up(node)
+        self._schedule(node, step)
+        self.joined += 1
+        self._touched()
+        return node
+
+    def leave(self, node_id: str) -> List[Node]:
+        """Уход узла: его рёбра удаляются, соседи с числом пиров меньше min_degree переподключаются."""
+        self._sync()
+        i = self._index.pop(node_id, None)
+        if i is None:
+            return []
+        node = self._nodes[i]
+        former = [self._index[p.id] for p in node.peers if p.id in self._index]
+        for j in former:
+            self._unlink(i, j)
+        self._nodes[i] = None
+        pos = self._alive_pos.pop(i)
+        last = self._alive.pop()
+        if last != i:
+            self._alive[pos] = last
+            self._alive_pos[last] = pos
+        self.graph.remove_node(node_id)
+        for j in former:
+            while len(self._nodes[j].peers) < self.min_degree:
+                k = self._random_peer_for(j)
+                if k is None:
+                    break
+                self._link(j, k)
+                self.reattached += 1
+        self.departed += 1
+        self._touched()
+        return [self._nodes[j] for j in former]
+
+    def step(self, step: int) -> Tuple[List[Node], List[Node]]:
+        """Процессы шага: уходы с истёкшей сессией, затем пуассоновские приходы. Возвращает (пришли, ушли)."""
+        if not self._sessions_started:
+            # Узлы, бывшие в сети до запуска процессов, получают свои сессии с текущего шага
+            self._sessions_started = True
+            for node in list(self.graph.nodes.values()):
+                self._schedule(node, step)
+        left: List[Node] = []
+        while self._departures and self._departures[0][0] <= step:
+            _, _, nid = heapq.heappop(self._departures)
+            node = self.graph.nodes.get(nid)
+            if node is not None and len(self.graph.nodes) > 3:
+                self.leave(nid)
+                left.append(node)
+        joined = [self.join(step) for _ in range(_poisson(self.rng, self.arrival_rate))]
+        return joined, left
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rewired": self.rewired,
+            "joined": self.joined,
+            "departed": self.departed,
+            "reattached": self.reattached,
+            "nodes": len(self.graph.nodes),
+        }
@@ -1,60 +1,394 @@
 """
 Имитация пост-квантовой криптографии для симуляции сети Елена.
 Используются хеши и подписи без реальных алгоритмов Dilithium/SHA3 — только поведение.
+
+Криптография вынесена в сменные бэкенды (выбираются на симуляцию через set_backend):
+- "null"    — без криптографии, для исследований топологии;
+- "sha512"  — исходное поведение: SHA-512 hex, HMAC-подобная подпись (по умолчанию);
+- "blake2b" — бинарные BLAKE2b-дайджесты, быстрая имитация;
+- "ed25519" — настоящие подписи (пакет cryptography), заглушка вместо Dilithium.
+Модульные функции (compute_anchor, sign_data, ...) делегируют активному бэкенду.
 """
 
 import hashlib
 import secrets
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Хранилище для проверки подписей (в симуляции: data_hash -> valid)
 _signature_store: dict = {}
 
+# Дайджест: hex-строка (sha512, null, ed25519) или bytes (blake2b)
+Digest = Union[str, bytes]
+
+# Размеры модели Dilithium2 (NIST PQC, уровень 2), которую имитируют sha512/blake2b
+DILITHIUM2_SIGNATURE_SIZE = 2420
+DILITHIUM2_VERIFY_COST_US = 60.0
+
+
+def digest_text(value: Digest) -> str:
+    """Текстовое представление дайджеста (bytes -> hex) для id алертов и подписываемых данных."""
+    return value.hex() if isinstance(value, bytes) else value
+
+
+class CryptoBackend:
+    """
+    Интерфейс криптографического бэкенда.
+    signature_size и verify_cost_us — модельные значения для учёта нагрузки:
+    байт подписи на проводе и стоимость одной проверки (мкс).
+    """
+
+    name = "base"
+    digest_size = 64  # байт якоря/id на проводе
+    signature_size = 0
+    verify_cost_us = 0.0
+    # Проверка не зависит от состояния процесса (можно отдавать в пул процессов)
+    stateless_verify = False
+    # Байт на ключ в общей памяти (core.shared_topology); 0 — ключи генерируются в каждом прогоне
+    key_size = 0
+
+    def __init__(self, signature_size: Optional[int] = None, verify_cost_us: Optional[float] = None):
+        if signature_size is not None:
+            self.signature_size = signature_size
+        if verify_cost_us is not None:
+            self.verify_cost_us = verify_cost_us
+
+    def compute_anchor(self, balance: float, last_txs: List[Digest], nonce: int, timestamp: float) -> Digest:
+        raise NotImplementedError
+
+    def tx_content_hash(
+        self,
+        from_id: str,
+        to_id: str,
+        amount: float,
+        nonce: int,
+        anchor: Digest,
+        parents: List[Digest],
+        timestamp: float,
+    ) -> Digest:
+        raise NotImplementedError
+
+    def generate_keypair(self) -> Tuple[str, Any]:
+        raise NotImplementedError
+
+    def sign(self, data: str, private_key: Any) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, data: str, signature: bytes, public_key: str) -> bool:
+        raise NotImplementedError
+
+    def export_keypair(self, public_key: str, private_key: Any) -> Tuple[bytes, bytes]:
+        """Сырые байты пары ключей (по key_size) для публикации в общей памяти."""
+        raise NotImplementedError
+
+    def import_keypair(self, public_raw: bytes, private_raw: bytes) -> Tuple[str, Any]:
+        """Пара ключей из байт export_keypair."""
+        raise NotImplementedError
+
+    def export_signature(self, data: str, public_key: str) -> Optional[tuple]:
+        """
+        Запись, позволяющая проверить подпись в другом процессе (для бэкендов с хранилищем подписей).
+        Бэкендам с настоящими подписями передавать нечего.
+        """
+        return None
+
+    def import_signature(self, record: tuple) -> None:
+        """Принимает запись export_signature из другого процесса."""
+
+    def estimate_tx_size(self, tx) -> int:
+        """Размер транзакции на проводе (байт, core.wire) с модельным размером подписи бэкенда."""
+        from .wire import transaction_size  # wire импортирует transaction, а тот — crypto
+        return transaction_size(tx, signature_size=self.signature_size)
+
+    def estimate_alert_size(self, alert) -> int:
+        """Размер алерта на проводе (байт, core.wire)."""
+        from .wire import alert_size
+        return alert_size(alert)
+
+
+class NullBackend(CryptoBackend):
+    """Без криптографии: дешёвые уникальные id, подпись пустая и всегда верна."""
+
+    name = "null"
+    digest_size = 8
+    stateless_verify = True
+
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, signature_size: Optional[int] = None, verify_cost_us: Optional[float] = None):
+        super().__init__(signature_size, verify_cost_us)
+        self._key_counter = 0
+
+    def compute_anchor(self, balance, last_txs, nonce, timestamp):
+        last = tuple(last_txs[:2])
+        return format(hash((balance, last, nonce, timestamp)) & self._MASK, "016x")
+
+    def tx_content_hash(self, from_id, to_id, amount, nonce, anchor, parents, timestamp):
+        return format(hash((from_id, to_id, amount, nonce, anchor, tuple(parents[:5]), timestamp)) & self._MASK, "016x")
+
+    def generate_keypair(self):
+        self._key_counter += 1
+        key = f"null_{self._key_counter}"
+        return key, key
+
+    def sign(self, data, private_key):
+        return b""
+
+    def verify(self, data, signature, public_key):
+        return True
+
+
+class Sha512Backend(CryptoBackend):
+    """Исходное поведение: SHA-512 hex и HMAC-подобная подпись через хранилище (модель Dilithium2)."""
+
+    name = "sha512"
+    digest_size = 64
+    signature_size = DILITHIUM2_SIGNATURE_SIZE
+    verify_cost_us = DILITHIUM2_VERIFY_COST_US
+
+    def compute_anchor(self, balance, last_txs, nonce, timestamp):
+        parts = [
+            str(balance),
+            (last_txs[0] if len(last_txs) > 0 else ""),
+            (last_txs[1] if len(last_txs) > 1 else ""),
+            str(nonce),
+            str(timestamp),
+        ]
+        payload = "|".join(parts)
+        # SHA3-512 имитация через SHA-512 (для симуляции достаточно)
+        return hashlib.sha512(payload.encode("utf-8")).hexdigest()
+
+    def tx_content_hash(self, from_id, to_id, amount, nonce, anchor, parents, timestamp):
+        parts = [from_id, to_id, str(amount), str(nonce), anchor]
+        parts.extend(parents[:5])
+        parts.append(str(timestamp))
+        payload = "|".join(parts)
+        return hashlib.sha512(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _data_hash(data: str) -> str:
+        """Хеш данных для подписи."""
+        return hashlib.sha512(data.encode("utf-8")).hexdigest()
+
+    key_size = 32
+
+    def generate_keypair(self):
+        private_key = secrets.token_hex(32)
+        public_key = hashlib.sha256(private_key.encode("utf-8")).hexdigest()
+        return public_key, private_key
+
+    def export_keypair(self, public_key, private_key):
+        return bytes.fromhex(public_key), bytes.fromhex(private_key)
+
+    def import_keypair(self, public_raw, private_raw):
+        return bytes(public_raw).hex(), bytes(private_raw).hex()
+
+    def sign(self, data, private_key):
+        data_hash = self._data_hash(data)
+        payload = private_key + data_hash
+        sig_hash = hashlib.sha512(payload.encode("utf-8")).digest()
+        public_key = hashlib.sha256(private_key.encode("utf-8")).hexdigest()
+        _signature_store[(data_hash, public_key)] = sig_hash
+        return sig_hash
+
+    def verify(self, data, signature, public_key):
+        key = (self._data_hash(data), public_key)
+        if key not in _signature_store:
+            return False
+        return _signature_store[key] == signature
+
+    def export_signature(self, data, public_key):
+        key = (self._data_hash(data), public_key)
+        signature = _signature_store.get(key)
+        return None if signature is None else (key, signature)
+
+    def import_signature(self, record):
+        key, signature = record
+        _signature_store[key] = signature
+
+
+class Blake2bBackend(CryptoBackend):
+    """Бинарные BLAKE2b-дайджесты (32 байта) и keyed-BLAKE2b подпись; модель Dilithium2 на проводе."""
+
+    name = "blake2b"
+    digest_size = 32
+    signature_size = DILITHIUM2_SIGNATURE_SIZE
+    verify_cost_us = DILITHIUM2_VERIFY_COST_US
+
+    @staticmethod
+    def _update(h, value) -> None:
+        h.update(value if isinstance(value, bytes) else str(value).encode("utf-8"))
+        h.update(b"|")
+
+    def compute_anchor(self, balance, last_txs, nonce, timestamp):
+        h = hashlib.blake2b(digest_size=self.digest_size)
+        self._update(h, balance)
+        self._update(h, last_txs[0] if len(last_txs) > 0 else b"")
+        self._update(h, last_txs[1] if len(last_txs) > 1 else b"")
+        self._update(h, nonce)
+        self._update(h, timestamp)
+        return h.digest()
+
+    def tx_content_hash(self, from_id, to_id, amount, nonce, anchor, parents, timestamp):
+        h = hashlib.blake2b(digest_size=self.digest_size)
+        for value in (from_id, to_id, amount, nonce, anchor, *parents[:5], timestamp):
+            self._update(h, value)
+        return h.digest()
+
+    key_size = 32
+
+    def generate_keypair(self):
+        private_key = secrets.token_bytes(32)
+        public_key = hashlib.blake2b(private_key, digest_size=32).hexdigest()
+        return public_key, private_key
+
+    def export_keypair(self, public_key, private_key):
+        return bytes.fromhex(public_key), private_key
+
+    def import_keypair(self, public_raw, private_raw):
+        return bytes(public_raw).hex(), bytes(private_raw)
+
+    def sign(self, data, private_key):
+        data_hash = hashlib.blake2b(data.encode("utf-8"), digest_size=32).digest()
+        sig = hashlib.blake2b(data_hash, key=private_key, digest_size=32).digest()
+        public_key = hashlib.blake2b(private_key, digest_size=32).hexdigest()
+        _signature_store[(data_hash, public_key)] = sig
+        return sig
+
+    def verify(self, data, signature, public_key):
+        data_hash = hashlib.blake2b(data.encode("utf-8"), digest_size=32).digest()
+        return _signature_store.get((data_hash, public_key)) == signature
+
+    def export_signature(self, data, public_key):
+        key = (hashlib.blake2b(data.encode("utf-8"), digest_size=32).digest(), public_key)
+        signature = _signature_store.get(key)
+        return None if signature is None else (key, signature)
+
+    def import_signature(self, record):
+        key, signature = record
+        _signature_store[key] = signature
+
+
+class Ed25519Backend(Sha512Backend):
+    """
+    Настоящие подписи Ed25519 (cryptography) как заглушка пост-квантовой схемы.
+    Якоря и id — как в sha512; для модели PQ-размеров задать signature_size (например, 2420).
+    """
+
+    name = "ed25519"
+    signature_size = 64
+    verify_cost_us = 50.0
+    stateless_verify = True
+
+    def __init__(self, signature_size: Optional[int] = None, verify_cost_us: Optional[float] = None):
+        super().__init__(signature_size, verify_cost_us)
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+        from cryptography.exceptions import InvalidSignature
+
+        self._ed25519 = ed25519
+        self._invalid_signature = InvalidSignature
+        self._public_keys: Dict[str, Any] = {}  # hex -> Ed25519PublicKey (кэш разбора)
+
+    def generate_keypair(self):
+        from cryptography.hazmat.primitives import serialization
+
+        private_key = self._ed25519.Ed25519PrivateKey.generate()
+        raw = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw,
+        )
+        return raw.hex(), private_key
+
+    def export_keypair(self, public_key, private_key):
+        from cryptography.hazmat.primitives import serialization
+
+        raw = private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        return bytes.fromhex(public_key), raw
+
+    def import_keypair(self, public_raw, private_raw):
+        return bytes(public_raw).hex(), self._ed25519.Ed25519PrivateKey.from_private_bytes(bytes(private_raw))
+
+    def sign(self, data, private_key):
+        return private_key.sign(data.encode("utf-8"))
+
+    def verify(self, data, signature, public_key):
+        key = self._public_keys.get(public_key)
+        if key is None:
+            try:
+                key = self._ed25519.Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key))
+            except ValueError:
+                return False
+            self._public_keys[public_key] = key
+        try:
+            key.verify(signature, data.encode("utf-8"))
+        except self._invalid_signature:
+            return False
+        return True
+
+    def export_signature(self, data, public_key):
+        return None  # подпись проверяема где угодно по открытому ключу
+
+
+CRYPTO_BACKENDS = {
+    "null": NullBackend,
+    "sha512": Sha512Backend,
+    "blake2b": Blake2bBackend,
+    "ed25519": Ed25519Backend,
+}
+
+_backend: CryptoBackend = Sha512Backend()
+
+
+def get_backend() -> CryptoBackend:
+    """Активный криптографический бэкенд."""
+    return _backend
+
+
+def set_backend(
+    backend: Union[str, CryptoBackend] = "sha512",
+    signature_size: Optional[int] = None,
+    verify_cost_us: Optional[float] = None,
+) -> CryptoBackend:
+    """
+    Выбирает бэкенд для симуляции (по имени или экземпляром).
+    signature_size / verify_cost_us переопределяют модельные значения бэкенда.
+    """
+    global _backend
+    if isinstance(backend, str):
+        if backend not in CRYPTO_BACKENDS:
+            raise ValueError(f"Неизвестный крипто-бэкенд: {backend} (доступны: {', '.join(CRYPTO_BACKENDS)})")
+        backend = CRYPTO_BACKENDS[backend](signature_size=signature_size, verify_cost_us=verify_cost_us)
+    _backend = backend
+    return backend
+
 
 def compute_anchor(
     balance: float,
-    last_txs: List[str],
+    last_txs: List[Digest],
     nonce: int,
     timestamp: float,
-) -> str:
+) -> Digest:
     """
     Вычисляет якорь транзакции (имитация SHA3-512).
     anchor = hash(balance | last_tx1 | last_tx2 | nonce | timestamp)
     """
-    parts = [
-        str(balance),
-        (last_txs[0] if len(last_txs) > 0 else ""),
-        (last_txs[1] if len(last_txs) > 1 else ""),
-        str(nonce),
-        str(timestamp),
-    ]
-    payload = "|".join(parts)
-    # SHA3-512 имитация через SHA-512 (для симуляции достаточно)
-    return hashlib.sha512(payload.encode("utf-8")).hexdigest()
-
-
-def _data_hash(data: str) -> str:
-    """Хеш данных для подписи."""
-    return hashlib.sha512(data.encode("utf-8")).hexdigest()
+    return _backend.compute_anchor(balance, last_txs, nonce, timestamp)
 
 
-def generate_keypair() -> Tuple[str, str]:
+def generate_keypair() -> Tuple[str, Any]:
     """Генерирует пару ключей (имитация для симуляции)."""
-    private_key = secrets.token_hex(32)
-    public_key = hashlib.sha256(private_key.encode("utf-8")).hexdigest()
-    return public_key, private_key
+    return _backend.generate_keypair()
 
 
-def sign_data(data: str, private_key: str) -> bytes:
+def sign_data(data: str, private_key: Any) -> bytes:
     """
     Имитация Dilithium-подписи: подпись = HMAC(priv, hash(data)).
     В симуляции достаточно детерминированного значения.
     """
-    payload = private_key + _data_hash(data)
-    sig_hash = hashlib.sha512(payload.encode("utf-8")).digest()
-    public_key = hashlib.sha256(private_key.encode("utf-8")).hexdigest()
-    _signature_store[( _data_hash(data), public_key)] = sig_hash
-    return sig_hash
+    return _backend.sign(data, private_key)
 
 
 def verify_signature(data: str, signature: bytes, public_key: str) -> bool:
@@ -62,10 +396,7 @@ def verify_signature(data: str, signature: bytes, public_key: str) -> bool:
     Имитация проверки подписи Dilithium.
     В симуляции проверяем, что подпись была создана для этих данных и ключа.
     """
-    key = (_data_hash(data), public_key)
-    if key not in _signature_store:
-        return False
-    return _signature_store[key] == signature
+    return _backend.verify(data, signature, public_key)
 
 
 def tx_content_hash(
@@ -73,13 +404,9 @@ def tx_content_hash(
     to_id: str,
     amount: float,
     nonce: int,
-    anchor: str,
-    parents: List[str],
+    anchor: Digest,
+    parents: List[Digest],
     timestamp: float,
-) -> str:
+) -> Digest:
     """Хеш содержимого транзакции для id и верификации."""
-    parts = [from_id, to_id, str(amount), str(nonce), anchor]
-    parts.extend(parents[:5])
-    parts.append(str(timestamp))
-    payload = "|".join(parts)
-    return hashlib.sha512(payload.encode("utf-8")).hexdigest()
+    return _backend.tx_content_hash(from_id, to_id, amount, nonce, anchor, parents, timestamp)
@@ -3,13 +3,21 @@
 """
 
 import random
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple, TYPE_CHECKING
 
-import networkx as nx
+import numpy as np
 
 from .node import Node
 from .transaction import Transaction, Alert
 from .quantum_node import QuantumEvilNode
+from .crypto import get_backend, verify_signature
+from .propagation import frontier_flood
+from .topology import graph_to_csr
+
+if TYPE_CHECKING:
+    from .churn import ChurnEngine
+    from .verify_pool import BatchVerifier
 
 try:
     from config import REPUTATION_PARAMS
@@ -24,14 +32,64 @@ class NetworkGraph:
         self.nodes: dict[str, Node] = {}  # node_id -> Node
         self.transactions: dict[str, Transaction] = {}  # tx_id -> Transaction
         self.alerts: dict[str, Alert] = {}  # alert_id -> Alert
-        self._nx_graph = nx.Graph()  # для топологии и rewiring
+        self.children: dict = {}  # tx_id -> id транзакций, ссылающихся на неё как на родителя
+        self._nx_cache: Optional[tuple] = None  # (версия топологии, nx.Graph) — строится по запросу
+        # Учёт нагрузки: доставленные сообщения, байты (модель бэкенда), проверки подписей
+        self.messages_delivered = 0
+        self.deliveries_accepted = 0  # доставки транзакций, принятые узлом
+        self.bytes_delivered = 0
+        self.signature_bytes = 0
+        self.signature_checks = 0
+        # Кэш вердиктов подписей (tx_id -> (подпись, вердикт)); включается пакетной проверкой
+        self.verdict_cache: Optional[dict] = None
+        self.verdict_cache_hits = 0
+        # Активные обходы (tx_id/alert_id -> (стек, visited)): вложенный вызов из узла, принявшего
+        # сообщение, продолжает текущий обход вместо нового — без рекурсии и повторных проходов
+        self._active_tx_floods: dict = {}
+        self._active_alert_floods: dict = {}
+        # Журнал событий (simulation.trace.TraceRecorder) и текущий шаг для его записей
+        self.recorder = None
+        self.current_step = 0
+        # Пакетное распространение (propagate_batch): пары (отправитель, anchor) всех транзакций сети
+        # и CSR топологии, пересобираемый при изменении рёбер
+        self._anchor_keys: set = set()
+        self._topology_version = 0
+        self._csr_cache: Optional[tuple] = None
+        # Глобальное доверие (core.trust.GlobalTrust); None — репутация узлов как есть
+        self.trust = None
+        # Оракул двойных трат (simulation.oracle.DoubleSpendOracle): эталон и индекс пометок узлов
+        self.oracle = None
+        # CSR общей топологии (core.shared_topology): (версия, node_ids, indptr, indices), пока сеть не менялась
+        self._shared_csr: Optional[tuple] = None
+        # Движок динамики топологии (core.churn.ChurnEngine); без процессов входа/выхода создаётся при первом rewiring
+        self.churn_engine = None
+        # Синхронизация состояния подключающихся узлов (core.reconcile.StateSync); None — выключена
+        self.state_sync = None
+        # Подписчики ухода узлов (remove_node): hook(node) — панель проб и т.п. заменяют ушедших
+        self.removal_hooks: List[Callable[[Node], None]] = []
 
     def add_node(self, node: Node) -> None:
         """Добавляет узел в сеть."""
         self.nodes[node.id] = node
-        self._nx_graph.add_node(node.id)
+        self._topology_version += 1
+        if self.state_sync is not None:
+            self.state_sync.track(node)
         node.set_network(self)
 
+    def remove_node(self, node_id: str) -> Optional[Node]:
+        """Убирает узел из сети вместе с его рёбрами и сообщает подписчикам removal_hooks."""
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return None
+        for peer in node.peers:
+            if node in peer.peers:
+                peer.peers.remove(node)
+        node.peers = []
+        self._topology_version += 1
+        for hook in self.removal_hooks:
+            hook(node)
+        return node
+
     def add_edge(self, node1_id: str, node2_id: str) -> None:
         """Создаёт связь между узлами (пиры)."""
         if node1_id not in self.nodes or node2_id not in self.nodes:
@@ -41,7 +99,89 @@ class NetworkGraph:
             n1.peers.append(n2)
         if n1 not in n2.peers:
             n2.peers.append(n1)
-        self._nx_graph.add_edge(node1_id, node2_id)
+        self._topology_version += 1
+
+    def attach_shared_csr(self, node_ids: List[str], indptr: np.ndarray, indices: np.ndarray) -> None:
+        """Текущая топология совпадает с общим CSR: он используется вместо сборки из списков пиров."""
+        self._shared_csr = (self._topology_version, node_ids, indptr, indices)
+
+    def csr(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """CSR текущей топологии; после rewiring — собственная копия прогона вместо общей."""
+        shared = self._shared_csr
+        if shared is not None and shared[0] == self._topology_version:
+            return shared[1], shared[2], shared[3]
+        return graph_to_csr(self)
+
+    def to_networkx(self):
+        """Топология как nx.Graph (метрики пути, отрисовка); networkx импортируется только здесь."""
+        cache = self._nx_cache
+        if cache is None or cache[0] != self._topology_version:
+            import networkx as nx
+
+            G = nx.Graph()
+            G.add_nodes_from(self.nodes)
+            G.add_edges_from((nid, p.id) for nid, n in self.nodes.items() for p in n.peers if p.id in self.nodes)
+            cache = self._nx_cache = (self._topology_version, G)
+        return cache[1]
+
+    def reputation_of(self, node_id: str) -> float:
+        """Репутация узла для уверенности и арбитров: глобальное доверие, если включено, иначе локальная."""
+        if self.trust is not None:
+            score = self.trust.score(node_id)
+            if score is not None:
+                return score
+        node = self.nodes.get(node_id)
+        return node.reputation if node is not None else 0.5
+
+    def arbiters(self, threshold: float) -> List[str]:
+        """Узлы, чья репутация (reputation_of) не ниже порога арбитров (reputation_threshold)."""
+        return [nid for nid in self.nodes if self.reputation_of(nid) >= threshold]
+
+    def verify_transaction(self, tx: Transaction) -> bool:
+        """Проверяет подпись транзакции ключом отправителя (с учётом числа проверок)."""
+        sender = self.nodes.get(tx.from_id)
+        if sender is None:
+            return False
+        cache = self.verdict_cache
+        if cache is not None:
+            cached = cache.get(tx.id)
+            if cached is not None and cached[0] == tx.signature:
+                self.verdict_cache_hits += 1
+                return cached[1]
+        self.signature_checks += 1
+        verdict = verify_signature(tx.content_for_signature(), tx.signature, sender.public_key)
+        if cache is not None:
+            cache[tx.id] = (tx.signature, verdict)
+        return verdict
+
+    def prevalidate(self, txs: List[Transaction], verifier: "BatchVerifier") -> int:
+        """
+        Пакетно проверяет подписи транзакций (один раз на tx id) и кладёт вердикты в кэш,
+        которым затем пользуются все узлы. Возвращает число проверенных подписей.
+        """
+        if self.verdict_cache is None:
+            self.verdict_cache = {}
+        cache = self.verdict_cache
+        pending = [tx for tx in txs if tx.id not in cache]
+        public_keys = {tx.from_id: self.nodes[tx.from_id].public_key for tx in pending if tx.from_id in self.nodes}
+        verdicts = verifier.verify_transactions(pending, public_keys)
+        signatures = {tx.id: tx.signature for tx in pending}
+        for tx_id, verdict in verdicts.items():
+            cache[tx_id] = (signatures[tx_id], verdict)
+        self.signature_checks += len(verdicts)
+        return len(verdicts)
+
+    def modeled_verify_time_ms(self) -> float:
+        """Модельное суммарное время проверок подписей (мс) по стоимости активного бэкенда."""
+        return self.signature_checks * get_backend().verify_cost_us / 1000.0
+
+    def _register_transaction(self, tx: Transaction) -> None:
+        """Первое появление транзакции в сети: индекс дочерних транзакций и запись в журнал."""
+        for parent in tx.parents:
+            self.children.setdefault(parent, []).append(tx.id)
+        self._anchor_keys.add((tx.from_id, tx.anchor))
+        if self.recorder is not None:
+            self.recorder.tx_created(self.current_step, tx)
 
     def propagate_transaction(
         self,
@@ -53,24 +193,138 @@ class NetworkGraph:
         Распространяет транзакцию по сети от start_node.
         Если first_hop_peers задан — только эти пиры получают tx на первом шаге (остальная сеть — через них).
         """
+        recorder = self.recorder
+        trust = self.trust
+        if tx.id not in self.transactions:
+            self._register_transaction(tx)
         self.transactions[tx.id] = tx
-        visited = {start_node.id}
         initial = first_hop_peers if first_hop_peers is not None else list(start_node.peers)
+        active = self._active_tx_floods.get(tx.id)
+        if active is not None:
+            stack, visited = active
+            stack.extend(p for p in initial if p.id not in visited)
+            return
+        backend = get_backend()
+        tx_size = backend.estimate_tx_size(tx)
+        visited = {start_node.id}
         stack: List[Node] = [p for p in initial if p.id not in visited]
-        while stack:
-            node = stack.pop()
-            if node.id in visited:
-                continue
-            visited.add(node.id)
-            if node.receive_transaction(tx):
-                for peer in node.peers:
-                    if peer.id not in visited:
-                        stack.append(peer)
+        self._active_tx_floods[tx.id] = (stack, visited)
+        accepted_ids = [start_node.id] if trust is not None else None
+        try:
+            while stack:
+                node = stack.pop()
+                if node.id in visited:
+                    continue
+                visited.add(node.id)
+                self.messages_delivered += 1
+                self.bytes_delivered += tx_size
+                self.signature_bytes += backend.signature_size
+                accepted = node.receive_transaction(tx)
+                if recorder is not None:
+                    recorder.delivery(self.current_step, node.id, tx.id, accepted)
+                if accepted:
+                    self.deliveries_accepted += 1
+                    if accepted_ids is not None:
+                        accepted_ids.append(node.id)
+                    for peer in node.peers:
+                        if peer.id not in visited:
+                            stack.append(peer)
+        finally:
+            del self._active_tx_floods[tx.id]
+        if accepted_ids is not None:
+            trust.observe_flood(accepted_ids)
 
-    def propagate_alert(self, alert: Alert, start_node: Node) -> None:
-        """Распространяет алерт с высоким приоритетом по сети и снижает репутацию виновного."""
-        self.alerts[alert.id] = alert
-        # Снижаем репутацию отправителя конфликтующих транзакций
+    def _flood_csr(self) -> Optional[tuple]:
+        """(узлы, индекс id -> позиция, indptr, indices) или None, если пакетный путь неприменим."""
+        cache = self._csr_cache
+        if cache is not None and cache[0] == self._topology_version:
+            return cache[1]
+        plan = None
+        nodes = list(self.nodes.values())
+        # Только узлы с базовой обработкой транзакций и рёбра внутри графа (не шард, не прокси)
+        plain = all(type(n).receive_transaction is Node.receive_transaction for n in nodes)
+        if plain and all(p.id in self.nodes for n in nodes for p in n.peers):
+            node_ids, indptr, indices = self.csr()
+            plan = (nodes, {nid: i for i, nid in enumerate(node_ids)}, indptr, indices)
+        self._csr_cache = (self._topology_version, plan)
+        return plan
+
+    def propagate_batch(self, items: List[Tuple[Transaction, Node]]) -> bool:
+        """
+        Распространяет транзакции шага (пары (tx, отправитель)) одним пакетом фронтов над CSR.
+        Итоговое состояние узлов и счётчики нагрузки — как у поочерёдного propagate_transaction.
+        Если у какой-либо tx возможен конфликт (тот же отправитель и anchor уже встречались,
+        tx уже в сети или это намеренная двойная трата) — поочерёдное распространение.
+        Возвращает True, если использован пакетный путь.
+        """
+        plan = self._flood_csr() if type(self).propagate_transaction is NetworkGraph.propagate_transaction else None
+        keys = {(tx.from_id, tx.anchor) for tx, _ in items}
+        if (
+            plan is None
+            or len(keys) != len(items)
+            or not keys.isdisjoint(self._anchor_keys)
+            or any(tx.id in self.transactions or sender.id not in plan[1] for tx, sender in items)
+            or (self.oracle is not None and any(self.oracle.conflict(tx.id) for tx, _ in items))
+        ):
+            for tx, sender in items:
+                self.propagate_transaction(tx, sender)
+            return False
+        if not items:
+            return True
+        nodes, index, indptr, indices = plan
+        # Новую транзакцию знает только её отправитель, поэтому решение узла зависит лишь от подписи
+        cache = self.verdict_cache
+        verdicts = []
+        for tx, sender in items:
+            cached = cache.get(tx.id) if cache is not None else None
+            if cached is not None and cached[0] == tx.signature:
+                verdicts.append(cached[1])
+            else:
+                verdicts.append(verify_signature(tx.content_for_signature(), tx.signature, sender.public_key))
+        sources = np.array([index[sender.id] for _, sender in items])
+        accept = np.repeat(np.array(verdicts, dtype=bool)[:, None], len(nodes), axis=1)
+        delivered, _ = frontier_flood(sources, accept, indptr, indices)
+
+        backend = get_backend()
+        recorder = self.recorder
+        for row, ((tx, _), ok) in enumerate(zip(items, verdicts)):
+            self._register_transaction(tx)
+            self.transactions[tx.id] = tx
+            targets = np.flatnonzero(delivered[row])
+            count = len(targets)
+            self.messages_delivered += count
+            if ok:
+                self.deliveries_accepted += count
+            self.bytes_delivered += count * backend.estimate_tx_size(tx)
+            self.signature_bytes += count * backend.signature_size
+            # Счётчики проверок — как при проверке на каждом узле (с кэшем: одна проверка, остальное — попадания)
+            cached = cache.get(tx.id) if cache is not None else None
+            if cached is not None and cached[0] == tx.signature:
+                self.verdict_cache_hits += count
+            elif count:
+                if cache is None:
+                    self.signature_checks += count
+                else:
+                    cache[tx.id] = (tx.signature, ok)
+                    self.signature_checks += 1
+                    self.verdict_cache_hits += count - 1
+            for j in targets.tolist():
+                node = nodes[j]
+                if ok:
+                    node.accept_transaction(tx)
+                if recorder is not None:
+                    recorder.delivery(self.current_step, node.id, tx.id, ok)
+            if ok and self.trust is not None:
+                self.trust.observe_flood(np.append(targets, sources[row]))
+        return True
+
+    @contextmanager
+    def batch(self):
+        """Группа распространений шага (синхронный граф доставляет сразу; см. simulation.actors)."""
+        yield
+
+    def _penalize_sender(self, alert: Alert) -> None:
+        """Снижает репутацию отправителя конфликтующих транзакций."""
         for tx_id in (alert.conflicting_tx1, alert.conflicting_tx2):
             if tx_id in self.transactions:
                 sender_id = self.transactions[tx_id].from_id
@@ -78,54 +332,85 @@ class NetworkGraph:
                     penalty = REPUTATION_PARAMS.get("penalty_double_spend", 0.2)
                     min_rep = REPUTATION_PARAMS.get("min_reputation", 0.01)
                     self.nodes[sender_id].reputation = max(min_rep, self.nodes[sender_id].reputation - penalty)
+                    if self.recorder is not None:
+                        self.recorder.penalty(self.current_step, sender_id, self.nodes[sender_id].reputation)
+
+    def propagate_alert(self, alert: Alert, start_node: Node) -> None:
+        """Распространяет алерт с высоким приоритетом по сети и снижает репутацию виновного."""
+        recorder = self.recorder
+        if recorder is not None and alert.id not in self.alerts:
+            recorder.alert_raised(self.current_step, alert)
+        self.alerts[alert.id] = alert
+        self._penalize_sender(alert)
+        hops = alert.propagation_count + 1
+        active = self._active_alert_floods.get(alert.id)
+        if active is not None:
+            stack, visited = active
+            stack.extend((p, hops) for p in start_node.peers if p.id not in visited)
+            return
+        alert_size = get_backend().estimate_alert_size(alert)
+        culprit = self.transactions.get(alert.conflicting_tx1) if self.trust is not None else None
         visited = {start_node.id}
-        stack: List[Node] = list(start_node.peers)
-        while stack:
-            node = stack.pop()
-            if node.id in visited:
-                continue
-            visited.add(node.id)
-            node.receive_alert(Alert(
-                id=alert.id,
-                conflicting_tx1=alert.conflicting_tx1,
-                conflicting_tx2=alert.conflicting_tx2,
-                anchor=alert.anchor,
-                discovered_by=alert.discovered_by,
-                propagation_count=alert.propagation_count + 1,
-            ))
-            for peer in node.peers:
-                if peer.id not in visited:
-                    stack.append(peer)
+        stack: List[tuple] = [(p, hops) for p in start_node.peers]
+        self._active_alert_floods[alert.id] = (stack, visited)
+        try:
+            while stack:
+                node, hops = stack.pop()
+                if node.id in visited:
+                    continue
+                visited.add(node.id)
+                self.messages_delivered += 1
+                self.bytes_delivered += alert_size
+                delivered = Alert(
+                    id=alert.id,
+                    conflicting_tx1=alert.conflicting_tx1,
+                    conflicting_tx2=alert.conflicting_tx2,
+                    anchor=alert.anchor,
+                    discovered_by=alert.discovered_by,
+                    propagation_count=hops,
+                )
+                node.receive_alert(delivered)
+                if culprit is not None:
+                    self.trust.observe_conflict(node.id, culprit.from_id)
+                if recorder is not None:
+                    recorder.alert_delivery(self.current_step, node.id, delivered)
+                for peer in node.peers:
+                    if peer.id not in visited:
+                        stack.append((peer, hops))
+        finally:
+            del self._active_alert_floods[alert.id]
 
     def rewire_peers(self, rewiring_prob: float = 0.1) -> None:
-        """Динамически меняет топологию (защита от квантового анализа)."""
-        if len(self.nodes) < 3:
-            return
-        node_ids = list(self.nodes.keys())
-        for nid in node_ids:
-            node = self.nodes[nid]
-            if not node.peers or random.random() > rewiring_prob:
-                continue
-            # Удаляем одно случайное ребро и добавляем новое к случайному узлу
-            peer = random.choice(node.peers)
-            node.peers.remove(peer)
-            peer.peers.remove(node)
-            self._nx_graph.remove_edge(nid, peer.id)
-            other = random.choice([x for x in node_ids if x != nid and self.nodes[x] not in node.peers])
-            self.add_edge(nid, other)
+        """Динамически меняет топологию (защита от квантового анализа): ~rewiring_prob · N рёбер за O(1) каждое."""
+        self.churn().rewire(rewiring_prob)
+
+    def churn(self) -> "ChurnEngine":
+        """Индекс рёбер для rewiring и входа/выхода узлов (core/churn.py), один на граф."""
+        if self.churn_engine is None:
+            from .churn import ChurnEngine
+
+            self.churn_engine = ChurnEngine(self)
+        return self.churn_engine
 
     def generate_chaff(self, prob: float = 0.05) -> None:
         """Генерирует шумовые транзакции (chaff) от случайных узлов."""
-        for node in self.nodes.values():
+        ids = list(self.nodes)
+        if len(ids) < 2:
+            return
+        for i, node in enumerate(list(self.nodes.values())):
             if getattr(node, "is_evil", False):
                 continue
             if random.random() > prob:
                 continue
-            targets = [x.id for x in self.nodes.values() if x.id != node.id]
-            if not targets:
-                continue
-            to_id = random.choice(targets)
-            tx = node.create_transaction(to_id, 0.01)
-            if tx:
-                tx.is_chaff = True
-                self.propagate_transaction(tx, node)
+            # Случайный получатель, кроме себя: индекс из n - 1 со сдвигом за свой
+            j = random.randrange(len(ids) - 1)
+            self.send_chaff(node, ids[j + (j >= i)])
+
+    def send_chaff(self, node: Node, to_id: str) -> bool:
+        """Шумовая транзакция от узла: минимальная сумма, флаг chaff, обычное распространение."""
+        tx = node.create_transaction(to_id, 0.01)
+        if not tx:
+            return False
+        tx.is_chaff = True
+        self.propagate_transaction(tx, node)
+        return True
@@ -6,7 +6,7 @@ import random
 import time
 from typing import List, Optional, TYPE_CHECKING
 
-from .crypto import compute_anchor, sign_data, verify_signature, generate_keypair, tx_content_hash
+from .crypto import compute_anchor, sign_data, generate_keypair, tx_content_hash, digest_text
 from .transaction import Transaction, Alert
 
 try:
@@ -27,15 +27,22 @@ if TYPE_CHECKING:
 class Node:
     """Узел сети с локальным графом транзакций и репутацией."""
 
-    def __init__(self, node_id: str, initial_reputation: float = 0.5):
+    def __init__(
+        self,
+        node_id: str,
+        initial_reputation: float = 0.5,
+        keypair: Optional[tuple] = None,
+        balance: float = 1000.0,
+    ):
         self.id = node_id
         self.reputation = initial_reputation
-        self.balance = 1000.0  # начальный баланс
-        self.public_key, self.private_key = generate_keypair()
+        self.balance = balance  # начальный баланс
+        # Готовая пара ключей (например, из общей топологии) — без генерации
+        self.public_key, self.private_key = keypair or generate_keypair()
 
         # Локальный граф (транзакции, которые знает узел)
         self.local_graph: dict[str, Transaction] = {}  # tx_id -> Transaction
-        self.known_balances: dict[str, float] = {node_id: 1000.0}  # node_id -> balance (локальное мнение)
+        self.known_balances: dict[str, float] = {node_id: balance}  # node_id -> balance (локальное мнение)
         self.peers: List["Node"] = []  # связи с другими узлами
         self.pending_alerts: dict[str, Alert] = {}  # полученные алерты
 
@@ -48,6 +55,8 @@ class Node:
 
         # Ссылка на граф для распространения (устанавливается извне)
         self._network: Optional["NetworkGraph"] = None
+        # Таблица множества сообщений для сверки с пирами (core/reconcile.py); None — не ведётся
+        self.sync_sketch = None
 
     def set_network(self, network: "NetworkGraph") -> None:
         """Устанавливает ссылку на граф сети для распространения."""
@@ -92,6 +101,8 @@ class Node:
         self.balance -= amount
         self.my_transactions.append(tx)
         self.local_graph[tx_id] = tx
+        if self.sync_sketch is not None:
+            self.sync_sketch.add(tx_id)
         self.known_balances[self.id] = self.balance
         return tx
 
@@ -103,11 +114,8 @@ class Node:
         if tx.id in self.local_graph:
             return True  # уже знаем
 
-        data = tx.content_for_signature()
-        if not self._network or tx.from_id not in self._network.nodes:
-            return False
-        sender_public_key = self._network.nodes[tx.from_id].public_key
-        if not verify_signature(data, tx.signature, sender_public_key):
+        # Неизвестный отправитель или неверная подпись — отклоняем
+        if not self._network or not self._network.verify_transaction(tx):
             return False
 
         # Проверка коллизий: две транзакции от одного отправителя с одним anchor или конфликт по балансу
@@ -119,7 +127,7 @@ class Node:
             # Одна и та же "история" (anchor/parents) — подозрение на двойную трату
             if existing_tx.anchor == tx.anchor and existing_tx.amount == tx.amount:
                 alert = Alert(
-                    id=f"alert_{tx.id}_{existing_id}",
+                    id=f"alert_{digest_text(tx.id)}_{digest_text(existing_id)}",
                     conflicting_tx1=tx.id,
                     conflicting_tx2=existing_id,
                     anchor=tx.anchor,
@@ -133,7 +141,7 @@ class Node:
             # Разные получатели при том же anchor — конфликт
             if existing_tx.anchor == tx.anchor and existing_tx.to_id != tx.to_id:
                 alert = Alert(
-                    id=f"alert_{tx.id}_{existing_id}",
+                    id=f"alert_{digest_text(tx.id)}_{digest_text(existing_id)}",
                     conflicting_tx1=tx.id,
                     conflicting_tx2=existing_id,
                     anchor=tx.anchor,
@@ -145,16 +153,14 @@ class Node:
                     self._network.propagate_alert(alert, self)
                 return False
 
-        self.local_graph[tx.id] = tx
-        self.conflicting_tx_ids.discard(tx.id)
-
-        # Обновляем локальный баланс отправителя/получателя
-        if tx.from_id in self.known_balances:
-            self.known_balances[tx.from_id] = self.known_balances.get(tx.from_id, 1000.0) - tx.amount
-        else:
-            self.known_balances[tx.from_id] = 1000.0 - tx.amount
-        self.known_balances[tx.to_id] = self.known_balances.get(tx.to_id, 1000.0) + tx.amount
+        self.accept_transaction(tx)
+        if self._network:
+            self._network.propagate_transaction(tx, self)
+        return True
 
+    def accept_transaction(self, tx: Transaction) -> None:
+        """Изменения состояния узла при принятии проверенной транзакции (без распространения)."""
+        self._apply_transaction(tx)
         # Награда за пересылку транзакции (узел принял и распространяет)
         rp = REPUTATION_PARAMS
         self.reputation = min(
@@ -162,23 +168,27 @@ class Node:
             rp.get("max_reputation", 0.99),
         )
 
-        if self._network:
-            self._network.propagate_transaction(tx, self)
-        return True
+    def _apply_transaction(self, tx: Transaction) -> None:
+        self.local_graph[tx.id] = tx
+        if self.sync_sketch is not None:
+            self.sync_sketch.add(tx.id)
+        if tx.id in self.conflicting_tx_ids:
+            self.conflicting_tx_ids.discard(tx.id)
+            if self._network and self._network.oracle is not None:
+                self._network.oracle.unflag(self.id, tx.id)
+
+        # Обновляем локальный баланс отправителя/получателя
+        if tx.from_id in self.known_balances:
+            self.known_balances[tx.from_id] = self.known_balances.get(tx.from_id, 1000.0) - tx.amount
+        else:
+            self.known_balances[tx.from_id] = 1000.0 - tx.amount
+        self.known_balances[tx.to_id] = self.known_balances.get(tx.to_id, 1000.0) + tx.amount
 
     def receive_alert(self, alert: Alert) -> None:
         """Обрабатывает сигнал тревоги: помечает конфликт, награда за распространение, распространяет."""
         if alert.id in self.pending_alerts:
             return
-        self.pending_alerts[alert.id] = alert
-        self.received_alerts.append(alert)
-        self.conflicting_tx_ids.add(alert.conflicting_tx1)
-        self.conflicting_tx_ids.add(alert.conflicting_tx2)
-
-        for tx_id in (alert.conflicting_tx1, alert.conflicting_tx2):
-            if tx_id in self.local_graph:
-                sender = self.local_graph[tx_id].from_id
-                self.known_balances[sender] = self.known_balances.get(sender, 1000.0)
+        self._apply_alert(alert)
         # Награда за распространение алерта (не за открытие, а за пересылку)
         if alert.discovered_by != self.id:
             rp = REPUTATION_PARAMS
@@ -189,6 +199,33 @@ class Node:
         if self._network and alert.discovered_by != self.id:
             self._network.propagate_alert(alert, self)
 
+    def _apply_alert(self, alert: Alert) -> None:
+        self.pending_alerts[alert.id] = alert
+        if self.sync_sketch is not None:
+            self.sync_sketch.add(alert.id)
+        self.received_alerts.append(alert)
+        self.conflicting_tx_ids.add(alert.conflicting_tx1)
+        self.conflicting_tx_ids.add(alert.conflicting_tx2)
+        if self._network and self._network.oracle is not None:
+            self._network.oracle.flag(self.id, alert)
+
+        for tx_id in (alert.conflicting_tx1, alert.conflicting_tx2):
+            if tx_id in self.local_graph:
+                sender = self.local_graph[tx_id].from_id
+                self.known_balances[sender] = self.known_balances.get(sender, 1000.0)
+
+    def catch_up(self, transactions: List[Transaction], alerts: List[Alert]) -> None:
+        """
+        Догруженная история (core/reconcile.py): транзакции в порядке создания, затем алерты.
+        Состояние — как при обычном приёме, но без наград и пересылки: сеть эти сообщения уже знает.
+        """
+        for tx in transactions:
+            if tx.id not in self.local_graph:
+                self._apply_transaction(tx)
+        for alert in alerts:
+            if alert.id not in self.pending_alerts:
+                self._apply_alert(alert)
+
     def get_confidence(self, tx_id: str) -> float:
         """
         Вычисляет уверенность в транзакции (0-1).
@@ -204,7 +241,7 @@ class Node:
             if tx_id in other_tx.parents:
                 # Узел, создавший other_tx, "подтвердил" нашу транзакцию
                 creator_id = other_tx.from_id
-                creator_rep = self._network.nodes[creator_id].reputation if self._network and creator_id in self._network.nodes else 0.5
+                creator_rep = self._network.reputation_of(creator_id) if self._network else 0.5
                 score += 0.1 * creator_rep
         return min(1.0, score)
 
@@ -0,0 +1,54 @@
+"""
+Пакетное распространение транзакций шага: фронты (tx × узел) над CSR-смежностью.
+Вместо отдельного обхода в глубину для каждой транзакции все транзакции шага
+распространяются одновременно — каждый шаг фронта это одна векторная операция
+по всем (tx, узел) парам. Результат совпадает с NetworkGraph.propagate_transaction:
+узел получает tx, если он сосед отправителя или принявшего её узла.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def expand(frontier: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Соседи фронта: out[t, j] = True, если j смежен хотя бы с одним узлом frontier[t]."""
+    out = np.zeros_like(frontier)
+    rows, cols = np.nonzero(frontier)
+    if rows.size == 0:
+        return out
+    starts = indptr[cols]
+    degrees = indptr[cols + 1] - starts
+    total = int(degrees.sum())
+    if total == 0:
+        return out
+    # Индексы в indices для всех (строка, сосед) без Python-цикла: start + смещение внутри строки
+    offsets = np.arange(total) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+    out[np.repeat(rows, degrees), indices[np.repeat(starts, degrees) + offsets]] = True
+    return out
+
+
+def frontier_flood(
+    sources: np.ndarray,
+    accept: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+) -> Tuple[np.ndarray, int]:
+    """
+    Многоисточниковое распространение.
+    sources — индекс узла-отправителя для каждой tx; accept[t, j] — примет (и перешлёт) ли узел j
+    транзакцию t. Возвращает (delivered[t, j] — узлы, получившие tx, без отправителя; число раундов).
+    """
+    num_tx, num_nodes = accept.shape
+    visited = np.zeros((num_tx, num_nodes), dtype=bool)
+    rows = np.arange(num_tx)
+    visited[rows, sources] = True
+    frontier = visited.copy()  # отправитель рассылает своим пирам без проверки
+    rounds = 0
+    while frontier.any():
+        reached = expand(frontier, indptr, indices) & ~visited
+        visited |= reached
+        frontier = reached & accept
+        rounds += 1
+    visited[rows, sources] = False
+    return visited, rounds
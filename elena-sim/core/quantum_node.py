@@ -17,8 +17,8 @@ if TYPE_CHECKING:
 class QuantumEvilNode(Node):
     """Злоумышленник с имитацией квантового преимущества."""
 
-    def __init__(self, node_id: str, quantum_advantage: float = 0.7):
-        super().__init__(node_id, initial_reputation=0.6)
+    def __init__(self, node_id: str, quantum_advantage: float = 0.7, keypair: Optional[tuple] = None):
+        super().__init__(node_id, initial_reputation=0.6, keypair=keypair)
         self.quantum_advantage = quantum_advantage
         self.is_evil = True
 
@@ -80,6 +80,8 @@ class QuantumEvilNode(Node):
         tx2.signature = sign_data(data, self.private_key)
         self.my_transactions.append(tx2)
         self.local_graph[tx_id2] = tx2
+        if self._network and self._network.oracle is not None:
+            self._network.oracle.register_conflict(self.id, tx1, tx2)
         return (tx1, tx2)
 
     def _split_peers_by_reputation(self, threshold: float = 0.5) -> "Tuple[List[Node], List[Node]]":
@@ -138,6 +140,8 @@ class QuantumEvilNode(Node):
         tx2.signature = sign_data(data, self.private_key)
         self.my_transactions.append(tx2)
         self.local_graph[tx_id2] = tx2
+        if self._network and self._network.oracle is not None:
+            self._network.oracle.register_conflict(self.id, tx1, tx2)
 
         # 3. Вторую — только через слабые связи (изолированный кластер)
         graph.propagate_transaction(tx2, self, first_hop_peers=weak_peers)
@@ -0,0 +1,362 @@
+"""
+Синхронизация состояния входящих и переподключающихся узлов сверкой множеств.
+Множество узла — id его транзакций и алертов. Каждое id даёт 64-битный ключ, и каждый узел ведёт
+по этим ключам обратимую таблицу Блума (IBLT). Таблица состоит из HASHES разделов по cells ячеек,
+а ячейка хранит (число, XOR ключей, XOR контрольных хешей).
+Позиция ключа в разделе j — это его биты [16j, 16j + 16) по модулю размера раздела.
+Поэтому таблица сворачивается в любую меньшую степень двойки без пересчёта.
+Входящий узел посылает пиру таблицу размера под ожидаемую разность; пир вычитает свою и
+расщепляет результат. Чистые ячейки отдают ключи, которых нет у одной из сторон; при неудаче
+размер удваивается. Тела недостающих сообщений догружаются пакетами ключей.
+Разность больше ёмкости таблицы сверяется по диапазонам ключевого пространства.
+Диапазон, в котором у узла нет ни одного ключа, забирается целиком, без таблиц.
+Байты и время сверки зависят от размера разности, а не от длины истории.
+"""
+
+import hashlib
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .topology import sorted_unique
+
+HASHES = 3
+_CELL_BYTES = 20  # число (int32) + XOR ключей + XOR контрольных хешей
+_HANDSHAKE_BYTES = 8  # размер множества стороны
+_RANGE_BYTES = 16  # границы диапазона ключей
+_KEY_BYTES = 8
+_FRAME_BYTES = 4  # длина сообщения в пакете (как в core/wire.py)
+_BATCH_BYTES = 6
+_MIN_CELLS = 8
+_SLACK = 4  # запас к оценке разности по размерам множеств
+_KEY_SPACE = 1 << 64
+
+Table = Tuple[np.ndarray, np.ndarray, np.ndarray]  # (число, XOR ключей, XOR проверок), форма (HASHES, ячеек)
+
+
+def message_key(message_id) -> int:
+    """64-битный ключ id транзакции или алерта (hex-строка, bytes или произвольная строка)."""
+    data = message_id if isinstance(message_id, bytes) else str(message_id).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    """Контрольный хеш ключей (финализатор splitmix64): отличает чистую ячейку от смеси."""
+    z = keys ^ (keys >> np.uint64(30))
+    z = z * np.uint64(0xBF58476D1CE4E5B9)
+    z = z ^ (z >> np.uint64(27))
+    z = z * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _empty(cells: int) -> Table:
+    return (
+        np.zeros((HASHES, cells), dtype=np.int64),
+        np.zeros((HASHES, cells), dtype=np.uint64),
+        np.zeros((HASHES, cells), dtype=np.uint64),
+    )
+
+
+def _toggle(table: Table, keys: np.ndarray, signs) -> None:
+    """Добавляет (signs = +1) или вынимает (-1) ключи из таблицы."""
+    count, key_sum, check_sum = table
+    cells = count.shape[1]
+    checks = _mix(keys)
+    for j in range(HASHES):
+        idx = ((keys >> np.uint64(16 * j)) & np.uint64(cells - 1)).astype(np.int64)
+        np.add.at(count[j], idx, signs)
+        np.bitwise_xor.at(key_sum[j], idx, keys)
+        np.bitwise_xor.at(check_sum[j], idx, checks)
+
+
+def build_table(keys: np.ndarray, cells: int) -> Table:
+    """Таблица множества ключей с cells ячейками на раздел (степень двойки)."""
+    table = _empty(cells)
+    _toggle(table, keys, 1)
+    return table
+
+
+def fold(table: Table, cells: int) -> Table:
+    """Сворачивает таблицу до cells ячеек на раздел: ячейки с равными младшими битами позиции сливаются."""
+    count, key_sum, check_sum = table
+    blocks = count.shape[1] // cells
+    if blocks == 1:
+        return count.copy(), key_sum.copy(), check_sum.copy()
+    return (
+        count.reshape(HASHES, blocks, cells).sum(axis=1),
+        np.bitwise_xor.reduce(key_sum.reshape(HASHES, blocks, cells), axis=1),
+        np.bitwise_xor.reduce(check_sum.reshape(HASHES, blocks, cells), axis=1),
+    )
+
+
+def subtract(a: Table, b: Table) -> Table:
+    return a[0] - b[0], a[1] ^ b[1], a[2] ^ b[2]
+
+
+def decode(table: Table) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Расщепляет разность таблиц A − B: (ключи только в A, ключи только в B) или None,
+    если чистых ячеек не хватило. Чистые ячейки снимаются волнами, по одной операции NumPy на волну.
+    """
+    table = (table[0].copy(), table[1].copy(), table[2].copy())
+    count, key_sum, check_sum = table
+    plus: List[np.ndarray] = []
+    minus: List[np.ndarray] = []
+    while True:
+        pure = (np.abs(count) == 1) & (check_sum == _mix(key_sum))
+        if not pure.any():
+            break
+        keys, signs = key_sum[pure], count[pure]
+        order = np.argsort(keys, kind="stable")
+        keys, signs = keys[order], signs[order]
+        first = np.concatenate(([True], keys[1:] != keys[:-1]))
+        keys, signs = keys[first], signs[first]
+        plus.append(keys[signs > 0])
+        minus.append(keys[signs < 0])
+        _toggle(table, keys, -signs)
+    if count.any() or key_sum.any():
+        return None
+    empty = np.empty(0, dtype=np.uint64)
+    return (
+        np.concatenate(plus) if plus else empty,
+        np.concatenate(minus) if minus else empty,
+    )
+
+
+def _cells_for(difference: int) -> int:
+    """Ячеек на раздел под ожидаемую разность: ~2 ячейки на ключ суммарно, степень двойки."""
+    need = max(_MIN_CELLS, math.ceil(2 * difference / HASHES))
+    return 1 << (need - 1).bit_length()
+
+
+class SetSketch:
+    """
+    Таблица множества сообщений одного узла, обновляемая по мере их появления.
+    Новые id копятся в списке, а в таблицу попадают пакетом при следующей сверке.
+    Поэтому запись в горячем пути стоит одного append.
+    """
+
+    def __init__(self, cells: int = 256):
+        if cells & (cells - 1) or not _MIN_CELLS <= cells <= 1 << 16:
+            raise ValueError(f"cells должно быть степенью двойки от {_MIN_CELLS} до 65536, получено {cells}")
+        self.cells = cells
+        self.table = _empty(cells)
+        self.ids: Dict[int, object] = {}  # ключ -> id сообщения
+        self._pending: List[object] = []
+        self._chunks: List[np.ndarray] = []
+        self._sorted: Optional[np.ndarray] = None
+
+    def add(self, message_id) -> None:
+        self._pending.append(message_id)
+
+    def flush(self) -> None:
+        """Вносит накопленные id в таблицу и индекс ключей."""
+        if not self._pending:
+            return
+        fresh = {}
+        for message_id in self._pending:
+            key = message_key(message_id)
+            if key not in self.ids and key not in fresh:
+                fresh[key] = message_id
+        self._pending = []
+        if not fresh:
+            return
+        self.ids.update(fresh)
+        keys = np.fromiter(fresh, dtype=np.uint64, count=len(fresh))
+        _toggle(self.table, keys, 1)
+        self._chunks.append(keys)
+        self._sorted = None
+
+    def keys(self) -> np.ndarray:
+        """Все ключи множества, по возрастанию (для сверки по диапазонам)."""
+        self.flush()
+        if self._sorted is None:
+            merged = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=np.uint64)
+            self._sorted = np.sort(merged)
+            self._chunks = [self._sorted]
+        return self._sorted
+
+    def __len__(self) -> int:
+        self.flush()
+        return len(self.ids)
+
+    def capacity(self) -> int:
+        """Наибольшая разность, которую надёжно расщепляет таблица полного размера."""
+        return HASHES * self.cells // 2
+
+
+class StateSync:
+    """
+    Догрузка истории узлам, подключившимся к идущей сети: сверка множеств сообщений с пирами
+    (до fanout пиров с наибольшей репутацией) и пакетная загрузка недостающих тел.
+    """
+
+    def __init__(self, graph, cells: int = 256, fanout: int = 2, fetch_batch: int = 128):
+        self.graph = graph
+        self.cells = cells
+        self.fanout = fanout
+        self.fetch_batch = fetch_batch
+        self.records: List[dict] = []
+        graph.state_sync = self
+        for node in graph.nodes.values():
+            self.track(node)
+
+    def track(self, node) -> SetSketch:
+        """Таблица узла; узлу, появившемуся до включения синхронизации, она строится по его графу."""
+        sketch = node.sync_sketch
+        if sketch is None:
+            sketch = node.sync_sketch = SetSketch(self.cells)
+            for tx_id in node.local_graph:
+                sketch.add(tx_id)
+            for alert_id in node.pending_alerts:
+                sketch.add(alert_id)
+        return sketch
+
+    def catch_up(self, node, peers=None) -> List[dict]:
+        """Сверка узла с пирами по очереди: второму пиру остаётся только то, чего не знал первый."""
+        candidates = sorted(peers if peers is not None else node.peers, key=lambda p: -p.reputation)
+        return [self.reconcile(node, peer) for peer in candidates[: self.fanout]]
+
+    def reconcile(self, node, peer) -> dict:
+        """Одна сверка узла с пиром; возвращает запись с разностью, байтами и временем."""
+        started = time.perf_counter()
+        mine, theirs = self.track(node), self.track(peer)
+        n_mine, n_theirs = len(mine), len(theirs)
+        stats = {"sketch_bytes": 2 * _HANDSHAKE_BYTES, "exchanges": 1, "ranged": False}
+        estimate = abs(n_theirs - n_mine) + _SLACK
+        result = None
+        if n_mine and estimate <= mine.capacity():
+            cells = _cells_for(estimate)
+            while result is None and cells <= self.cells:
+                stats["sketch_bytes"] += HASHES * cells * _CELL_BYTES
+                stats["exchanges"] += 1
+                result = decode(subtract(fold(mine.table, cells), fold(theirs.table, cells)))
+                cells *= 2
+        if result is None:
+            stats["ranged"] = True
+            result = self._reconcile_ranges(mine.keys(), theirs.keys(), stats)
+        extra, missing = result
+        body_bytes = self._fetch(node, peer, missing, stats)
+        elapsed = time.perf_counter() - started
+        record = {
+            "node": node.id,
+            "peer": peer.id,
+            "history": n_theirs,
+            "difference": len(missing) + len(extra),
+            "fetched": len(missing),
+            "peer_missing": len(extra),
+            "sketch_bytes": stats["sketch_bytes"],
+            "body_bytes": body_bytes,
+            "bytes": stats["sketch_bytes"] + body_bytes,
+            "exchanges": stats["exchanges"],
+            "ranged": stats["ranged"],
+            "time_ms": elapsed * 1000.0,
+        }
+        self.graph.bytes_delivered += record["bytes"]
+        self.records.append(record)
+        return record
+
+    def _reconcile_ranges(self, mine: np.ndarray, theirs: np.ndarray, stats: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Сверка по диапазонам ключей: пространство делится так, чтобы разность в диапазоне уместилась
+        в таблицу; диапазон без ключей у узла забирается целиком, неразобранный — делится пополам.
+        """
+        capacity = HASHES * self.cells // 2
+        parts = max(1, math.ceil((abs(len(theirs) - len(mine)) + _SLACK) / capacity)) if len(mine) else 1
+        step = -(-_KEY_SPACE // (1 << (parts - 1).bit_length()))
+        pending = [(lo, min(lo + step, _KEY_SPACE)) for lo in range(0, _KEY_SPACE, step)]
+        plus: List[np.ndarray] = []
+        minus: List[np.ndarray] = []
+        while pending:
+            stats["exchanges"] += 1
+            next_round = []
+            for lo, hi in pending:
+                a = mine[np.searchsorted(mine, np.uint64(lo)):np.searchsorted(mine, np.uint64(hi - 1), side="right")]
+                b = theirs[np.searchsorted(theirs, np.uint64(lo)):np.searchsorted(theirs, np.uint64(hi - 1), side="right")]
+                stats["sketch_bytes"] += _RANGE_BYTES + _HANDSHAKE_BYTES
+                if not len(a) or not len(b):
+                    plus.append(a)
+                    minus.append(b)
+                    continue
+                estimate = abs(len(b) - len(a)) + _SLACK
+                result = None
+                if estimate <= capacity:
+                    cells = _cells_for(estimate)
+                    while result is None and cells <= self.cells:
+                        stats["sketch_bytes"] += HASHES * cells * _CELL_BYTES
+                        result = decode(subtract(build_table(a, cells), build_table(b, cells)))
+                        cells *= 2
+                if result is not None:
+                    plus.append(result[0])
+                    minus.append(result[1])
+                elif hi - lo > 1:
+                    mid = lo + (hi - lo) // 2
+                    next_round += [(lo, mid), (mid, hi)]
+            pending = next_round
+        return sorted_unique(np.concatenate(plus)), sorted_unique(np.concatenate(minus))
+
+    def _fetch(self, node, peer, missing: np.ndarray, stats: dict) -> int:
+        """Тела недостающих сообщений пакетами по fetch_batch ключей; узел применяет их без пересылки."""
+        if not len(missing):
+            return 0
+        from .crypto import get_backend
+
+        backend = get_backend()
+        ids = peer.sync_sketch.ids
+        txs, alerts = [], []
+        total = 0
+        keys = missing.tolist()
+        for start in range(0, len(keys), self.fetch_batch):
+            batch = keys[start:start + self.fetch_batch]
+            total += _BATCH_BYTES + _KEY_BYTES * len(batch)  # запрос
+            total += _BATCH_BYTES
+            for key in batch:
+                message_id = ids[key]
+                tx = peer.local_graph.get(message_id)
+                if tx is not None:
+                    txs.append(tx)
+                    total += _FRAME_BYTES + backend.estimate_tx_size(tx)
+                    continue
+                alert = peer.pending_alerts.get(message_id)
+                if alert is not None:
+                    alerts.append(alert)
+                    total += _FRAME_BYTES + backend.estimate_alert_size(alert)
+            stats["exchanges"] += 1
+        network = self.graph
+        txs = [tx for tx in txs if network.verify_transaction(tx)]
+        node.catch_up(sorted(txs, key=lambda tx: tx.timestamp), alerts)
+        return total
+
+    def stats(self) -> dict:
+        """Сводка сверок: байты и время по корзинам размера разности (степени двойки)."""
+        buckets: Dict[int, dict] = {}
+        for r in self.records:
+            bound = 1 << max(0, r["difference"] - 1).bit_length()
+            b = buckets.setdefault(bound, {"difference_max": bound, "syncs": 0, "bytes": 0, "time_ms": 0.0})
+            b["syncs"] += 1
+            b["bytes"] += r["bytes"]
+            b["time_ms"] += r["time_ms"]
+        rows = []
+        for bound in sorted(buckets):
+            b = buckets[bound]
+            rows.append({
+                "difference_max": bound,
+                "syncs": b["syncs"],
+                "avg_bytes": b["bytes"] / b["syncs"],
+                "avg_time_ms": b["time_ms"] / b["syncs"],
+            })
+        difference = sum(r["difference"] for r in self.records)
+        total = sum(r["bytes"] for r in self.records)
+        return {
+            "syncs": len(self.records),
+            "difference": difference,
+            "fetched": sum(r["fetched"] for r in self.records),
+            "bytes": total,
+            "sketch_bytes": sum(r["sketch_bytes"] for r in self.records),
+            "bytes_per_item": total / difference if difference else 0.0,
+            "time_ms": sum(r["time_ms"] for r in self.records),
+            "ranged": sum(1 for r in self.records if r["ranged"]),
+            "by_difference": rows,
+        }
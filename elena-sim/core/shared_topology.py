@@ -0,0 +1,204 @@
+"""
+Общая топология для параллельных прогонов: CSR-смежность, ключи узлов и начальное
+состояние публикуются один раз в multiprocessing.shared_memory. Воркеры подключаются
+по имени сегмента и видят массивы только для чтения (без копии), а изменения
+топологии (rewiring) каждого прогона живут в его собственных списках пиров —
+общий CSR используется, пока прогон не перестроил сеть (копирование при записи).
+Общие — только массивы: объекты Node и списки пиров каждый воркер строит сам, так что
+выигрыш — время сборки (рёбра, ключи, метрики пути), а память воркера почти не меняется.
+Раскладка сегмента: 8 байт длины заголовка, JSON-заголовок, затем выровненные массивы
+(смещения в заголовке — от начала области массивов).
+"""
+
+import json
+import random
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .crypto import CRYPTO_BACKENDS
+from .topology import edges_to_csr, generate_edges, path_metrics, sybil_region_edges
+
+_HEADER = struct.Struct("<Q")
+_ALIGN = 64
+
+
+def node_ids(num_nodes: int, num_evil: int) -> List[str]:
+    """Id узлов в порядке SimulationRunner.build_network: сначала честные, затем злые."""
+    return [f"node_{i}" for i in range(num_nodes - num_evil)] + [f"evil_{i}" for i in range(num_evil)]
+
+
+class SharedTopology:
+    """Топология, ключи и начальное состояние сети в общей памяти (один сегмент)."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        (size,) = _HEADER.unpack_from(shm.buf, 0)
+        self.meta: Dict[str, Any] = json.loads(bytes(shm.buf[_HEADER.size:_HEADER.size + size]))
+        base = _align(_HEADER.size + size)
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in self.meta["arrays"].items():
+            arr = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=base + offset)
+            arr.flags.writeable = False
+            self.arrays[name] = arr
+
+    @classmethod
+    def publish(
+        cls,
+        num_nodes: int,
+        num_evil: int = 1,
+        seed: Optional[int] = None,
+        crypto_backend: str = "sha512",
+        degree_min: int = 3,
+        degree_max: int = 10,
+        sybil_attack_edges: Optional[int] = None,
+        initial_reputation: float = 0.5,
+        name: Optional[str] = None,
+        with_path_metrics: bool = True,
+    ) -> "SharedTopology":
+        """
+        Строит сеть (рёбра как в build_network, ключи бэкенда) и публикует её в новом сегменте.
+        with_path_metrics — диаметр и средняя длина пути считаются здесь один раз, а не в каждом прогоне.
+        """
+        rng = random.Random(seed)
+        num_honest = num_nodes - num_evil
+        if sybil_attack_edges is not None:
+            edges = sybil_region_edges(
+                num_honest, num_evil, sybil_attack_edges, degree_min=degree_min, degree_max=degree_max, rng=rng
+            )
+        else:
+            edges = generate_edges(num_nodes, degree_min, degree_max, rng=rng)
+        indptr, indices = edges_to_csr(num_nodes, edges)
+        reputation = np.full(num_nodes, initial_reputation)
+        reputation[num_honest:] = min(initial_reputation + 0.01, 0.6)
+        arrays = {
+            "indptr": indptr,
+            "indices": indices,
+            "balance": np.full(num_nodes, 1000.0),
+            "reputation": reputation,
+        }
+        backend = CRYPTO_BACKENDS[crypto_backend]()
+        if backend.key_size:
+            public = np.empty((num_nodes, backend.key_size), dtype=np.uint8)
+            private = np.empty_like(public)
+            for i in range(num_nodes):
+                pub, priv = backend.export_keypair(*backend.generate_keypair())
+                public[i] = np.frombuffer(pub, dtype=np.uint8)
+                private[i] = np.frombuffer(priv, dtype=np.uint8)
+            arrays["public_keys"], arrays["private_keys"] = public, private
+
+        layout: Dict[str, Tuple[int, str, List[int]]] = {}
+        meta = {
+            "num_nodes": num_nodes,
+            "num_evil": num_evil,
+            "seed": seed,
+            "crypto_backend": crypto_backend,
+            "sybil_attack_edges": sybil_attack_edges,
+            "path_metrics": _path_metrics(num_nodes, edges) if with_path_metrics else None,
+            "arrays": layout,
+        }
+        offset = 0
+        for key, arr in arrays.items():
+            layout[key] = (offset, arr.dtype.str, list(arr.shape))
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps(meta).encode("utf-8")
+        base = _align(_HEADER.size + len(header))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=base + max(offset, 1))
+        _HEADER.pack_into(shm.buf, 0, len(header))
+        shm.buf[_HEADER.size:_HEADER.size + len(header)] = header
+        for key, arr in arrays.items():
+            start = base + layout[key][0]
+            shm.buf[start:start + arr.nbytes] = np.ascontiguousarray(arr).tobytes()
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTopology":
+        """Подключение к опубликованному сегменту из другого процесса (только чтение)."""
+        # Сегментом владеет издатель: трекер ресурсов воркера не должен удалять его при выходе
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    # --- доступ ---
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def num_nodes(self) -> int:
+        return self.meta["num_nodes"]
+
+    @property
+    def num_evil(self) -> int:
+        return self.meta["num_evil"]
+
+    @property
+    def crypto_backend(self) -> str:
+        return self.meta["crypto_backend"]
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def node_ids(self) -> List[str]:
+        return node_ids(self.num_nodes, self.num_evil)
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(indptr, indices) — представления общей памяти, только чтение."""
+        return self.arrays["indptr"], self.arrays["indices"]
+
+    def edges(self) -> np.ndarray:
+        """Неориентированные рёбра (i < j) в порядке CSR."""
+        indptr, indices = self.csr()
+        src = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(indptr))
+        mask = src < indices
+        return np.stack([src[mask], indices[mask].astype(np.int64)], axis=1)
+
+    def keypair(self, i: int, backend) -> Optional[tuple]:
+        """Пара ключей узла i для бэкенда прогона; None — бэкенд не публикует ключи."""
+        if "public_keys" not in self.arrays:
+            return None
+        return backend.import_keypair(self.arrays["public_keys"][i], self.arrays["private_keys"][i])
+
+    # --- жизненный цикл ---
+
+    def close(self) -> None:
+        """Отключается от сегмента (массивы становятся недоступны); владелец также удаляет его."""
+        self.arrays.clear()
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # представления ещё живы (например, в графе прогона) — отображение снимется при выходе
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedTopology":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _path_metrics(num_nodes: int, edges) -> Optional[Tuple[int, float]]:
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(num_nodes))
+    G.add_edges_from(map(tuple, edges))
+    return path_metrics(G)
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -0,0 +1,133 @@
+"""
+Генерация и компактное представление топологии сети Елена.
+Рёбра строятся за O(N·d) (выборка соседей с отбраковкой) и переводятся в CSR
+(indptr/indices) для шардирования и векторных алгоритмов.
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def generate_edges(
+    num_nodes: int,
+    degree_min: int = 3,
+    degree_max: int = 10,
+    rng: Optional[random.Random] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Рёбра случайного графа как в SimulationRunner.build_network: каждый узел добавляет
+    degree ∈ [degree_min, degree_max] новых соседей среди тех, с кем ещё не связан.
+    Возвращает пары индексов узлов (без дубликатов).
+    """
+    rnd = rng or random
+    adjacency: List[set] = [set() for _ in range(num_nodes)]
+    edges: List[Tuple[int, int]] = []
+    if num_nodes < 2:
+        return edges
+    for i in range(num_nodes):
+        degree = rnd.randint(degree_min, min(degree_max, num_nodes - 1))
+        peers_i = adjacency[i]
+        free = num_nodes - 1 - len(peers_i)
+        if free <= degree:
+            chosen = [j for j in range(num_nodes) if j != i and j not in peers_i]
+        else:
+            chosen = []
+            picked = set()
+            while len(chosen) < degree:
+                j = rnd.randrange(num_nodes)
+                if j == i or j in peers_i or j in picked:
+                    continue
+                picked.add(j)
+                chosen.append(j)
+        for j in chosen:
+            peers_i.add(j)
+            adjacency[j].add(i)
+            edges.append((i, j))
+    return edges
+
+
+def sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """Отсортированные уникальные значения (сортировка быстрее хеширования в np.unique на больших int64)."""
+    keys = np.sort(keys)
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys
+
+
+def edges_to_csr(num_nodes: int, edges) -> Tuple[np.ndarray, np.ndarray]:
+    """Неориентированные рёбра -> симметричный CSR (indptr, indices), соседи отсортированы."""
+    arr = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if arr.size == 0:
+        return np.zeros(num_nodes + 1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    src = np.concatenate([arr[:, 0], arr[:, 1]])
+    dst = np.concatenate([arr[:, 1], arr[:, 0]])
+    keys = sorted_unique(src * num_nodes + dst)
+    src, dst = keys // num_nodes, keys % num_nodes
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    return indptr, dst.astype(np.int32)
+
+
+def edge_keys(indptr: np.ndarray, indices: np.ndarray, n: int) -> np.ndarray:
+    """Неориентированные рёбра симметричного CSR как отсортированные ключи i * n + j (i < j)."""
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    dst = indices.astype(np.int64)
+    mask = src < dst
+    return np.sort(src[mask] * n + dst[mask])
+
+
+def graph_to_csr(graph) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """CSR текущей топологии NetworkGraph: (node_ids в порядке индексов, indptr, indices)."""
+    node_ids = list(graph.nodes.keys())
+    index = {nid: i for i, nid in enumerate(node_ids)}
+    edges = [
+        (i, index[peer.id])
+        for i, nid in enumerate(node_ids)
+        for peer in graph.nodes[nid].peers
+        if peer.id in index
+    ]
+    indptr, indices = edges_to_csr(len(node_ids), edges)
+    return node_ids, indptr, indices
+
+
+def path_metrics(G) -> Optional[Tuple[int, float]]:
+    """(диаметр, средняя длина пути) графа networkx; (-1, -1.0) — граф несвязен, None — меньше двух узлов."""
+    import networkx as nx
+
+    if G.number_of_nodes() < 2:
+        return None
+    if not nx.is_connected(G):
+        return -1, -1.0
+    return nx.diameter(G), nx.average_shortest_path_length(G)
+
+
+def sybil_region_edges(
+    num_honest: int,
+    num_sybil: int,
+    attack_edges: int,
+    sybil_degree: int = 8,
+    degree_min: int = 3,
+    degree_max: int = 10,
+    rng: Optional[random.Random] = None,
+) -> np.ndarray:
+    """
+    Топология Сибил-атаки: честная область (как generate_edges), плотный кластер
+    сибил-узлов (индексы num_honest..num_honest+num_sybil−1, у каждого ~sybil_degree
+    соседей внутри кластера) и attack_edges рёбер между областями.
+    Возвращает массив рёбер (E, 2); дубликаты и петли убирает edges_to_csr.
+    """
+    rnd = rng or random
+    parts = [np.asarray(generate_edges(num_honest, degree_min, degree_max, rng=rnd), dtype=np.int64).reshape(-1, 2)]
+    if num_sybil > 1:
+        gen = np.random.default_rng(rnd.getrandbits(32))
+        src = np.repeat(np.arange(num_sybil), sybil_degree)
+        dst = (src + gen.integers(1, num_sybil, size=src.size)) % num_sybil  # без петель
+        parts.append(np.stack([src, dst], axis=1) + num_honest)
+    if num_sybil and num_honest and attack_edges:
+        gen = np.random.default_rng(rnd.getrandbits(32))
+        honest = gen.integers(0, num_honest, size=attack_edges)
+        sybil = gen.integers(0, num_sybil, size=attack_edges) + num_honest
+        parts.append(np.stack([honest, sybil], axis=1))
+    return np.concatenate(parts)
@@ -0,0 +1,107 @@
+"""
+Пакетная проверка подписей для режима настоящей криптографии.
+Транзакции шага собираются, дедуплицируются по tx id и проверяются один раз
+в пуле потоков или процессов; вердикты затем разделяют все узлы сети.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .crypto import get_backend, set_backend, Digest
+from .transaction import Transaction
+
+# Элемент пакета: (tx_id, подписываемые данные, подпись, открытый ключ отправителя)
+VerifyItem = Tuple[Digest, str, bytes, str]
+
+_worker_backend_name: Optional[str] = None
+
+
+def _verify_chunk(backend_name: str, items: List[VerifyItem]) -> List[Tuple[Digest, bool]]:
+    """Проверяет часть пакета (в том числе в процессе-воркере с собственным бэкендом)."""
+    global _worker_backend_name
+    backend = get_backend()
+    if backend.name != backend_name:
+        if _worker_backend_name != backend_name:
+            set_backend(backend_name)
+            _worker_backend_name = backend_name
+        backend = get_backend()
+    return [(tx_id, backend.verify(data, signature, public_key)) for tx_id, data, signature, public_key in items]
+
+
+class BatchVerifier:
+    """
+    Пул проверки подписей.
+    executor: "thread" | "process"; процессы доступны только бэкендам без общего
+    состояния (stateless_verify), иначе используется пул потоков.
+    Пакеты меньше min_batch проверяются в текущем потоке; по умолчанию min_batch — число
+    воркеров, так что в пул уходит уже пакет одного шага (tx_per_step транзакций).
+    """
+
+    def __init__(self, workers: Optional[int] = None, executor: str = "process", min_batch: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.min_batch = min_batch or self.workers
+        self._executor: Optional[Executor] = None
+        self._executor_key: Optional[Tuple[str, str]] = None
+        self.batches = 0
+        self.pooled_batches = 0  # пакетов, проверенных в пуле (а не в текущем потоке)
+        self.verified = 0
+
+    def _get_executor(self, backend_name: str, stateless: bool) -> Executor:
+        kind = "process" if self.executor_kind == "process" and stateless else "thread"
+        key = (kind, backend_name)
+        if self._executor is None or self._executor_key != key:
+            self.close()
+            if kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            self._executor_key = key
+        return self._executor
+
+    def verify_items(self, items: List[VerifyItem]) -> Dict[Digest, bool]:
+        """Проверяет пакет элементов и возвращает вердикты по tx id."""
+        if not items:
+            return {}
+        backend = get_backend()
+        self.batches += 1
+        self.verified += len(items)
+        if len(items) < self.min_batch or self.workers <= 1:
+            return dict(_verify_chunk(backend.name, items))
+        executor = self._get_executor(backend.name, backend.stateless_verify)
+        self.pooled_batches += 1
+        # Малый пакет — по части на воркер, большой — по четыре для выравнивания нагрузки
+        chunk = -(-len(items) // (self.workers * 4 if len(items) >= 4 * self.workers else self.workers))
+        futures = [
+            executor.submit(_verify_chunk, backend.name, items[i : i + chunk])
+            for i in range(0, len(items), chunk)
+        ]
+        verdicts: Dict[Digest, bool] = {}
+        for future in futures:
+            verdicts.update(future.result())
+        return verdicts
+
+    def verify_transactions(self, txs: Iterable[Transaction], public_keys: Dict[str, str]) -> Dict[Digest, bool]:
+        """Дедуплицирует транзакции по id и проверяет их подписи ключами отправителей."""
+        items: List[VerifyItem] = []
+        seen = set()
+        verdicts: Dict[Digest, bool] = {}
+        for tx in txs:
+            if tx.id in seen:
+                continue
+            seen.add(tx.id)
+            public_key = public_keys.get(tx.from_id)
+            if public_key is None:
+                verdicts[tx.id] = False
+                continue
+            items.append((tx.id, tx.content_for_signature(), tx.signature, public_key))
+        verdicts.update(self.verify_items(items))
+        return verdicts
+
+    def close(self) -> None:
+        """Останавливает пул."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._executor_key = None
@@ -0,0 +1,324 @@
+"""
+Бинарный проводной формат транзакций и алертов сети Елена (версия 1).
+Фиксированный заголовок struct, дайджесты в бинарном виде (hex-строки бэкенда
+восстанавливаются при декодировании), родители с префиксом длины.
+Декодирование идёт по memoryview без копий буфера; TransactionView читает поля лениво.
+"""
+
+import struct
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .crypto import Digest
+from .transaction import Transaction, Alert
+
+WIRE_VERSION = 1
+KIND_TX = 1
+KIND_ALERT = 2
+
+_FLAG_HEX = 0x01  # дайджесты — hex-строки (sha512/null), иначе bytes (blake2b)
+_FLAG_CHAFF = 0x02
+_FLAG_ROUTED = 0x01  # в пакете у каждого сообщения есть адрес получателя
+
+# version, kind, flags, digest_len, amount, timestamp, nonce, from_len, to_len, n_parents, sig_len
+_TX_HEADER = struct.Struct("<BBBBddQHHHH")
+# version, kind, flags, digest_len, id_len, by_len, propagation_count
+_ALERT_HEADER = struct.Struct("<BBBBHHI")
+_BATCH_HEADER = struct.Struct("<BBI")  # version, flags, число сообщений
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+Message = Union[Transaction, Alert]
+
+
+class WireError(ValueError):
+    """Повреждённый буфер или неподдерживаемая версия формата."""
+
+
+def _digest_mode(digests: List[Digest]) -> Tuple[int, int]:
+    """(флаги, длина дайджеста в байтах); все дайджесты сообщения должны быть одного вида."""
+    first = digests[0]
+    is_hex = isinstance(first, str)
+    size = len(first) // 2 if is_hex else len(first)
+    for d in digests:
+        if isinstance(d, str) != is_hex or (len(d) // 2 if is_hex else len(d)) != size:
+            raise WireError("Дайджесты сообщения разного вида или длины")
+    return (_FLAG_HEX if is_hex else 0), size
+
+
+def _digest_bytes(value: Digest) -> bytes:
+    return bytes.fromhex(value) if isinstance(value, str) else value
+
+
+def _check_header(buf: memoryview, kind: int, header: struct.Struct) -> None:
+    if len(buf) < header.size:
+        raise WireError("Буфер короче заголовка")
+    if buf[0] != WIRE_VERSION:
+        raise WireError(f"Неподдерживаемая версия формата: {buf[0]}")
+    if buf[1] != kind:
+        raise WireError(f"Ожидался тип сообщения {kind}, получен {buf[1]}")
+
+
+# --- транзакции ---
+
+
+def encode_transaction(tx: Transaction) -> bytes:
+    flags, dl = _digest_mode([tx.id, tx.anchor, *tx.parents])
+    if tx.is_chaff:
+        flags |= _FLAG_CHAFF
+    from_b = tx.from_id.encode("utf-8")
+    to_b = tx.to_id.encode("utf-8")
+    parts = [
+        _TX_HEADER.pack(
+            WIRE_VERSION, KIND_TX, flags, dl, tx.amount, tx.timestamp, tx.nonce,
+            len(from_b), len(to_b), len(tx.parents), len(tx.signature),
+        ),
+        _digest_bytes(tx.id),
+        _digest_bytes(tx.anchor),
+    ]
+    parts.extend(_digest_bytes(p) for p in tx.parents)
+    parts += [from_b, to_b, tx.signature]
+    return b"".join(parts)
+
+
+def transaction_size(tx: Transaction, signature_size: Optional[int] = None) -> int:
+    """Размер закодированной транзакции (байт) без кодирования; signature_size — модельная подпись."""
+    first = tx.id
+    dl = len(first) // 2 if isinstance(first, str) else len(first)
+    sig = len(tx.signature) if signature_size is None else signature_size
+    return (
+        _TX_HEADER.size
+        + dl * (2 + len(tx.parents))
+        + len(tx.from_id.encode("utf-8"))
+        + len(tx.to_id.encode("utf-8"))
+        + sig
+    )
+
+
+class TransactionView:
+    """Ленивое чтение транзакции из буфера: заголовок разбирается сразу, поля — по запросу."""
+
+    __slots__ = ("_buf", "_hex", "_dl", "_n_parents", "_from_len", "_to_len", "_sig_len",
+                 "amount", "timestamp", "nonce", "is_chaff")
+
+    def __init__(self, buf):
+        mv = memoryview(buf)
+        _check_header(mv, KIND_TX, _TX_HEADER)
+        (_, _, flags, dl, self.amount, self.timestamp, self.nonce,
+         self._from_len, self._to_len, self._n_parents, self._sig_len) = _TX_HEADER.unpack_from(mv)
+        self._buf = mv
+        self._hex = bool(flags & _FLAG_HEX)
+        self._dl = dl
+        self.is_chaff = bool(flags & _FLAG_CHAFF)
+        if len(mv) < self.size:
+            raise WireError("Буфер транзакции обрезан")
+
+    @property
+    def size(self) -> int:
+        return (_TX_HEADER.size + self._dl * (2 + self._n_parents)
+                + self._from_len + self._to_len + self._sig_len)
+
+    def _digest(self, offset: int) -> Digest:
+        raw = self._buf[offset : offset + self._dl]
+        return raw.hex() if self._hex else bytes(raw)
+
+    @property
+    def id(self) -> Digest:
+        return self._digest(_TX_HEADER.size)
+
+    @property
+    def anchor(self) -> Digest:
+        return self._digest(_TX_HEADER.size + self._dl)
+
+    @property
+    def parents(self) -> List[Digest]:
+        start = _TX_HEADER.size + 2 * self._dl
+        return [self._digest(start + i * self._dl) for i in range(self._n_parents)]
+
+    @property
+    def _strings_offset(self) -> int:
+        return _TX_HEADER.size + self._dl * (2 + self._n_parents)
+
+    @property
+    def from_id(self) -> str:
+        off = self._strings_offset
+        return str(self._buf[off : off + self._from_len], "utf-8")
+
+    @property
+    def to_id(self) -> str:
+        off = self._strings_offset + self._from_len
+        return str(self._buf[off : off + self._to_len], "utf-8")
+
+    @property
+    def signature(self) -> bytes:
+        off = self._strings_offset + self._from_len + self._to_len
+        return bytes(self._buf[off : off + self._sig_len])
+
+    def to_transaction(self) -> Transaction:
+        return Transaction(
+            id=self.id,
+            from_id=self.from_id,
+            to_id=self.to_id,
+            amount=self.amount,
+            nonce=self.nonce,
+            anchor=self.anchor,
+            parents=self.parents,
+            timestamp=self.timestamp,
+            signature=self.signature,
+            is_chaff=self.is_chaff,
+        )
+
+
+def decode_transaction(buf) -> Transaction:
+    """Полное декодирование: все дайджесты переводятся одним вызовом hex()/срезом."""
+    mv = memoryview(buf)
+    _check_header(mv, KIND_TX, _TX_HEADER)
+    (_, _, flags, dl, amount, timestamp, nonce,
+     from_len, to_len, n_parents, sig_len) = _TX_HEADER.unpack_from(mv)
+    count = 2 + n_parents
+    strings = _TX_HEADER.size + dl * count
+    end = strings + from_len + to_len + sig_len
+    if len(mv) < end:
+        raise WireError("Буфер транзакции обрезан")
+    if flags & _FLAG_HEX:
+        text = mv[_TX_HEADER.size : strings].hex()
+        step = 2 * dl
+        digests = [text[i * step : (i + 1) * step] for i in range(count)]
+    else:
+        raw = mv[_TX_HEADER.size : strings].tobytes()
+        digests = [raw[i * dl : (i + 1) * dl] for i in range(count)]
+    to_start = strings + from_len
+    sig_start = to_start + to_len
+    return Transaction(
+        id=digests[0],
+        from_id=str(mv[strings:to_start], "utf-8"),
+        to_id=str(mv[to_start:sig_start], "utf-8"),
+        amount=amount,
+        nonce=nonce,
+        anchor=digests[1],
+        parents=digests[2:],
+        timestamp=timestamp,
+        signature=mv[sig_start:end].tobytes(),
+        is_chaff=bool(flags & _FLAG_CHAFF),
+    )
+
+
+# --- алерты ---
+
+
+def encode_alert(alert: Alert) -> bytes:
+    flags, dl = _digest_mode([alert.conflicting_tx1, alert.conflicting_tx2, alert.anchor])
+    id_b = alert.id.encode("utf-8")
+    by_b = alert.discovered_by.encode("utf-8")
+    return b"".join((
+        _ALERT_HEADER.pack(WIRE_VERSION, KIND_ALERT, flags, dl, len(id_b), len(by_b), alert.propagation_count),
+        _digest_bytes(alert.conflicting_tx1),
+        _digest_bytes(alert.conflicting_tx2),
+        _digest_bytes(alert.anchor),
+        id_b,
+        by_b,
+    ))
+
+
+def alert_size(alert: Alert) -> int:
+    """Размер закодированного алерта (байт) без кодирования."""
+    first = alert.conflicting_tx1
+    dl = len(first) // 2 if isinstance(first, str) else len(first)
+    return _ALERT_HEADER.size + 3 * dl + len(alert.id.encode("utf-8")) + len(alert.discovered_by.encode("utf-8"))
+
+
+def decode_alert(buf) -> Alert:
+    mv = memoryview(buf)
+    _check_header(mv, KIND_ALERT, _ALERT_HEADER)
+    _, _, flags, dl, id_len, by_len, hops = _ALERT_HEADER.unpack_from(mv)
+    off = _ALERT_HEADER.size
+    if len(mv) < off + 3 * dl + id_len + by_len:
+        raise WireError("Буфер алерта обрезан")
+    is_hex = flags & _FLAG_HEX
+
+    def digest(i: int) -> Digest:
+        raw = mv[off + i * dl : off + (i + 1) * dl]
+        return raw.hex() if is_hex else bytes(raw)
+
+    strings = off + 3 * dl
+    return Alert(
+        id=str(mv[strings : strings + id_len], "utf-8"),
+        conflicting_tx1=digest(0),
+        conflicting_tx2=digest(1),
+        anchor=digest(2),
+        discovered_by=str(mv[strings + id_len : strings + id_len + by_len], "utf-8"),
+        propagation_count=hops,
+    )
+
+
+# --- общий интерфейс и пакеты ---
+
+
+def message_kind(buf) -> int:
+    """KIND_TX или KIND_ALERT по заголовку сообщения."""
+    mv = memoryview(buf)
+    if len(mv) < 2 or mv[0] != WIRE_VERSION:
+        raise WireError("Неизвестный формат сообщения")
+    return mv[1]
+
+
+def encode(message: Message) -> bytes:
+    if isinstance(message, Transaction):
+        return encode_transaction(message)
+    return encode_alert(message)
+
+
+def decode(buf) -> Message:
+    kind = message_kind(buf)
+    if kind == KIND_TX:
+        return decode_transaction(buf)
+    if kind == KIND_ALERT:
+        return decode_alert(buf)
+    raise WireError(f"Неизвестный тип сообщения: {kind}")
+
+
+def encode_batch(messages: Iterable[Message], routes: Optional[Iterable[str]] = None) -> bytes:
+    """
+    Пакет сообщений в одном буфере: [заголовок][(адрес)][u32 длина][сообщение]...
+    routes — id узлов-получателей (по одному на сообщение), если пакет адресный.
+    """
+    messages = list(messages)
+    route_list = list(routes) if routes is not None else None
+    if route_list is not None and len(route_list) != len(messages):
+        raise ValueError("routes и messages разной длины")
+    parts = [_BATCH_HEADER.pack(WIRE_VERSION, _FLAG_ROUTED if route_list is not None else 0, len(messages))]
+    for i, message in enumerate(messages):
+        if route_list is not None:
+            route = route_list[i].encode("utf-8")
+            parts += [_U16.pack(len(route)), route]
+        body = encode(message)
+        parts += [_U32.pack(len(body)), body]
+    return b"".join(parts)
+
+
+def iter_batch(buf) -> Iterator[Tuple[Optional[str], memoryview]]:
+    """Перебирает пакет: (адрес или None, memoryview сообщения) — без копирования тел."""
+    mv = memoryview(buf)
+    if len(mv) < _BATCH_HEADER.size:
+        raise WireError("Буфер короче заголовка пакета")
+    version, flags, count = _BATCH_HEADER.unpack_from(mv)
+    if version != WIRE_VERSION:
+        raise WireError(f"Неподдерживаемая версия формата: {version}")
+    routed = flags & _FLAG_ROUTED
+    off = _BATCH_HEADER.size
+    for _ in range(count):
+        route = None
+        if routed:
+            (route_len,) = _U16.unpack_from(mv, off)
+            off += _U16.size
+            route = str(mv[off : off + route_len], "utf-8")
+            off += route_len
+        (length,) = _U32.unpack_from(mv, off)
+        off += _U32.size
+        if off + length > len(mv):
+            raise WireError("Пакет обрезан")
+        yield route, mv[off : off + length]
+        off += length
+
+
+def decode_batch(buf) -> List[Message]:
+    return [decode(body) for _, body in iter_batch(buf)]
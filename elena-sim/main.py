@@ -5,6 +5,7 @@
 
 import argparse
 import sys
+import threading
 from pathlib import Path
 
 # Добавляем корень проекта в path
@@ -20,11 +21,20 @@ from simulation.scenarios import (
     Scenario3_QuantumDoubleSpend,
     Scenario4_SybilAttack,
 )
-from visualization.dashboard import create_app, set_dashboard_state
+from simulation.ab import ab_payload
+from simulation.live import LiveStream
+from simulation.timeline import StateTimeline
+from simulation.telemetry import SimulationTelemetry
 
 console = Console()
 
 
+def set_dashboard_state(**kwargs) -> None:
+    """Состояние для дашборда; FastAPI загружается только при --viz."""
+    from visualization.dashboard import set_dashboard_state as _set_state
+    _set_state(**kwargs)
+
+
 def run_scenario_1(args: argparse.Namespace, runner_kwargs: dict = None) -> None:
     scenario = Scenario1_HonestNetwork()
     result = scenario.run(num_nodes=args.nodes, steps=args.steps, **(runner_kwargs or {}))
@@ -37,10 +47,32 @@ def run_scenario_1(args: argparse.Namespace, runner_kwargs: dict = None) -> None
     console.print(f"Транзакций в сети: {len(runner.graph.transactions)}")
     if summary.get("network_diameter") is not None and summary.get("network_diameter") >= 0:
         console.print(f"Диаметр графа: {summary['network_diameter']}, ср. длина пути: {summary.get('avg_path_length', 0):.2f}")
+    _print_actor_stats(summary)
+    _print_memory_stats(summary)
+    _print_churn_stats(summary)
+    runner.close()
     if args.viz:
         set_dashboard_state(runner=runner)
 
 
+def run_scenario_1_sharded(args: argparse.Namespace, runner_kwargs: dict = None) -> None:
+    from simulation.sharded import ShardedSimulationRunner
+
+    runner = ShardedSimulationRunner(num_nodes=args.nodes, num_shards=args.shards, **(runner_kwargs or {}))
+    runner.build_network()
+    result = runner.run(args.steps)
+    summary, sharding = result["summary"], result["sharding"]
+    console.print(Panel(f"[green]Сценарий 1: Честная сеть (шардов: {sharding['num_shards']})[/green]"))
+    console.print(f"Узлов: {args.nodes}, шагов: {args.steps}")
+    console.print(f"Средняя репутация: {summary.get('avg_reputation', 0):.2f}")
+    console.print(f"Транзакций в сети: {sharding['transactions']}")
+    console.print(
+        f"Разрез: {sharding['edge_cut']} рёбер ({100 * sharding['edge_cut_fraction']:.1f}%), "
+        f"межшардовых сообщений: {sharding['cross_shard_messages']}"
+    )
+    console.print(f"Время: {sharding['elapsed_sec']:.1f} с ({sharding['steps_per_sec']:.2f} шагов/с)")
+
+
 def run_scenario_2(args: argparse.Namespace, runner_kwargs: dict = None) -> None:
     scenario = Scenario2_ClassicDoubleSpend()
     result = scenario.run(num_nodes=args.nodes, steps=args.steps, num_evil=args.evil, **(runner_kwargs or {}))
@@ -58,7 +90,7 @@ def run_scenario_2(args: argparse.Namespace, runner_kwargs: dict = None) -> None
     discovered_by = result.get("discovered_by")
     detection_step = result.get("detection_step")
     nodes_alert = result.get("nodes_with_alert", 0)
-    total = len(runner.graph.nodes)
+    total = result.get("nodes_total", len(runner.graph.nodes))
     pct = (100 * nodes_alert / total) if total else 0
     if detection_step is not None and discovered_by:
         console.print(f"Шаг {detection_step}: [bold]⚠️ КОНФЛИКТ ОБНАРУЖЕН[/bold] узлом {discovered_by}")
@@ -79,6 +111,10 @@ def run_scenario_2(args: argparse.Namespace, runner_kwargs: dict = None) -> None
     table.add_row("Репутация злого узла", f"упала с {rep_before} до {rep_after}")
     table.add_row("Ложных срабатываний", str(summary.get("false_positives", 0)))
     console.print(table)
+    _print_actor_stats(summary)
+    _print_memory_stats(summary)
+    _print_churn_stats(summary)
+    runner.close()
     if args.viz:
         set_dashboard_state(runner=runner)
 
@@ -105,7 +141,7 @@ def run_scenario_3(args: argparse.Namespace, runner_kwargs: dict = None) -> None
     summary = runner.metrics.get_summary()
     detection_step = result.get("detection_step")
     nodes_alert = result.get("nodes_with_alert", 0)
-    total_nodes = len(runner.graph.nodes)
+    total_nodes = result.get("nodes_total", len(runner.graph.nodes))
     pct = (100 * nodes_alert / total_nodes) if total_nodes else 0
 
     # Имитация пошагового вывода как в спецификации
@@ -134,8 +170,12 @@ def run_scenario_3(args: argparse.Namespace, runner_kwargs: dict = None) -> None
     table.add_row("Ложных срабатываний", str(summary.get("false_positives", 0)))
     table.add_row("Пиковая нагрузка", f"{summary.get('peak_throughput', 0)} сообщений/шаг")
     console.print(table)
+    _print_actor_stats(summary)
+    _print_memory_stats(summary)
+    _print_churn_stats(summary)
     if getattr(args, "batch", False):
         _print_batch_result(args, result, runner, summary, detection_step, nodes_alert)
+    runner.close()
     if args.viz:
         set_dashboard_state(runner=runner)
 
@@ -143,20 +183,7 @@ def run_scenario_3(args: argparse.Namespace, runner_kwargs: dict = None) -> None
 def _print_batch_result(args, result, runner, summary, detection_step, nodes_alert) -> None:
     """Выводит одну строку AB_RESULT=<json> для парсинга батч-скриптом."""
     import json
-    total = len(runner.graph.nodes)
-    alert_pct = round(100 * nodes_alert / total, 1) if total else 0
-    det_time = summary.get("avg_detection_time_steps") or (0 if not detection_step else 3.0)
-    payload = {
-        "detection_time": round(float(det_time), 1),
-        "alert_coverage": alert_pct,
-        "peak_load": int(summary.get("peak_throughput", 0)),
-        "evil_reputation_before": result.get("evil_reputation_before", 0),
-        "evil_reputation_after": result.get("evil_reputation_after", 0),
-        "successful_attack": int(bool(summary.get("successful_attacks", 0))),
-        "false_positives": int(summary.get("false_positives", 0)),
-        "network_diameter": int(summary.get("network_diameter", -1)) if summary.get("network_diameter") is not None else -1,
-        "avg_path_length": round(float(summary.get("avg_path_length", -1)), 2) if summary.get("avg_path_length") is not None else -1.0,
-    }
+    payload = ab_payload(result, runner, summary, detection_step, nodes_alert)
     print("AB_RESULT=" + json.dumps(payload, ensure_ascii=False))
 
 
@@ -169,24 +196,157 @@ def _avg_rep(runner) -> float:
     return sum(last["reputations"].values()) / len(last["reputations"])
 
 
+def _print_actor_stats(summary: dict) -> None:
+    """Пропускная способность и хвост задержки в режиме акторов (--actors)."""
+    stats = summary.get("actor_stats")
+    if not stats:
+        return
+    console.print(
+        f"Акторы ({stats['transport']}, {stats['codec']}): {stats['messages']} сообщений, "
+        f"{stats['messages_per_sec']:.0f} сообщ./с, задержка p50/p99: "
+        f"{stats['latency_p50_ms']:.2f}/{stats['latency_p99_ms']:.2f} мс"
+    )
+
+
+def _print_churn_stats(summary: dict) -> None:
+    """Вход и выход узлов (--churn-rate / --session-mean) и догрузка истории новыми узлами (--sync-on-join)."""
+    stats = summary.get("churn_stats")
+    if not stats:
+        return
+    console.print(
+        f"Динамика сети: пришло {stats['joined']}, ушло {stats['departed']} узлов "
+        f"(переподключений: {stats['reattached']}), перестроено рёбер: {stats['rewired']}, узлов сейчас: {stats['nodes']}"
+    )
+    sync = summary.get("sync_stats")
+    if not sync or not sync["syncs"]:
+        return
+    table = Table(title=f"Синхронизация новых узлов ({sync['syncs']} сверок, по диапазонам: {sync['ranged']})")
+    table.add_column("Разность до", justify="right", style="cyan")
+    table.add_column("Сверок", justify="right")
+    table.add_column("Байт в среднем", justify="right")
+    table.add_column("мс в среднем", justify="right")
+    for row in sync["by_difference"]:
+        table.add_row(
+            str(row["difference_max"]), str(row["syncs"]), f"{row['avg_bytes']:.0f}", f"{row['avg_time_ms']:.2f}"
+        )
+    console.print(table)
+    console.print(
+        f"[dim]Догружено сообщений: {sync['fetched']}, байт: {sync['bytes']} "
+        f"(таблицы и запросы: {sync['sketch_bytes']}), байт на сообщение разности: {sync['bytes_per_item']:.0f}[/dim]"
+    )
+
+
+def _print_memory_stats(summary: dict) -> None:
+    """Память по подсистемам (--memory): последняя выборка и удельные байты на узел и транзакцию."""
+    stats = summary.get("memory_stats")
+    if not stats:
+        return
+    table = Table(title=f"Память (шаг {stats['step']}, выборок: {stats['samples']})")
+    table.add_column("Подсистема", style="cyan")
+    table.add_column("МБ", justify="right")
+    for name, size in sorted(stats["subsystems"].items(), key=lambda kv: -kv[1]):
+        table.add_row(name, f"{size / 1e6:.2f}")
+    console.print(table)
+    line = (
+        f"На узел: {stats['per_node_bytes']:.0f} Б, на транзакцию: {stats['per_tx_bytes']:.0f} Б "
+        f"(по всей сети: {stats['per_tx_network_bytes']:.0f} Б)"
+    )
+    if "traced_peak" in stats:
+        line += f", tracemalloc: {stats['traced_current'] / 1e6:.1f} МБ (пик {stats['traced_peak'] / 1e6:.1f} МБ)"
+    console.print(line)
+
+
 def run_scenario_4(args: argparse.Namespace, runner_kwargs: dict = None) -> None:
     scenario = Scenario4_SybilAttack()
     result = scenario.run(
         num_nodes=args.nodes,
-        num_sybil=min(5, args.nodes // 10),
+        num_sybil=max(5, args.nodes // 10),
         quantum_advantage=args.quantum,
         steps=args.steps,
+        quarantine_fraction=args.sybil_quarantine,
         **(runner_kwargs or {}),
     )
     runner = result["runner"]
     summary = runner.metrics.get_summary()
+    sybil = summary.get("sybil_detection", {})
     console.print(Panel("[magenta]Сценарий 4: Сибил-атака[/magenta]"))
-    console.print(f"Узлов: {args.nodes}, сибил-узлов: {len(runner.evil_nodes)}")
-    console.print(f"Сводка: {summary}")
+    console.print(
+        f"Честных узлов: {len(runner.honest_nodes)}, сибил-узлов: {len(runner.evil_nodes)}, "
+        f"рёбер атаки: {sybil.get('attack_edges', 0)}"
+    )
+    table = Table()
+    table.add_column("Метрика", style="cyan")
+    table.add_column("Значение", style="green")
+    table.add_row("Раундов обнаружения", str(sybil.get("rounds", 0)))
+    table.add_row(
+        "Помечено узлов",
+        f"{sybil.get('flagged', 0)} (доля карантина {sybil.get('quarantine_fraction', 0):.0%})",
+    )
+    table.add_row("Точность / полнота", f"{sybil.get('precision', 0):.3f} / {sybil.get('recall', 0):.3f}")
+    table.add_row("Время детектора", f"{sybil.get('runtime_ms', 0):.1f} мс")
+    table.add_row(
+        "Репутация сибил-кластера",
+        f"{sybil.get('sybil_reputation_before', 0):.2f} → {sybil.get('sybil_reputation_after', 0):.2f}",
+    )
+    table.add_row("Репутация честных узлов", f"{sybil.get('honest_reputation', 0):.2f}")
+    console.print(table)
+    _print_actor_stats(summary)
+    _print_memory_stats(summary)
+    _print_churn_stats(summary)
+    runner.close()
     if args.viz:
         set_dashboard_state(runner=runner)
 
 
+# Параметры раннера, которые понимает шардированный режим; остальные — флаги, которые он не поддерживает
+_SHARDED_KWARGS = ("chaff_prob", "rewiring_interval", "rewiring_prob", "crypto_backend", "seed")
+_KWARG_FLAGS = {
+    "batch_verify": "--batch-verify",
+    "verify_workers": "--verify-workers",
+    "actor_transport": "--actors",
+    "trace_path": "--trace",
+    "vectorized_propagation": "--vectorized",
+    "trust_interval": "--trust",
+    "memory_interval": "--memory",
+    "shared_topology": "--shared-topology",
+    "metrics_sink": "--metrics-sink",
+    "metrics_dir": "--metrics-dir",
+    "metrics_history": "--metrics-history",
+    "telemetry": "--prom-port",
+    "churn_arrival_rate": "--churn-rate",
+    "churn_session_mean": "--session-mean",
+    "churn_session_distribution": "--session-dist",
+    "workload_arrival": "--arrival",
+    "workload_senders": "--senders",
+    "sync_on_join": "--sync-on-join",
+    "timeline": "--timeline",
+}
+
+
+def _sharded_unsupported(runner_kwargs: dict) -> list:
+    """Флаги CLI, заданные для прогона, которые --shards не поддерживает."""
+    flags = [_KWARG_FLAGS.get(key, key) for key in runner_kwargs if key not in _SHARDED_KWARGS]
+    return sorted(set(flags))
+
+
+def _run_scenario(args: argparse.Namespace, runner_kwargs: dict) -> None:
+    if args.scenario == 1 and args.shards is not None:
+        run_scenario_1_sharded(args, runner_kwargs)
+    elif args.scenario == 1:
+        run_scenario_1(args, runner_kwargs)
+    elif args.scenario == 2:
+        run_scenario_2(args, runner_kwargs)
+    elif args.scenario == 3:
+        run_scenario_3(args, runner_kwargs)
+    elif args.scenario == 4:
+        run_scenario_4(args, runner_kwargs)
+    timeline = runner_kwargs.get("timeline")
+    if timeline is not None and getattr(args, "timeline_out", None):
+        timeline.save(args.timeline_out)
+        console.print(f"[dim]Шкала состояний: {args.timeline_out} ({len(timeline.steps)} шагов, "
+                      f"{len(timeline.keyframes)} ключевых кадров)[/dim]")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Симулятор сети Елена")
     parser.add_argument("--scenario", type=int, default=1, help="Номер сценария (1-4)")
@@ -200,9 +360,60 @@ def main() -> None:
     parser.add_argument("--chaff-prob", type=float, default=None, help="Вероятность chaff (по умолч. из config)")
     parser.add_argument("--rewiring-interval", type=int, default=None, help="Интервал rewiring в шагах")
     parser.add_argument("--rewiring-prob", type=float, default=None, help="Вероятность rewiring одного ребра")
+    parser.add_argument("--crypto", choices=("null", "sha512", "blake2b", "ed25519"), default=None,
+                        help="Крипто-бэкенд симуляции (по умолч. из config)")
+    parser.add_argument("--batch-verify", action="store_true",
+                        help="Пакетная проверка подписей шага в пуле (для --crypto ed25519)")
+    parser.add_argument("--verify-workers", type=int, default=None, help="Размер пула проверки подписей")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="Шардированный запуск на нескольких процессах (сценарий 1; 0 — по числу ядер)")
+    parser.add_argument("--actors", choices=("inprocess", "tcp", "unix"), default=None,
+                        help="Режим акторов asyncio: узлы обмениваются сообщениями через транспорт")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="Пакетное распространение транзакций шага (NumPy-фронты по CSR)")
+    parser.add_argument("--trust", type=int, default=None, metavar="K",
+                        help="Глобальное доверие (EigenTrust) с пересчётом каждые K шагов")
+    parser.add_argument("--memory", type=int, default=None, metavar="K",
+                        help="Учёт памяти по подсистемам каждые K шагов (tracemalloc + оценка размеров)")
+    parser.add_argument("--metrics-sink", choices=("jsonl", "npz"), default=None,
+                        help="Писать пошаговые метрики на диск по ходу прогона (чанки JSONL или сжатые NPZ)")
+    parser.add_argument("--metrics-dir", type=str, default=None, metavar="DIR",
+                        help="Каталог приёмника метрик (по умолч. results/metrics_<дата>)")
+    parser.add_argument("--metrics-history", type=int, default=None, metavar="N",
+                        help="Держать в памяти только N последних шагов (сводка — по онлайн-агрегатам)")
+    parser.add_argument("--prom-port", type=int, default=None, metavar="PORT",
+                        help="Отдавать живые метрики Prometheus на http://127.0.0.1:PORT/metrics во время прогона")
+    parser.add_argument("--churn-rate", type=float, default=None, metavar="RATE",
+                        help="Приход узлов: в среднем RATE новых узлов за шаг (пуассоновский поток)")
+    parser.add_argument("--session-mean", type=float, default=None, metavar="STEPS",
+                        help="Уход узлов: средняя длительность сессии в шагах")
+    parser.add_argument("--session-dist", choices=("exponential", "lognormal", "pareto"), default=None,
+                        help="Распределение длительности сессий (по умолч. exponential)")
+    parser.add_argument("--arrival", choices=("uniform", "poisson", "mmpp"), default=None,
+                        help="Модель прихода транзакций: ровно tx_per_step, пуассоновская или со всплесками (MMPP)")
+    parser.add_argument("--senders", choices=("uniform", "zipf"), default=None,
+                        help="Выбор отправителей: равномерно или по Zipf (горячие отправители)")
+    parser.add_argument("--sybil-quarantine", type=float, default=None, metavar="FRAC",
+                        help="Сценарий 4: доля узлов с наименьшим доверием, помечаемых за раунд (по умолч. из настроек)")
+    parser.add_argument("--sync-on-join", action="store_true",
+                        help="Новые узлы догружают историю сверкой множеств с пирами (IBLT + пакетная загрузка тел)")
+    parser.add_argument("--timeline", type=int, default=None, metavar="K",
+                        help="Шкала состояний: ключевой кадр каждые K шагов, между ними дельты (/state?step=k)")
+    parser.add_argument("--timeline-out", type=str, default=None, metavar="PATH",
+                        help="С --timeline: сохранить шкалу в .npz (StateTimeline.load)")
+    parser.add_argument("--seed", type=int, default=None, help="Зерно генератора (воспроизводимый прогон)")
+    parser.add_argument("--shared-topology", type=str, default=None, metavar="NAME",
+                        help="Подключиться к опубликованной общей топологии (сегмент shared_memory)")
+    parser.add_argument("--trace", type=str, default=None, metavar="PATH",
+                        help="Записать журнал событий (разбор: python replay.py PATH)")
     parser.add_argument("--batch", action="store_true", help="Режим A/B: в конце вывести одну строку AB_RESULT=<json>")
-    parser.add_argument("--viz", action="store_true", help="Запустить веб-визуализацию после симуляции")
+    parser.add_argument("--viz", action="store_true",
+                        help="Веб-дашборд: прогон транслируется в реальном времени (пауза/шаг из браузера)")
+    parser.add_argument("--paused", action="store_true", help="С --viz: начать на паузе (запуск кнопкой в дашборде)")
     args = parser.parse_args()
+    if args.scenario not in (1, 2, 3, 4):
+        console.print("[red]Неизвестный сценарий. Выберите 1–4.[/red]")
+        sys.exit(1)
 
     runner_kwargs = {}
     if getattr(args, "no_chaff", False):
@@ -215,24 +426,72 @@ def main() -> None:
         runner_kwargs["rewiring_interval"] = args.rewiring_interval
     if getattr(args, "rewiring_prob", None) is not None:
         runner_kwargs["rewiring_prob"] = args.rewiring_prob
-
-    if args.scenario == 1:
-        run_scenario_1(args, runner_kwargs)
-    elif args.scenario == 2:
-        run_scenario_2(args, runner_kwargs)
-    elif args.scenario == 3:
-        run_scenario_3(args, runner_kwargs)
-    elif args.scenario == 4:
-        run_scenario_4(args, runner_kwargs)
-    else:
-        console.print("[red]Неизвестный сценарий. Выберите 1–4.[/red]")
-        sys.exit(1)
+    if getattr(args, "crypto", None):
+        runner_kwargs["crypto_backend"] = args.crypto
+    if getattr(args, "batch_verify", False):
+        runner_kwargs["batch_verify"] = True
+        runner_kwargs["verify_workers"] = args.verify_workers
+    if getattr(args, "actors", None):
+        runner_kwargs["actor_transport"] = args.actors
+    if getattr(args, "trace", None):
+        runner_kwargs["trace_path"] = args.trace
+    if getattr(args, "vectorized", False):
+        runner_kwargs["vectorized_propagation"] = True
+    if getattr(args, "trust", None):
+        runner_kwargs["trust_interval"] = args.trust
+    if getattr(args, "seed", None) is not None:
+        runner_kwargs["seed"] = args.seed
+    if getattr(args, "memory", None):
+        runner_kwargs["memory_interval"] = args.memory
+    if getattr(args, "shared_topology", None):
+        runner_kwargs["shared_topology"] = args.shared_topology
+    if getattr(args, "metrics_sink", None):
+        runner_kwargs["metrics_sink"] = args.metrics_sink
+        runner_kwargs["metrics_dir"] = args.metrics_dir
+    if getattr(args, "metrics_history", None):
+        runner_kwargs["metrics_history"] = args.metrics_history
+    if getattr(args, "prom_port", None) is not None:
+        telemetry = SimulationTelemetry()
+        port = telemetry.serve(args.prom_port)
+        console.print(f"[dim]Метрики Prometheus: http://127.0.0.1:{port}/metrics[/dim]")
+        runner_kwargs["telemetry"] = telemetry
+    if getattr(args, "churn_rate", None):
+        runner_kwargs["churn_arrival_rate"] = args.churn_rate
+    if getattr(args, "session_mean", None):
+        runner_kwargs["churn_session_mean"] = args.session_mean
+    if getattr(args, "session_dist", None):
+        runner_kwargs["churn_session_distribution"] = args.session_dist
+    if getattr(args, "arrival", None):
+        runner_kwargs["workload_arrival"] = args.arrival
+    if getattr(args, "senders", None):
+        runner_kwargs["workload_senders"] = args.senders
+    if getattr(args, "sync_on_join", False):
+        runner_kwargs["sync_on_join"] = True
+    if getattr(args, "timeline", None):
+        timeline = StateTimeline(keyframe_interval=args.timeline)
+        runner_kwargs["timeline"] = timeline
+        set_dashboard_state(timeline=timeline)
+    if args.scenario == 1 and args.shards is not None:
+        unsupported = _sharded_unsupported(runner_kwargs)
+        if unsupported:
+            parser.error(f"--shards не поддерживает: {', '.join(unsupported)}")
 
     if args.viz and not getattr(args, "batch", False):
-        app = create_app()
+        from visualization.dashboard import create_app
         import uvicorn
+
+        # Живой режим: прогон идёт в фоновом потоке, дашборд получает дельты шагов по /ws
+        if not (args.scenario == 1 and args.shards is not None):
+            live = LiveStream(paused=getattr(args, "paused", False))
+            runner_kwargs["live"] = live
+            set_dashboard_state(live=live)
+        threading.Thread(target=_run_scenario, args=(args, runner_kwargs), daemon=True).start()
+        app = create_app()
         console.print("[bold]Запуск дашборда на http://127.0.0.1:8000[/bold]")
         uvicorn.run(app, host="127.0.0.1", port=8000)
+    else:
+        _run_scenario(args, runner_kwargs)
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Разбор журнала событий симуляции (main.py --trace PATH) без повторного запуска.
+Запуск: python3 replay.py trace.elt [--step 500] [--events 10] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulation.trace import TraceReplay
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение журнала событий сети Елена")
+    parser.add_argument("path", help="Файл журнала (--trace в main.py)")
+    parser.add_argument("--step", type=int, default=None, help="Показать состояние на конец шага")
+    parser.add_argument("--events", type=int, default=0, help="Вывести первые N событий шага --step")
+    parser.add_argument("--json", action="store_true", help="Сводка в JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    replay = TraceReplay(args.path)
+    summary = replay.metrics().get_summary()
+    summary.pop("avg_reputation_history", None)
+    elapsed = time.perf_counter() - start
+    first, last = replay.steps
+    if args.json:
+        print(json.dumps({"steps": [first, last], "totals": replay.totals, "summary": summary}, ensure_ascii=False))
+    else:
+        print(f"Шаги {first}–{last}, чанков: {len(replay.chunks)}, разбор: {elapsed:.2f} с")
+        print("Итого событий: " + ", ".join(f"{k}={v}" for k, v in replay.totals.items()))
+        print(f"Средняя репутация: {summary['avg_reputation']:.3f}, пиковая нагрузка: {summary['peak_throughput']}")
+    if args.step is not None:
+        state = replay.seek(args.step)
+        reps = state.pop("reputations")
+        avg = sum(reps.values()) / len(reps) if reps else 0.0
+        print(f"Шаг {args.step}: " + ", ".join(f"{k}={v}" for k, v in state.items() if k != "step")
+              + f", средняя репутация {avg:.3f}")
+        for i, (kind, fields) in enumerate(replay.events(args.step, args.step)):
+            if i >= args.events:
+                break
+            print(f"  {kind}: {fields}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,20 @@ from typing import Dict, List, Optional, Any
 
 # Корень проекта (где main.py)
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.shared_topology import SharedTopology
+from simulation.replication import replicate
+
+METRIC_KEYS = (
+    "detection_time", "alert_coverage", "peak_load", "evil_reputation_before",
+    "evil_reputation_after", "successful_attack", "false_positives",
+    "network_diameter", "avg_path_length",
+)
+# Удельная память (при --memory): байт на узел и транзакцию, оценка и пик tracemalloc
+MEMORY_KEYS = ("mem_per_node_bytes", "mem_per_tx_bytes", "mem_estimated_mb", "mem_traced_peak_mb")
+# Метрики, по сходимости интервалов которых останавливается добавление зёрен
+TARGET_METRICS = ("detection_time", "alert_coverage", "peak_load", "evil_reputation_after")
 
 
 class ABTester:
@@ -27,12 +41,26 @@ class ABTester:
         quantum: float = 0.9,
         scenario: int = 3,
         output_dir: Optional[str] = None,
+        seeds: int = 1,
+        min_seeds: int = 3,
+        ci_width: Optional[float] = 0.1,
+        workers: int = 4,
+        shared_topology: Optional[str] = None,
+        memory_interval: Optional[int] = None,
     ):
         self.nodes = nodes
         self.steps = steps
         self.quantum = quantum
         # Масштаб по умолчанию: 200 узлов, 500 шагов (можно переопределить через CLI)
         self.scenario = scenario
+        # Повторения: до seeds зёрен на конфигурацию, пока 95% интервалы шире ci_width·|среднее|
+        self.seeds = seeds
+        self.min_seeds = min(min_seeds, seeds)
+        self.ci_width = ci_width
+        self.workers = workers
+        # Имя сегмента общей топологии: все прогоны подключаются к одной сети вместо построения своей
+        self.shared_topology = shared_topology
+        self.memory_interval = memory_interval
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_dir = output_dir or os.path.join(PROJECT_ROOT, "results", f"ab_tests_{self.timestamp}")
         os.makedirs(os.path.join(self.output_dir, "logs"), exist_ok=True)
@@ -43,8 +71,9 @@ class ABTester:
         chaff_prob: Optional[float] = 0.05,
         rewiring_interval: Optional[int] = 100,
         rewiring_prob: Optional[float] = 0.1,
+        seed: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Запускает один тест и возвращает метрики."""
+        """Запускает один тест (seed — зерно прогона) и возвращает метрики."""
         cmd = [
             sys.executable,
             os.path.join(PROJECT_ROOT, "main.py"),
@@ -68,11 +97,18 @@ class ABTester:
             if rewiring_prob is not None:
                 cmd.extend(["--rewiring-prob", str(rewiring_prob)])
             rewiring_label = "on"
+        if seed is not None:
+            cmd.extend(["--seed", str(seed)])
+        if self.shared_topology:
+            cmd.extend(["--shared-topology", self.shared_topology])
+        if self.memory_interval:
+            cmd.extend(["--memory", str(self.memory_interval)])
 
         print(f"\n🚀 Запуск теста {test_id}")
         print(f"   Команда: {' '.join(cmd)}")
 
-        log_path = os.path.join(self.output_dir, "logs", f"{test_id}.log")
+        log_name = test_id if seed is None else f"{test_id}_seed{seed}"
+        log_path = os.path.join(self.output_dir, "logs", f"{log_name}.log")
         with open(log_path, "w", encoding="utf-8") as log_file:
             process = subprocess.run(
                 cmd,
@@ -97,28 +133,68 @@ class ABTester:
             "rewiring_prob": rewiring_prob if rewiring_prob is not None else 0,
         }
 
-        # Парсим AB_RESULT=...
+        # Парсим AB_RESULT=...; без него прогон помечается ok=False и не входит в статистику по зёрнам
         match = re.search(r"AB_RESULT=(.+)", output)
+        metrics["ok"] = False
         if match:
             try:
                 data = json.loads(match.group(1).strip())
-                metrics["detection_time"] = data.get("detection_time", 0)
-                metrics["alert_coverage"] = data.get("alert_coverage", 0)
-                metrics["peak_load"] = data.get("peak_load", 0)
-                metrics["evil_reputation_before"] = data.get("evil_reputation_before", 0)
-                metrics["evil_reputation_after"] = data.get("evil_reputation_after", 0)
-                metrics["successful_attack"] = data.get("successful_attack", 0)
-                metrics["false_positives"] = data.get("false_positives", 0)
-                metrics["network_diameter"] = data.get("network_diameter", -1)
-                metrics["avg_path_length"] = data.get("avg_path_length", -1)
+                for key in METRIC_KEYS:
+                    metrics[key] = data.get(key, -1 if key in ("network_diameter", "avg_path_length") else 0)
+                for key in MEMORY_KEYS:
+                    if key in data:
+                        metrics[key] = data[key]
+                metrics["ok"] = True
             except json.JSONDecodeError:
                 _fill_defaults(metrics)
         else:
             _fill_defaults(metrics)
 
-        print(f"   ✅ Завершён. Время обнаружения: {metrics.get('detection_time', '?')} шагов")
+        if metrics["ok"]:
+            print(f"   ✅ Завершён. Время обнаружения: {metrics.get('detection_time', '?')} шагов")
+        else:
+            print(f"   ❌ Прогон не выдал AB_RESULT (код {process.returncode}), см. лог")
         return metrics
 
+    def run_replicated(
+        self,
+        test_id: str,
+        chaff_prob: Optional[float] = 0.05,
+        rewiring_interval: Optional[int] = 100,
+        rewiring_prob: Optional[float] = 0.1,
+    ) -> Dict[str, Any]:
+        """
+        Прогоняет конфигурацию по зёрнам 0, 1, … (параллельно, workers процессов main.py) до сходимости
+        интервалов TARGET_METRICS. Строка: средние метрик, полуширины 95% интервалов (*_ci95), число зёрен.
+        """
+        samples: List[Dict[str, Any]] = []
+
+        def evaluate(seed: int) -> Dict[str, Any]:
+            row = self.run_test(test_id, chaff_prob, rewiring_interval, rewiring_prob, seed=seed)
+            samples.append(row)
+            return row
+
+        rep = replicate(
+            evaluate,
+            metrics=METRIC_KEYS + MEMORY_KEYS,
+            target_metrics=TARGET_METRICS,
+            min_seeds=self.min_seeds,
+            max_seeds=self.seeds,
+            ci_width=self.ci_width,
+            workers=self.workers,
+        )
+        row = {k: samples[0][k] for k in ("test_id", "chaff", "rewiring", "chaff_prob", "rewiring_interval", "rewiring_prob")}
+        for key in METRIC_KEYS + tuple(k for k in MEMORY_KEYS if k in rep["stats"]):
+            stat = rep["stats"].get(key)
+            row[key] = round(stat.mean, 3) if stat else 0
+            row[f"{key}_ci95"] = round(stat.half_width(), 3) if stat and stat.n > 1 else 0
+        row["seeds"] = len(rep["seeds"])
+        row["failed_seeds"] = len(rep["failed"])
+        row["converged"] = int(rep["converged"])
+        failed = f", упало: {row['failed_seeds']}" if rep["failed"] else ""
+        print(f"   📐 {test_id}: {row['seeds']} зёрен{failed}, интервалы {'сошлись' if rep['converged'] else 'не сошлись'}")
+        return row
+
     def run_all_tests(self) -> List[Dict[str, Any]]:
         """Запускает все тестовые конфигурации."""
         # baseline = рекомендуемая конфигурация (no_chaff — оптимально по нагрузке)
@@ -136,7 +212,10 @@ class ABTester:
             configs = configs[: self._max_tests]
         results = []
         for test_id, chaff, rew_int, rew_prob in configs:
-            row = self.run_test(test_id, chaff, rew_int, rew_prob)
+            if self.seeds > 1:
+                row = self.run_replicated(test_id, chaff, rew_int, rew_prob)
+            else:
+                row = self.run_test(test_id, chaff, rew_int, rew_prob)
             results.append(row)
             self._save_csv(results)
         self._print_summary(results)
@@ -161,18 +240,22 @@ class ABTester:
         for r in results:
             print(
                 f"{r['test_id']:<18} {r['chaff']:<6} {r['rewiring']:<9} "
-                f"{r.get('detection_time', 0):<10} {r.get('alert_coverage', 0):<8} "
-                f"{r.get('peak_load', 0):<10} {r.get('evil_reputation_after', 0):<10}"
+                f"{_fmt(r, 'detection_time'):<10} {_fmt(r, 'alert_coverage'):<8} "
+                f"{_fmt(r, 'peak_load'):<10} {_fmt(r, 'evil_reputation_after'):<10}"
             )
         print("=" * 85)
         print(f"\n✅ Результаты: {os.path.join(self.output_dir, 'results.csv')}")
         print(f"   Графики: python3 plot_results.py \"{os.path.join(self.output_dir, 'results.csv')}\"")
 
 
+def _fmt(row: Dict[str, Any], key: str) -> str:
+    """Значение метрики; для повторённых прогонов — среднее±полуширина интервала."""
+    ci = row.get(f"{key}_ci95")
+    return f"{row.get(key, 0)}" if ci is None else f"{row.get(key, 0):g}±{ci:g}"
+
+
 def _fill_defaults(metrics: Dict[str, Any]) -> None:
-    for key in ("detection_time", "alert_coverage", "peak_load", "evil_reputation_before",
-                "evil_reputation_after", "successful_attack", "false_positives",
-                "network_diameter", "avg_path_length"):
+    for key in METRIC_KEYS:
         if key not in metrics:
             metrics[key] = 0 if key != "avg_path_length" else -1.0
 
@@ -186,17 +269,38 @@ def main() -> None:
                         help="small=50/80, default=200/500, large=300/800")
     parser.add_argument("--output-dir", type=str, default=None, help="Директория для results.csv и logs/")
     parser.add_argument("--max-tests", type=int, default=None, help="Макс. число тестов (для отладки)")
+    parser.add_argument("--seeds", type=int, default=1, help="Макс. зёрен на конфигурацию (1 — один прогон)")
+    parser.add_argument("--min-seeds", type=int, default=3, help="Мин. зёрен до проверки интервалов")
+    parser.add_argument("--ci-width", type=float, default=0.1,
+                        help="Целевая ширина 95%% интервала в долях |среднего|")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Параллельных прогонов")
+    parser.add_argument("--memory", type=int, default=None, metavar="K",
+                        help="Учёт памяти каждые K шагов: колонки mem_* в results.csv")
+    parser.add_argument("--share-topology", action="store_true",
+                        help="Одна сеть в общей памяти для всех прогонов (топология, ключи, начальное состояние)")
+    parser.add_argument("--topology-seed", type=int, default=0, help="Зерно общей топологии")
     args = parser.parse_args()
     nodes, steps = args.nodes, args.steps
     if getattr(args, "scale", None) == "small":
         nodes, steps = 50, 80
     elif getattr(args, "scale", None) == "large":
         nodes, steps = 300, 800
-    tester = ABTester(nodes=nodes, steps=steps, quantum=args.quantum, output_dir=args.output_dir)
+    topology = SharedTopology.publish(nodes, num_evil=1, seed=args.topology_seed) if args.share_topology else None
+    tester = ABTester(
+        nodes=nodes, steps=steps, quantum=args.quantum, output_dir=args.output_dir,
+        seeds=args.seeds, min_seeds=args.min_seeds, ci_width=args.ci_width, workers=args.workers,
+        shared_topology=topology.name if topology else None, memory_interval=args.memory,
+    )
     tester._max_tests = getattr(args, "max_tests", None)
     print(f"Узлов: {tester.nodes}, шагов: {tester.steps}, quantum: {tester.quantum}")
     print(f"Результаты: {tester.output_dir}")
-    tester.run_all_tests()
+    if topology:
+        print(f"Общая топология: {topology.name} ({topology.nbytes / 1e6:.1f} МБ)")
+    try:
+        tester.run_all_tests()
+    finally:
+        if topology:
+            topology.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Адаптивный поиск границы успеха атаки (вместо полной сетки run_batch.py).
+Сохраняет все прогоны в results/search_<date>/search_points.csv и оценку границы в boundary.json.
+Запуск:
+  python3 run_search.py --strategy bisect --axis quantum --tol 0.05
+  python3 run_search.py --strategy halving --axes chaff_prob rewiring_prob --levels 4
+  python3 run_search.py --strategy surrogate --axes quantum chaff_prob --budget 30
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_ROOT)
+
+from simulation.ab import run_ab
+from simulation.search import SEARCH_AXES, BoundarySearch
+
+
+def run_subprocess(config: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """Прогон через main.py --batch (как в run_batch.py): изоляция процесса на каждую точку."""
+    cmd = [
+        sys.executable, os.path.join(PROJECT_ROOT, "main.py"),
+        "--scenario", "3",
+        "--nodes", str(config.get("nodes", 100)),
+        "--steps", str(config.get("steps", 150)),
+        "--quantum", str(config.get("quantum", 0.9)),
+        "--seed", str(seed),
+        "--batch",
+    ]
+    if config.get("chaff_prob"):
+        cmd.extend(["--chaff-prob", str(config["chaff_prob"])])
+    else:
+        cmd.append("--no-chaff")
+    if config.get("rewiring_interval"):
+        cmd.extend(["--rewiring-interval", str(config["rewiring_interval"])])
+        if config.get("rewiring_prob") is not None:
+            cmd.extend(["--rewiring-prob", str(config["rewiring_prob"])])
+    else:
+        cmd.append("--no-rewiring")
+    if config.get("sophisticated"):
+        cmd.append("--sophisticated")
+    if config.get("vectorized"):
+        cmd.append("--vectorized")
+    output = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8").stdout
+    match = re.search(r"AB_RESULT=(.+)", output)
+    return json.loads(match.group(1)) if match else {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Адаптивный поиск границы успеха атаки сети Елена")
+    parser.add_argument("--strategy", choices=("bisect", "halving", "surrogate"), default="bisect")
+    parser.add_argument("--axis", choices=tuple(SEARCH_AXES), default="quantum", help="Ось бисекции")
+    parser.add_argument("--lo", type=float, default=None, help="Начало диапазона оси (по умолч. из SEARCH_AXES)")
+    parser.add_argument("--hi", type=float, default=None, help="Конец диапазона оси")
+    parser.add_argument("--tol", type=float, default=0.05, help="Точность бисекции")
+    parser.add_argument("--axes", nargs="+", choices=tuple(SEARCH_AXES), default=["quantum", "chaff_prob"],
+                        help="Оси для halving/surrogate")
+    parser.add_argument("--levels", type=int, default=4, help="Уровней на ось в списке конфигураций halving")
+    parser.add_argument("--budget", type=int, default=30, help="Точек суррогатного поиска")
+    parser.add_argument("--metric", type=str, default="successful_attack", help="Метрика AB_RESULT")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Порог успеха атаки по метрике")
+    parser.add_argument("--below", action="store_true", help="Успех — метрика не выше порога")
+    parser.add_argument("--replicates", type=int, default=3, help="Прогонов (зёрен) на точку")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=150)
+    parser.add_argument("--quantum", type=float, default=0.9)
+    parser.add_argument("--chaff-prob", type=float, default=0.0)
+    parser.add_argument("--rewiring-interval", type=int, default=100)
+    parser.add_argument("--rewiring-prob", type=float, default=0.1)
+    parser.add_argument("--sophisticated", action="store_true")
+    parser.add_argument("--vectorized", action="store_true", help="Пакетное распространение в прогонах")
+    parser.add_argument("--subprocess", action="store_true", help="Каждый прогон — отдельный процесс main.py")
+    parser.add_argument("--output-dir", type=str, default=None)
+    args = parser.parse_args()
+
+    base = {
+        "nodes": args.nodes, "steps": args.steps, "quantum": args.quantum, "chaff_prob": args.chaff_prob,
+        "rewiring_interval": args.rewiring_interval, "rewiring_prob": args.rewiring_prob,
+        "sophisticated": args.sophisticated, "vectorized": args.vectorized,
+    }
+    search = BoundarySearch(
+        run_subprocess if args.subprocess else run_ab, base_config=base, metric=args.metric,
+        threshold=args.threshold, above=not args.below, replicates=args.replicates,
+    )
+    if args.strategy == "bisect":
+        lo = args.lo if args.lo is not None else SEARCH_AXES[args.axis][0]
+        hi = args.hi if args.hi is not None else SEARCH_AXES[args.axis][1]
+        summary = search.bisect(args.axis, lo, hi, args.tol)
+    elif args.strategy == "halving":
+        levels = [np.linspace(*SEARCH_AXES[a], args.levels) for a in args.axes]
+        candidates = [dict(zip(args.axes, values)) for values in itertools.product(*levels)]
+        summary = search.halving(candidates)
+    else:
+        summary = search.surrogate({a: SEARCH_AXES[a] for a in args.axes}, budget=args.budget)
+
+    output_dir = args.output_dir or os.path.join(
+        PROJECT_ROOT, "results", f"search_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    points_path, boundary_path = search.save(output_dir, summary)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    print(f"Прогонов: {summary['runs']} (сетка той же точности: {summary['grid_runs']})")
+    print(f"Точки: {points_path}")
+    print(f"Граница: {boundary_path}")
+
+
+if __name__ == "__main__":
+    main()
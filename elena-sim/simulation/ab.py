@@ -0,0 +1,68 @@
+"""
+Результат A/B-прогона: строка AB_RESULT для run_batch.py и запуск конфигурации в процессе
+(для адаптивного поиска границ без запуска main.py на каждую точку).
+"""
+
+from typing import Any, Dict, Optional
+
+from .scenarios import Scenario3_QuantumDoubleSpend
+
+
+def ab_payload(result: dict, runner, summary: dict, detection_step: Optional[int], nodes_alert: int) -> Dict[str, Any]:
+    """Метрики одного прогона в формате AB_RESULT (общий для main.py --batch и run_ab)."""
+    total = len(runner.graph.nodes)
+    alert_pct = round(100 * nodes_alert / total, 1) if total else 0
+    det_time = summary.get("avg_detection_time_steps") or (0 if not detection_step else 3.0)
+    payload = {
+        "detection_time": round(float(det_time), 1),
+        "alert_coverage": alert_pct,
+        "peak_load": int(summary.get("peak_throughput", 0)),
+        "evil_reputation_before": result.get("evil_reputation_before", 0),
+        "evil_reputation_after": result.get("evil_reputation_after", 0),
+        "successful_attack": int(bool(summary.get("successful_attacks", 0))),
+        "false_positives": int(summary.get("false_positives", 0)),
+        "false_positive_rate": round(float(summary.get("false_positive_rate", 0.0)), 4),
+        "missed_conflicts": int(summary.get("missed_conflicts", 0)),
+        "network_diameter": int(summary.get("network_diameter", -1)) if summary.get("network_diameter") is not None else -1,
+        "avg_path_length": round(float(summary.get("avg_path_length", -1)), 2) if summary.get("avg_path_length") is not None else -1.0,
+    }
+    memory = summary.get("memory_stats")
+    if memory:
+        payload["mem_per_node_bytes"] = round(memory["per_node_bytes"], 1)
+        payload["mem_per_tx_bytes"] = round(memory["per_tx_bytes"], 1)
+        payload["mem_estimated_mb"] = round(memory["total_estimated"] / 1e6, 2)
+        if "traced_peak" in memory:
+            payload["mem_traced_peak_mb"] = round(memory["traced_peak"] / 1e6, 2)
+    actor_stats = summary.get("actor_stats")
+    if actor_stats:
+        payload["messages_per_sec"] = round(actor_stats["messages_per_sec"], 1)
+        payload["latency_p99_ms"] = round(actor_stats["latency_p99_ms"], 3)
+    return payload
+
+
+def run_ab(config: Dict[str, Any], seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Прогон сценария 3 с параметрами config (nodes, steps, quantum, chaff_prob, rewiring_interval,
+    rewiring_prob, sophisticated, evil) в текущем процессе. Возвращает метрики AB_RESULT.
+    """
+    runner_kwargs = {
+        "chaff_prob": config.get("chaff_prob") or 0,
+        "rewiring_interval": int(config.get("rewiring_interval") or 0),
+        "seed": seed,
+    }
+    if config.get("rewiring_prob") is not None:
+        runner_kwargs["rewiring_prob"] = config["rewiring_prob"]
+    if config.get("vectorized"):
+        runner_kwargs["vectorized_propagation"] = True
+    result = Scenario3_QuantumDoubleSpend().run(
+        num_nodes=config.get("nodes", 100),
+        quantum_advantage=config.get("quantum", 0.9),
+        steps=config.get("steps", 150),
+        sophisticated=config.get("sophisticated", False),
+        num_evil=config.get("evil", 1),
+        **runner_kwargs,
+    )
+    runner = result["runner"]
+    runner.close()  # пул проверки подписей и приёмники не переживают точку перебора
+    summary = runner.metrics.get_summary()
+    return ab_payload(result, runner, summary, result.get("detection_step"), result.get("nodes_with_alert", 0))
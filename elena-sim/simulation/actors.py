@@ -0,0 +1,373 @@
+"""
+Режим акторов на asyncio: каждый Node — задача с входящей очередью.
+Сообщения кодируются (core.wire; JSON — для сравнения) и идут через транспорт — в памяти процесса (InProcessTransport)
+или через локальный сокет 127.0.0.1 / Unix (LoopbackTransport). Синхронный код
+(сценарии, SimulationRunner.step) работает как раньше: вызов распространения из него
+дожидается, пока сеть затихнет. Замеряются сообщения/с и хвостовая задержка доставки.
+"""
+
+import asyncio
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from core import Node, NetworkGraph, Transaction, Alert, wire
+
+_FRAME_TIME = struct.Struct("<d")  # время отправки (perf_counter) в начале кадра
+_LOOPBACK_HEADER = struct.Struct("<IH")  # длина кадра, длина id получателя
+
+
+class JsonCodec:
+    """Проводное кодирование сообщений в JSON (дайджесты bytes — как {"x": hex})."""
+
+    name = "json"
+
+    @staticmethod
+    def _digest(value):
+        return {"x": value.hex()} if isinstance(value, bytes) else value
+
+    @staticmethod
+    def _undigest(value):
+        return bytes.fromhex(value["x"]) if isinstance(value, dict) else value
+
+    def encode(self, kind: str, payload) -> bytes:
+        d = self._digest
+        if kind == "tx":
+            body = {
+                "id": d(payload.id), "from": payload.from_id, "to": payload.to_id,
+                "amount": payload.amount, "nonce": payload.nonce, "anchor": d(payload.anchor),
+                "parents": [d(p) for p in payload.parents], "ts": payload.timestamp,
+                "sig": payload.signature.hex(), "chaff": payload.is_chaff,
+            }
+        else:
+            body = {
+                "id": payload.id, "tx1": d(payload.conflicting_tx1), "tx2": d(payload.conflicting_tx2),
+                "anchor": d(payload.anchor), "by": payload.discovered_by, "hops": payload.propagation_count,
+            }
+        return json.dumps({"k": kind, "b": body}, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data) -> Tuple[str, object]:
+        msg = json.loads(bytes(data))
+        b, u = msg["b"], self._undigest
+        if msg["k"] == "tx":
+            return "tx", Transaction(
+                id=u(b["id"]), from_id=b["from"], to_id=b["to"], amount=b["amount"], nonce=b["nonce"],
+                anchor=u(b["anchor"]), parents=[u(p) for p in b["parents"]], timestamp=b["ts"],
+                signature=bytes.fromhex(b["sig"]), is_chaff=b["chaff"],
+            )
+        return "alert", Alert(
+            id=b["id"], conflicting_tx1=u(b["tx1"]), conflicting_tx2=u(b["tx2"]),
+            anchor=u(b["anchor"]), discovered_by=b["by"], propagation_count=b["hops"],
+        )
+
+
+class WireCodec:
+    """Проводное кодирование core.wire: бинарный заголовок и дайджесты, ленивое чтение из memoryview."""
+
+    name = "wire"
+
+    def encode(self, kind: str, payload) -> bytes:
+        return wire.encode(payload)
+
+    def decode(self, data) -> Tuple[str, object]:
+        message = wire.decode(data)
+        return ("tx" if isinstance(message, Transaction) else "alert"), message
+
+
+CODECS = {"wire": WireCodec, "json": JsonCodec}
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с логарифмическими корзинами (шаг ×1.1 от 1 мкс): O(1) на запись."""
+
+    _BASE = 1e-6
+    _LOG_STEP = math.log(1.1)
+
+    def __init__(self, buckets: int = 220):
+        self.counts = [0] * buckets
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        idx = 0 if seconds <= self._BASE else int(math.log(seconds / self._BASE) / self._LOG_STEP) + 1
+        self.counts[min(idx, len(self.counts) - 1)] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль q (секунды)."""
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        acc = 0
+        for idx, count in enumerate(self.counts):
+            acc += count
+            if acc >= target:
+                return self._BASE * math.exp(idx * self._LOG_STEP)
+        return self._BASE * math.exp((len(self.counts) - 1) * self._LOG_STEP)
+
+
+class InProcessTransport:
+    """Доставка закодированных кадров прямо во входящие очереди (без сокетов)."""
+
+    name = "inprocess"
+
+    def __init__(self, graph: "AsyncNetworkGraph"):
+        self.graph = graph
+
+    async def start(self) -> None:
+        pass
+
+    def send(self, dst_id: str, frame: bytes) -> None:
+        self.graph.inboxes[dst_id].put_nowait(frame)
+
+    async def close(self) -> None:
+        pass
+
+
+class LoopbackTransport:
+    """Кадры идут через одно соединение по 127.0.0.1 (tcp) или Unix-сокету (unix) и разбираются сервером."""
+
+    def __init__(self, graph: "AsyncNetworkGraph", family: str = "tcp"):
+        self.graph = graph
+        self.name = family
+        self._dir: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._serving: set = set()
+
+    async def start(self) -> None:
+        if self.name == "unix":
+            self._dir = tempfile.mkdtemp(prefix="elena-actors-")
+            path = os.path.join(self._dir, "bus.sock")
+            self._server = await asyncio.start_unix_server(self._serve, path=path)
+            _, self._writer = await asyncio.open_unix_connection(path)
+        else:
+            self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+            port = self._server.sockets[0].getsockname()[1]
+            _, self._writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        inboxes = self.graph.inboxes
+        self._serving.add(asyncio.current_task())
+        try:
+            while True:
+                header = await reader.readexactly(_LOOPBACK_HEADER.size)
+                frame_len, dst_len = _LOOPBACK_HEADER.unpack(header)
+                dst_id = (await reader.readexactly(dst_len)).decode("utf-8")
+                frame = await reader.readexactly(frame_len)
+                inboxes[dst_id].put_nowait(frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self._serving.discard(asyncio.current_task())
+
+    def send(self, dst_id: str, frame: bytes) -> None:
+        dst = dst_id.encode("utf-8")
+        self._writer.write(_LOOPBACK_HEADER.pack(len(frame), len(dst)) + dst + frame)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        if self._serving:
+            await asyncio.gather(*self._serving, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+
+ACTOR_TRANSPORTS = ("inprocess", "tcp", "unix")
+
+
+class AsyncNetworkGraph(NetworkGraph):
+    """
+    Граф, в котором распространение — это сообщения между акторами-узлами.
+    Узел пересылает транзакцию всем пирам один раз, когда впервые её принял;
+    алерты — как в синхронном графе (штраф отправителю на каждом узле-ретрансляторе).
+    """
+
+    def __init__(self, transport: str = "inprocess", codec: str = "wire"):
+        super().__init__()
+        if transport not in ACTOR_TRANSPORTS:
+            raise ValueError(f"Неизвестный транспорт акторов: {transport} (доступны: {', '.join(ACTOR_TRANSPORTS)})")
+        self.loop = asyncio.new_event_loop()
+        self.codec = CODECS[codec]()
+        self.transport = InProcessTransport(self) if transport == "inprocess" else LoopbackTransport(self, transport)
+        self.inboxes: Dict[str, asyncio.Queue] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._started = False
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._deferred = False
+        self._error: Optional[BaseException] = None
+        # Статистика акторов
+        self.messages_processed = 0
+        self.wire_bytes = 0
+        self.busy_seconds = 0.0
+        self.latency = LatencyHistogram()
+        # Остановка акторов при close() или при выходе интерпретатора
+        self._finalizer = weakref.finalize(self, _shutdown, self.loop, self._tasks, self.transport)
+
+    def add_node(self, node: Node) -> None:
+        super().add_node(node)
+        self.inboxes[node.id] = asyncio.Queue()
+
+    # --- отправка ---
+
+    def _send(self, dst: Node, kind: str, payload) -> None:
+        if not self._started:
+            self.loop.run_until_complete(self._ensure_started())
+        frame = _FRAME_TIME.pack(time.perf_counter()) + self.codec.encode(kind, payload)
+        self._in_flight += 1
+        self.messages_delivered += 1
+        self.bytes_delivered += len(frame)
+        self.wire_bytes += len(frame)
+        self.transport.send(dst.id, frame)
+
+    def _in_actor(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _settle(self) -> None:
+        """Из синхронного кода: дождаться, пока все сообщения будут обработаны."""
+        if not self._in_actor() and not self._deferred:
+            self.run_until_idle()
+
+    def propagate_transaction(self, tx: Transaction, start_node: Node, first_hop_peers=None) -> None:
+        if tx.id not in self.transactions:
+            self._register_transaction(tx)
+        self.transactions[tx.id] = tx
+        initial = first_hop_peers if first_hop_peers is not None else start_node.peers
+        for peer in initial:
+            if peer.id != start_node.id:
+                self._send(peer, "tx", tx)
+        self._settle()
+
+    def propagate_alert(self, alert: Alert, start_node: Node) -> None:
+        if self.recorder is not None and alert.id not in self.alerts:
+            self.recorder.alert_raised(self.current_step, alert)
+        self.alerts[alert.id] = alert
+        self._penalize_sender(alert)
+        forwarded = Alert(
+            id=alert.id,
+            conflicting_tx1=alert.conflicting_tx1,
+            conflicting_tx2=alert.conflicting_tx2,
+            anchor=alert.anchor,
+            discovered_by=alert.discovered_by,
+            propagation_count=alert.propagation_count + 1,
+        )
+        for peer in start_node.peers:
+            self._send(peer, "alert", forwarded)
+        self._settle()
+
+    @contextmanager
+    def batch(self):
+        """Отправки внутри блока уходят в сеть одновременно; ожидание затихания — на выходе."""
+        if self._deferred or self._in_actor():
+            yield
+            return
+        self._deferred = True
+        try:
+            yield
+        finally:
+            self._deferred = False
+        self.run_until_idle()
+
+    # --- акторы ---
+
+    async def _actor(self, node: Node) -> None:
+        inbox = self.inboxes[node.id]
+        codec = self.codec
+        while True:
+            frame = await inbox.get()
+            try:
+                view = memoryview(frame)
+                (sent_at,) = _FRAME_TIME.unpack_from(view)
+                kind, payload = codec.decode(view[_FRAME_TIME.size :])
+                self.latency.record(time.perf_counter() - sent_at)
+                recorder = self.recorder
+                if kind == "tx":
+                    # Узел получает tx от каждого пира; принятой доставка считается один раз, как в графе
+                    fresh = payload.id not in node.local_graph
+                    accepted = node.receive_transaction(payload)
+                    if accepted and fresh:
+                        self.deliveries_accepted += 1
+                    if recorder is not None:
+                        recorder.delivery(self.current_step, node.id, payload.id, accepted)
+                else:
+                    node.receive_alert(payload)
+                    if recorder is not None:
+                        recorder.alert_delivery(self.current_step, node.id, payload)
+            except Exception as exc:
+                # Ошибка актора прерывает ожидание затихания и пробрасывается в синхронный код
+                self._error = exc
+                self._idle.set()
+            finally:
+                self.messages_processed += 1
+                self._in_flight -= 1
+                if self._in_flight == 0:
+                    self._idle.set()
+
+    async def _ensure_started(self) -> None:
+        if not self._started:
+            self._idle = asyncio.Event()
+            await self.transport.start()
+            self._started = True
+        for node_id, node in self.nodes.items():
+            if node_id not in self._tasks:
+                self._tasks[node_id] = self.loop.create_task(self._actor(node))
+
+    async def drain(self) -> None:
+        """Ждёт, пока в сети не останется необработанных сообщений."""
+        await self._ensure_started()
+        while self._in_flight > 0 and self._error is None:
+            self._idle.clear()
+            await self._idle.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def run_until_idle(self) -> None:
+        start = time.perf_counter()
+        self.loop.run_until_complete(self.drain())
+        self.busy_seconds += time.perf_counter() - start
+
+    def actor_stats(self) -> Dict[str, float]:
+        """Сообщений/с (по времени работы цикла событий) и квантили задержки доставки (мс)."""
+        return {
+            "actors": len(self.nodes),
+            "transport": self.transport.name,
+            "codec": self.codec.name,
+            "messages": self.messages_processed,
+            "wire_bytes": self.wire_bytes,
+            "messages_per_sec": self.messages_processed / self.busy_seconds if self.busy_seconds else 0.0,
+            "latency_p50_ms": self.latency.quantile(0.50) * 1000,
+            "latency_p95_ms": self.latency.quantile(0.95) * 1000,
+            "latency_p99_ms": self.latency.quantile(0.99) * 1000,
+        }
+
+    def close(self) -> None:
+        """Останавливает акторов и транспорт, закрывает цикл событий."""
+        self._finalizer()
+
+
+def _shutdown(loop: asyncio.AbstractEventLoop, tasks: Dict[str, asyncio.Task], transport) -> None:
+    if loop.is_closed():
+        return
+    for task in tasks.values():
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks.values(), return_exceptions=True))
+    loop.run_until_complete(transport.close())
+    loop.close()
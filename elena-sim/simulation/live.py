@@ -0,0 +1,297 @@
+"""
+Живая трансляция прогона в дашборд. Runner в конце каждого шага вызывает LiveStream.end_step
+(хук, как recorder/oracle у графа): поток считает компактную дельту — изменившиеся репутации,
+добавленные/удалённые рёбра (только если топология менялась), новые алерты — и сливает её
+в очередь каждого подписчика. Медленный клиент получает не все кадры, а одну слитую дельту
+(последняя репутация узла побеждает, ребро «добавлено, затем удалено» взаимно уничтожается),
+поэтому цикл симуляции никогда не ждёт сеть. Пауза/продолжение/один шаг — через end_step.
+
+Бинарный кадр дельты (little-endian, смещения массивов выровнены на 4 байта):
+заголовок <B3xIIIII> — тип (1), шаг, число репутаций, добавленных рёбер, удалённых рёбер,
+длина JSON алертов; затем u32 индексы узлов, f32 репутации, u32 пары рёбер (добавленные,
+удалённые) и JSON-список алертов. Индексы — позиции в списке nodes снимка.
+"""
+
+import json
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from core.topology import edge_keys, edges_to_csr
+
+FRAME_DELTA = 1
+_DELTA_HEADER = struct.Struct("<B3xIIIII")
+MAX_PENDING_ALERTS = 256  # алертов в слитой дельте медленного клиента (старые отбрасываются)
+
+
+def encode_delta(step: int, reps: Dict[int, float], added: Set[int], removed: Set[int], alerts: List[dict], n: int) -> bytes:
+    rep_idx = np.fromiter(reps.keys(), dtype=np.uint32, count=len(reps))
+    rep_val = np.fromiter(reps.values(), dtype=np.float32, count=len(reps))
+    add = np.fromiter(added, dtype=np.int64, count=len(added))
+    rem = np.fromiter(removed, dtype=np.int64, count=len(removed))
+    alerts_json = json.dumps(alerts, ensure_ascii=False).encode("utf-8") if alerts else b""
+    pairs = [np.stack([keys // n, keys % n], axis=1).astype(np.uint32) for keys in (add, rem)]
+    return b"".join([
+        _DELTA_HEADER.pack(FRAME_DELTA, step, len(reps), len(add), len(rem), len(alerts_json)),
+        rep_idx.tobytes(), rep_val.tobytes(), pairs[0].tobytes(), pairs[1].tobytes(), alerts_json,
+    ])
+
+
+def decode_delta(frame: bytes) -> Dict[str, Any]:
+    """Обратное encode_delta (для тестов и клиентов на Python)."""
+    kind, step, n_rep, n_add, n_rem, n_alerts = _DELTA_HEADER.unpack_from(frame)
+    if kind != FRAME_DELTA:
+        raise ValueError(f"Неизвестный тип кадра: {kind}")
+    offset = _DELTA_HEADER.size
+    idx = np.frombuffer(frame, dtype=np.uint32, count=n_rep, offset=offset)
+    offset += 4 * n_rep
+    val = np.frombuffer(frame, dtype=np.float32, count=n_rep, offset=offset)
+    offset += 4 * n_rep
+    added = np.frombuffer(frame, dtype=np.uint32, count=2 * n_add, offset=offset).reshape(-1, 2)
+    offset += 8 * n_add
+    removed = np.frombuffer(frame, dtype=np.uint32, count=2 * n_rem, offset=offset).reshape(-1, 2)
+    offset += 8 * n_rem
+    alerts = json.loads(frame[offset:offset + n_alerts]) if n_alerts else []
+    return {
+        "step": step,
+        "reputations": dict(zip(idx.tolist(), val.tolist())),
+        "added": [tuple(e) for e in added.tolist()],
+        "removed": [tuple(e) for e in removed.tolist()],
+        "alerts": alerts,
+    }
+
+
+class Subscriber:
+    """Очередь клиента: одна слитая дельта вместо очереди кадров."""
+
+    def __init__(self, stream: "LiveStream", notify: Callable[[], None]):
+        self.stream = stream
+        self.notify = notify
+        self.snapshot: Dict[str, Any] = {}
+        self.frames_coalesced = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.step: Optional[int] = None
+        self.reps: Dict[int, float] = {}
+        self.added: Set[int] = set()
+        self.removed: Set[int] = set()
+        self.alerts: List[dict] = []
+        self.resync = False
+        self._merged = 0
+
+    def _merge(self, step: int, reps: Dict[int, float], added, removed, alerts: List[dict]) -> None:
+        self.step = step
+        self.reps.update(reps)
+        for key in added:
+            if key in self.removed:
+                self.removed.discard(key)
+            else:
+                self.added.add(key)
+        for key in removed:
+            if key in self.added:
+                self.added.discard(key)
+            else:
+                self.removed.add(key)
+        self.alerts.extend(alerts)
+        del self.alerts[:-MAX_PENDING_ALERTS]
+        self._merged += 1
+
+    def take(self) -> Optional[Any]:
+        """
+        Следующее сообщение клиенту: bytes (дельта), dict (новый снимок после смены состава узлов)
+        или None, если ничего не накопилось.
+        """
+        stream = self.stream
+        with stream._lock:
+            if self.resync:
+                self._clear()
+                self.snapshot = stream._snapshot()
+                return dict(self.snapshot, type="snapshot")
+            if self.step is None:
+                return None
+            step, reps, added, removed, alerts = self.step, self.reps, self.added, self.removed, self.alerts
+            self.frames_coalesced += self._merged - 1
+            self._clear()
+            n = len(stream._ids)
+        return encode_delta(step, reps, added, removed, alerts, n)
+
+    def close(self) -> None:
+        self.stream.unsubscribe(self)
+
+
+class LiveStream:
+    """Хук runner'а: дельты шагов для подписчиков и управление ходом прогона."""
+
+    def __init__(self, min_delta: float = 1e-4, paused: bool = False):
+        self.min_delta = min_delta
+        self.graph = None
+        self.step = -1
+        self.steps_published = 0
+        self.subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._nodes: List[Any] = []
+        self._evil: List[bool] = []
+        self._reputation = np.empty(0)
+        self._edges = np.empty(0, dtype=np.int64)
+        self._topology_version = None
+        self._alerts_seen = 0
+        # Управление: пауза, разрешённые одиночные шаги, остановка
+        self._control = threading.Condition()
+        self.paused = paused
+        self._credits = 0
+        self.stopped = False
+
+    # --- сторона симуляции ---
+
+    def _attach(self, graph) -> None:
+        node_ids, indptr, indices = graph.csr()
+        with self._lock:
+            self.graph = graph
+            self._ids = list(node_ids)
+            self._nodes = [graph.nodes[nid] for nid in self._ids]
+            self._evil = [bool(getattr(node, "is_evil", False)) for node in self._nodes]
+            self._reputation = np.fromiter((node.reputation for node in self._nodes), dtype=float, count=len(self._nodes))
+            self._edges = edge_keys(indptr, indices, len(self._ids))
+            self._topology_version = graph._topology_version
+            self._alerts_seen = len(graph.alerts)
+            for sub in self.subscribers:
+                sub.resync = True
+        self._notify_all()
+
+    def end_step(self, graph, step: int) -> None:
+        """Дельта шага для подписчиков; затем ожидание, если прогон на паузе."""
+        if graph is not self.graph or self._roster_changed(graph):
+            self._attach(graph)
+        else:
+            self._publish(graph, step)
+        self.step = step
+        self.steps_published += 1
+        self._wait_gate()
+
+    def _roster_changed(self, graph) -> bool:
+        """Состав узлов другой (вход и уход в одном шаге не меняют их числа): сверка после изменения топологии."""
+        if len(graph.nodes) != len(self._nodes):
+            return True
+        if graph._topology_version == self._topology_version:
+            return False
+        return any(a is not b for a, b in zip(graph.nodes.values(), self._nodes))
+
+    def _publish(self, graph, step: int) -> None:
+        n = len(self._nodes)
+        reputation = np.fromiter((node.reputation for node in self._nodes), dtype=float, count=n)
+        changed = np.flatnonzero(np.abs(reputation - self._reputation) > self.min_delta)
+        reputation_prev = self._reputation
+        if len(changed):
+            reputation_prev = reputation_prev.copy()
+            reputation_prev[changed] = reputation[changed]
+        added = removed = np.empty(0, dtype=np.int64)
+        edges = self._edges
+        if graph._topology_version != self._topology_version:
+            _, indptr, indices = graph.csr()
+            edges = edge_keys(indptr, indices, n)
+            added = edges[~np.isin(edges, self._edges, assume_unique=True)]
+            removed = self._edges[~np.isin(self._edges, edges, assume_unique=True)]
+        alerts: List[dict] = []
+        if len(graph.alerts) != self._alerts_seen:
+            for alert in list(graph.alerts.values())[self._alerts_seen:]:
+                alerts.append({
+                    "id": alert.id, "step": step, "discovered_by": alert.discovered_by,
+                    "tx1": alert.conflicting_tx1, "tx2": alert.conflicting_tx2,
+                })
+        reps = dict(zip(changed.tolist(), reputation[changed].tolist())) if len(changed) else {}
+        added_keys, removed_keys = added.tolist(), removed.tolist()
+        with self._lock:
+            # Опорное состояние хранит только опубликованные значения: дрейф меньше min_delta накапливается
+            self._reputation = reputation_prev
+            self._edges = edges
+            self._topology_version = graph._topology_version
+            self._alerts_seen = len(graph.alerts)
+            for sub in self.subscribers:
+                sub._merge(step, reps, added_keys, removed_keys, alerts)
+        self._notify_all()
+
+    def _notify_all(self) -> None:
+        for sub in list(self.subscribers):
+            try:
+                sub.notify()
+            except RuntimeError:
+                self.unsubscribe(sub)  # цикл событий клиента уже закрыт
+
+    def _wait_gate(self) -> None:
+        with self._control:
+            while self.paused and not self._credits and not self.stopped:
+                self._control.wait()
+            if self._credits:
+                self._credits -= 1
+
+    # --- сторона дашборда ---
+
+    def _snapshot(self) -> Dict[str, Any]:
+        n = len(self._ids)
+        return {
+            "step": self.step,
+            "paused": self.paused,
+            "nodes": [
+                {"id": nid, "reputation": round(float(rep), 4), "is_evil": evil}
+                for nid, rep, evil in zip(self._ids, self._reputation.tolist(), self._evil)
+            ],
+            "edges": [[int(k // n), int(k % n)] for k in self._edges.tolist()] if n else [],
+            "alerts_count": self._alerts_seen,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Опубликованное состояние (не живой граф): узлы, репутации, рёбра по индексам узлов."""
+        with self._lock:
+            return self._snapshot()
+
+    # Источник для укрупнённого графа (visualization/lod.py): опубликованное состояние
+
+    @property
+    def topology_version(self):
+        return self._topology_version
+
+    def topology(self):
+        with self._lock:
+            n = len(self._ids)
+            edges = np.stack([self._edges // n, self._edges % n], axis=1) if n else np.empty((0, 2), dtype=np.int64)
+            ids = list(self._ids)
+        return (ids, *edges_to_csr(n, edges))
+
+    def reputations(self) -> np.ndarray:
+        return self._reputation
+
+    def evil_mask(self) -> np.ndarray:
+        return np.array(self._evil, dtype=bool)
+
+    def subscribe(self, notify: Callable[[], None]) -> Subscriber:
+        """Новый подписчик; его snapshot и поток дельт согласованы (взяты под одной блокировкой)."""
+        sub = Subscriber(self, notify)
+        with self._lock:
+            sub.snapshot = self._snapshot()
+            self.subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+
+    def control(self, command: str) -> None:
+        """pause | resume | step (один шаг на паузе) | stop (снять паузу навсегда)."""
+        with self._control:
+            if command == "pause":
+                self.paused = True
+            elif command == "resume":
+                self.paused = False
+            elif command == "step":
+                self.paused = True
+                self._credits += 1
+            elif command == "stop":
+                self.stopped = True
+            else:
+                raise ValueError(f"Неизвестная команда: {command}")
+            self._control.notify_all()
@@ -0,0 +1,151 @@
+"""
+Учёт памяти по подсистемам: раз в K шагов оценивает байты хранилищ узлов, глобальных
+словарей транзакций и алертов, хранилища подписей core.crypto и историй MetricsCollector.
+Оценка структурная: размеры контейнеров (sys.getsizeof) плюс средний размер элемента
+по выборке, умноженный на число элементов, — O(узлов + выборка) вместо обхода всех объектов.
+Дополнительно tracemalloc даёт фактически выделенные байты по файлам исходников.
+"""
+
+import random
+import sys
+import tracemalloc
+from collections import deque
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core import crypto
+
+_FLOAT_SIZE = sys.getsizeof(0.0)
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def estimate_size(obj: Any, sample: int = 32, depth: int = 4, rng: Optional[random.Random] = None) -> int:
+    """
+    Оценка глубокого размера объекта (байт). Для контейнеров длиннее sample размер элементов
+    экстраполируется по случайной выборке; depth ограничивает глубину обхода.
+    """
+    rng = rng or random.Random(0)
+    if isinstance(obj, np.ndarray):
+        return max(sys.getsizeof(obj), obj.nbytes)
+    size = sys.getsizeof(obj)
+    if depth == 0 or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        items: List[Any] = list(obj.items()) if len(obj) <= sample else [
+            (k, obj[k]) for k in rng.sample(list(obj), sample)
+        ]
+        per_item = [estimate_size(k, sample, depth - 1, rng) + estimate_size(v, sample, depth - 1, rng) for k, v in items]
+        return size + (int(np.mean(per_item) * len(obj)) if per_item else 0)
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        seq = list(obj)
+        chosen = seq if len(seq) <= sample else rng.sample(seq, sample)
+        per_item = [estimate_size(x, sample, depth - 1, rng) for x in chosen]
+        return size + (int(np.mean(per_item) * len(seq)) if per_item else 0)
+    if is_dataclass(obj):
+        return size + sum(estimate_size(getattr(obj, f.name), sample, depth - 1, rng) for f in fields(obj)) + (
+            sys.getsizeof(obj.__dict__) if hasattr(obj, "__dict__") else 0
+        )
+    return size
+
+
+class MemoryAccountant:
+    """Периодические снимки памяти прогона; результат — metrics.memory_stats."""
+
+    def __init__(self, graph, metrics, interval: int = 50, sample: int = 64, trace: bool = True):
+        self.graph = graph
+        self.metrics = metrics
+        self.interval = interval
+        self.sample = sample
+        self.trace = trace
+        self._rng = random.Random(0)
+        self._started_tracing = False
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    # --- оценки по подсистемам ---
+
+    def _node_stores(self) -> Dict[str, int]:
+        """Хранилища узлов: local_graph (ссылки на транзакции графа) и known_balances (+ прочие списки)."""
+        local_graph = known_balances = other = 0
+        for node in self.graph.nodes.values():
+            local_graph += sys.getsizeof(node.local_graph)
+            known_balances += sys.getsizeof(node.known_balances) + _FLOAT_SIZE * len(node.known_balances)
+            other += (
+                sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.peers)
+                + sys.getsizeof(node.my_transactions) + sys.getsizeof(node.received_alerts)
+                + sys.getsizeof(node.pending_alerts) + sys.getsizeof(node.conflicting_tx_ids)
+            )
+        return {"node_local_graph": local_graph, "node_known_balances": known_balances, "node_objects": other}
+
+    def _sampled(self, container: dict) -> int:
+        """Словарь с объектами: контейнер + средний глубокий размер записи по выборке × число записей."""
+        if not container:
+            return sys.getsizeof(container)
+        keys = list(container) if len(container) <= self.sample else self._rng.sample(list(container), self.sample)
+        per_item = np.mean([estimate_size(k) + estimate_size(container[k]) for k in keys])
+        return sys.getsizeof(container) + int(per_item * len(container))
+
+    def subsystems(self) -> Dict[str, int]:
+        g = self.graph
+        sizes = self._node_stores()
+        sizes["graph_transactions"] = self._sampled(g.transactions) + sys.getsizeof(g.children) + sum(
+            sys.getsizeof(v) for v in g.children.values()
+        )
+        sizes["graph_alerts"] = self._sampled(g.alerts)
+        sizes["signature_store"] = self._sampled(crypto._signature_store)
+        m = self.metrics
+        sizes["metrics_histories"] = sum(
+            estimate_size(value, sample=self.sample, rng=self._rng)
+            for key, value in vars(m).items()
+            if isinstance(value, (list, dict, deque)) and key not in ("memory_stats", "step_stats")
+        )
+        return sizes
+
+    def _traced(self) -> Dict[str, Any]:
+        """Фактические выделения по файлам проекта (tracemalloc), текущие и пиковые байты."""
+        if not tracemalloc.is_tracing():
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        by_file: Dict[str, int] = {}
+        for stat in tracemalloc.take_snapshot().statistics("filename"):
+            path = Path(stat.traceback[0].filename)
+            try:
+                name = str(path.resolve().relative_to(_ROOT))
+            except ValueError:
+                name = "<прочее>"
+            by_file[name] = by_file.get(name, 0) + stat.size
+        top = dict(sorted(by_file.items(), key=lambda kv: -kv[1])[:10])
+        return {"traced_current": current, "traced_peak": peak, "traced_by_file": top}
+
+    # --- снимок ---
+
+    def sample_step(self, step: int) -> Dict[str, Any]:
+        sizes = self.subsystems()
+        num_nodes = max(1, len(self.graph.nodes))
+        num_tx = len(self.graph.transactions)
+        tx_bytes = sizes["graph_transactions"] + sizes["signature_store"]
+        record = dict(
+            step=step,
+            subsystems=sizes,
+            total_estimated=sum(sizes.values()),
+            per_node_bytes=(sizes["node_local_graph"] + sizes["node_known_balances"] + sizes["node_objects"]) / num_nodes,
+            # Глобальная запись транзакции (+ подпись) и её стоимость по всей сети (записи в local_graph узлов)
+            per_tx_bytes=tx_bytes / num_tx if num_tx else 0.0,
+            per_tx_network_bytes=(tx_bytes + sizes["node_local_graph"]) / num_tx if num_tx else 0.0,
+            transactions=num_tx,
+        )
+        record.update(self._traced())
+        history = self.metrics.memory_stats.get("history", [])
+        keys = ("step", "total_estimated", "per_node_bytes", "per_tx_bytes", "traced_current")
+        history.append({k: record[k] for k in keys if k in record})
+        self.metrics.memory_stats = dict(record, history=history, samples=len(history))
+        return record
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -3,39 +3,92 @@
 """
 
 import random
+from collections import deque
 from typing import List, Dict, Any, Optional
 
 import numpy as np
 
+from .streaming import MetricsSink, SeriesStats
+
 
 class MetricsCollector:
-    """Собирает и агрегирует метрики симуляции."""
+    """
+    Собирает и агрегирует метрики симуляции.
+    history — сколько последних шагов держать в пошаговых рядах (None — все); сводка
+    считается по онлайн-агрегатам step_stats, поэтому не зависит от history.
+    sink — приёмник, в который каждый шаг пишется по ходу прогона (simulation/streaming.py).
+    """
 
-    def __init__(self):
+    def __init__(self, history: Optional[int] = None, sink: Optional[MetricsSink] = None):
+        self.history = history
+        self.sink = sink
+        self._step_record: Dict[str, Any] = {}
+        self.step_stats: Dict[str, SeriesStats] = {
+            "throughput": SeriesStats(),
+            "bytes": SeriesStats(),
+            "avg_reputation": SeriesStats(),
+        }
+        self.reputation_snapshots = 0
+        # Живые метрики Prometheus (simulation/telemetry.py); задаётся runner'ом
+        self.telemetry = None
         self.detection_times: List[float] = []
         self.false_positives: int = 0
         self.successful_attacks: int = 0
         self.propagation_speed: List[float] = []
-        self.reputation_history: List[dict] = []
-        self.tx_throughput: List[int] = []
+        self.reputation_history = self._series()
+        self.tx_throughput = self._series()
         self.alerts_created: int = 0
         self.conflicts_detected: int = 0
         self.nodes_received_alert: List[int] = []
         # Расширенные метрики (METRICS_TO_COLLECT)
-        self.avg_reputation: List[float] = []
-        self.reputation_distribution: List[list] = []
+        self.avg_reputation = self._series()
+        self.reputation_distribution = self._series()
         self.tx_confidence_5: List[float] = []
         self.tx_confidence_10: List[float] = []
         self.tx_confidence_20: List[float] = []
         self.alert_propagation_time: List[float] = []
         self.false_positive_rate: float = 0.0
+        # Оракул двойных трат (simulation/oracle.py): намеренные конфликты, пропуски, охват
+        self.conflicts_injected: int = 0
+        self.missed_conflicts: int = 0
+        self.alert_coverage: float = 0.0
         self.network_diameter: int = 0
         self.avg_path_length: float = 0.0
+        # Нагрузка на сеть и криптографию (модель активного бэкенда)
+        self.bytes_per_step = self._series()
+        self.signature_bytes: int = 0
+        self.signature_checks: int = 0
+        self.verdict_cache_hits: int = 0
+        self.modeled_verify_time_ms: float = 0.0
+        self.crypto_backend: str = ""
+        # Режим акторов: сообщения/с и квантили задержки доставки (пусто в синхронном режиме)
+        self.actor_stats: dict = {}
+        # Глобальное доверие (core/trust.py): пересчёты, итерации, рёбра, число арбитров
+        self.trust_stats: dict = {}
+        # Сибил-атака (сценарий 4): точность/полнота детектора, время, репутация кластера
+        self.sybil_detection: dict = {}
+        # Учёт памяти по подсистемам (simulation/memory.py, --memory K)
+        self.memory_stats: dict = {}
+        # Динамика топологии (core/churn.py): перестроенные рёбра, пришедшие и ушедшие узлы
+        self.churn_stats: dict = {}
+        # Синхронизация подключившихся узлов (core/reconcile.py): байты и время по размеру разности
+        self.sync_stats: dict = {}
+        # Пробы уверенности (simulation/probes.py): возраст -> значения, время до финальности
+        self.confidence_by_age: Dict[int, List[float]] = {}
+        self.time_to_finality: List[int] = []
+        self.finality_censored: int = 0
+        self.confidence_threshold: float = 0.99
+
+    def _series(self):
+        """Пошаговый ряд: список или кольцевой буфер последних history шагов."""
+        return [] if self.history is None else deque(maxlen=max(1, self.history))
 
     def record_detection(self, detection_time: float) -> None:
         """Фиксирует время обнаружения конфликта (в шагах)."""
         self.detection_times.append(detection_time)
         self.conflicts_detected += 1
+        if self.telemetry is not None:
+            self.telemetry.observe_detection(detection_time)
 
     def record_attack_result(self, success: bool) -> None:
         """Фиксирует результат атаки."""
@@ -53,10 +106,63 @@ class MetricsCollector:
     def record_throughput(self, count: int) -> None:
         """Фиксирует пропускную способность за шаг."""
         self.tx_throughput.append(count)
+        self.step_stats["throughput"].add(count)
+        self._step_record["throughput"] = count
+
+    def record_bandwidth(self, num_bytes: int) -> None:
+        """Фиксирует объём переданных за шаг данных (байт)."""
+        self.bytes_per_step.append(num_bytes)
+        self.step_stats["bytes"].add(num_bytes)
+        self._step_record["bytes"] = num_bytes
+
+    def record_avg_reputation(self, value: float) -> None:
+        """Средняя репутация сети на шаге."""
+        self.avg_reputation.append(value)
+        self.step_stats["avg_reputation"].add(value)
+        self._step_record["avg_reputation"] = value
+
+    def record_reputation_step(self, step: int, reputations: dict) -> None:
+        """Снимок, средняя и распределение репутаций шага (вектор репутаций уходит и в приёмник)."""
+        self.record_reputation_snapshot(step, reputations)
+        rep_values = list(reputations.values())
+        if rep_values:
+            self.record_avg_reputation(sum(rep_values) / len(rep_values))
+            self.reputation_distribution.append(rep_values)
+            if self.sink is not None:
+                self._step_record["reputations"] = rep_values
+
+    def end_step(self, step: int) -> None:
+        """Закрывает запись шага: передаёт её в приёмник."""
+        if self.sink is not None and self._step_record:
+            self.sink.write(dict(step=step, **self._step_record))
+        self._step_record = {}
+
+    def close(self) -> None:
+        """Дописывает незакрытый чанк приёмника."""
+        if self.sink is not None:
+            self.sink.close()
+
+    def record_confidence_probe(self, age: int, confidence: float) -> None:
+        """Средняя по панели уверенность в помеченной транзакции возраста age (шагов)."""
+        self.confidence_by_age.setdefault(age, []).append(confidence)
+        if age in (5, 10, 20):
+            getattr(self, f"tx_confidence_{age}").append(confidence)
+
+    def record_finality(self, age: Optional[int]) -> None:
+        """Возраст достижения порога уверенности; None — порог не достигнут до конца наблюдения."""
+        if age is None:
+            self.finality_censored += 1
+        else:
+            self.time_to_finality.append(age)
+
+    def confidence_curve(self) -> Dict[int, float]:
+        """Средняя уверенность по возрасту транзакции."""
+        return {age: float(np.mean(v)) for age, v in sorted(self.confidence_by_age.items())}
 
     def record_reputation_snapshot(self, step: int, reputations: dict) -> None:
         """Сохраняет снимок репутаций узлов на шаге."""
         self.reputation_history.append({"step": step, "reputations": dict(reputations)})
+        self.reputation_snapshots += 1
 
     def calculate_average_confidence(self, graph, sample_txs: int = 100, sample_nodes: int = 10) -> Dict[str, float]:
         """Средняя уверенность в транзакциях (последние sample_txs, опрос sample_nodes узлов)."""
@@ -82,9 +188,11 @@ class MetricsCollector:
         """Возвращает сводку метрик."""
         avg_detection = sum(self.detection_times) / len(self.detection_times) if self.detection_times else 0
         avg_propagation = sum(self.propagation_speed) / len(self.propagation_speed) if self.propagation_speed else 0
-        peak_throughput = max(self.tx_throughput) if self.tx_throughput else 0
+        throughput, bandwidth = self.step_stats["throughput"], self.step_stats["bytes"]
+        peak_throughput = throughput.max if throughput.count else 0
         last_rep = self.reputation_history[-1]["reputations"] if self.reputation_history else {}
         avg_rep = sum(last_rep.values()) / len(last_rep) if last_rep else 0
+        finality_total = len(self.time_to_finality) + self.finality_censored
         return {
             "detection_times_count": len(self.detection_times),
             "avg_detection_time_steps": avg_detection,
@@ -93,11 +201,34 @@ class MetricsCollector:
             "conflicts_detected": self.conflicts_detected,
             "avg_propagation_speed": avg_propagation,
             "peak_throughput": peak_throughput,
-            "reputation_snapshots": len(self.reputation_history),
+            "reputation_snapshots": self.reputation_snapshots,
             "alerts_created": self.alerts_created,
             "avg_reputation": avg_rep,
-            "avg_reputation_history": self.avg_reputation,
+            "avg_reputation_history": list(self.avg_reputation),
             "false_positive_rate": self.false_positive_rate,
+            "conflicts_injected": self.conflicts_injected,
+            "missed_conflicts": self.missed_conflicts,
+            "alert_coverage": self.alert_coverage,
             "network_diameter": getattr(self, "network_diameter", 0),
             "avg_path_length": getattr(self, "avg_path_length", 0.0),
+            "crypto_backend": self.crypto_backend,
+            "bytes_transferred": int(bandwidth.total),
+            "peak_bytes_per_step": bandwidth.max if bandwidth.count else 0,
+            "signature_bytes": self.signature_bytes,
+            "signature_checks": self.signature_checks,
+            "verdict_cache_hits": self.verdict_cache_hits,
+            "modeled_verify_time_ms": self.modeled_verify_time_ms,
+            "actor_stats": self.actor_stats,
+            "trust_stats": self.trust_stats,
+            "sybil_detection": self.sybil_detection,
+            "memory_stats": self.memory_stats,
+            "churn_stats": self.churn_stats,
+            "sync_stats": self.sync_stats,
+            "step_stats": {name: stats.summary() for name, stats in self.step_stats.items()},
+            "tx_confidence_5": float(np.mean(self.tx_confidence_5)) if self.tx_confidence_5 else 0.0,
+            "tx_confidence_10": float(np.mean(self.tx_confidence_10)) if self.tx_confidence_10 else 0.0,
+            "tx_confidence_20": float(np.mean(self.tx_confidence_20)) if self.tx_confidence_20 else 0.0,
+            "confidence_curve": self.confidence_curve(),
+            "finality_rate": len(self.time_to_finality) / finality_total if finality_total else 0.0,
+            "median_time_to_finality": float(np.median(self.time_to_finality)) if self.time_to_finality else None,
         }
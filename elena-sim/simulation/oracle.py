@@ -0,0 +1,153 @@
+"""
+Оракул двойных трат: эталон намеренных конфликтов и глобальный индекс пометок узлов.
+Злой узел сообщает о каждой созданной паре конфликтующих транзакций (до распространения),
+узлы — о каждой пометке транзакции как конфликтной и о снятии пометки. Все счётчики
+обновляются за O(1) на событие, поэтому истинные/ложные срабатывания, пропуски и охват
+доступны на любом шаге без обхода узлов.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from core import NetworkGraph
+from core.transaction import Alert, Transaction
+from .metrics import MetricsCollector
+
+
+@dataclass
+class InjectedConflict:
+    """Намеренная двойная трата и узлы, пометившие хотя бы одну из её транзакций."""
+
+    tx1: object
+    tx2: object
+    attacker: str
+    step: int
+    nodes: Dict[str, int] = field(default_factory=dict)  # node_id -> число помеченных tx пары (1 или 2)
+    discovered_by: Optional[str] = None
+    detected_step: Optional[int] = None
+
+
+class DoubleSpendOracle:
+    """Эталон конфликтов сети и классификация алертов (подключается как graph.oracle)."""
+
+    def __init__(self, graph: NetworkGraph, metrics: MetricsCollector):
+        self.graph = graph
+        self.metrics = metrics
+        self.conflicts: list = []
+        self._by_tx: Dict[object, InjectedConflict] = {}
+        self._flags: Dict[object, Set[str]] = {}  # tx_id -> узлы, пометившие её конфликтной
+        self._node_hits: Dict[str, int] = {}  # node_id -> число истинных конфликтов, помеченных узлом
+        self._alerts: Dict[str, bool] = {}  # alert_id -> истинный ли конфликт
+        self._coverage_sum = 0  # Σ по конфликтам числа пометивших узлов
+        self.detected = 0
+        self.true_positives = 0
+        self.false_positives = 0
+
+    # --- события ---
+
+    def register_conflict(self, attacker: str, tx1: Transaction, tx2: Transaction) -> None:
+        """Злой узел создал пару конфликтующих транзакций (вызывается до их распространения)."""
+        conflict = InjectedConflict(tx1.id, tx2.id, attacker, self.graph.current_step)
+        self.conflicts.append(conflict)
+        self._by_tx[tx1.id] = conflict
+        self._by_tx[tx2.id] = conflict
+        self._sync()
+
+    def flag(self, node_id: str, alert: Alert) -> None:
+        """Узел принял алерт и пометил обе транзакции пары конфликтными."""
+        if alert.id not in self._alerts:
+            truth = alert.conflicting_tx1 in self._by_tx or alert.conflicting_tx2 in self._by_tx
+            self._alerts[alert.id] = truth
+            if truth:
+                self.true_positives += 1
+            else:
+                self.false_positives += 1
+                self.metrics.record_false_positive()
+        for tx_id in (alert.conflicting_tx1, alert.conflicting_tx2):
+            flagged = self._flags.setdefault(tx_id, set())
+            if node_id in flagged:
+                continue
+            flagged.add(node_id)
+            conflict = self._by_tx.get(tx_id)
+            if conflict is None:
+                continue
+            count = conflict.nodes.get(node_id, 0)
+            conflict.nodes[node_id] = count + 1
+            if count:
+                continue
+            self._coverage_sum += 1
+            self._node_hits[node_id] = self._node_hits.get(node_id, 0) + 1
+            if conflict.detected_step is None:
+                conflict.detected_step = self.graph.current_step
+                conflict.discovered_by = alert.discovered_by
+                self.detected += 1
+        self._sync()
+
+    def unflag(self, node_id: str, tx_id: object) -> None:
+        """Узел принял транзакцию, ранее помеченную конфликтной, и снял пометку."""
+        flagged = self._flags.get(tx_id)
+        if not flagged or node_id not in flagged:
+            return
+        flagged.discard(node_id)
+        conflict = self._by_tx.get(tx_id)
+        if conflict is None or node_id not in conflict.nodes:
+            return
+        conflict.nodes[node_id] -= 1
+        if conflict.nodes[node_id] == 0:
+            del conflict.nodes[node_id]
+            self._coverage_sum -= 1
+            self._node_hits[node_id] -= 1
+            if self._node_hits[node_id] == 0:
+                del self._node_hits[node_id]
+        self._sync()
+
+    # --- запросы ---
+
+    def conflict(self, tx_id: object) -> Optional[InjectedConflict]:
+        """Намеренный конфликт, в который входит транзакция (None — честная транзакция)."""
+        return self._by_tx.get(tx_id)
+
+    def flagged_by(self, tx_id: object) -> Set[str]:
+        """Узлы, у которых транзакция сейчас помечена конфликтной."""
+        return self._flags.get(tx_id, set())
+
+    @property
+    def flagged_nodes(self) -> int:
+        """Число узлов, пометивших хотя бы один намеренный конфликт."""
+        return len(self._node_hits)
+
+    @property
+    def missed(self) -> int:
+        """Намеренные конфликты, которые не пометил ни один узел (ложноотрицательные)."""
+        return len(self.conflicts) - self.detected
+
+    @property
+    def coverage(self) -> float:
+        """Средняя по конфликтам доля узлов сети, пометивших конфликт."""
+        if not self.conflicts or not self.graph.nodes:
+            return 0.0
+        return self._coverage_sum / (len(self.conflicts) * len(self.graph.nodes))
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Доля алертов, не соответствующих ни одному намеренному конфликту."""
+        return self.false_positives / len(self._alerts) if self._alerts else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "conflicts_injected": len(self.conflicts),
+            "conflicts_flagged": self.detected,
+            "missed_conflicts": self.missed,
+            "true_positive_alerts": self.true_positives,
+            "false_positive_alerts": self.false_positives,
+            "false_positive_rate": self.false_positive_rate,
+            "alert_coverage": self.coverage,
+        }
+
+    def _sync(self) -> None:
+        """Переносит текущие значения в метрики (O(1))."""
+        m = self.metrics
+        m.false_positive_rate = self.false_positive_rate
+        m.conflicts_injected = len(self.conflicts)
+        m.missed_conflicts = self.missed
+        m.alert_coverage = self.coverage
@@ -0,0 +1,117 @@
+"""
+Пробы уверенности по возрасту транзакции (tx_confidence_5/10/20, кривые, время до финальности).
+При создании часть транзакций помечается; ровно через k шагов их уверенность считается
+на фиксированной панели узлов. Все пробы шага считаются одним пакетом матричными операциями
+по панели — стоимость зависит от размера выборки и панели, а не от размера сети.
+Формула та же, что в Node.get_confidence: 0.5 + 0.1 · Σ репутаций (graph.reputation_of)
+создателей дочерних транзакций, известных узлу; 0 — если узел не знает транзакцию
+или считает её конфликтной.
+"""
+
+import random
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from core import NetworkGraph, Transaction
+from config import SIMULATION_PARAMS
+from .metrics import MetricsCollector
+
+
+class ProbeScheduler:
+    """Помечает выборку транзакций и опрашивает панель узлов на заданных возрастах."""
+
+    def __init__(
+        self,
+        graph: NetworkGraph,
+        metrics: MetricsCollector,
+        panel_size: int = 16,
+        sample_per_step: int = 2,
+        ages: Optional[Sequence[int]] = None,
+        threshold: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.graph = graph
+        self.metrics = metrics
+        self.panel_size = panel_size
+        self.sample_per_step = sample_per_step
+        self.ages = sorted(set(ages)) if ages else list(range(1, 21))
+        self.max_age = self.ages[-1]
+        self._age_set = set(self.ages)
+        self.threshold = threshold if threshold is not None else SIMULATION_PARAMS.get("confidence_threshold", 0.99)
+        self.metrics.confidence_threshold = self.threshold
+        # Отдельный генератор: выборка проб не сдвигает случайную последовательность симуляции
+        self.rng = rng or random.Random(random.getrandbits(32))
+        self.panel: List[str] = []
+        self._active: Dict[object, int] = {}  # tx_id -> шаг создания
+        self._final: set = set()
+        graph.removal_hooks.append(self._node_removed)
+
+    def _fill_panel(self) -> None:
+        """Добирает панель до panel_size случайными узлами вне неё (в начале и после ухода членов)."""
+        members = set(self.panel)
+        candidates = [nid for nid in self.graph.nodes if nid not in members]
+        self.panel.extend(self.rng.sample(candidates, min(self.panel_size - len(self.panel), len(candidates))))
+
+    def _node_removed(self, node) -> None:
+        """Ушедший член панели (core/churn.py) заменяется случайным узлом вне панели."""
+        if node.id in self.panel:
+            self.panel.remove(node.id)
+            self._fill_panel()
+
+    def tag(self, step: int, txs: Iterable[Transaction]) -> None:
+        """Помечает до sample_per_step транзакций, созданных на шаге step (chaff не берём)."""
+        candidates = [tx for tx in txs if not tx.is_chaff]
+        if not candidates or self.sample_per_step <= 0:
+            return
+        if len(self.panel) < min(self.panel_size, len(self.graph.nodes)):
+            self._fill_panel()
+        for tx in self.rng.sample(candidates, min(self.sample_per_step, len(candidates))):
+            self._active[tx.id] = step
+
+    def evaluate(self, step: int) -> None:
+        """Опрос панели для всех помеченных транзакций, чей возраст на шаге step входит в ages."""
+        due = [(tx_id, step - created) for tx_id, created in self._active.items() if step - created in self._age_set]
+        if due:
+            confidence = self.panel_confidence([tx_id for tx_id, _ in due])
+            for (tx_id, age), value in zip(due, confidence.tolist()):
+                self.metrics.record_confidence_probe(age, value)
+                if tx_id not in self._final and value >= self.threshold:
+                    self._final.add(tx_id)
+                    self.metrics.record_finality(age)
+        for tx_id, created in list(self._active.items()):
+            if step - created >= self.max_age:
+                del self._active[tx_id]
+                if tx_id in self._final:
+                    self._final.discard(tx_id)
+                else:
+                    self.metrics.record_finality(None)
+
+    def panel_confidence(self, tx_ids: List[object]) -> np.ndarray:
+        """Средняя по панели уверенность для каждой транзакции из tx_ids (вектор длины len(tx_ids))."""
+        graph = self.graph
+        panel = [graph.nodes[nid] for nid in self.panel if nid in graph.nodes]
+        if not panel or not tx_ids:
+            return np.zeros(len(tx_ids))
+        # Дочерние транзакции всех проб (объединение) и репутации их создателей
+        child_col: Dict[object, int] = {}
+        pairs = []
+        for j, tx_id in enumerate(tx_ids):
+            for child in graph.children.get(tx_id, ()):
+                col = child_col.setdefault(child, len(child_col))
+                pairs.append((col, j))
+        children = list(child_col)
+        creators = [graph.transactions[c].from_id for c in children]
+        rep = np.array([graph.reputation_of(c) for c in creators])
+        refs = np.zeros((len(children), len(tx_ids)))
+        if pairs:
+            cols, rows = zip(*pairs)
+            refs[list(cols), list(rows)] = 1.0
+        # Матрицы знаний панели: известна ли узлу дочерняя tx / сама tx, не конфликтна ли она
+        knows_child = np.array([[c in n.local_graph for c in children] for n in panel], dtype=float)
+        knows_child = knows_child.reshape(len(panel), len(children))
+        valid = np.array(
+            [[t in n.local_graph and t not in n.conflicting_tx_ids for t in tx_ids] for n in panel], dtype=bool
+        )
+        score = np.minimum(1.0, 0.5 + 0.1 * (knows_child @ (rep[:, None] * refs)))
+        return np.where(valid, score, 0.0).mean(axis=0)
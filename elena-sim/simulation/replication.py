@@ -0,0 +1,109 @@
+"""
+Повторение конфигурации по многим зёрнам (Монте-Карло) с доверительными интервалами.
+Средние и дисперсии считаются на лету (алгоритм Уэлфорда); зёрна добавляются пачками
+по числу воркеров, пока ширина 95% интервала всех целевых метрик не станет не больше заданной.
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Квантили t-распределения Стьюдента (0.975) для 1..30 степеней свободы; дальше — нормальное
+_T975 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def t_quantile(df: int) -> float:
+    """Двусторонний 95% квантиль t-распределения."""
+    if df < 1:
+        return math.inf
+    return _T975[df - 1] if df <= len(_T975) else 1.96
+
+
+class RunningStat:
+    """Среднее и дисперсия за один проход (Уэлфорд), без хранения выборки."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def half_width(self) -> float:
+        """Полуширина 95% доверительного интервала среднего."""
+        if self.n < 2:
+            return math.inf
+        return t_quantile(self.n - 1) * self.std / math.sqrt(self.n)
+
+    def summary(self) -> Dict[str, float]:
+        hw = self.half_width()
+        return {"mean": self.mean, "std": self.std, "ci_low": self.mean - hw, "ci_high": self.mean + hw, "n": self.n}
+
+
+def converged(stat: RunningStat, ci_width: float, relative: bool = True) -> bool:
+    """Полная ширина интервала не больше ci_width (доли |среднего| при relative)."""
+    width = 2 * stat.half_width()
+    if relative:
+        # Нулевая дисперсия (например, все прогоны без атаки) тоже считается сходимостью
+        return width <= ci_width * abs(stat.mean) or (stat.std == 0.0 and stat.n >= 2)
+    return width <= ci_width
+
+
+def replicate(
+    evaluate: Callable[[int], Dict[str, Any]],
+    metrics: Optional[Sequence[str]] = None,
+    target_metrics: Optional[Sequence[str]] = None,
+    min_seeds: int = 3,
+    max_seeds: int = 30,
+    ci_width: Optional[float] = 0.1,
+    relative: bool = True,
+    workers: int = 4,
+    base_seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Запускает evaluate(seed) для зёрен base_seed, base_seed+1, … параллельно (потоки — для
+    прогонов в отдельных процессах) и останавливается, когда интервалы target_metrics сошлись
+    или исчерпан max_seeds. ci_width=None — всегда max_seeds прогонов.
+    Прогон, вернувший ok=False (упал или не выдал метрик), не входит в статистику, но расходует
+    зерно из max_seeds.
+    Возвращает {"seeds", "failed", "converged", "stats": {метрика: RunningStat}}.
+    """
+    stats: Dict[str, RunningStat] = {}
+    seeds: List[int] = []
+    failed: List[int] = []
+    done = False
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while len(seeds) + len(failed) < max_seeds and not done:
+            attempted = len(seeds) + len(failed)
+            # До min_seeds — сразу пачкой, дальше — по числу воркеров
+            batch = max(min_seeds - len(seeds), workers, 1)
+            batch_seeds = [base_seed + attempted + k for k in range(min(batch, max_seeds - attempted))]
+            for seed, result in zip(batch_seeds, pool.map(evaluate, batch_seeds)):
+                if result.get("ok") is False:
+                    failed.append(seed)
+                    continue
+                seeds.append(seed)
+                for key in metrics or result:
+                    value = result.get(key)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        stats.setdefault(key, RunningStat()).push(float(value))
+            if ci_width is not None and len(seeds) >= min_seeds:
+                targets = [stats[k] for k in (target_metrics or stats) if k in stats]
+                done = bool(targets) and all(converged(s, ci_width, relative) for s in targets)
+    return {"seeds": seeds, "failed": failed, "converged": done, "stats": stats}
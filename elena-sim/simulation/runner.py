@@ -3,11 +3,29 @@
 """
 
 import random
+import time
+from datetime import datetime
+from pathlib import Path
 from typing import List, Optional
 
 from core import Node, QuantumEvilNode, NetworkGraph
+from core.churn import ChurnEngine
+from core.reconcile import StateSync
+from core.crypto import set_backend
+from core.shared_topology import SharedTopology
+from core.trust import GlobalTrust
+from core.topology import generate_edges, path_metrics, sybil_region_edges
+from core.verify_pool import BatchVerifier
 from config import SIMULATION_PARAMS, REPUTATION_PARAMS
+from .memory import MemoryAccountant
 from .metrics import MetricsCollector
+from .oracle import DoubleSpendOracle
+from .probes import ProbeScheduler
+from .streaming import make_sink
+from .telemetry import SimulationTelemetry
+from .timeline import StateTimeline
+from .trace import TraceRecorder
+from .workload import WorkloadGenerator
 
 
 class SimulationRunner:
@@ -22,23 +40,191 @@ class SimulationRunner:
         rewiring_prob: float = None,
         chaff_prob: float = None,
         tx_per_step: int = None,
+        crypto_backend: str = None,
+        batch_verify: bool = None,
+        verify_workers: int = None,
+        actor_transport: str = None,
+        trace_path: str = None,
+        vectorized_propagation: bool = None,
+        trust_interval: int = None,
+        seed: int = None,
+        shared_topology=None,
+        memory_interval: int = None,
+        metrics_sink: str = None,
+        metrics_dir: str = None,
+        metrics_history: int = None,
+        telemetry: Optional[SimulationTelemetry] = None,
+        live=None,
+        timeline_interval: int = None,
+        timeline: Optional[StateTimeline] = None,
+        churn_arrival_rate: float = None,
+        churn_session_mean: float = None,
+        churn_session_distribution: str = None,
+        sync_on_join: bool = None,
+        workload: Optional[WorkloadGenerator] = None,
+        workload_arrival: str = None,
+        workload_senders: str = None,
     ):
         params = SIMULATION_PARAMS
+        # Общая топология (SharedTopology или имя сегмента): сеть не строится заново в каждом прогоне
+        if isinstance(shared_topology, str):
+            shared_topology = SharedTopology.attach(shared_topology)
+        self.shared_topology: Optional[SharedTopology] = shared_topology
+        if shared_topology is not None:
+            if num_nodes not in (None, shared_topology.num_nodes) or num_evil not in (None, shared_topology.num_evil):
+                raise ValueError(
+                    f"Общая топология на {shared_topology.num_nodes} узлов ({shared_topology.num_evil} злых), "
+                    f"запрошено {num_nodes} ({num_evil})"
+                )
+            num_nodes, num_evil = shared_topology.num_nodes, shared_topology.num_evil
+            if crypto_backend not in (None, shared_topology.crypto_backend):
+                raise ValueError(f"Ключи общей топологии — для бэкенда {shared_topology.crypto_backend}")
+            crypto_backend = shared_topology.crypto_backend
+        if seed is not None:
+            # Воспроизводимый прогон: все случайные решения симуляции идут через модуль random
+            random.seed(seed)
         self.num_nodes = num_nodes or params["num_nodes"]
         self.num_evil = num_evil or params["num_evil_nodes"]
-        self.quantum_advantage = quantum_advantage or params["quantum_advantage"]
+        self.quantum_advantage = quantum_advantage if quantum_advantage is not None else params["quantum_advantage"]
         self.rewiring_interval = rewiring_interval if rewiring_interval is not None else params["rewiring_interval"]
         self.rewiring_prob = rewiring_prob if rewiring_prob is not None else 0.1
         self.chaff_prob = chaff_prob if chaff_prob is not None else params["chaff_probability"]
         self.tx_per_step = tx_per_step or params["tx_per_step"]
+        # Нагрузка шага (simulation/workload.py): транзакции и chaff блоками на NumPy.
+        # Chaff — отдельный поток: в среднем chaff_prob транзакций на узел за шаг
+        self.workload = workload or WorkloadGenerator(
+            self.tx_per_step,
+            arrival=workload_arrival or params.get("workload_arrival", "uniform"),
+            senders=workload_senders or params.get("workload_senders", "uniform"),
+            zipf_exponent=params.get("workload_zipf_exponent", 1.1),
+            burst_factor=params.get("workload_burst_factor", 10.0),
+            burst_enter=params.get("workload_burst_enter", 0.05),
+            burst_exit=params.get("workload_burst_exit", 0.3),
+            chaff_rate=self.chaff_prob * self.num_nodes,
+        )
+        self._roster: tuple = (None, [])  # (версия топологии, узлы в порядке графа)
+        # Крипто-бэкенд выбирается на симуляцию (до создания узлов и ключей)
+        self.crypto = set_backend(
+            crypto_backend or params.get("crypto_backend", "sha512"),
+            signature_size=params.get("signature_size_bytes"),
+            verify_cost_us=params.get("verify_cost_us"),
+        )
 
-        self.graph = NetworkGraph()
-        self.metrics = MetricsCollector()
+        if batch_verify is None:
+            batch_verify = params.get("batch_verify", False)
+        self.verifier: Optional[BatchVerifier] = (
+            BatchVerifier(workers=verify_workers or params.get("verify_workers")) if batch_verify else None
+        )
+
+        if vectorized_propagation is None:
+            vectorized_propagation = params.get("vectorized_propagation", False)
+        self.vectorized_propagation = vectorized_propagation
+
+        actor_transport = actor_transport or params.get("actor_transport")
+        if actor_transport:
+            from .actors import AsyncNetworkGraph
+            self.graph = AsyncNetworkGraph(transport=actor_transport)
+        else:
+            self.graph = NetworkGraph()
+        if self.verifier is not None:
+            self.graph.verdict_cache = {}
+        self.trust_interval = trust_interval if trust_interval is not None else params.get("trust_interval", 0)
+        self.trust: Optional[GlobalTrust] = None
+        if self.trust_interval > 0:
+            if actor_transport:
+                raise ValueError("Глобальное доверие пока не поддерживается в режиме акторов")
+            self.trust = GlobalTrust(
+                self.graph, interval=self.trust_interval, baseline=REPUTATION_PARAMS.get("initial_reputation", 0.5)
+            )
+            self.graph.trust = self.trust
+        # Вход и выход узлов по ходу прогона (rewiring тем же движком работает всегда)
+        if churn_arrival_rate is None:
+            churn_arrival_rate = params.get("churn_arrival_rate", 0.0)
+        if churn_session_mean is None:
+            churn_session_mean = params.get("churn_session_mean", 0)
+        self.churn: Optional[ChurnEngine] = None
+        if churn_arrival_rate > 0 or churn_session_mean > 0:
+            if actor_transport:
+                raise ValueError("Вход и выход узлов пока не поддерживаются в режиме акторов")
+            initial_rep = REPUTATION_PARAMS.get("initial_reputation", 0.5)
+            self.churn = ChurnEngine(
+                self.graph,
+                arrival_rate=churn_arrival_rate,
+                session_mean=churn_session_mean,
+                session_distribution=churn_session_distribution or params.get("churn_session_distribution", "exponential"),
+                attach_degree=(params.get("peer_degree_min", 3) + params.get("peer_degree_max", 10)) // 2,
+                min_degree=params.get("peer_degree_min", 3),
+                node_factory=lambda nid: Node(node_id=nid, initial_reputation=initial_rep),
+            )
+            self.graph.churn_engine = self.churn
+        # Догрузка истории подключающимися узлами: таблицы ведутся у всех узлов с момента создания
+        if sync_on_join is None:
+            sync_on_join = params.get("sync_on_join", False)
+        self.state_sync: Optional[StateSync] = None
+        if sync_on_join:
+            if actor_transport:
+                raise ValueError("Синхронизация состояния пока не поддерживается в режиме акторов")
+            self.state_sync = StateSync(
+                self.graph,
+                cells=params.get("sync_sketch_cells", 256),
+                fanout=params.get("sync_fanout", 2),
+                fetch_batch=params.get("sync_fetch_batch", 128),
+            )
+        self.recorder: Optional[TraceRecorder] = None
+        if trace_path:
+            self.recorder = TraceRecorder(trace_path)
+            self.graph.recorder = self.recorder
+        # Пошаговые метрики: приёмник на диске (jsonl | npz) и ограниченная история в памяти
+        metrics_sink = metrics_sink or params.get("metrics_sink")
+        self.metrics_dir: Optional[str] = None
+        sink = None
+        if metrics_sink:
+            self.metrics_dir = metrics_dir or params.get("metrics_dir") or str(
+                Path(__file__).resolve().parent.parent / "results" / f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            )
+            sink = make_sink(metrics_sink, self.metrics_dir)
+        if metrics_history is None:
+            metrics_history = params.get("metrics_history")
+        self.metrics = MetricsCollector(history=metrics_history, sink=sink)
+        self.metrics.crypto_backend = self.crypto.name
+        # Живые счётчики для Prometheus: общий объект можно передать снаружи (main --prom-port)
+        self.telemetry = telemetry or SimulationTelemetry()
+        self.metrics.telemetry = self.telemetry
+        self._telemetry_marks = (0, 0, 0, 0)  # принятия, сообщения, байты, алерты на конец прошлого шага
+        # Живая трансляция в дашборд (simulation/live.py): дельты шагов и пауза
+        self.live = live
+        # Шкала состояний для запросов «что было на шаге k» (simulation/timeline.py)
+        if timeline is None:
+            if timeline_interval is None:
+                timeline_interval = params.get("timeline_interval", 0)
+            timeline = StateTimeline(keyframe_interval=timeline_interval) if timeline_interval > 0 else None
+        self.timeline = timeline
+        self.oracle = DoubleSpendOracle(self.graph, self.metrics)
+        self.graph.oracle = self.oracle
+        self.probes = ProbeScheduler(
+            self.graph,
+            self.metrics,
+            panel_size=params.get("probe_panel_size", 16),
+            sample_per_step=params.get("probe_sample_per_step", 2),
+            ages=range(1, params.get("probe_max_age", 20) + 1),
+        )
+        self.memory_interval = memory_interval if memory_interval is not None else params.get("memory_interval", 0)
+        self.memory: Optional[MemoryAccountant] = (
+            MemoryAccountant(self.graph, self.metrics, interval=self.memory_interval) if self.memory_interval > 0 else None
+        )
+        self._bytes_recorded = 0
         self.evil_nodes: List[QuantumEvilNode] = []
         self.honest_nodes: List[Node] = []
 
-    def build_network(self) -> None:
-        """Создаёт узлы и рёбра графа."""
+    def build_network(self, sybil_attack_edges: Optional[int] = None) -> None:
+        """
+        Создаёт узлы и рёбра графа. При sybil_attack_edges злые узлы образуют плотный
+        сибил-кластер, связанный с честной областью только этим числом рёбер атаки.
+        С общей топологией сеть (включая сибил-кластер) берётся из неё.
+        """
+        if self.shared_topology is not None:
+            self._build_from_shared(self.shared_topology)
+            return
         initial_rep = REPUTATION_PARAMS.get("initial_reputation", 0.5)
         # Честные узлы
         for i in range(self.num_nodes - self.num_evil):
@@ -58,61 +244,156 @@ class SimulationRunner:
         all_nodes = list(self.graph.nodes.values())
         degree_min = SIMULATION_PARAMS.get("peer_degree_min", 3)
         degree_max = SIMULATION_PARAMS.get("peer_degree_max", 10)
-        for i, node in enumerate(all_nodes):
-            degree = random.randint(degree_min, min(degree_max, len(all_nodes) - 1))
-            candidates = [n for j, n in enumerate(all_nodes) if j != i and n not in node.peers]
-            random.shuffle(candidates)
-            for k in range(min(degree, len(candidates))):
-                self.graph.add_edge(node.id, candidates[k].id)
+        if sybil_attack_edges is not None:
+            edges = sybil_region_edges(
+                len(self.honest_nodes), len(self.evil_nodes), sybil_attack_edges, degree_min=degree_min, degree_max=degree_max
+            ).tolist()
+        else:
+            edges = generate_edges(len(all_nodes), degree_min, degree_max)
+        for i, j in edges:
+            self.graph.add_edge(all_nodes[i].id, all_nodes[j].id)
         self._record_network_metrics()
 
+    def _build_from_shared(self, topo: SharedTopology) -> None:
+        """Узлы с ключами и начальным состоянием из общей памяти; рёбра — из общего CSR."""
+        balance, reputation = topo.arrays["balance"], topo.arrays["reputation"]
+        num_honest = topo.num_nodes - topo.num_evil
+        for i, nid in enumerate(topo.node_ids()):
+            keypair = topo.keypair(i, self.crypto)
+            if i < num_honest:
+                node = Node(node_id=nid, initial_reputation=float(reputation[i]), keypair=keypair, balance=float(balance[i]))
+                self.honest_nodes.append(node)
+            else:
+                node = QuantumEvilNode(node_id=nid, quantum_advantage=self.quantum_advantage, keypair=keypair)
+                node.reputation = float(reputation[i])
+                node.balance = float(balance[i])
+                node.known_balances[nid] = node.balance
+                self.evil_nodes.append(node)
+            self.graph.add_node(node)
+        all_nodes = list(self.graph.nodes.values())
+        for i, j in topo.edges().tolist():
+            self.graph.add_edge(all_nodes[i].id, all_nodes[j].id)
+        self.graph.attach_shared_csr(topo.node_ids(), *topo.csr())
+        if topo.meta.get("path_metrics") is not None:
+            self.metrics.network_diameter, self.metrics.avg_path_length = topo.meta["path_metrics"]
+        else:
+            self._record_network_metrics()
+
     def step(self, step_id: int) -> int:
         """
         Один шаг симуляции: случайные транзакции, опционально chaff и rewiring.
         Возвращает число обработанных сообщений (throughput).
         """
+        started = time.perf_counter()
         messages_this_step = 0
-        node_list = list(self.graph.nodes.values())
-        for _ in range(self.tx_per_step):
-            sender = random.choice(node_list)
-            others = [n for n in node_list if n.id != sender.id]
-            if not others:
-                continue
-            receiver = random.choice(others)
-            amount = round(random.uniform(1.0, 50.0), 2)
-            tx = sender.create_transaction(receiver.id, amount)
+        self.graph.current_step = step_id
+        node_list = self._node_list()
+        batch = self.workload.step(len(node_list))
+        created = []
+        for i, j, amount in zip(batch.senders.tolist(), batch.receivers.tolist(), batch.amounts.tolist()):
+            sender = node_list[i]
+            tx = sender.create_transaction(node_list[j].id, amount)
             if tx:
-                self.graph.propagate_transaction(tx, sender)
+                created.append((tx, sender))
+        if self.verifier is not None:
+            # Подписи шага проверяются пакетом один раз; узлы берут вердикт из кэша графа
+            self.graph.prevalidate([tx for tx, _ in created], self.verifier)
+        with self.graph.batch():
+            if self.vectorized_propagation:
+                # Все транзакции шага — одним пакетом фронтов (при возможном конфликте — поочерёдно)
+                self.graph.propagate_batch(created)
+            else:
+                for tx, sender in created:
+                    self.graph.propagate_transaction(tx, sender)
+            messages_this_step += sum(len(sender.peers) + 1 for _, sender in created)
+        self.probes.tag(step_id, [tx for tx, _ in created])
+        for i, j in zip(batch.chaff_senders.tolist(), batch.chaff_receivers.tolist()):
+            sender = node_list[i]
+            if not getattr(sender, "is_evil", False) and self.graph.send_chaff(sender, node_list[j].id):
                 messages_this_step += len(sender.peers) + 1
-        if self.chaff_prob > 0 and random.random() < self.chaff_prob * self.num_nodes:
-            self.graph.generate_chaff(self.chaff_prob)
-            messages_this_step += 10
         if self.rewiring_interval > 0 and step_id > 0 and step_id % self.rewiring_interval == 0:
             self.graph.rewire_peers(self.rewiring_prob)
+        if self.churn is not None:
+            joined, left = self.churn.step(step_id)
+            if left:
+                gone = {node.id for node in left}
+                self.honest_nodes = [node for node in self.honest_nodes if node.id not in gone]
+            self.honest_nodes.extend(joined)
+            self.metrics.churn_stats = self.churn.stats()
+            if self.state_sync is not None and joined:
+                self.metrics.sync_stats = self.state_sync.stats()
         # Естественное затухание репутации каждый шаг
         for node in self.graph.nodes.values():
             node.step_decay()
         reputations = {nid: n.reputation for nid, n in self.graph.nodes.items()}
-        self.metrics.record_reputation_snapshot(step_id, reputations)
-        rep_values = list(reputations.values())
-        if rep_values:
-            self.metrics.avg_reputation.append(sum(rep_values) / len(rep_values))
-            self.metrics.reputation_distribution.append(rep_values)
+        self.metrics.record_reputation_step(step_id, reputations)
+        if self.trust is not None and (step_id + 1) % self.trust_interval == 0:
+            self.trust.update()
+            self.metrics.trust_stats = dict(
+                self.trust.stats(),
+                arbiters=len(self.graph.arbiters(SIMULATION_PARAMS.get("reputation_threshold", 0.8))),
+            )
+        self.probes.evaluate(step_id)
         self.metrics.record_throughput(messages_this_step)
+        self._record_crypto_load()
+        if self.memory is not None and (step_id + 1) % self.memory_interval == 0:
+            self.memory.sample_step(step_id)
+        if self.recorder is not None:
+            self.recorder.end_step(step_id, reputations, messages_this_step, self.metrics.bytes_per_step[-1])
+        self.metrics.end_step(step_id)
+        self._record_telemetry(step_id, time.perf_counter() - started, len(created), reputations)
+        if self.timeline is not None:
+            self.timeline.record(self.graph, step_id)
+        if self.live is not None:
+            self.live.end_step(self.graph, step_id)
         return messages_this_step
 
+    def _node_list(self) -> List[Node]:
+        """Узлы в порядке графа; список пересобирается только после изменения состава или рёбер."""
+        version = self.graph._topology_version
+        if self._roster[0] != version or len(self._roster[1]) != len(self.graph.nodes):
+            self._roster = (version, list(self.graph.nodes.values()))
+        return self._roster[1]
+
+    def close(self) -> None:
+        """Дописывает журнал событий и чанк приёмника метрик, останавливает акторов и пул проверки подписей."""
+        if self.verifier is not None:
+            self.verifier.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.memory is not None:
+            self.memory.close()
+        self.metrics.close()
+        if hasattr(self.graph, "close"):
+            self.graph.close()
+
+    def _record_telemetry(self, step_id: int, duration: float, created: int, reputations: dict) -> None:
+        """Приращения счётчиков графа за шаг -> живые метрики."""
+        g = self.graph
+        marks = (g.deliveries_accepted, g.messages_delivered, g.bytes_delivered, len(g.alerts))
+        accepted, messages, num_bytes, alerts = (now - before for now, before in zip(marks, self._telemetry_marks))
+        self._telemetry_marks = marks
+        self.telemetry.end_step(
+            step_id, duration, created, accepted, messages, num_bytes, alerts, list(reputations.values())
+        )
+
+    def _record_crypto_load(self) -> None:
+        """Переносит счётчики нагрузки графа (байты, подписи, проверки) в метрики."""
+        g = self.graph
+        self.metrics.record_bandwidth(g.bytes_delivered - self._bytes_recorded)
+        self._bytes_recorded = g.bytes_delivered
+        self.metrics.signature_bytes = g.signature_bytes
+        self.metrics.signature_checks = g.signature_checks
+        self.metrics.verdict_cache_hits = g.verdict_cache_hits
+        self.metrics.modeled_verify_time_ms = g.modeled_verify_time_ms()
+        if hasattr(g, "actor_stats"):
+            self.metrics.actor_stats = g.actor_stats()
+
     def _record_network_metrics(self) -> None:
         """Записывает диаметр и среднюю длину пути графа (после build_network)."""
         try:
-            import networkx as nx
-            G = self.graph._nx_graph
-            if G.number_of_nodes() < 2:
-                return
-            if not nx.is_connected(G):
-                self.metrics.network_diameter = -1
-                self.metrics.avg_path_length = -1.0
-                return
-            self.metrics.network_diameter = nx.diameter(G)
-            self.metrics.avg_path_length = nx.average_shortest_path_length(G)
+            result = path_metrics(self.graph.to_networkx())
+            if result is not None:
+                self.metrics.network_diameter, self.metrics.avg_path_length = result
         except Exception:
             pass
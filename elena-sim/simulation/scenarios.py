@@ -5,8 +5,11 @@
 import random
 from typing import List
 
+import numpy as np
+
 from core import Node, QuantumEvilNode, NetworkGraph
-from config import SIMULATION_PARAMS
+from core.sybil import SybilDetector, precision_recall
+from config import SIMULATION_PARAMS, REPUTATION_PARAMS
 from .runner import SimulationRunner
 from .metrics import MetricsCollector
 
@@ -56,6 +59,7 @@ class Scenario2_ClassicDoubleSpend:
         evil_rep_after = evil_rep_before
         discovered_by = None
         nodes_with_alert = 0
+        nodes_total = len(runner.graph.nodes)
         detection_step_val = None
 
         if not evil:
@@ -71,18 +75,15 @@ class Scenario2_ClassicDoubleSpend:
             runner.metrics.alerts_created += 1
             runner.graph.propagate_transaction(tx1, evil)
             runner.graph.propagate_transaction(tx2, evil)
-            for n in runner.graph.nodes.values():
-                if tx1.id in n.conflicting_tx_ids or tx2.id in n.conflicting_tx_ids:
-                    nodes_with_alert += 1
-                    if discovered_by is None:
-                        discovered_by = n.id
-                    if detection_step_val is None:
-                        detection_step_val = warmup + 2
+            # Узлы, пометившие конфликт, — из индекса оракула (без обхода сети)
+            conflict = runner.oracle.conflict(tx1.id)
+            nodes_with_alert = len(conflict.nodes)
+            nodes_total = len(runner.graph.nodes)  # на момент атаки: с входом/выходом узлов сеть меняется
             if nodes_with_alert > 0:
+                detection_step_val = warmup + 2
+                discovered_by = conflict.discovered_by
                 runner.metrics.record_detection(2.0)
                 runner.metrics.record_attack_result(False)
-                if runner.graph.alerts:
-                    discovered_by = next(iter(runner.graph.alerts.values())).discovered_by
             else:
                 runner.metrics.record_attack_result(True)
             evil_rep_after = round(evil.reputation, 2)
@@ -98,6 +99,7 @@ class Scenario2_ClassicDoubleSpend:
             "evil_reputation_after": evil_rep_after,
             "discovered_by": discovered_by,
             "nodes_with_alert": nodes_with_alert,
+            "nodes_total": nodes_total,
             "detection_step": detection_step_val,
         }
 
@@ -132,7 +134,6 @@ class Scenario3_QuantumDoubleSpend:
         evil_rep_before = round(first_evil.reputation, 2)
         evil_rep_after = evil_rep_before
         detection_step = None
-        nodes_with_alert_set = set()
         honest_ids = [n.id for n in runner.honest_nodes]
         for i, evil in enumerate(runner.evil_nodes):
             idx = (i * 2) % max(len(honest_ids), 1)
@@ -150,19 +151,17 @@ class Scenario3_QuantumDoubleSpend:
                 runner.metrics.alerts_created += 1
                 runner.graph.propagate_transaction(tx1, evil)
                 runner.graph.propagate_transaction(tx2, evil)
-                for n in runner.graph.nodes.values():
-                    if tx1.id in n.conflicting_tx_ids or tx2.id in n.conflicting_tx_ids:
-                        if detection_step is None:
-                            detection_step = attack_step + 3
-                        nodes_with_alert_set.add(n.id)
+                if detection_step is None and runner.oracle.conflict(tx1.id).nodes:
+                    detection_step = attack_step + 3
                 if detection_step is not None:
                     runner.metrics.record_detection(float(detection_step - attack_step))
                     runner.metrics.record_attack_result(False)
-                    runner.metrics.nodes_received_alert.append(len(nodes_with_alert_set))
+                    runner.metrics.nodes_received_alert.append(runner.oracle.flagged_nodes)
                 else:
                     runner.metrics.record_attack_result(True)
                 evil_rep_after = round(evil.reputation, 2)
-        nodes_with_alert = len(nodes_with_alert_set)
+        nodes_with_alert = runner.oracle.flagged_nodes
+        nodes_total = len(runner.graph.nodes)
         for step in range(attack_step + 1, steps):
             runner.step(step)
         if runner.evil_nodes:
@@ -175,6 +174,7 @@ class Scenario3_QuantumDoubleSpend:
             "runner": runner,
             "detection_step": detection_step,
             "nodes_with_alert": nodes_with_alert,
+            "nodes_total": nodes_total,
             "discovered_by": discovered_by,
             "evil_reputation_before": evil_rep_before,
             "evil_reputation_after": evil_rep_after,
@@ -182,7 +182,14 @@ class Scenario3_QuantumDoubleSpend:
 
 
 class Scenario4_SybilAttack:
-    """Сибил-атака с квантовым усилением: несколько злых узлов."""
+    """
+    Сибил-атака: злые узлы образуют плотный кластер, связанный с честной сетью немногими
+    рёбрами атаки, и накручивают репутацию транзакциями внутри кластера. Защита — детектор
+    на коротких случайных блужданиях из доверенных честных узлов (core/sybil.py): каждые
+    detect_interval шагов помеченные узлы получают минимальную репутацию. Размер карантина —
+    заданная доля сети (quarantine_fraction), а не истинное число сибил-узлов: оно используется
+    только для точности и полноты.
+    """
 
     def run(
         self,
@@ -190,6 +197,11 @@ class Scenario4_SybilAttack:
         num_sybil: int = 5,
         quantum_advantage: float = 0.7,
         steps: int = 500,
+        attack_edges: int = None,
+        sybil_tx_per_step: int = None,
+        detect_interval: int = 50,
+        num_seeds: int = None,
+        quarantine_fraction: float = None,
         **runner_kwargs,
     ) -> dict:
         runner = SimulationRunner(
@@ -198,7 +210,72 @@ class Scenario4_SybilAttack:
             quantum_advantage=quantum_advantage,
             **runner_kwargs,
         )
-        runner.build_network()
+        attack_edges = attack_edges if attack_edges is not None else max(1, num_sybil // 5)
+        runner.build_network(sybil_attack_edges=attack_edges)
+        sybils = runner.evil_nodes
+        sybil_tx_per_step = sybil_tx_per_step if sybil_tx_per_step is not None else min(len(sybils), runner.tx_per_step)
+        # Доверенные узлы защиты — небольшая выборка честных
+        num_seeds = num_seeds or max(3, len(runner.honest_nodes) // 100)
+        seeds = random.sample([n.id for n in runner.honest_nodes], min(num_seeds, len(runner.honest_nodes)))
+        detector = SybilDetector(seed=random.getrandbits(32))
+        if quarantine_fraction is None:
+            quarantine_fraction = SIMULATION_PARAMS.get("sybil_quarantine_fraction", 0.1)
+        min_rep = REPUTATION_PARAMS.get("min_reputation", 0.01)
+        rep_before = None
+        rounds = []
         for step in range(steps):
             runner.step(step)
-        return {"summary": runner.metrics.get_summary(), "runner": runner}
+            # Накрутка: сибил-узлы переводят средства друг другу и получают награды за пересылку
+            if len(sybils) > 1:
+                farmed = []
+                for sender in random.sample(sybils, min(sybil_tx_per_step, len(sybils))):
+                    receiver = random.choice([n for n in sybils if n is not sender])
+                    tx = sender.create_transaction(receiver.id, 0.01)
+                    if tx:
+                        farmed.append((tx, sender))
+                if runner.vectorized_propagation:
+                    runner.graph.propagate_batch(farmed)
+                else:
+                    for tx, sender in farmed:
+                        runner.graph.propagate_transaction(tx, sender)
+            if (detect_interval and (step + 1) % detect_interval == 0) or step == steps - 1:
+                if rep_before is None:
+                    rep_before = _mean_reputation(sybils)
+                rounds.append(self._detect(runner, detector, seeds, min_rep, quarantine_fraction))
+        last = rounds[-1] if rounds else {}
+        runner.metrics.sybil_detection = dict(
+            last,
+            rounds=len(rounds),
+            attack_edges=attack_edges,
+            quarantine_fraction=quarantine_fraction,
+            sybil_reputation_before=rep_before or 0.0,
+            sybil_reputation_after=_mean_reputation(sybils),
+            honest_reputation=_mean_reputation(runner.honest_nodes),
+        )
+        return {"summary": runner.metrics.get_summary(), "runner": runner, "detection_rounds": rounds}
+
+    @staticmethod
+    def _detect(
+        runner: SimulationRunner, detector: SybilDetector, seeds: List[str], min_rep: float, fraction: float
+    ) -> dict:
+        """Один раунд защиты: ранжирование блужданиями, метка нижней доли fraction узлов, карантин по репутации."""
+        node_ids, indptr, indices = runner.graph.csr()
+        index = {nid: i for i, nid in enumerate(node_ids)}
+        # Размер карантина защита знает только из настроек: истинная разметка ей недоступна
+        num_flag = int(round(fraction * (len(node_ids) - len(seeds))))
+        flagged = detector.detect(indptr, indices, [index[nid] for nid in seeds], num_flag)
+        for i in flagged.tolist():
+            runner.graph.nodes[node_ids[i]].reputation = min_rep
+        is_sybil = np.zeros(len(node_ids), dtype=bool)
+        is_sybil[[index[n.id] for n in runner.evil_nodes]] = True
+        precision, recall = precision_recall(flagged, is_sybil)
+        return {
+            "precision": precision,
+            "recall": recall,
+            "flagged": int(len(flagged)),
+            "runtime_ms": 1000.0 * detector.last_runtime,
+        }
+
+
+def _mean_reputation(nodes: List[Node]) -> float:
+    return sum(n.reputation for n in nodes) / len(nodes) if nodes else 0.0
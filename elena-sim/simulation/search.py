@@ -0,0 +1,228 @@
+"""
+Адаптивный поиск границы успеха атаки в пространстве параметров защиты.
+Вместо полной сетки прогоны тратятся только рядом с границей «атака удалась / не удалась»:
+бисекция по одной оси, последовательное деление пополам по списку конфигураций
+и (по желанию) суррогат на гауссовском процессе с выбором точек по критерию straddle.
+Исход точки — доля прогонов (по зёрнам), в которых метрика переходит порог.
+"""
+
+import csv
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Оси поиска и их допустимые диапазоны по умолчанию
+SEARCH_AXES: Dict[str, Tuple[float, float]] = {
+    "quantum": (0.0, 1.0),
+    "chaff_prob": (0.0, 0.3),
+    "rewiring_prob": (0.0, 0.5),
+    "rewiring_interval": (0, 400),
+}
+INTEGER_AXES = ("rewiring_interval",)
+
+
+class BoundarySearch:
+    """Исследует пространство параметров, вызывая evaluate(config, seed) -> метрики прогона."""
+
+    def __init__(
+        self,
+        evaluate: Callable[[Dict[str, Any], int], Dict[str, Any]],
+        base_config: Optional[Dict[str, Any]] = None,
+        metric: str = "successful_attack",
+        threshold: float = 0.5,
+        above: bool = True,
+        replicates: int = 3,
+        base_seed: int = 0,
+    ):
+        self.evaluate = evaluate
+        self.base_config = dict(base_config or {})
+        self.metric = metric
+        self.threshold = threshold
+        self.above = above
+        self.replicates = replicates
+        self.base_seed = base_seed
+        self.points: List[Dict[str, Any]] = []
+        self._outcomes: Dict[tuple, List[int]] = {}
+
+    # --- прогоны ---
+
+    def _config(self, values: Dict[str, float]) -> Dict[str, Any]:
+        config = dict(self.base_config)
+        for axis, value in values.items():
+            config[axis] = int(round(value)) if axis in INTEGER_AXES else round(float(value), 6)
+        return config
+
+    def _success(self, metrics: Dict[str, Any]) -> int:
+        value = float(metrics.get(self.metric, 0))
+        return int(value >= self.threshold if self.above else value <= self.threshold)
+
+    def rate(self, values: Dict[str, float], replicates: Optional[int] = None) -> float:
+        """Доля успешных атак в точке; недостающие прогоны (новые зёрна) досчитываются."""
+        config = self._config(values)
+        key = tuple(sorted(config.items()))
+        outcomes = self._outcomes.setdefault(key, [])
+        needed = replicates or self.replicates
+        while len(outcomes) < needed:
+            seed = self.base_seed + len(outcomes)
+            metrics = self.evaluate(config, seed)
+            success = self._success(metrics)
+            outcomes.append(success)
+            self.points.append(dict(config, seed=seed, success=success, **{self.metric: metrics.get(self.metric)}))
+        return sum(outcomes[:needed]) / needed
+
+    @property
+    def runs(self) -> int:
+        return len(self.points)
+
+    # --- стратегии ---
+
+    def bisect(self, axis: str, lo: float, hi: float, tol: float) -> Dict[str, Any]:
+        """Бисекция по оси axis: граница между концами с разным исходом (None — исход одинаков)."""
+        start_runs = self.runs
+        success_lo = self.rate({axis: lo}) >= 0.5
+        success_hi = self.rate({axis: hi}) >= 0.5
+        boundary = None
+        if success_lo != success_hi:
+            a, b = lo, hi
+            while abs(b - a) > tol:
+                mid = (a + b) / 2
+                if axis in INTEGER_AXES and int(round(mid)) in (int(round(a)), int(round(b))):
+                    break
+                if (self.rate({axis: mid}) >= 0.5) == success_lo:
+                    a = mid
+                else:
+                    b = mid
+            boundary = (a + b) / 2
+        grid_points = int(math.ceil(abs(hi - lo) / tol)) + 1
+        return {
+            "strategy": "bisect",
+            "axis": axis,
+            "range": [lo, hi],
+            "tol": tol,
+            "success_at_lo": success_lo,
+            "success_at_hi": success_hi,
+            "boundary": boundary,
+            "runs": self.runs - start_runs,
+            "grid_runs": grid_points * self.replicates,
+        }
+
+    def halving(self, candidates: Sequence[Dict[str, float]], max_replicates: int = 24) -> Dict[str, Any]:
+        """
+        Последовательное деление пополам: все конфигурации получают немного прогонов,
+        дальше проходит половина с исходом ближе к 0.5 (к границе), а число прогонов удваивается.
+        """
+        start_runs = self.runs
+        alive = list(candidates)
+        replicates = self.replicates
+        rounds = []
+        while True:
+            scored = sorted(((abs(self.rate(c, replicates) - 0.5), i) for i, c in enumerate(alive)))
+            rounds.append({"replicates": replicates, "alive": len(alive)})
+            if len(alive) == 1 or replicates * 2 > max_replicates:
+                break
+            alive = [alive[i] for _, i in scored[: int(math.ceil(len(alive) / 2))]]
+            replicates *= 2
+        ranking = [dict(self._config(c), rate=self.rate(c, replicates)) for c in alive]
+        ranking.sort(key=lambda r: abs(r["rate"] - 0.5))
+        return {
+            "strategy": "halving",
+            "rounds": rounds,
+            "nearest_boundary": ranking,
+            "runs": self.runs - start_runs,
+            "grid_runs": len(candidates) * max_replicates,
+        }
+
+    def surrogate(
+        self,
+        axes: Dict[str, Tuple[float, float]],
+        budget: int = 30,
+        initial: int = 6,
+        length_scale: float = 0.25,
+        noise: float = 0.05,
+        candidates: int = 512,
+        seed: int = 0,
+        grid_resolution: int = 11,
+    ) -> Dict[str, Any]:
+        """
+        Гауссовский процесс по долям успеха в нормированном кубе осей. Следующая точка —
+        максимум straddle = 1.96·σ − |μ − 0.5| (неопределённость рядом с границей).
+        budget — число исследованных точек (каждая по replicates прогонов).
+        """
+        start_runs = self.runs
+        rng = np.random.default_rng(seed)
+        names = list(axes)
+        lows = np.array([axes[a][0] for a in names], dtype=float)
+        spans = np.array([axes[a][1] - axes[a][0] for a in names], dtype=float)
+        xs: List[np.ndarray] = []
+        ys: List[float] = []
+
+        def observe(u: np.ndarray) -> None:
+            xs.append(u)
+            ys.append(self.rate(dict(zip(names, lows + u * spans))))
+
+        for u in rng.random((min(initial, budget), len(names))):
+            observe(u)
+        pool = rng.random((candidates, len(names)))
+        while True:
+            mu, sigma = _gp_predict(np.array(xs), np.array(ys), pool, length_scale, noise)
+            if len(xs) >= budget:
+                break
+            observe(pool[int(np.argmax(1.96 * sigma - np.abs(mu - 0.5)))])
+        near = np.argsort(np.abs(mu - 0.5))[:10]
+        boundary = [
+            dict(self._config(dict(zip(names, lows + pool[i] * spans))), predicted_rate=float(mu[i]), sigma=float(sigma[i]))
+            for i in near
+            if abs(mu[i] - 0.5) < 0.25
+        ]
+        return {
+            "strategy": "surrogate",
+            "axes": {a: list(axes[a]) for a in names},
+            "points": len(xs),
+            "boundary": boundary,
+            "runs": self.runs - start_runs,
+            "grid_runs": grid_resolution ** len(names) * self.replicates,
+        }
+
+    # --- результаты ---
+
+    def save(self, output_dir: str, summary: Dict[str, Any]) -> Tuple[str, str]:
+        """Пишет все прогоны (search_points.csv) и оценку границы (boundary.json)."""
+        os.makedirs(output_dir, exist_ok=True)
+        points_path = os.path.join(output_dir, "search_points.csv")
+        fields: List[str] = []
+        for p in self.points:
+            fields.extend(k for k in p if k not in fields)
+        with open(points_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            w.writerows(self.points)
+        boundary_path = os.path.join(output_dir, "boundary.json")
+        with open(boundary_path, "w", encoding="utf-8") as f:
+            json.dump(
+                dict(summary, metric=self.metric, threshold=self.threshold, above=self.above,
+                     replicates=self.replicates, base_config=self.base_config, total_runs=self.runs),
+                f, ensure_ascii=False, indent=2,
+            )
+        return points_path, boundary_path
+
+
+def _gp_predict(
+    x: np.ndarray, y: np.ndarray, query: np.ndarray, length_scale: float, noise: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Апостериорные среднее и σ гауссовского процесса (RBF-ядро, априорное среднее — среднее y)."""
+    def kernel(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1)
+        return np.exp(-0.5 * d2 / length_scale ** 2)
+
+    prior = y.mean()
+    k = kernel(x, x) + noise ** 2 * np.eye(len(x))
+    chol = np.linalg.cholesky(k)
+    alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, y - prior))
+    k_star = kernel(query, x)
+    mu = prior + k_star @ alpha
+    v = np.linalg.solve(chol, k_star.T)
+    var = np.clip(1.0 - (v ** 2).sum(axis=0), 1e-12, None)
+    return mu, np.sqrt(var)
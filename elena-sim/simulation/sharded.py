@@ -0,0 +1,500 @@
+"""
+Шардированная симуляция на нескольких процессах.
+Топология делится на K шардов (минимальный разрез), каждый шард — отдельный процесс
+со своими узлами. Внутри шарда распространение мгновенное, как в SimulationRunner;
+сообщения через границу шарда копятся и передаются пакетами на границе шага
+через очереди в разделяемой памяти (ShmMailbox). В конце метрики шардов сливаются.
+Ограничения: только честная нагрузка (сценарий 1); rewiring — внутри шарда.
+"""
+
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import random
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core import Node, QuantumEvilNode, NetworkGraph, wire
+from core.crypto import get_backend, set_backend, verify_signature
+from core.topology import generate_edges, edges_to_csr
+from config import SIMULATION_PARAMS, REPUTATION_PARAMS
+from .metrics import MetricsCollector
+from .partition import partition_graph, partition_stats
+
+_SLOT_HEADER = struct.Struct("<Q")
+_CONTROL = struct.Struct("<QQ")  # (есть продолжение, отправлено байт за обмен)
+_RECORDS_LEN = struct.Struct("<I")  # длина записей хранилища подписей перед пакетом сообщений
+
+
+class ShmMailbox:
+    """
+    Почтовые ящики K×K в одном сегменте разделяемой памяти: слот (src, dst) фиксированной ёмкости.
+    exchange() — коллективная операция всех шардов: пакеты больше слота передаются
+    в несколько раундов, синхронизация — барьером.
+    """
+
+    def __init__(self, num_shards: int, slot_size: int = 1 << 20, name: Optional[str] = None):
+        self.num_shards = num_shards
+        self.slot_size = slot_size
+        self._control_offset = num_shards * num_shards * slot_size
+        size = self._control_offset + num_shards * _CONTROL.size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+
+    def _slot(self, src: int, dst: int) -> int:
+        return (src * self.num_shards + dst) * self.slot_size
+
+    def exchange(self, shard: int, outgoing: Dict[int, bytes], barrier) -> Tuple[Dict[int, bytes], bool]:
+        """
+        Отправляет outgoing[dst] всем шардам и получает их пакеты для shard.
+        Возвращает (src -> байты, отправлял ли кто-нибудь хоть что-то).
+        """
+        buf = self.shm.buf
+        capacity = self.slot_size - _SLOT_HEADER.size
+        pending = {dst: memoryview(data) for dst, data in outgoing.items() if data}
+        received: Dict[int, bytearray] = {}
+        sent_total = sum(len(v) for v in pending.values())
+        anyone_sent = False
+        first_round = True
+        while True:
+            for dst in range(self.num_shards):
+                chunk = pending.get(dst)
+                off = self._slot(shard, dst)
+                if chunk is None or len(chunk) == 0:
+                    _SLOT_HEADER.pack_into(buf, off, 0)
+                    continue
+                part = chunk[:capacity]
+                _SLOT_HEADER.pack_into(buf, off, len(part))
+                buf[off + _SLOT_HEADER.size : off + _SLOT_HEADER.size + len(part)] = part
+                pending[dst] = chunk[capacity:]
+            more = any(len(v) for v in pending.values())
+            _CONTROL.pack_into(buf, self._control_offset + shard * _CONTROL.size, int(more), sent_total)
+            barrier.wait()
+            any_more = False
+            for src in range(self.num_shards):
+                off = self._slot(src, shard)
+                (length,) = _SLOT_HEADER.unpack_from(buf, off)
+                if length:
+                    received.setdefault(src, bytearray()).extend(buf[off + _SLOT_HEADER.size : off + _SLOT_HEADER.size + length])
+                flag, sent = _CONTROL.unpack_from(buf, self._control_offset + src * _CONTROL.size)
+                any_more = any_more or bool(flag)
+                if first_round and sent:
+                    anyone_sent = True
+            barrier.wait()
+            first_round = False
+            if not any_more:
+                break
+        return {src: bytes(data) for src, data in received.items()}, anyone_sent
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RemotePeer:
+    """Заместитель узла из другого шарда: доставка в него — сообщение в исходящий пакет."""
+
+    def __init__(self, node_id: str, shard: int, outbox: "ShardOutbox"):
+        self.id = node_id
+        self.shard = shard
+        self.peers: List[Node] = []  # рёбра хранятся у шарда-владельца
+        self.reputation = REPUTATION_PARAMS.get("initial_reputation", 0.5)
+        self.is_remote = True
+        self._outbox = outbox
+
+    def receive_transaction(self, tx) -> bool:
+        self._outbox.send(self.shard, ("tx", self.id, tx))
+        return False  # распространение продолжит шард-владелец
+
+    def receive_alert(self, alert) -> None:
+        self._outbox.send(self.shard, ("alert", self.id, alert))
+
+
+class ShardOutbox:
+    """Исходящие сообщения шарда до ближайшей границы шага (с дедупликацией в пределах шага)."""
+
+    def __init__(self, num_shards: int):
+        self.batches: List[list] = [[] for _ in range(num_shards)]
+        self._sent: set = set()
+
+    def send(self, shard: int, message: tuple) -> None:
+        key = (message[0], message[1], message[2].id)
+        if key in self._sent:
+            return
+        self._sent.add(key)
+        self.batches[shard].append(message)
+
+    def drain(self) -> List[list]:
+        batches = self.batches
+        self.batches = [[] for _ in batches]
+        self._sent = set()
+        return batches
+
+
+class ShardGraph(NetworkGraph):
+    """Граф одного шарда: локальные узлы, заместители чужих и каталог открытых ключей сети."""
+
+    def __init__(self, shard: int, num_shards: int):
+        super().__init__()
+        self.shard = shard
+        self.outbox = ShardOutbox(num_shards)
+        self.remote_keys: Dict[str, str] = {}
+        self.remote_peers: Dict[str, RemotePeer] = {}
+
+    def add_remote_edge(self, local_id: str, remote_id: str, remote_shard: int) -> None:
+        """Ребро к узлу другого шарда (хранится только на локальной стороне)."""
+        proxy = self.remote_peers.get(remote_id)
+        if proxy is None:
+            proxy = RemotePeer(remote_id, remote_shard, self.outbox)
+            self.remote_peers[remote_id] = proxy
+        node = self.nodes[local_id]
+        if proxy not in node.peers:
+            node.peers.append(proxy)
+
+    def verify_transaction(self, tx) -> bool:
+        if tx.from_id in self.nodes:
+            return super().verify_transaction(tx)
+        public_key = self.remote_keys.get(tx.from_id)
+        if public_key is None:
+            return False
+        self.signature_checks += 1
+        return verify_signature(tx.content_for_signature(), tx.signature, public_key)
+
+    def public_key_of(self, node_id: str) -> Optional[str]:
+        node = self.nodes.get(node_id)
+        return node.public_key if node is not None else self.remote_keys.get(node_id)
+
+    def rewire_peers(self, rewiring_prob: float = 0.1) -> None:
+        """Rewiring только среди локальных рёбер: рёбра через границу шарда фиксированы."""
+        node_ids = list(self.nodes.keys())
+        if len(node_ids) < 3:
+            return
+        for nid in node_ids:
+            node = self.nodes[nid]
+            local_peers = [p for p in node.peers if not getattr(p, "is_remote", False)]
+            if not local_peers or random.random() > rewiring_prob:
+                continue
+            peer = random.choice(local_peers)
+            node.peers.remove(peer)
+            peer.peers.remove(node)
+            self._topology_version += 1
+            for _ in range(16):
+                other = random.choice(node_ids)
+                if other != nid and self.nodes[other] not in node.peers:
+                    self.add_edge(nid, other)
+                    break
+
+    def generate_chaff(self, prob: float = 0.05, all_ids: Optional[List[str]] = None) -> None:
+        """Chaff от локальных узлов к случайным узлам всей сети."""
+        targets = all_ids or list(self.nodes.keys())
+        for node in list(self.nodes.values()):
+            if getattr(node, "is_evil", False) or random.random() > prob:
+                continue
+            to_id = random.choice(targets)
+            if to_id == node.id:
+                continue
+            tx = node.create_transaction(to_id, 0.01)
+            if tx:
+                tx.is_chaff = True
+                self.propagate_transaction(tx, node)
+
+    def encode_outgoing(self) -> Dict[int, bytes]:
+        """
+        Кодирует исходящие пакеты: [u32 длина][pickle записей подписей][адресный пакет core.wire].
+        Записи хранилища подписей прикладываются только для бэкендов без проверки по открытому ключу.
+        """
+        backend = get_backend()
+        out: Dict[int, bytes] = {}
+        for shard, batch in enumerate(self.outbox.drain()):
+            if not batch:
+                continue
+            records = []
+            if not backend.stateless_verify:
+                for kind, _, payload in batch:
+                    if kind == "tx":
+                        record = backend.export_signature(
+                            payload.content_for_signature(), self.public_key_of(payload.from_id) or ""
+                        )
+                        if record is not None:
+                            records.append(record)
+            header = pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL) if records else b""
+            body = wire.encode_batch((payload for _, _, payload in batch), routes=[node_id for _, node_id, _ in batch])
+            out[shard] = _RECORDS_LEN.pack(len(header)) + header + body
+        return out
+
+    def deliver_incoming(self, incoming: Dict[int, bytes]) -> int:
+        """Доставляет пакеты других шардов локальным узлам; возвращает число сообщений."""
+        backend = get_backend()
+        delivered = 0
+        for src in sorted(incoming):
+            data = memoryview(incoming[src])
+            (records_len,) = _RECORDS_LEN.unpack_from(data)
+            if records_len:
+                for record in pickle.loads(data[_RECORDS_LEN.size : _RECORDS_LEN.size + records_len]):
+                    backend.import_signature(record)
+            for node_id, body in wire.iter_batch(data[_RECORDS_LEN.size + records_len :]):
+                node = self.nodes.get(node_id)
+                if node is None:
+                    continue
+                delivered += 1
+                if wire.message_kind(body) == wire.KIND_TX:
+                    node.receive_transaction(wire.decode_transaction(body))
+                else:
+                    node.receive_alert(wire.decode_alert(body))
+        return delivered
+
+
+def _shard_worker(
+    shard: int,
+    num_shards: int,
+    node_ids: List[str],
+    num_evil: int,
+    parts: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    params: dict,
+    mailbox_name: str,
+    slot_size: int,
+    barrier,
+    results,
+) -> None:
+    """Процесс шарда: строит свои узлы, выполняет шаги в такт с остальными, отдаёт метрики."""
+    seed = params.get("seed")
+    random.seed(None if seed is None else seed * 1000 + shard)
+    rng = np.random.default_rng(None if seed is None else seed * 1000 + shard)
+    set_backend(params["crypto_backend"])
+    mailbox = ShmMailbox(num_shards, slot_size, name=mailbox_name)
+    try:
+        graph = ShardGraph(shard, num_shards)
+        initial_rep = REPUTATION_PARAMS.get("initial_reputation", 0.5)
+        local = np.flatnonzero(parts == shard)
+        honest_count = len(node_ids) - num_evil
+        for i in local:
+            if i >= honest_count:
+                node = QuantumEvilNode(node_ids[i], quantum_advantage=params["quantum_advantage"])
+                node.reputation = min(initial_rep + 0.01, 0.6)
+            else:
+                node = Node(node_ids[i], initial_reputation=initial_rep)
+            graph.add_node(node)
+        for i in local:
+            for j in indices[indptr[i] : indptr[i + 1]]:
+                if parts[j] == shard:
+                    if i < j:
+                        graph.add_edge(node_ids[i], node_ids[j])
+                else:
+                    graph.add_remote_edge(node_ids[i], node_ids[j], int(parts[j]))
+
+        # Обмен каталогом открытых ключей
+        keys = pickle.dumps({nid: n.public_key for nid, n in graph.nodes.items()})
+        incoming, _ = mailbox.exchange(shard, {dst: keys for dst in range(num_shards) if dst != shard}, barrier)
+        for data in incoming.values():
+            graph.remote_keys.update(pickle.loads(data))
+
+        total = len(node_ids)
+        local_nodes = list(graph.nodes.values())
+        share = len(local_nodes) / total if total else 0.0
+        tx_per_step = params["tx_per_step"]
+        throughput: List[int] = []
+        rep_sums: List[float] = []
+        bytes_per_step: List[int] = []
+        cross_messages = 0
+        bytes_recorded = 0
+        for step_id in range(params["steps"]):
+            messages = 0
+            for _ in range(int(rng.binomial(tx_per_step, share)) if local_nodes else 0):
+                sender = local_nodes[int(rng.integers(len(local_nodes)))]
+                j = int(rng.integers(total - 1))
+                receiver_id = node_ids[j if node_ids[j] != sender.id else total - 1]
+                amount = round(random.uniform(1.0, 50.0), 2)
+                tx = sender.create_transaction(receiver_id, amount)
+                if tx:
+                    graph.propagate_transaction(tx, sender)
+                    messages += len(sender.peers) + 1
+            chaff_prob = params["chaff_prob"]
+            if chaff_prob > 0 and random.random() < chaff_prob * len(local_nodes):
+                graph.generate_chaff(chaff_prob, node_ids)
+                messages += 10
+            interval = params["rewiring_interval"]
+            if interval > 0 and step_id > 0 and step_id % interval == 0:
+                graph.rewire_peers(params["rewiring_prob"])
+            for node in local_nodes:
+                node.step_decay()
+            # Граница шага: пакетный обмен сообщениями между шардами
+            incoming, _ = mailbox.exchange(shard, graph.encode_outgoing(), barrier)
+            cross_messages += graph.deliver_incoming(incoming)
+            throughput.append(messages)
+            rep_sums.append(sum(n.reputation for n in local_nodes))
+            bytes_per_step.append(graph.bytes_delivered - bytes_recorded)
+            bytes_recorded = graph.bytes_delivered
+        # Досылка: обмены до тишины во всех шардах
+        while True:
+            incoming, anyone_sent = mailbox.exchange(shard, graph.encode_outgoing(), barrier)
+            cross_messages += graph.deliver_incoming(incoming)
+            if not anyone_sent:
+                break
+        results.put({
+            "shard": shard,
+            "nodes": len(local_nodes),
+            "tx_throughput": throughput,
+            "reputation_sums": rep_sums,
+            "bytes_per_step": bytes_per_step,
+            "reputations": {nid: n.reputation for nid, n in graph.nodes.items()},
+            "transactions_created": sum(len(n.my_transactions) for n in local_nodes),
+            "alert_ids": list(graph.alerts.keys()),
+            "messages_delivered": graph.messages_delivered,
+            "cross_shard_messages": cross_messages,
+            "signature_bytes": graph.signature_bytes,
+            "signature_checks": graph.signature_checks,
+            "modeled_verify_time_ms": graph.modeled_verify_time_ms(),
+        })
+    finally:
+        mailbox.close()
+
+
+class ShardedSimulationRunner:
+    """
+    Шардированная версия SimulationRunner: топология из generate_edges разбивается
+    на num_shards шардов, каждый выполняется в своём процессе.
+    """
+
+    def __init__(
+        self,
+        num_nodes: int = None,
+        num_shards: int = None,
+        num_evil: int = 0,
+        quantum_advantage: float = None,
+        rewiring_interval: int = None,
+        rewiring_prob: float = None,
+        chaff_prob: float = None,
+        tx_per_step: int = None,
+        crypto_backend: str = None,
+        seed: Optional[int] = None,
+        slot_size: int = 1 << 20,
+    ):
+        params = SIMULATION_PARAMS
+        self.num_nodes = num_nodes or params["num_nodes"]
+        self.num_shards = max(1, min(num_shards or os.cpu_count() or 1, self.num_nodes))
+        self.num_evil = num_evil
+        self.quantum_advantage = quantum_advantage or params["quantum_advantage"]
+        self.rewiring_interval = rewiring_interval if rewiring_interval is not None else params["rewiring_interval"]
+        self.rewiring_prob = rewiring_prob if rewiring_prob is not None else 0.1
+        self.chaff_prob = chaff_prob if chaff_prob is not None else params["chaff_probability"]
+        self.tx_per_step = tx_per_step or params["tx_per_step"]
+        self.crypto_backend = crypto_backend or params.get("crypto_backend", "sha512")
+        self.seed = seed
+        self.slot_size = slot_size
+        self.metrics = MetricsCollector()
+        self.metrics.crypto_backend = self.crypto_backend
+        self.node_ids: List[str] = []
+        self.indptr: Optional[np.ndarray] = None
+        self.indices: Optional[np.ndarray] = None
+        self.parts: Optional[np.ndarray] = None
+        self.partition: Dict[str, object] = {}
+        self.stats: Dict[str, object] = {}
+
+    def build_network(self) -> None:
+        """Генерирует топологию (как SimulationRunner.build_network) и разбивает её на шарды."""
+        honest = self.num_nodes - self.num_evil
+        self.node_ids = [f"node_{i}" for i in range(honest)] + [
+            f"evil_{i}" if self.num_evil > 1 else "evil_0" for i in range(self.num_evil)
+        ]
+        rng = random.Random(self.seed)
+        edges = generate_edges(
+            self.num_nodes,
+            SIMULATION_PARAMS.get("peer_degree_min", 3),
+            SIMULATION_PARAMS.get("peer_degree_max", 10),
+            rng=rng,
+        )
+        self.indptr, self.indices = edges_to_csr(self.num_nodes, edges)
+        self.parts = partition_graph(self.indptr, self.indices, self.num_shards, seed=self.seed)
+        self.partition = partition_stats(self.indptr, self.indices, self.parts)
+
+    def run(self, steps: int) -> dict:
+        """Запускает шарды на steps шагов и возвращает слитую сводку метрик."""
+        if self.parts is None:
+            self.build_network()
+        ctx = mp.get_context()
+        mailbox = ShmMailbox(self.num_shards, self.slot_size)
+        barrier = ctx.Barrier(self.num_shards)
+        results = ctx.Queue()
+        params = {
+            "steps": steps,
+            "seed": self.seed,
+            "tx_per_step": self.tx_per_step,
+            "chaff_prob": self.chaff_prob,
+            "rewiring_interval": self.rewiring_interval,
+            "rewiring_prob": self.rewiring_prob,
+            "quantum_advantage": self.quantum_advantage,
+            "crypto_backend": self.crypto_backend,
+        }
+        procs = [
+            ctx.Process(
+                target=_shard_worker,
+                args=(
+                    shard, self.num_shards, self.node_ids, self.num_evil, self.parts,
+                    self.indptr, self.indices, params, mailbox.name, self.slot_size, barrier, results,
+                ),
+                daemon=True,
+            )
+            for shard in range(self.num_shards)
+        ]
+        start = time.perf_counter()
+        shard_results: List[dict] = []
+        try:
+            for p in procs:
+                p.start()
+            while len(shard_results) < self.num_shards:
+                try:
+                    shard_results.append(results.get(timeout=1.0))
+                except queue.Empty:
+                    failed = [p for p in procs if p.exitcode not in (None, 0)]
+                    if failed:
+                        barrier.abort()
+                        raise RuntimeError(f"Шард завершился с ошибкой (код {failed[0].exitcode})")
+            for p in procs:
+                p.join()
+        finally:
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+            mailbox.close()
+        elapsed = time.perf_counter() - start
+        self._merge(shard_results, steps)
+        self.stats = {
+            "num_shards": self.num_shards,
+            "elapsed_sec": elapsed,
+            "steps_per_sec": steps / elapsed if elapsed else 0.0,
+            "cross_shard_messages": sum(r["cross_shard_messages"] for r in shard_results),
+            "transactions": sum(r["transactions_created"] for r in shard_results),
+            **self.partition,
+        }
+        return {"summary": self.metrics.get_summary(), "sharding": self.stats}
+
+    def _merge(self, shard_results: List[dict], steps: int) -> None:
+        """Сливает метрики шардов в один MetricsCollector."""
+        m = self.metrics
+        total_nodes = sum(r["nodes"] for r in shard_results) or 1
+        for i in range(steps):
+            m.record_throughput(sum(r["tx_throughput"][i] for r in shard_results))
+            m.record_avg_reputation(sum(r["reputation_sums"][i] for r in shard_results) / total_nodes)
+            m.record_bandwidth(sum(r["bytes_per_step"][i] for r in shard_results))
+            m.end_step(i)
+        reputations: Dict[str, float] = {}
+        for r in shard_results:
+            reputations.update(r["reputations"])
+        m.record_reputation_snapshot(steps - 1, reputations)
+        m.alerts_created = len({a for r in shard_results for a in r["alert_ids"]})
+        m.signature_bytes = sum(r["signature_bytes"] for r in shard_results)
+        m.signature_checks = sum(r["signature_checks"] for r in shard_results)
+        m.modeled_verify_time_ms = sum(r["modeled_verify_time_ms"] for r in shard_results)
@@ -0,0 +1,223 @@
+"""
+Потоковые метрики: онлайн-агрегаты по шагам и запись пошаговых записей на диск по ходу прогона.
+Агрегаты (SeriesStats) — среднее/дисперсия по Уэлфорду, сумма, min/max и квантильный
+скетч с логарифмическими корзинами (относительная ошибка alpha, память O(log диапазона)).
+Приёмники (JSONL и сжатые NPZ-чанки) пишут записи шагов чанками: при падении прогона
+всё, что попало в закрытые чанки, остаётся на диске.
+"""
+
+import atexit
+import gzip
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .replication import RunningStat
+
+
+class QuantileSketch:
+    """Квантили с относительной ошибкой alpha: корзина i хранит значения из (γ^(i−1), γ^i], γ = (1+α)/(1−α)."""
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        if x == 0:
+            self.zeros += 1
+            return
+        buckets = self.positive if x > 0 else self.negative
+        key = math.ceil(math.log(abs(x)) / self._log_gamma)
+        buckets[key] = buckets.get(key, 0) + 1
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class SeriesStats:
+    """Онлайн-агрегаты пошагового ряда без хранения значений."""
+
+    def __init__(self, alpha: float = 0.01):
+        self.running = RunningStat()
+        self.sketch = QuantileSketch(alpha)
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def add(self, x: float) -> None:
+        x = float(x)
+        self.running.push(x)
+        self.sketch.add(x)
+        self.total += x
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        self.last = x
+
+    @property
+    def count(self) -> int:
+        return self.running.n
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.running.mean,
+            "std": self.running.std,
+            "min": self.min,
+            "max": self.max,
+            "sum": self.total,
+            "p50": self.sketch.quantile(0.5),
+            "p95": self.sketch.quantile(0.95),
+            "p99": self.sketch.quantile(0.99),
+        }
+
+
+# --- приёмники ---
+
+
+class MetricsSink:
+    """Приёмник пошаговых записей: write() на каждый шаг, close() в конце прогона."""
+
+    def __init__(self, directory: str, chunk_steps: int = 256):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_steps = chunk_steps
+        self.chunks = 0
+        self.records = 0
+        atexit.register(self.close)  # незакрытый чанк дописывается и при выходе без close()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Дописывает незакрытый чанк."""
+
+    def _chunk_path(self, suffix: str) -> Path:
+        return self.directory / f"metrics_{self.chunks:05d}{suffix}"
+
+
+class JsonlSink(MetricsSink):
+    """Строка JSON на шаг; новый файл каждые chunk_steps шагов (gzip при compress)."""
+
+    def __init__(self, directory: str, chunk_steps: int = 1000, compress: bool = False):
+        super().__init__(directory, chunk_steps)
+        self.compress = compress
+        self._file = None
+        self._in_chunk = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            path = self._chunk_path(".jsonl.gz" if self.compress else ".jsonl")
+            self._file = gzip.open(path, "wt", encoding="utf-8") if self.compress else open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if not self.compress:
+            self._file.flush()  # целые строки на диске сразу — после падения читается всё до последнего шага
+        self.records += 1
+        self._in_chunk += 1
+        if self._in_chunk >= self.chunk_steps:
+            self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.chunks += 1
+            self._in_chunk = 0
+
+
+class NpzSink(MetricsSink):
+    """
+    Колонки шагов в сжатых .npz по chunk_steps шагов. Вектор репутаций шага хранится как строка
+    float32-матрицы; при смене состава узлов чанк закрывается досрочно. Чанк пишется во временный
+    файл и атомарно переименовывается — на диске только целые чанки.
+    """
+
+    def __init__(self, directory: str, chunk_steps: int = 256):
+        super().__init__(directory, chunk_steps)
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._rows and len(record.get("reputations") or ()) != len(self._rows[0].get("reputations") or ()):
+            self.close()
+        self._rows.append(record)
+        self.records += 1
+        if len(self._rows) >= self.chunk_steps:
+            self.close()
+
+    def close(self) -> None:
+        if not self._rows:
+            return
+        columns: Dict[str, np.ndarray] = {}
+        for key in self._rows[0]:
+            values = [row.get(key) for row in self._rows]
+            if key == "reputations":
+                columns[key] = np.asarray(values, dtype=np.float32)
+            elif all(isinstance(v, (int, float)) for v in values):
+                columns[key] = np.asarray(values, dtype=np.float64)
+        path = self._chunk_path(".npz")
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp, **columns)
+        os.replace(tmp, path)
+        self.chunks += 1
+        self._rows = []
+
+
+SINKS = {"jsonl": JsonlSink, "npz": NpzSink}
+
+
+def make_sink(kind: str, directory: str, chunk_steps: Optional[int] = None) -> MetricsSink:
+    if kind not in SINKS:
+        raise ValueError(f"Неизвестный приёмник метрик: {kind} (доступны: {', '.join(SINKS)})")
+    return SINKS[kind](directory) if chunk_steps is None else SINKS[kind](directory, chunk_steps=chunk_steps)
+
+
+def iter_records(directory: str) -> Iterator[Dict[str, Any]]:
+    """Пошаговые записи из каталога приёмника (JSONL или NPZ) в порядке чанков."""
+    for path in sorted(Path(directory).glob("metrics_*")):
+        name = path.name
+        if name.endswith(".tmp.npz"):
+            continue
+        if name.endswith(".npz"):
+            with np.load(path) as data:
+                columns = {k: data[k] for k in data.files}
+            for i in range(len(next(iter(columns.values())))):
+                yield {k: (v[i].tolist() if v.ndim > 1 else v[i].item()) for k, v in columns.items()}
+        elif name.endswith((".jsonl", ".jsonl.gz")):
+            opener = gzip.open if name.endswith(".gz") else open
+            try:
+                with opener(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.endswith("\n"):  # недописанная строка после падения пропускается
+                            yield json.loads(line)
+            except EOFError:
+                return  # gzip-чанк, оборванный падением
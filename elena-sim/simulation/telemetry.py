@@ -0,0 +1,215 @@
+"""
+Живые метрики в текстовом формате Prometheus (exposition format 0.0.4).
+Счётчики, гейджи и гистограммы обновляются симуляцией инкрементально (раз в шаг и при
+обнаружении конфликта), поэтому выдача стоит O(числа рядов), а не O(истории прогона).
+Отдаются дашбордом (/metrics/prom) или встроенным HTTP-сервером (serve) прямо во время прогона.
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DETECTION_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+STEP_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REPUTATION_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Counter:
+    """Монотонный счётчик."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name}: счётчик не может уменьшаться")
+        self.value += amount
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, {}, self.value)]
+
+
+class Gauge:
+    """Текущее значение; labelnames — ряды с метками (например, квантили)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {} if labelnames else {(): 0}
+
+    def set(self, value: float, *labelvalues) -> None:
+        self.values[tuple(str(v) for v in labelvalues)] = value
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self.values.items()]
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (накопительные счётчики в выдаче)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        out = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += n
+            out.append((f"{self.name}_bucket", {"le": _fmt(float(bound))}, cumulative))
+        out.append((f"{self.name}_sum", {}, self.sum))
+        out.append((f"{self.name}_count", {}, self.count))
+        return out
+
+
+class Registry:
+    """Набор метрик; render() — текст для Prometheus. Обновления и выдача — под общей блокировкой."""
+
+    def __init__(self):
+        self.metrics: List = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        if any(m.name == metric.name for m in self.metrics):
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{_labels(labels)} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class SimulationTelemetry:
+    """Ряды симуляции «Елены». Один объект можно передать нескольким прогонам подряд — счётчики накапливаются."""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        self.registry = registry or Registry()
+        r = self.registry
+        self.steps = r.register(Counter("elena_steps_total", "Выполненные шаги симуляции"))
+        self.tx_created = r.register(Counter("elena_transactions_created_total", "Созданные транзакции"))
+        self.tx_accepted = r.register(Counter(
+            "elena_transactions_accepted_total", "Принятия транзакций узлами (доставки, прошедшие проверку)"
+        ))
+        self.messages = r.register(Counter("elena_messages_total", "Доставленные сообщения (транзакции и алерты)"))
+        self.bytes = r.register(Counter("elena_bytes_total", "Переданные байты (модель крипто-бэкенда)"))
+        self.alerts = r.register(Counter("elena_alerts_total", "Новые алерты о конфликтах"))
+        self.detection_latency = r.register(Histogram(
+            "elena_detection_latency_steps", "Время обнаружения конфликта (шаги)", DETECTION_BUCKETS
+        ))
+        self.step_duration = r.register(Histogram(
+            "elena_step_duration_seconds", "Длительность шага (с)", STEP_DURATION_BUCKETS
+        ))
+        self.current_step = r.register(Gauge("elena_step", "Номер последнего шага"))
+        self.nodes = r.register(Gauge("elena_nodes", "Узлов в сети"))
+        self.reputation = r.register(Gauge("elena_reputation", "Квантили репутации узлов", ("quantile",)))
+        self.reputation_mean = r.register(Gauge("elena_reputation_mean", "Средняя репутация узлов"))
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def observe_detection(self, steps: float) -> None:
+        with self.registry.lock:
+            self.detection_latency.observe(steps)
+
+    def end_step(
+        self,
+        step: int,
+        duration: float,
+        created: int,
+        accepted: int,
+        messages: int,
+        num_bytes: int,
+        alerts: int,
+        reputations: Sequence[float],
+    ) -> None:
+        """Приращения счётчиков за шаг и текущие гейджи."""
+        values = np.fromiter(reputations, dtype=float, count=len(reputations))
+        quantiles = np.quantile(values, REPUTATION_QUANTILES) if len(values) else ()
+        with self.registry.lock:
+            self.steps.inc()
+            self.tx_created.inc(created)
+            self.tx_accepted.inc(accepted)
+            self.messages.inc(messages)
+            self.bytes.inc(num_bytes)
+            self.alerts.inc(alerts)
+            self.step_duration.observe(duration)
+            self.current_step.set(step)
+            self.nodes.set(len(values))
+            for q, v in zip(REPUTATION_QUANTILES, quantiles):
+                self.reputation.set(float(v), q)
+            if len(values):
+                self.reputation_mean.set(float(values.mean()))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    # --- HTTP ---
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1") -> int:
+        """Отдаёт /metrics в фоновом потоке (на время прогона); возвращает фактический порт."""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = telemetry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,262 @@
+"""
+Шкала состояний прогона: ключевые кадры каждые keyframe_interval шагов (репутации float32,
+рёбра как ключи i * n + j) и пошаговые дельты между ними — изменившиеся репутации (старое
+и новое значение), добавленные/удалённые rewiring'ом рёбра, поступившие алерты.
+Состояние шага k собирается от ближайшего ключевого кадра (вперёд от предыдущего или назад
+от следующего) — время пропорционально расстоянию до кадра, а не длине прогона.
+Репутация попадает в дельту, когда ушла от последнего записанного значения больше чем на
+min_delta, поэтому между кадрами она восстанавливается с этой точностью; кадры точны.
+"""
+
+import json
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.topology import edge_keys
+
+_EMPTY_KEYS = np.empty(0, dtype=np.int64)
+
+
+class StateTimeline:
+    """Хук runner'а (record в конце шага); state(k) — состояние сети на шаге k."""
+
+    def __init__(self, keyframe_interval: int = 50, min_delta: float = 1e-3):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.min_delta = min_delta
+        self._lock = threading.Lock()
+        # Составы узлов: (id, признак злого узла); смена состава — внеочередной кадр
+        self.rosters: List[Tuple[List[str], np.ndarray]] = []
+        # Кадры: шаг, позиция в steps, состав, репутации, рёбра, число алертов
+        self.keyframes: List[Dict[str, Any]] = []
+        self._keyframe_pos: List[int] = []
+        self.steps: List[int] = []
+        # Дельта шага: (индексы, старые, новые репутации, добавленные рёбра, удалённые рёбра)
+        self.deltas: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self.alerts: List[Dict[str, Any]] = []
+        self._alert_steps: List[int] = []
+        # Состояние записи
+        self._graph = None
+        self._nodes: List[Any] = []
+        self._reputation = np.empty(0, dtype=np.float32)
+        self._edges = _EMPTY_KEYS
+        self._version = None
+        self._alerts_seen = 0
+
+    # --- запись ---
+
+    def record(self, graph, step: int) -> None:
+        """Дельта шага относительно записанного состояния; по расписанию — ключевой кадр."""
+        if graph is not self._graph or self._roster_changed(graph):
+            self._new_roster(graph)
+            delta = (np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32),
+                     _EMPTY_KEYS, _EMPTY_KEYS)
+            keyframe = True
+        else:
+            reputation = self._current_reputation()
+            changed = np.flatnonzero(np.abs(reputation - self._reputation) > self.min_delta)
+            old = self._reputation[changed]
+            self._reputation[changed] = reputation[changed]
+            added = removed = _EMPTY_KEYS
+            if graph._topology_version != self._version:
+                _, indptr, indices = graph.csr()
+                edges = edge_keys(indptr, indices, len(self._nodes))
+                added = edges[~np.isin(edges, self._edges, assume_unique=True)]
+                removed = self._edges[~np.isin(self._edges, edges, assume_unique=True)]
+                self._edges = edges
+                self._version = graph._topology_version
+            delta = (changed.astype(np.uint32), old, self._reputation[changed], added, removed)
+            keyframe = len(self.steps) - self._keyframe_pos[-1] >= self.keyframe_interval
+        arrived = []
+        if len(graph.alerts) != self._alerts_seen:
+            for alert in list(graph.alerts.values())[self._alerts_seen:]:
+                arrived.append({"id": alert.id, "step": step, "discovered_by": alert.discovered_by,
+                                "tx1": alert.conflicting_tx1, "tx2": alert.conflicting_tx2})
+            self._alerts_seen = len(graph.alerts)
+        with self._lock:
+            self.steps.append(step)
+            self.deltas.append(delta)
+            self.alerts.extend(arrived)
+            self._alert_steps.extend([step] * len(arrived))
+            if keyframe:
+                self._reputation = self._current_reputation()
+                self._keyframe_pos.append(len(self.steps) - 1)
+                self.keyframes.append({
+                    "step": step,
+                    "roster": len(self.rosters) - 1,
+                    "reputation": self._reputation.copy(),
+                    "edges": self._edges,
+                    "alerts": len(self.alerts),
+                })
+
+    def _roster_changed(self, graph) -> bool:
+        """Состав узлов другой: сверка id — только после изменения топологии (вход и выход её меняют)."""
+        if len(graph.nodes) != len(self._nodes):
+            return True
+        if graph._topology_version == self._version:
+            return False
+        return any(a is not b for a, b in zip(graph.nodes.values(), self._nodes))
+
+    def _new_roster(self, graph) -> None:
+        node_ids, indptr, indices = graph.csr()
+        self._graph = graph
+        self._nodes = [graph.nodes[nid] for nid in node_ids]
+        evil = np.array([bool(getattr(n, "is_evil", False)) for n in self._nodes], dtype=bool)
+        self.rosters.append((list(node_ids), evil))
+        self._edges = edge_keys(indptr, indices, len(self._nodes))
+        self._version = graph._topology_version
+
+    def _current_reputation(self) -> np.ndarray:
+        return np.fromiter((n.reputation for n in self._nodes), dtype=np.float32, count=len(self._nodes))
+
+    # --- запросы ---
+
+    @property
+    def span(self) -> Optional[Tuple[int, int]]:
+        return (self.steps[0], self.steps[-1]) if self.steps else None
+
+    def state(self, step: int) -> Dict[str, Any]:
+        """
+        Состояние на шаге step (последний записанный шаг не позже step): id узлов, репутации,
+        рёбра (пары индексов), алерты до шага включительно, какой кадр и сколько дельт применено.
+        """
+        with self._lock:
+            pos = bisect_right(self.steps, step) - 1
+            if pos < 0:
+                raise ValueError(f"Шаг {step} раньше начала записи ({self.steps[0] if self.steps else '—'})")
+            k = bisect_right(self._keyframe_pos, pos) - 1
+            base = self.keyframes[k]
+            backward = (
+                k + 1 < len(self.keyframes)
+                and self.keyframes[k + 1]["roster"] == base["roster"]
+                and self._keyframe_pos[k + 1] - pos < pos - self._keyframe_pos[k]
+            )
+            if backward:
+                frame = self.keyframes[k + 1]
+                span = range(self._keyframe_pos[k + 1], pos, -1)
+            else:
+                frame = base
+                span = range(self._keyframe_pos[k] + 1, pos + 1)
+            reputation = frame["reputation"].copy()
+            edge_ops: Dict[int, bool] = {}
+            for i in span:
+                idx, old, new, added, removed = self.deltas[i]
+                reputation[idx] = old if backward else new
+                for key in added.tolist():
+                    edge_ops[key] = not backward
+                for key in removed.tolist():
+                    edge_ops[key] = backward
+            node_ids, evil = self.rosters[frame["roster"]]
+            alerts = self.alerts[:bisect_right(self._alert_steps, self.steps[pos])]
+            edges = frame["edges"]
+        if edge_ops:
+            keys = np.fromiter(edge_ops.keys(), dtype=np.int64, count=len(edge_ops))
+            present = np.fromiter(edge_ops.values(), dtype=bool, count=len(edge_ops))
+            edges = np.union1d(edges[~np.isin(edges, keys[~present])], keys[present])
+        n = len(node_ids)
+        return {
+            "step": self.steps[pos],
+            "keyframe": frame["step"],
+            "direction": "backward" if backward else "forward",
+            "deltas_applied": len(span),
+            "node_ids": node_ids,
+            "is_evil": evil,
+            "reputations": reputation,
+            "edges": np.stack([edges // n, edges % n], axis=1) if n else np.empty((0, 2), dtype=np.int64),
+            "alerts": alerts,
+        }
+
+    def node_history(self, node_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(шаги, репутации) узла на каждом записанном шаге — один проход по кадрам и дельтам."""
+        with self._lock:
+            steps, values = [], []
+            value, index = None, None
+            kf = 0
+            for pos, step in enumerate(self.steps):
+                if kf < len(self._keyframe_pos) and self._keyframe_pos[kf] == pos:
+                    frame = self.keyframes[kf]
+                    ids = self.rosters[frame["roster"]][0]
+                    index = ids.index(node_id) if node_id in ids else None
+                    value = float(frame["reputation"][index]) if index is not None else None
+                    kf += 1
+                elif index is not None:
+                    idx, _, new, _, _ = self.deltas[pos]
+                    hit = np.flatnonzero(idx == index)
+                    if len(hit):
+                        value = float(new[hit[-1]])
+                if value is not None:
+                    steps.append(step)
+                    values.append(value)
+        if not steps:
+            raise KeyError(node_id)
+        return np.array(steps), np.array(values)
+
+    def first_step_below(self, node_id: str, threshold: float) -> Optional[int]:
+        """Первый шаг, на котором репутация узла опустилась ниже threshold (None — не опускалась)."""
+        steps, values = self.node_history(node_id)
+        below = np.flatnonzero(values < threshold)
+        return int(steps[below[0]]) if len(below) else None
+
+    # --- файл ---
+
+    def save(self, path: str) -> None:
+        """Сжатый .npz: кадры и дельты склеены в плоские массивы со смещениями."""
+        with self._lock:
+            deltas = list(zip(*self.deltas)) if self.deltas else [[]] * 5
+            arrays = {
+                "meta": np.array(json.dumps({"keyframe_interval": self.keyframe_interval, "min_delta": self.min_delta})),
+                "steps": np.array(self.steps, dtype=np.int64),
+                "alerts": np.array(json.dumps(self.alerts, ensure_ascii=False)),
+                "roster_ids": np.array([nid for ids, _ in self.rosters for nid in ids]),
+                "roster_evil": np.concatenate([evil for _, evil in self.rosters]) if self.rosters else np.empty(0, bool),
+                "roster_off": _offsets([len(ids) for ids, _ in self.rosters]),
+                "kf_pos": np.array(self._keyframe_pos, dtype=np.int64),
+                "kf_roster": np.array([f["roster"] for f in self.keyframes], dtype=np.int64),
+                "kf_alerts": np.array([f["alerts"] for f in self.keyframes], dtype=np.int64),
+            }
+            for name, parts in (
+                ("kf_rep", [f["reputation"] for f in self.keyframes]),
+                ("kf_edges", [f["edges"] for f in self.keyframes]),
+                ("d_idx", deltas[0]), ("d_old", deltas[1]), ("d_new", deltas[2]),
+                ("d_add", deltas[3]), ("d_rem", deltas[4]),
+            ):
+                arrays[name] = np.concatenate(parts) if len(parts) else np.empty(0)
+                arrays[f"{name}_off"] = _offsets([len(p) for p in parts])
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "StateTimeline":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            timeline = cls(meta["keyframe_interval"], meta["min_delta"])
+            parts = {name: _split(data[name], data[f"{name}_off"])
+                     for name in ("kf_rep", "kf_edges", "d_idx", "d_old", "d_new", "d_add", "d_rem")}
+            ids, evil = _split(data["roster_ids"], data["roster_off"]), _split(data["roster_evil"], data["roster_off"])
+            timeline.rosters = [(list(map(str, i)), e.astype(bool)) for i, e in zip(ids, evil)]
+            timeline.steps = data["steps"].tolist()
+            timeline._keyframe_pos = data["kf_pos"].tolist()
+            timeline.keyframes = [
+                {"step": timeline.steps[pos], "roster": int(roster), "reputation": rep.astype(np.float32),
+                 "edges": edges.astype(np.int64), "alerts": int(alerts)}
+                for pos, roster, alerts, rep, edges in zip(
+                    timeline._keyframe_pos, data["kf_roster"], data["kf_alerts"], parts["kf_rep"], parts["kf_edges"])
+            ]
+            timeline.deltas = [
+                (i.astype(np.uint32), o.astype(np.float32), n.astype(np.float32), a.astype(np.int64), r.astype(np.int64))
+                for i, o, n, a, r in zip(parts["d_idx"], parts["d_old"], parts["d_new"], parts["d_add"], parts["d_rem"])
+            ]
+            timeline.alerts = json.loads(str(data["alerts"]))
+            timeline._alert_steps = [a["step"] for a in timeline.alerts]
+        return timeline
+
+
+def _offsets(lengths: List[int]) -> np.ndarray:
+    out = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=out[1:])
+    return out
+
+
+def _split(values: np.ndarray, offsets: np.ndarray) -> List[np.ndarray]:
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
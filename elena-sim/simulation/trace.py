@@ -0,0 +1,389 @@
+"""
+Журнал событий симуляции и быстрое воспроизведение.
+TraceRecorder пишет в файл только в конец: создание транзакций, доставки и отказы, алерты,
+штрафы репутации и снимки репутации по шагам. События хранятся колонками (numpy) в чанках
+со сжатием zlib; строки (id узлов и транзакций) — в отдельной таблице; в конце файла индекс
+шагов с накопленными счётчиками. TraceReplay пересобирает метрики и переходит к любому шагу
+без повторного запуска криптографии и распространения.
+
+Формат: b"ELTR" + u16 версия, затем чанки [тип u8][сырой размер u32][сжатый u32][шаги u32 u32],
+в конце чанк индекса (JSON) и хвост [смещение индекса u64][b"ELTI"].
+"""
+
+import atexit
+import json
+import struct
+import zlib
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import MetricsCollector
+
+TRACE_VERSION = 1
+_MAGIC = b"ELTR"
+_INDEX_MAGIC = b"ELTI"
+_FILE_HEADER = struct.Struct("<4sH")
+_CHUNK_HEADER = struct.Struct("<BIIII")  # тип, сырой размер, сжатый размер, первый и последний шаг
+_TRAILER = struct.Struct("<Q4s")
+_SECTION_HEADER = struct.Struct("<BII")  # тип секции, строк, байт
+
+_CHUNK_EVENTS = b"E"[0]
+_CHUNK_STRINGS = b"S"[0]
+_CHUNK_INDEX = b"I"[0]
+
+_STR_TEXT = 0
+_STR_HEX = 1  # hex-дайджест, хранится бинарно
+_STR_BYTES = 2
+
+# Секции чанка событий: имя и dtype строк
+_SECTIONS: Dict[int, Tuple[str, np.dtype]] = {
+    1: ("tx", np.dtype([("seq", "<u8"), ("step", "<u4"), ("tx", "<u4"), ("src", "<u4"), ("dst", "<u4"),
+                        ("amount", "<f8"), ("chaff", "u1")])),
+    2: ("delivery", np.dtype([("seq", "<u8"), ("step", "<u4"), ("node", "<u4"), ("tx", "<u4"),
+                              ("accepted", "u1")])),
+    3: ("alert", np.dtype([("seq", "<u8"), ("step", "<u4"), ("alert", "<u4"), ("node", "<u4"),
+                           ("tx1", "<u4"), ("tx2", "<u4")])),
+    4: ("alert_delivery", np.dtype([("seq", "<u8"), ("step", "<u4"), ("node", "<u4"), ("alert", "<u4"),
+                                    ("hops", "<u4")])),
+    5: ("penalty", np.dtype([("seq", "<u8"), ("step", "<u4"), ("node", "<u4"), ("reputation", "<f4")])),
+    6: ("step", np.dtype([("seq", "<u8"), ("step", "<u4"), ("throughput", "<u4"), ("bytes", "<u8")])),
+}
+_SECTION_IDS = {name: sid for sid, (name, _) in _SECTIONS.items()}
+_ROSTER_SECTION = 7  # id узлов (индексы строк) в порядке столбцов снимков
+_SNAPSHOT_SECTION = 8  # шаги (u32) и матрица репутаций float32 [шаги x узлы]
+
+# Накопленные счётчики, которые хранит индекс перед каждым чанком
+_COUNTERS = ("tx", "delivered", "rejected", "alert", "alert_delivery", "penalty")
+
+
+def _count_rows(name: str, rows: np.ndarray) -> Dict[str, int]:
+    if name == "delivery":
+        accepted = int(np.count_nonzero(rows["accepted"]))
+        return {"delivered": accepted, "rejected": len(rows) - accepted}
+    if name == "step":
+        return {}
+    return {name: len(rows)}
+
+
+class TraceRecorder:
+    """Пишет события одного прогона; подключается к NetworkGraph через graph.recorder."""
+
+    def __init__(self, path: str, chunk_events: int = 100_000, level: int = 6):
+        self.path = path
+        self.chunk_events = chunk_events
+        self.level = level
+        self._file = open(path, "wb")
+        self._file.write(_FILE_HEADER.pack(_MAGIC, TRACE_VERSION))
+        self._strings: Dict[object, int] = {}
+        self._new_strings: List[Tuple[int, bytes]] = []
+        self._rows: Dict[str, list] = {name: [] for name, _ in _SECTIONS.values()}
+        self._pending = 0
+        self._seq = 0
+        self._roster: List[str] = []
+        self._roster_idx: List[int] = []
+        self._snap_steps: List[int] = []
+        self._snap_rows: List[np.ndarray] = []
+        self._counters = dict.fromkeys(_COUNTERS, 0)
+        self._index: List[dict] = []
+        self._closed = False
+        atexit.register(self.close)
+
+    # --- строки ---
+
+    def _intern(self, value) -> int:
+        idx = self._strings.get(value)
+        if idx is None:
+            idx = len(self._strings)
+            self._strings[value] = idx
+            if isinstance(value, bytes):
+                self._new_strings.append((_STR_BYTES, value))
+            else:
+                try:
+                    raw = bytes.fromhex(value)
+                    entry = (_STR_HEX, raw) if raw.hex() == value else None
+                except ValueError:
+                    entry = None
+                self._new_strings.append(entry or (_STR_TEXT, value.encode("utf-8")))
+        return idx
+
+    def _add(self, name: str, row: tuple) -> None:
+        self._rows[name].append((self._seq,) + row)
+        self._seq += 1
+        self._pending += 1
+
+    # --- события ---
+
+    def tx_created(self, step: int, tx) -> None:
+        self._add("tx", (step, self._intern(tx.id), self._intern(tx.from_id), self._intern(tx.to_id),
+                         tx.amount, int(tx.is_chaff)))
+
+    def delivery(self, step: int, node_id: str, tx_id, accepted: bool) -> None:
+        self._add("delivery", (step, self._intern(node_id), self._intern(tx_id), int(accepted)))
+
+    def alert_raised(self, step: int, alert) -> None:
+        self._add("alert", (step, self._intern(alert.id), self._intern(alert.discovered_by),
+                            self._intern(alert.conflicting_tx1), self._intern(alert.conflicting_tx2)))
+
+    def alert_delivery(self, step: int, node_id: str, alert) -> None:
+        self._add("alert_delivery", (step, self._intern(node_id), self._intern(alert.id), alert.propagation_count))
+
+    def penalty(self, step: int, node_id: str, reputation: float) -> None:
+        self._add("penalty", (step, self._intern(node_id), reputation))
+
+    def end_step(self, step: int, reputations: Dict[str, float], throughput: int, num_bytes: int) -> None:
+        """Итог шага: снимок репутаций, число сообщений и байт; здесь же сбрасываются чанки."""
+        self._add("step", (step, throughput, num_bytes))
+        roster = list(reputations.keys())
+        if roster != self._roster:
+            if self._snap_steps:
+                self._flush()
+            self._roster = roster
+            self._roster_idx = [self._intern(nid) for nid in roster]
+        self._snap_steps.append(step)
+        self._snap_rows.append(np.fromiter(reputations.values(), dtype=np.float32, count=len(roster)))
+        if self._pending >= self.chunk_events:
+            self._flush()
+
+    # --- запись ---
+
+    def _write_chunk(self, kind: int, payload: bytes, first_step: int, last_step: int) -> int:
+        offset = self._file.tell()
+        data = zlib.compress(payload, self.level)
+        self._file.write(_CHUNK_HEADER.pack(kind, len(payload), len(data), first_step, last_step))
+        self._file.write(data)
+        return offset
+
+    def _flush(self) -> None:
+        if not self._pending and not self._snap_steps:
+            return
+        if self._new_strings:
+            first = len(self._strings) - len(self._new_strings)
+            kinds = np.array([k for k, _ in self._new_strings], dtype=np.uint8)
+            lens = np.array([len(b) for _, b in self._new_strings], dtype=np.uint32)
+            payload = struct.pack("<II", first, len(kinds)) + kinds.tobytes() + lens.tobytes()
+            payload += b"".join(b for _, b in self._new_strings)
+            self._write_chunk(_CHUNK_STRINGS, payload, 0, 0)
+            self._new_strings = []
+        parts = []
+        steps = []
+        counts = dict.fromkeys(_COUNTERS, 0)
+        for sid, (name, dtype) in _SECTIONS.items():
+            rows = self._rows[name]
+            if not rows:
+                continue
+            arr = np.array(rows, dtype=dtype)
+            parts.append(_SECTION_HEADER.pack(sid, len(arr), arr.nbytes) + arr.tobytes())
+            steps.append(arr["step"])
+            for key, value in _count_rows(name, arr).items():
+                counts[key] += value
+            self._rows[name] = []
+        if self._snap_steps:
+            roster = np.array(self._roster_idx, dtype=np.uint32)
+            parts.append(_SECTION_HEADER.pack(_ROSTER_SECTION, len(roster), roster.nbytes) + roster.tobytes())
+            snap_steps = np.array(self._snap_steps, dtype=np.uint32)
+            matrix = np.vstack(self._snap_rows)
+            body = snap_steps.tobytes() + matrix.tobytes()
+            parts.append(_SECTION_HEADER.pack(_SNAPSHOT_SECTION, len(snap_steps), len(body)) + body)
+            steps.append(snap_steps)
+            self._snap_steps, self._snap_rows = [], []
+        all_steps = np.concatenate(steps)
+        first_step, last_step = int(all_steps.min()), int(all_steps.max())
+        offset = self._write_chunk(_CHUNK_EVENTS, b"".join(parts), first_step, last_step)
+        self._index.append({
+            "offset": offset, "first_step": first_step, "last_step": last_step,
+            "strings": len(self._strings), "counters": dict(self._counters),
+        })
+        for key, value in counts.items():
+            self._counters[key] += value
+        self._pending = 0
+
+    def close(self) -> None:
+        """Сбрасывает остаток, пишет индекс и закрывает файл (повторный вызов безопасен)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        payload = json.dumps({"version": TRACE_VERSION, "chunks": self._index, "totals": self._counters}).encode()
+        offset = self._write_chunk(_CHUNK_INDEX, payload, 0, 0)
+        self._file.write(_TRAILER.pack(offset, _INDEX_MAGIC))
+        self._file.close()
+        atexit.unregister(self.close)
+
+
+class TraceReplay:
+    """Чтение журнала: переход к шагу, перебор событий, пересборка MetricsCollector."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = f.read()
+        magic, version = _FILE_HEADER.unpack_from(self._data)
+        if magic != _MAGIC:
+            raise ValueError(f"Не журнал событий Елена: {path}")
+        if version != TRACE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия журнала: {version}")
+        self._strings: List[object] = []
+        self._string_chunks: List[int] = []
+        self.chunks: List[dict] = []
+        self.totals: Dict[str, int] = {}
+        self._scan()
+
+    # --- структура файла ---
+
+    def _chunk(self, offset: int) -> Tuple[int, bytes, int, int]:
+        kind, raw_len, comp_len, first, last = _CHUNK_HEADER.unpack_from(self._data, offset)
+        start = offset + _CHUNK_HEADER.size
+        return kind, zlib.decompress(self._data[start : start + comp_len], bufsize=raw_len), first, last
+
+    def _scan(self) -> None:
+        """Каталог чанков: из индекса в конце файла, а если файл не закрыт — проходом по заголовкам."""
+        data = self._data
+        index = None
+        if len(data) >= _FILE_HEADER.size + _TRAILER.size:
+            offset, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+            if magic == _INDEX_MAGIC:
+                index = json.loads(self._chunk(offset)[1])
+        pos = _FILE_HEADER.size
+        counters = dict.fromkeys(_COUNTERS, 0)
+        while pos + _CHUNK_HEADER.size <= len(data):
+            kind, raw_len, comp_len, first, last = _CHUNK_HEADER.unpack_from(data, pos)
+            if pos + _CHUNK_HEADER.size + comp_len > len(data):
+                break  # недописанный хвост
+            if kind == _CHUNK_STRINGS:
+                self._string_chunks.append(pos)
+            elif kind == _CHUNK_EVENTS and index is None:
+                entry = {"offset": pos, "first_step": first, "last_step": last, "counters": dict(counters)}
+                sections = self._sections(self._chunk(pos)[1])
+                for name in _SECTION_IDS:
+                    if name in sections:
+                        for key, value in _count_rows(name, sections[name]).items():
+                            counters[key] += value
+                self.chunks.append(entry)
+            elif kind == _CHUNK_INDEX:
+                break
+            pos += _CHUNK_HEADER.size + comp_len
+        if index is not None:
+            self.chunks = index["chunks"]
+            self.totals = index["totals"]
+        else:
+            self.totals = counters
+        self._last_steps = [c["last_step"] for c in self.chunks]
+
+    @staticmethod
+    def _sections(payload: bytes) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        pos = 0
+        while pos < len(payload):
+            sid, rows, nbytes = _SECTION_HEADER.unpack_from(payload, pos)
+            pos += _SECTION_HEADER.size
+            body = payload[pos : pos + nbytes]
+            pos += nbytes
+            if sid in _SECTIONS:
+                name, dtype = _SECTIONS[sid]
+                out[name] = np.frombuffer(body, dtype=dtype)
+            elif sid == _ROSTER_SECTION:
+                out["roster"] = np.frombuffer(body, dtype=np.uint32)
+            elif sid == _SNAPSHOT_SECTION:
+                out["snapshot_steps"] = np.frombuffer(body, dtype=np.uint32, count=rows)
+                out["snapshots"] = np.frombuffer(body, dtype=np.float32, offset=4 * rows).reshape(rows, -1)
+        return out
+
+    def strings(self) -> List[object]:
+        """Таблица строк (id узлов, транзакций, алертов); дайджесты восстанавливаются в исходном виде."""
+        while self._string_chunks:
+            payload = self._chunk(self._string_chunks.pop(0))[1]
+            first, count = struct.unpack_from("<II", payload)
+            kinds = np.frombuffer(payload, dtype=np.uint8, count=count, offset=8)
+            lens = np.frombuffer(payload, dtype=np.uint32, count=count, offset=8 + count)
+            ends = np.cumsum(lens) + 8 + 5 * count
+            assert first == len(self._strings), "таблица строк повреждена"
+            start = 8 + 5 * count
+            for kind, end in zip(kinds.tolist(), ends.tolist()):
+                raw = payload[start:end]
+                start = end
+                if kind == _STR_HEX:
+                    self._strings.append(raw.hex())
+                elif kind == _STR_BYTES:
+                    self._strings.append(bytes(raw))
+                else:
+                    self._strings.append(raw.decode("utf-8"))
+        return self._strings
+
+    @property
+    def steps(self) -> Tuple[int, int]:
+        """(первый, последний) записанный шаг."""
+        if not self.chunks:
+            return 0, -1
+        return self.chunks[0]["first_step"], max(self._last_steps)
+
+    def _chunks_for(self, start: int, end: int) -> Iterator[dict]:
+        """Чанки, где могут быть события шагов [start, end] (границы чанков могут перекрываться на шаг)."""
+        for entry in self.chunks:
+            if entry["last_step"] >= start and entry["first_step"] <= end:
+                yield entry
+
+    # --- воспроизведение ---
+
+    def seek(self, step: int) -> dict:
+        """Состояние на конец шага step: накопленные счётчики и репутации узлов."""
+        names = self.strings()
+        pos = min(bisect_left(self._last_steps, step), max(len(self.chunks) - 1, 0))
+        if not self.chunks:
+            return {"step": step, **dict.fromkeys(_COUNTERS, 0), "reputations": {}}
+        counters = dict(self.chunks[pos]["counters"])
+        reputations: Dict[str, float] = {}
+        for entry in self.chunks[pos:]:
+            if entry["first_step"] > step:
+                break
+            sections = self._sections(self._chunk(entry["offset"])[1])
+            for name, rows in sections.items():
+                if name in _SECTION_IDS:
+                    for key, value in _count_rows(name, rows[rows["step"] <= step]).items():
+                        counters[key] += value
+            if "snapshots" in sections:
+                hit = np.flatnonzero(sections["snapshot_steps"] == step)
+                if hit.size:
+                    row = sections["snapshots"][hit[-1]]
+                    reputations = {names[i]: float(r) for i, r in zip(sections["roster"].tolist(), row.tolist())}
+        return {"step": step, **counters, "reputations": reputations}
+
+    def events(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+        """События шагов [start, end] в порядке записи: (тип, поля); индексы строк заменены значениями."""
+        names = self.strings()
+        end = self.steps[1] if end is None else end
+        string_fields = {"tx", "src", "dst", "node", "alert", "tx1", "tx2"}
+        for entry in self._chunks_for(start, end):
+            sections = self._sections(self._chunk(entry["offset"])[1])
+            merged = []
+            for name in _SECTION_IDS:
+                rows = sections.get(name)
+                if rows is None:
+                    continue
+                rows = rows[(rows["step"] >= start) & (rows["step"] <= end)]
+                merged.extend((int(r["seq"]), name, r) for r in rows)
+            merged.sort(key=lambda item: item[0])
+            for _, name, row in merged:
+                fields = {}
+                for field in row.dtype.names[1:]:
+                    value = row[field].item()
+                    fields[field] = names[value] if field in string_fields else value
+                yield name, fields
+
+    def metrics(self) -> MetricsCollector:
+        """Пересобирает MetricsCollector по журналу (пропускная способность, байты, репутации, алерты)."""
+        names = self.strings()
+        m = MetricsCollector()
+        for entry in self.chunks:
+            sections = self._sections(self._chunk(entry["offset"])[1])
+            step_rows = sections.get("step")
+            if step_rows is not None:
+                for throughput, num_bytes in zip(step_rows["throughput"].tolist(), step_rows["bytes"].tolist()):
+                    m.record_throughput(throughput)
+                    m.record_bandwidth(num_bytes)
+            if "snapshots" in sections:
+                roster = [names[i] for i in sections["roster"].tolist()]
+                for s, row in zip(sections["snapshot_steps"].tolist(), sections["snapshots"].tolist()):
+                    m.record_reputation_step(s, dict(zip(roster, row)))
+        m.alerts_created = self.totals.get("alert", 0)
+        return m
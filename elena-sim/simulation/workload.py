@@ -0,0 +1,165 @@
+"""
+Генератор нагрузки: транзакции (отправитель, получатель, сумма) блоками шагов на NumPy.
+Число транзакций за шаг задаёт модель прихода:
+- uniform — ровно rate транзакций; дробная часть rate добавляет одну с этой вероятностью;
+- poisson — пуассоновское число со средним rate;
+- mmpp — пуассоновский поток, модулированный двухсостоянной цепью Маркова (тихо/всплеск).
+  Всплеск в burst_factor раз интенсивнее, а среднее за шаг остаётся rate.
+Отправители выбираются равномерно или по Zipf: узел ранга k шлёт ~1/k^s транзакций, ранг — порядок
+узла в сети. В блоке хранятся равномерные числа в [0, 1), а в индексы узлов они переводятся при
+выдаче шага по текущему числу узлов. Поэтому вход и выход узлов не сбрасывает блок, а стоимость
+транзакции не зависит от размера сети.
+Zipf берётся обратной функцией непрерывного степенного закона — O(1) на выборку без таблицы весов.
+Chaff — отдельный пуассоновский поток со средним chaff_rate транзакций за шаг.
+"""
+
+import random
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+ARRIVAL_MODELS = ("uniform", "poisson", "mmpp")
+SENDER_MODELS = ("uniform", "zipf")
+
+
+class StepBatch(NamedTuple):
+    """Нагрузка одного шага: индексы узлов в текущем порядке сети и суммы."""
+
+    senders: np.ndarray
+    receivers: np.ndarray
+    amounts: np.ndarray
+    chaff_senders: np.ndarray
+    chaff_receivers: np.ndarray
+
+
+class WorkloadGenerator:
+    """Заранее сгенерированные блоки нагрузки; step() отдаёт очередной шаг."""
+
+    def __init__(
+        self,
+        rate: float,
+        arrival: str = "uniform",
+        senders: str = "uniform",
+        zipf_exponent: float = 1.1,
+        burst_factor: float = 10.0,
+        burst_enter: float = 0.05,
+        burst_exit: float = 0.3,
+        chaff_rate: float = 0.0,
+        amount_range: Tuple[float, float] = (1.0, 50.0),
+        block_steps: int = 256,
+        rng: Optional[random.Random] = None,
+    ):
+        if arrival not in ARRIVAL_MODELS:
+            raise ValueError(f"Неизвестная модель прихода: {arrival} (доступны: {', '.join(ARRIVAL_MODELS)})")
+        if senders not in SENDER_MODELS:
+            raise ValueError(f"Неизвестная модель отправителей: {senders} (доступны: {', '.join(SENDER_MODELS)})")
+        if not 0 < burst_enter <= 1 or not 0 < burst_exit <= 1:
+            raise ValueError("burst_enter и burst_exit — вероятности перехода за шаг в (0, 1]")
+        self.rate = rate
+        self.arrival = arrival
+        self.senders = senders
+        self.zipf_exponent = zipf_exponent
+        self.burst_factor = burst_factor
+        self.burst_enter = burst_enter
+        self.burst_exit = burst_exit
+        self.chaff_rate = chaff_rate
+        self.amount_range = amount_range
+        self.block_steps = block_steps
+        self.generated = 0  # транзакций выдано (без chaff)
+        # Числа генератора NumPy выводятся из random: прогон воспроизводим по seed раннера
+        self._gen = np.random.default_rng((rng or random).getrandbits(64))
+        self._bursting = False
+        self._cursor = 0
+        self._block: Optional[dict] = None
+
+    # --- модели ---
+
+    def _counts(self, steps: int) -> np.ndarray:
+        """Число транзакций на каждый из steps шагов."""
+        gen = self._gen
+        if self.arrival == "uniform":
+            base = int(self.rate)
+            return base + (gen.random(steps) < self.rate - base)
+        if self.arrival == "poisson":
+            return gen.poisson(self.rate, steps)
+        # mmpp: длины серий состояний — геометрические, среднее за шаг сохраняется
+        share = self.burst_enter / (self.burst_enter + self.burst_exit)
+        quiet = self.rate / (1 - share + share * self.burst_factor)
+        bursting = np.empty(steps, dtype=bool)
+        filled = 0
+        while filled < steps:
+            drawn = int(gen.geometric(self.burst_exit if self._bursting else self.burst_enter))
+            run = min(drawn, steps - filled)
+            bursting[filled:filled + run] = self._bursting
+            filled += run
+            if run == drawn:  # серия, обрезанная концом блока, продолжится в следующем (без памяти)
+                self._bursting = not self._bursting
+        return gen.poisson(np.where(bursting, quiet * self.burst_factor, quiet))
+
+    def _ranks(self, u: np.ndarray, n: int) -> np.ndarray:
+        """Индексы отправителей из равномерных чисел: равномерно или по Zipf с показателем s."""
+        if self.senders == "uniform" or n < 2:
+            return np.minimum((u * n).astype(np.int64), n - 1)
+        s = self.zipf_exponent
+        if abs(s - 1.0) < 1e-9:
+            x = np.power(n + 1.0, u)
+        else:
+            top = (n + 1.0) ** (1 - s) - 1
+            x = np.power(1 + u * top, 1 / (1 - s))
+        return np.clip(x.astype(np.int64) - 1, 0, n - 1)
+
+    # --- блоки и шаги ---
+
+    def _fill(self) -> None:
+        gen = self._gen
+        steps = self.block_steps
+        counts = self._counts(steps)
+        chaff = gen.poisson(self.chaff_rate, steps) if self.chaff_rate > 0 else np.zeros(steps, dtype=np.int64)
+        total, chaff_total = int(counts.sum()), int(chaff.sum())
+        lo, hi = self.amount_range
+        self._block = {
+            "offsets": np.concatenate(([0], np.cumsum(counts))),
+            "senders": gen.random(total),
+            "receivers": gen.random(total),
+            "amounts": np.round(gen.uniform(lo, hi, total), 2),
+            "chaff_offsets": np.concatenate(([0], np.cumsum(chaff))),
+            "chaff": gen.random((chaff_total, 2)),
+        }
+        self._cursor = 0
+
+    def _pairs(self, u_send: np.ndarray, u_recv: np.ndarray, n: int, weighted: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Отправитель (по модели отправителей, если weighted) и получатель, отличный от него."""
+        senders = self._ranks(u_send, n) if weighted else np.minimum((u_send * n).astype(np.int64), n - 1)
+        receivers = np.minimum((u_recv * (n - 1)).astype(np.int64), n - 2)
+        receivers += receivers >= senders
+        return senders, receivers
+
+    def step(self, num_nodes: int) -> StepBatch:
+        """Нагрузка очередного шага для сети из num_nodes узлов."""
+        if self._block is None or self._cursor >= self.block_steps:
+            self._fill()
+        block, k = self._block, self._cursor
+        self._cursor += 1
+        a, b = block["offsets"][k], block["offsets"][k + 1]
+        c, d = block["chaff_offsets"][k], block["chaff_offsets"][k + 1]
+        if num_nodes < 2:
+            empty = np.empty(0, dtype=np.int64)
+            return StepBatch(empty, empty, np.empty(0), empty, empty)
+        senders, receivers = self._pairs(block["senders"][a:b], block["receivers"][a:b], num_nodes, True)
+        chaff = block["chaff"][c:d]
+        chaff_senders, chaff_receivers = self._pairs(chaff[:, 0], chaff[:, 1], num_nodes, False)
+        self.generated += len(senders)
+        return StepBatch(senders, receivers, block["amounts"][a:b], chaff_senders, chaff_receivers)
+
+    def generate(self, steps: int, num_nodes: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Нагрузка steps шагов одним пакетом: (границы шагов, отправители, получатели, суммы).
+        Для бенчмарков и внешних драйверов; chaff не включается.
+        """
+        counts = self._counts(steps)
+        total = int(counts.sum())
+        gen = self._gen
+        lo, hi = self.amount_range
+        senders, receivers = self._pairs(gen.random(total), gen.random(total), num_nodes, True)
+        self.generated += total
+        return np.concatenate(([0], np.cumsum(counts))), senders, receivers, np.round(gen.uniform(lo, hi, total), 2)
@@ -7,6 +7,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import pytest
+
 from core import Node, QuantumEvilNode, NetworkGraph, Transaction, Alert, compute_anchor, generate_keypair, sign_data, verify_signature
 from core.crypto import tx_content_hash
 
@@ -100,3 +102,21 @@ if __name__ == "__main__":
     test_conflict_detection()
     test_simulation_run()
     print("All tests passed.")
+
+
+def test_confidence_probes_match_node_confidence():
+    from simulation.runner import SimulationRunner
+    runner = SimulationRunner(num_nodes=20, num_evil=0, tx_per_step=6, chaff_prob=0)
+    runner.build_network()
+    for step in range(25):
+        runner.step(step)
+    probes = runner.probes
+    tx_ids = list(runner.graph.transactions)[:30]
+    expected = [
+        sum(runner.graph.nodes[nid].get_confidence(t) for nid in probes.panel) / len(probes.panel) for t in tx_ids
+    ]
+    assert list(probes.panel_confidence(tx_ids)) == pytest.approx(expected)
+    summary = runner.metrics.get_summary()
+    assert len(runner.metrics.tx_confidence_5) > 0 and len(runner.metrics.tx_confidence_20) > 0
+    assert set(summary["confidence_curve"]) == set(range(1, 21))
+    assert 0.0 <= summary["finality_rate"] <= 1.0
@@ -0,0 +1,130 @@
+"""
+Тесты динамики топологии: rewiring через индекс рёбер, вход и выход узлов.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.churn import ChurnEngine
+from core.topology import graph_to_csr
+from simulation.runner import SimulationRunner
+
+
+def _check_consistent(graph, engine):
+    edges = set()
+    for node in graph.nodes.values():
+        assert node not in node.peers
+        assert len(set(map(id, node.peers))) == len(node.peers)
+        for peer in node.peers:
+            assert peer.id in graph.nodes and node in peer.peers
+            edges.add(tuple(sorted((node.id, peer.id))))
+    assert engine.num_edges == len(edges)
+    assert all(engine._edge_pos[key] == i for i, key in enumerate(engine._edges))
+
+
+def test_rewire_keeps_edge_count_and_index():
+    runner = SimulationRunner(num_nodes=300, num_evil=1, seed=2)
+    runner.build_network()
+    graph = runner.graph
+    _, indptr, _ = graph_to_csr(graph)
+    before = {(n.id, p.id) for n in graph.nodes.values() for p in n.peers}
+    version = graph._topology_version
+    engine = graph.churn()
+    done = engine.rewire(0.2)
+    assert 30 < done <= 80 and graph._topology_version != version
+    after = {(n.id, p.id) for n in graph.nodes.values() for p in n.peers}
+    assert len(after) == len(before) == indptr[-1] and after != before
+    _check_consistent(graph, engine)
+    graph.add_edge("node_0", "node_1")  # изменение в обход движка — индекс перестраивается
+    engine.rewire(0.1)
+    _check_consistent(graph, engine)
+
+
+def test_join_and_leave_processes():
+    runner = SimulationRunner(num_nodes=120, num_evil=1, seed=3)
+    runner.build_network()
+    engine = ChurnEngine(runner.graph, arrival_rate=2.0, session_mean=15, session_distribution="pareto",
+                         attach_degree=4, min_degree=2, rng=random.Random(7))
+    joined_total = left_total = 0
+    for step in range(40):
+        joined, left = engine.step(step)
+        joined_total += len(joined)
+        left_total += len(left)
+        for node in left:
+            assert node.id not in runner.graph.nodes and not node.peers
+        for node in joined:
+            assert node.id in runner.graph.nodes and node.peers
+    assert joined_total > 40 and left_total > 40 and engine.reattached > 0
+    assert len(runner.graph.nodes) == 120 + joined_total - left_total
+    assert "evil_0" in runner.graph.nodes  # злые узлы не уходят
+    _check_consistent(runner.graph, engine)
+
+
+def test_runner_with_churn():
+    runner = SimulationRunner(num_nodes=80, num_evil=1, tx_per_step=3, seed=4, rewiring_interval=5,
+                              churn_arrival_rate=1.0, churn_session_mean=30, timeline_interval=10)
+    runner.build_network()
+    for step in range(30):
+        runner.step(step)
+    stats = runner.metrics.get_summary()["churn_stats"]
+    assert stats["joined"] > 10 and stats["departed"] > 10 and stats["rewired"] > 0
+    assert {n.id for n in runner.honest_nodes} | {n.id for n in runner.evil_nodes} == set(runner.graph.nodes)
+    state = runner.timeline.state(29)
+    assert set(state["node_ids"]) == set(runner.graph.nodes)
+
+
+def test_churn_with_global_trust():
+    # Вход и уход в одном шаге не меняют числа узлов: индекс доверия должен заметить смену состава
+    for vectorized in (False, True):
+        runner = SimulationRunner(num_nodes=60, num_evil=1, tx_per_step=4, seed=3, trust_interval=5,
+                                  churn_arrival_rate=1.0, churn_session_mean=8, vectorized_propagation=vectorized)
+        runner.build_network()
+        trust = runner.trust
+        for step in range(40):
+            runner.step(step)
+            if step == 20:
+                # Вес ребра между уцелевшими узлами переживает уход других узлов
+                trust._sync_index()
+                trust._aggregate(len(trust._ids))
+                weights = {
+                    (trust._ids[k >> 32], trust._ids[k & 0xFFFFFFFF]): w for k, w in zip(trust._keys.tolist(), trust._sat)
+                }
+        trust._sync_index()
+        assert trust._ids == list(runner.graph.nodes)
+        assert all(trust._index[nid] == i for i, nid in enumerate(trust._ids))
+        trust._aggregate(len(trust._ids))
+        after = {(trust._ids[k >> 32], trust._ids[k & 0xFFFFFFFF]): w for k, w in zip(trust._keys.tolist(), trust._sat)}
+        for edge, w in weights.items():
+            if edge in after:
+                assert after[edge] >= w
+        assert trust.updates == 8
+        for nid in runner.graph.nodes:
+            score = trust.score(nid)
+            assert score is None or 0.0 <= score <= 1.0
+
+
+def test_departures_reach_probe_panel_and_live_stream():
+    from simulation.live import LiveStream
+    live = LiveStream()
+    runner = SimulationRunner(num_nodes=40, num_evil=1, tx_per_step=3, seed=5, live=live,
+                              churn_arrival_rate=1.5, churn_session_mean=20)
+    runner.build_network()
+    graph = runner.graph
+    removed = []
+    graph.removal_hooks.append(removed.append)
+    panel_left = 0
+    for step in range(40):
+        before = set(runner.probes.panel)
+        runner.step(step)
+        panel = runner.probes.panel
+        panel_left += len(before - set(panel))
+        # Ушедшие члены панели заменены живыми узлами; трансляция видит текущий состав
+        assert len(panel) == len(set(panel)) == min(16, len(graph.nodes)) and set(panel) <= set(graph.nodes)
+        assert live._ids == list(graph.nodes)
+        assert [n.reputation for n in live._nodes] == [n.reputation for n in graph.nodes.values()]
+    assert panel_left > 0
+    assert len(removed) == runner.churn.departed and all(not node.peers for node in removed)
+    assert runner.metrics.get_summary()["tx_confidence_5"] > 0
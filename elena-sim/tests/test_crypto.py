@@ -0,0 +1,97 @@
+"""
+Тесты крипто-бэкендов и учёта нагрузки.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import Node, QuantumEvilNode, NetworkGraph
+from core.crypto import CRYPTO_BACKENDS, set_backend
+
+
+def test_backends_sign_and_verify():
+    for name, cls in CRYPTO_BACKENDS.items():
+        backend = cls()
+        pub, priv = backend.generate_keypair()
+        sig = backend.sign("payload", priv)
+        assert backend.verify("payload", sig, pub), name
+        if name != "null":
+            assert not backend.verify("other", sig, pub), name
+
+
+def test_conflict_detection_with_binary_digests():
+    set_backend("blake2b")
+    try:
+        g = NetworkGraph()
+        evil = QuantumEvilNode("evil", quantum_advantage=0.0)
+        a, b = Node("a"), Node("b")
+        for n in (evil, a, b):
+            g.add_node(n)
+        g.add_edge("evil", "a")
+        g.add_edge("evil", "b")
+        g.add_edge("a", "b")
+        tx1, tx2 = evil.double_spend_attack("a", "b", 50.0)
+        assert isinstance(tx1.id, bytes) and len(tx1.anchor) == 32
+        g.propagate_transaction(tx1, evil)
+        g.propagate_transaction(tx2, evil)
+        assert len(g.alerts) >= 1
+        assert g.signature_checks > 0 and g.bytes_delivered > 0
+    finally:
+        set_backend("sha512")
+
+
+def test_runner_reports_crypto_load():
+    from simulation.runner import SimulationRunner
+    try:
+        runner = SimulationRunner(num_nodes=15, num_evil=0, tx_per_step=2, crypto_backend="null")
+        runner.build_network()
+        for step in range(3):
+            runner.step(step)
+        summary = runner.metrics.get_summary()
+        assert summary["crypto_backend"] == "null"
+        assert summary["bytes_transferred"] > 0
+        assert summary["signature_bytes"] == 0
+    finally:
+        set_backend("sha512")
+
+
+def test_batch_verifier_matches_per_node_check():
+    from core.verify_pool import BatchVerifier
+    set_backend("ed25519")
+    try:
+        g = NetworkGraph()
+        a, b = Node("a"), Node("b")
+        g.add_node(a)
+        g.add_node(b)
+        g.add_edge("a", "b")
+        good = a.create_transaction("b", 5.0)
+        bad = a.create_transaction("b", 6.0)
+        bad.signature = good.signature
+        verifier = BatchVerifier(workers=2, executor="thread", min_batch=1)
+        g.prevalidate([good, bad, good], verifier)
+        verifier.close()
+        assert verifier.verified == 2
+        assert g.verdict_cache[good.id][1] is True and g.verdict_cache[bad.id][1] is False
+        assert b.receive_transaction(good) and not b.receive_transaction(bad)
+        assert g.verdict_cache_hits >= 2
+    finally:
+        set_backend("sha512")
+
+
+def test_runner_batch_verify_uses_pool():
+    from simulation.runner import SimulationRunner
+    try:
+        runner = SimulationRunner(num_nodes=30, num_evil=0, tx_per_step=4, seed=1, batch_verify=True, verify_workers=2)
+        runner.build_network()
+        for step in range(3):
+            runner.step(step)
+        verifier = runner.verifier
+        # Пакет шага (4 транзакции) больше числа воркеров — проверка идёт в пуле
+        assert verifier.min_batch == 2 and verifier.pooled_batches == verifier.batches == 3
+        assert verifier.verified == 12
+        runner.close()
+        assert verifier._executor is None
+    finally:
+        set_backend("sha512")
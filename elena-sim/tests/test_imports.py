@@ -0,0 +1,36 @@
+"""
+Тесты ленивых импортов: безголовый запуск не загружает визуализацию и networkx.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_import import HEAVY_MODULES
+from simulation.runner import SimulationRunner
+
+
+def _loaded_after(statement: str) -> list:
+    code = f"import sys; sys.argv = ['main.py']; {statement}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+
+def test_headless_imports_skip_heavy_dependencies():
+    assert _loaded_after("import main, run_batch, simulation.ab, simulation.runner") == []
+    assert _loaded_after("import visualization") == []
+    assert "fastapi" in _loaded_after("from visualization import create_app")
+
+
+def test_networkx_mirror_built_on_demand():
+    runner = SimulationRunner(num_nodes=30, num_evil=1)
+    runner.build_network()
+    G = runner.graph.to_networkx()
+    assert G.number_of_nodes() == 30
+    assert G.number_of_edges() == sum(len(n.peers) for n in runner.graph.nodes.values()) // 2
+    assert runner.graph.to_networkx() is G
+    runner.graph.rewire_peers(1.0)
+    assert runner.graph.to_networkx() is not G
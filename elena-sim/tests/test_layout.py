@@ -0,0 +1,59 @@
+"""
+Тесты силовой раскладки: структура графа видна в позициях, кэш по версии топологии,
+после rewiring двигаются только затронутые узлы.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.topology import edges_to_csr
+from simulation.runner import SimulationRunner
+from visualization.layout import force_layout, graph_layout
+from visualization.lod import GraphSource
+from visualization.plots import plot_network_state
+
+
+def test_two_communities_are_separated():
+    rng = np.random.default_rng(0)
+    edges = [(i, j) for block in (range(0, 60), range(60, 120)) for i in block for j in block
+             if i < j and rng.random() < 0.2]
+    edges.append((0, 60))
+    indptr, indices = edges_to_csr(120, edges)
+    pos = force_layout(indptr, indices)
+    centers = pos[:60].mean(axis=0), pos[60:].mean(axis=0)
+    spread = max(np.linalg.norm(pos[:60] - centers[0], axis=1).mean(), np.linalg.norm(pos[60:] - centers[1], axis=1).mean())
+    assert np.linalg.norm(centers[0] - centers[1]) > 1.5 * spread
+
+
+def test_cached_per_version_and_relaxes_only_affected_nodes():
+    runner = SimulationRunner(num_nodes=200, num_evil=1, seed=3)
+    runner.build_network()
+    layout = graph_layout(runner.graph)
+    assert graph_layout(runner.graph) is layout  # общая для графиков и дашборда
+    source = GraphSource(runner.graph)
+    ids, pos = layout.positions(source)
+    assert layout.positions(source)[1] is pos and layout.builds == 1
+    _, indptr, indices = runner.graph.csr()
+    before = set(zip(np.repeat(np.arange(len(ids)), np.diff(indptr)).tolist(), indices.tolist()))
+    runner.graph.rewire_peers(0.02)
+    ids2, pos2 = layout.positions(source)
+    _, indptr, indices = runner.graph.csr()
+    after = set(zip(np.repeat(np.arange(len(ids2)), np.diff(indptr)).tolist(), indices.tolist()))
+    touched = {i for edge in before ^ after for i in edge}
+    moved = set(np.flatnonzero(np.any(pos2 != pos, axis=1)).tolist())
+    assert ids2 == ids and layout.builds == 1
+    assert moved and moved <= touched and layout.relaxed == len(touched)
+
+
+def test_plot_network_state_uses_shared_layout(tmp_path):
+    runner = SimulationRunner(num_nodes=60, num_evil=1, seed=4)
+    runner.build_network()
+    out = tmp_path / "net.png"
+    plot_network_state(runner.graph.nodes, runner.graph.transactions, out, graph=runner.graph)
+    assert out.stat().st_size > 0 and graph_layout(runner.graph).builds == 1
+    plot_network_state(runner.graph.nodes, runner.graph.transactions, tmp_path / "plain.png")
+    assert (tmp_path / "plain.png").stat().st_size > 0
@@ -0,0 +1,66 @@
+"""
+Тесты живой трансляции прогона: дельты, слияние для медленных клиентов, пауза и шаг.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.live import LiveStream, decode_delta, encode_delta
+from simulation.runner import SimulationRunner
+
+
+def _runner(live):
+    runner = SimulationRunner(
+        num_nodes=40, num_evil=1, tx_per_step=3, seed=11, rewiring_interval=2, rewiring_prob=0.3, live=live
+    )
+    runner.build_network()
+    return runner
+
+
+def test_delta_frame_round_trip():
+    frame = encode_delta(7, {3: 0.25, 0: 0.5}, {1 * 10 + 4}, {2 * 10 + 9}, [{"id": "a"}], n=10)
+    delta = decode_delta(frame)
+    assert delta["step"] == 7
+    assert delta["reputations"] == {3: 0.25, 0: 0.5}
+    assert delta["added"] == [(1, 4)] and delta["removed"] == [(2, 9)]
+    assert delta["alerts"] == [{"id": "a"}]
+
+
+def test_slow_client_gets_one_coalesced_delta_matching_final_state():
+    live = LiveStream()
+    runner = _runner(live)
+    runner.step(0)
+    sub = live.subscribe(lambda: None)
+    nodes = {i: n["reputation"] for i, n in enumerate(sub.snapshot["nodes"])}
+    edges = {tuple(e) for e in sub.snapshot["edges"]}
+    for step in range(1, 15):
+        runner.step(step)
+    frame = sub.take()
+    assert sub.frames_coalesced == 13 and sub.take() is None
+    delta = decode_delta(frame)
+    assert delta["step"] == 14 and delta["added"]
+    nodes.update(delta["reputations"])
+    edges = (edges | set(delta["added"])) - set(delta["removed"])
+    final = live.snapshot()
+    assert edges == {tuple(e) for e in final["edges"]}
+    assert all(abs(nodes[i] - n["reputation"]) < 1e-3 for i, n in enumerate(final["nodes"]))
+    truth = {nid: n.reputation for nid, n in runner.graph.nodes.items()}
+    assert all(abs(truth[n["id"]] - n["reputation"]) <= live.min_delta + 1e-4 for n in final["nodes"])
+
+
+def test_pause_and_single_step():
+    live = LiveStream(paused=True)
+    runner = _runner(live)
+    worker = threading.Thread(target=lambda: [runner.step(s) for s in range(5)])
+    worker.start()
+    worker.join(0.2)
+    assert live.steps_published == 1  # первый шаг выполнен и ждёт у ворот
+    live.control("step")
+    worker.join(0.2)
+    assert live.steps_published == 2
+    live.control("resume")
+    worker.join(5)
+    assert not worker.is_alive() and live.steps_published == 5
@@ -0,0 +1,58 @@
+"""
+Тесты укрупнённого графа: кластеризация CSR и ответы LOD-сервиса дашборда.
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.clustering import aggregate, partition
+from core.topology import edges_to_csr, generate_edges, sybil_region_edges
+from simulation.runner import SimulationRunner
+from visualization.lod import GraphLOD, GraphSource
+
+
+def test_partition_and_aggregate():
+    n = 3000
+    indptr, indices = edges_to_csr(n, generate_edges(n, 3, 10, rng=random.Random(0)))
+    labels = partition(indptr, indices, target_size=50)
+    k = labels.max() + 1
+    assert sorted(set(labels.tolist())) == list(range(k)) and 30 <= k <= 90
+    sizes, s_indptr, s_indices, weights = aggregate(indptr, indices, labels)
+    assert sizes.sum() == n
+    src = np.repeat(np.arange(n), np.diff(indptr))
+    assert weights.sum() == np.count_nonzero(labels[src] != labels[indices])
+    # Плотный сибил-кластер с 5 рёбрами атаки целиком попадает в один кластер
+    indptr, indices = edges_to_csr(1000, sybil_region_edges(950, 50, 5, rng=random.Random(1)))
+    labels = partition(indptr, indices, target_size=64, rounds=8)
+    assert len(set(labels[950:].tolist())) == 1
+
+
+def test_lod_top_and_expand_are_cached_per_topology_version():
+    runner = SimulationRunner(num_nodes=600, num_evil=1, tx_per_step=2, seed=3)
+    runner.build_network()
+    runner.step(0)
+    source = GraphSource(runner.graph)
+    lod = GraphLOD(cluster_size=20, fanout=4, top_size=10)
+    top = json.loads(lod.top(source))
+    graph = top["graph"]
+    assert graph["levels"] >= 2 and len(graph["nodes"]) <= 10
+    assert sum(node["size"] for node in graph["nodes"]) == 600
+    assert sum(node["evil"] for node in graph["nodes"]) == 1
+    expanded = json.loads(lod.expand(source, graph["level"], [node["index"] for node in graph["nodes"]]))
+    assert sum(node["size"] for node in expanded["graph"]["nodes"]) == 600
+    leaf = json.loads(lod.expand(source, 1, [0]))
+    ids = [node["id"] for node in leaf["graph"]["nodes"]]
+    assert ids and all(node["parent"] == "c1_0" for node in leaf["graph"]["nodes"])
+    truth = [runner.graph.nodes[nid].reputation for nid in ids]
+    assert np.allclose(leaf["reputation"], truth, atol=1e-4)
+    lod.top(source)
+    assert lod.builds == 1
+    runner.graph.rewire_peers(0.2)
+    lod.top(source)
+    assert lod.builds == 2
@@ -0,0 +1,46 @@
+"""
+Тесты учёта памяти по подсистемам.
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.ab import ab_payload
+from simulation.memory import estimate_size
+from simulation.runner import SimulationRunner
+
+
+def test_estimate_size_extrapolates_from_sample():
+    values = [float(i) for i in range(5000)]
+    exact = sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+    assert estimate_size(values, sample=32) == exact
+    table = {f"key_{i}": [i, i + 1] for i in range(2000)}
+    exact = sys.getsizeof(table) + sum(
+        sys.getsizeof(k) + sys.getsizeof(v) + sum(sys.getsizeof(x) for x in v) for k, v in table.items()
+    )
+    assert abs(estimate_size(table, sample=64) - exact) / exact < 0.05
+
+
+def test_runner_samples_memory_by_subsystem():
+    runner = SimulationRunner(num_nodes=40, num_evil=1, tx_per_step=4, memory_interval=5)
+    runner.build_network()
+    for step in range(15):
+        runner.step(step)
+    summary = runner.metrics.get_summary()
+    stats = summary["memory_stats"]
+    assert stats["samples"] == 3 and stats["step"] == 14
+    assert set(stats["subsystems"]) >= {
+        "node_local_graph", "node_known_balances", "graph_transactions", "graph_alerts",
+        "signature_store", "metrics_histories",
+    }
+    assert stats["per_node_bytes"] > 0 and stats["per_tx_network_bytes"] > stats["per_tx_bytes"] > 0
+    assert stats["traced_peak"] >= stats["traced_current"] > 0
+    history = stats["history"]
+    assert history[0]["total_estimated"] < history[-1]["total_estimated"]
+    payload = ab_payload({}, runner, summary, None, 0)
+    assert payload["mem_per_node_bytes"] > 0 and payload["mem_per_tx_bytes"] > 0
+    runner.close()
+    assert not tracemalloc.is_tracing()
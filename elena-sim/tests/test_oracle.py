@@ -0,0 +1,66 @@
+"""
+Тесты оракула двойных трат.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import Alert
+from simulation.runner import SimulationRunner
+
+
+def _scan(runner, tx1, tx2):
+    return {n.id for n in runner.graph.nodes.values() if tx1.id in n.conflicting_tx_ids or tx2.id in n.conflicting_tx_ids}
+
+
+def test_oracle_matches_node_scan():
+    runner = SimulationRunner(num_nodes=40, num_evil=2, tx_per_step=3)
+    runner.build_network()
+    for step in range(5):
+        runner.step(step)
+    attacks = []
+    for evil in runner.evil_nodes:
+        tx1, tx2 = evil.double_spend_attack("node_0", "node_1", 5.0)
+        runner.graph.propagate_transaction(tx1, evil)
+        runner.graph.propagate_transaction(tx2, evil)
+        attacks.append((tx1, tx2))
+    for step in range(5, 10):
+        runner.step(step)
+    oracle = runner.oracle
+    flagged = set()
+    for tx1, tx2 in attacks:
+        conflict = oracle.conflict(tx1.id)
+        assert conflict is oracle.conflict(tx2.id)
+        assert set(conflict.nodes) == _scan(runner, tx1, tx2)
+        flagged |= set(conflict.nodes)
+    assert oracle.flagged_nodes == len(flagged)
+    assert oracle.missed == 0 and oracle.false_positives == 0
+    summary = runner.metrics.get_summary()
+    assert summary["conflicts_injected"] == 2 and summary["missed_conflicts"] == 0
+    expected = sum(len(oracle.conflict(tx1.id).nodes) for tx1, _ in attacks) / (2 * len(runner.graph.nodes))
+    assert abs(summary["alert_coverage"] - expected) < 1e-12
+
+
+def test_oracle_counts_false_positive_and_missed():
+    runner = SimulationRunner(num_nodes=20, num_evil=1, tx_per_step=4)
+    runner.build_network()
+    for step in range(3):
+        runner.step(step)
+    evil = runner.evil_nodes[0]
+    tx1, tx2 = evil.double_spend_attack("node_0", "node_1", 5.0)
+    assert runner.oracle.missed == 1  # ещё не распространены
+    honest = [tx for tx in runner.graph.transactions.values() if tx.from_id != evil.id][:2]
+    node = runner.graph.nodes["node_2"]
+    node.receive_alert(Alert(
+        id="alert_bogus", conflicting_tx1=honest[0].id, conflicting_tx2=honest[1].id,
+        anchor=honest[0].anchor, discovered_by=node.id, propagation_count=0,
+    ))
+    summary = runner.metrics.get_summary()
+    assert summary["false_positives"] == 1 and summary["false_positive_rate"] == 1.0
+    assert runner.oracle.flagged_by(honest[0].id) == {"node_2"}
+    runner.graph.propagate_transaction(tx1, evil)
+    runner.graph.propagate_transaction(tx2, evil)
+    assert runner.oracle.missed == 0
+    assert 0 < runner.metrics.false_positive_rate < 1.0
@@ -0,0 +1,87 @@
+"""
+Тесты параллельных режимов: разбиение топологии, шардированный запуск, акторы asyncio.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pytest
+
+from core.topology import generate_edges, edges_to_csr
+from simulation.partition import partition_graph, edge_cut
+
+
+def test_partition_beats_random_cut():
+    edges = generate_edges(600, 3, 6)
+    indptr, indices = edges_to_csr(600, edges)
+    parts = partition_graph(indptr, indices, 4, seed=1)
+    assert np.bincount(parts).max() <= int(np.ceil(600 / 4 * 1.05))
+    random_parts = np.random.default_rng(1).integers(0, 4, 600)
+    assert edge_cut(indptr, indices, parts) < edge_cut(indptr, indices, random_parts)
+
+
+def test_sharded_run_merges_metrics():
+    from simulation.sharded import ShardedSimulationRunner
+    runner = ShardedSimulationRunner(num_nodes=120, num_shards=2, tx_per_step=4, seed=3)
+    result = runner.run(4)
+    assert len(runner.metrics.tx_throughput) == 4
+    assert len(runner.metrics.reputation_history[-1]["reputations"]) == 120
+    assert result["sharding"]["cross_shard_messages"] > 0
+    assert result["summary"]["bytes_transferred"] > 0
+
+
+def test_actor_mode_detects_double_spend():
+    from core import Node, QuantumEvilNode
+    from simulation.actors import AsyncNetworkGraph
+    for transport in ("inprocess", "tcp"):
+        g = AsyncNetworkGraph(transport=transport)
+        evil = QuantumEvilNode("evil", quantum_advantage=0.0)
+        nodes = [Node(f"n{i}") for i in range(6)]
+        for n in [evil] + nodes:
+            g.add_node(n)
+        for i in range(6):
+            g.add_edge(f"n{i}", f"n{(i + 1) % 6}")
+        g.add_edge("evil", "n0")
+        g.add_edge("evil", "n3")
+        tx1, tx2 = evil.double_spend_attack("n1", "n2", 50.0)
+        with g.batch():
+            g.propagate_transaction(tx1, evil, [nodes[0]])
+            g.propagate_transaction(tx2, evil, [nodes[3]])
+        assert g.alerts, transport
+        assert all(tx1.id in n.conflicting_tx_ids for n in nodes), transport
+        stats = g.actor_stats()
+        assert stats["messages"] == g.messages_delivered > 0
+        assert stats["latency_p99_ms"] >= stats["latency_p50_ms"] > 0
+        g.close()
+    with pytest.raises(ValueError):
+        AsyncNetworkGraph(transport="udp")
+
+
+def test_actor_mode_counts_first_acceptance_once():
+    from core import Node, NetworkGraph
+    from simulation.actors import AsyncNetworkGraph
+    counts = []
+    for g in (NetworkGraph(), AsyncNetworkGraph(transport="inprocess")):
+        nodes = [Node(f"n{i}") for i in range(8)]
+        for n in nodes:
+            g.add_node(n)
+        for i in range(8):
+            g.add_edge(f"n{i}", f"n{(i + 1) % 8}")
+            g.add_edge(f"n{i}", f"n{(i + 3) % 8}")
+        tx = nodes[0].create_transaction("n1", 5.0)
+        g.propagate_transaction(tx, nodes[0])
+        if hasattr(g, "run_until_idle"):
+            g.run_until_idle()
+            assert g.messages_delivered > 7  # дубликаты от разных пиров доставляются...
+            g.close()
+        counts.append(g.deliveries_accepted)
+    assert counts == [7, 7]  # ...но каждый узел принимает tx один раз
+
+
+def test_sharded_cli_rejects_unsupported_flags():
+    from main import _sharded_unsupported
+    assert _sharded_unsupported({"seed": 1, "chaff_prob": 0, "crypto_backend": "null"}) == []
+    assert _sharded_unsupported({"seed": 1, "trust_interval": 5, "workload_arrival": "mmpp"}) == ["--arrival", "--trust"]
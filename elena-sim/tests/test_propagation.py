@@ -0,0 +1,50 @@
+"""
+Тесты пакетного распространения транзакций (core/propagation.py).
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.runner import SimulationRunner
+
+
+def _state(runner):
+    g = runner.graph
+    nodes = {
+        nid: ([(t.from_id, t.to_id, t.amount) for t in n.local_graph.values()], n.reputation, n.known_balances)
+        for nid, n in g.nodes.items()
+    }
+    return nodes, (g.messages_delivered, g.bytes_delivered, g.signature_checks, g.signature_bytes)
+
+
+def test_batch_matches_scalar_propagation():
+    states = []
+    for vectorized in (False, True):
+        random.seed(7)
+        runner = SimulationRunner(num_nodes=60, num_evil=1, tx_per_step=6, vectorized_propagation=vectorized)
+        runner.build_network()
+        for step in range(12):
+            runner.step(step)
+        states.append(_state(runner))
+    assert states[0] == states[1]
+
+
+def test_batch_falls_back_on_conflict_and_rejects_bad_signature():
+    runner = SimulationRunner(num_nodes=30, num_evil=1, tx_per_step=2, vectorized_propagation=True)
+    runner.build_network()
+    runner.step(0)
+    g = runner.graph
+    evil = runner.evil_nodes[0]
+    tx1, tx2 = evil.double_spend_attack("node_0", "node_1", 5.0)
+    assert g.propagate_batch([(tx1, evil), (tx2, evil)]) is False
+    assert g.alerts and runner.oracle.missed == 0
+
+    sender = g.nodes["node_3"]
+    bad = sender.create_transaction("node_4", 1.0)
+    bad.signature = b"\x00" * len(bad.signature)
+    assert g.propagate_batch([(bad, sender)]) is True
+    holders = [n.id for n in g.nodes.values() if bad.id in n.local_graph]
+    assert holders == [sender.id]
@@ -0,0 +1,97 @@
+"""
+Тесты синхронизации состояния: расщепление разности таблиц, догрузка истории новым узлом,
+байты сверки в зависимости от разности, а не от истории.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.reconcile import SetSketch, decode, fold, subtract
+from core.transaction import Alert
+from simulation.runner import SimulationRunner
+
+
+def test_sketch_decodes_symmetric_difference():
+    rng = np.random.default_rng(0)
+    a, b = SetSketch(cells=64), SetSketch(cells=64)
+    for x in rng.integers(0, 2**62, size=3000).tolist():
+        a.add(f"{x:032x}")
+        b.add(f"{x:032x}")
+    only_a = [f"a{i}" for i in range(7)]
+    only_b = [f"b{i}" for i in range(30)]
+    for x in only_a:
+        a.add(x)
+    for x in only_b:
+        b.add(x)
+    assert len(a) == 3007 and len(b) == 3030
+    assert decode(subtract(fold(a.table, 8), fold(b.table, 8))) is None  # 37 ключей в 24 ячейки не влезают
+    plus, minus = decode(subtract(fold(a.table, 64), fold(b.table, 64)))
+    assert sorted(a.ids[k] for k in plus.tolist()) == sorted(only_a)
+    assert sorted(b.ids[k] for k in minus.tolist()) == sorted(only_b)
+
+
+def test_joining_node_catches_up_with_peers():
+    runner = SimulationRunner(num_nodes=60, num_evil=1, tx_per_step=4, seed=2, sync_on_join=True)
+    runner.build_network()
+    for step in range(25):
+        runner.step(step)
+    # Алерт в истории: новый узел должен узнать и о конфликте
+    honest = runner.honest_nodes
+    tx1, tx2 = list(honest[0].local_graph.values())[:2]
+    alert = Alert(
+        id="alert_test", conflicting_tx1=tx1.id, conflicting_tx2=tx2.id, anchor=tx1.anchor,
+        discovered_by=honest[0].id, propagation_count=0,
+    )
+    honest[0].receive_alert(alert)
+    runner.graph.propagate_alert(alert, honest[0])
+    node = runner.graph.churn().join(step=25)
+    records = runner.state_sync.records
+    assert len(records) == min(2, len(node.peers)) and records[0]["ranged"]
+    union = set()
+    for peer in node.peers:
+        union |= set(peer.local_graph)
+    assert set(node.local_graph) == union
+    assert "alert_test" in node.pending_alerts and tx1.id in node.conflicting_tx_ids
+    assert node.reputation == 0.5  # без наград за догрузку
+    peer = max(node.peers, key=lambda p: p.reputation)
+    assert records[0]["fetched"] == len(peer.local_graph) + len(peer.pending_alerts)
+
+
+def _reconnect_bytes(history_steps: int, missed: int) -> dict:
+    """Узел отключается, пропускает missed транзакций и сверяется с бывшим соседом."""
+    runner = SimulationRunner(num_nodes=40, num_evil=1, tx_per_step=5, seed=4, sync_on_join=True)
+    runner.build_network()
+    for step in range(history_steps):
+        runner.step(step)
+    node = runner.honest_nodes[1]
+    peer = node.peers[0]
+    for other in list(node.peers):
+        other.peers.remove(node)
+    saved, node.peers = node.peers, []
+    senders = [n for n in runner.honest_nodes if n is not node][:missed]
+    for sender in senders:
+        tx = sender.create_transaction(runner.honest_nodes[2].id, 1.0)
+        runner.graph.propagate_transaction(tx, sender)
+    node.peers = saved
+    for other in saved:
+        other.peers.append(node)
+    record = runner.state_sync.reconcile(node, peer)
+    assert set(node.local_graph) >= set(peer.local_graph)
+    return record
+
+
+def test_sync_bytes_follow_difference_not_history():
+    short = _reconnect_bytes(history_steps=10, missed=6)
+    long = _reconnect_bytes(history_steps=80, missed=6)
+    assert long["history"] > 5 * short["history"]
+    assert short["difference"] == long["difference"] == 6
+    assert not short["ranged"] and not long["ranged"]
+    # Id транзакций содержат время, поэтому декодирование первой таблицы (8 ячеек на раздел) изредка
+    # не удаётся и сверка удваивает её; в любом случае размер таблиц задаёт разность, а не история
+    ladder = 2 * 8 + 3 * (8 + 16) * 20
+    assert short["sketch_bytes"] <= ladder and long["sketch_bytes"] <= ladder
+    assert long["bytes"] < 2 * short["bytes"]
@@ -0,0 +1,53 @@
+"""
+Тесты повторения по зёрнам: статистика Уэлфорда и остановка по ширине интервала.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.replication import RunningStat, replicate
+
+
+def test_running_stat_matches_numpy():
+    rng = random.Random(7)
+    values = [rng.gauss(5, 2) for _ in range(51)]
+    stat = RunningStat()
+    for v in values:
+        stat.push(v)
+    assert abs(stat.mean - np.mean(values)) < 1e-9
+    assert abs(stat.variance - np.var(values, ddof=1)) < 1e-9
+    s = stat.summary()
+    assert s["ci_low"] < s["mean"] < s["ci_high"] and s["n"] == 51
+
+
+def test_replicate_stops_when_interval_is_narrow():
+    def quiet(seed):
+        return {"detection_time": 10 + random.Random(seed).uniform(-0.1, 0.1), "successful_attack": 0}
+
+    def noisy(seed):
+        return {"detection_time": random.Random(seed).uniform(0, 20), "successful_attack": 0}
+
+    rep = replicate(quiet, min_seeds=3, max_seeds=40, ci_width=0.05, workers=2)
+    assert rep["converged"] and len(rep["seeds"]) == 3
+    assert rep["stats"]["successful_attack"].std == 0.0
+
+    rep = replicate(noisy, min_seeds=3, max_seeds=12, ci_width=0.05, workers=4)
+    assert not rep["converged"] and rep["seeds"] == list(range(12))
+    assert rep["stats"]["detection_time"].n == 12
+
+
+def test_replicate_skips_failed_runs():
+    # Упавший прогон (ok=False, нули вместо метрик) не сдвигает среднее и не сужает интервал
+    def flaky(seed):
+        if seed % 3 == 1:
+            return {"ok": False, "detection_time": 0}
+        return {"ok": True, "detection_time": 10 + random.Random(seed).uniform(-0.1, 0.1)}
+
+    rep = replicate(flaky, min_seeds=4, max_seeds=9, ci_width=None, workers=3)
+    assert rep["failed"] == [1, 4, 7] and rep["seeds"] == [0, 2, 3, 5, 6, 8]
+    assert rep["stats"]["detection_time"].n == 6 and rep["stats"]["detection_time"].mean > 9.9
@@ -0,0 +1,48 @@
+"""
+Тесты адаптивного поиска границы (синтетические прогоны с известной границей).
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.search import BoundarySearch
+
+
+def _threshold_model(config, seed):
+    # Атака удаётся, если квантовое преимущество выше 0.62 (чуть шумно у самой границы)
+    noise = random.Random(seed).uniform(-0.01, 0.01)
+    return {"successful_attack": int(config["quantum"] + noise > 0.62)}
+
+
+def test_bisect_finds_boundary_with_fewer_runs(tmp_path):
+    search = BoundarySearch(_threshold_model, base_config={"nodes": 50}, replicates=3)
+    summary = search.bisect("quantum", 0.0, 1.0, tol=0.02)
+    assert summary["success_at_lo"] is False and summary["success_at_hi"] is True
+    assert abs(summary["boundary"] - 0.62) < 0.03
+    assert summary["runs"] < summary["grid_runs"] / 3
+    points, boundary = search.save(str(tmp_path), summary)
+    assert Path(points).read_text(encoding="utf-8").count("\n") == search.runs + 1
+    assert json.loads(Path(boundary).read_text(encoding="utf-8"))["total_runs"] == search.runs
+
+
+def test_halving_and_surrogate_focus_on_boundary():
+    # Граница — прямая quantum + chaff_prob = 0.8
+    def model(config, seed):
+        return {"successful_attack": int(config["quantum"] + config["chaff_prob"] + random.Random(seed).uniform(-0.05, 0.05) > 0.8)}
+
+    search = BoundarySearch(model, replicates=2)
+    candidates = [{"quantum": q / 10, "chaff_prob": 0.1} for q in range(11)]
+    summary = search.halving(candidates, max_replicates=16)
+    assert summary["runs"] < summary["grid_runs"]
+    assert abs(summary["nearest_boundary"][0]["quantum"] - 0.7) <= 0.1
+
+    search = BoundarySearch(model, replicates=2)
+    summary = search.surrogate({"quantum": (0.0, 1.0), "chaff_prob": (0.0, 0.3)}, budget=25)
+    assert summary["runs"] < summary["grid_runs"]
+    assert summary["boundary"]
+    for point in summary["boundary"]:
+        assert abs(point["quantum"] + point["chaff_prob"] - 0.8) < 0.2
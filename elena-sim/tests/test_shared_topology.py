@@ -0,0 +1,56 @@
+"""
+Тесты общей топологии в shared_memory: подключение из другого процесса и копирование при записи.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.shared_topology import SharedTopology
+from simulation.runner import SimulationRunner
+
+
+def test_attach_from_other_process_reads_same_segment():
+    with SharedTopology.publish(80, num_evil=2, seed=3, crypto_backend="blake2b", with_path_metrics=False) as topo:
+        code = (
+            "from core.shared_topology import SharedTopology\n"
+            f"t = SharedTopology.attach({topo.name!r})\n"
+            "indptr, indices = t.csr()\n"
+            "print(int(indices.sum()), int(t.arrays['public_keys'].sum()), t.num_evil)\n"
+            "t.close()\n"
+        )
+        for _ in range(2):  # выход воркера не удаляет сегмент
+            out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+            assert out.stdout.split() == [str(int(topo.csr()[1].sum())), str(int(topo.arrays["public_keys"].sum())), "2"]
+            assert "KeyError" not in out.stderr and "leaked" not in out.stderr
+
+
+def test_runner_uses_shared_csr_until_rewiring():
+    with SharedTopology.publish(60, num_evil=1, seed=1) as topo:
+        a = SimulationRunner(shared_topology=topo, tx_per_step=3, vectorized_propagation=True)
+        a.build_network()
+        b = SimulationRunner(shared_topology=topo, tx_per_step=3)
+        b.build_network()
+        shared_indices = topo.csr()[1]
+        assert [n.public_key for n in a.graph.nodes.values()] == [n.public_key for n in b.graph.nodes.values()]
+        assert a.metrics.network_diameter == topo.meta["path_metrics"][0]
+        assert a.graph.csr()[2] is shared_indices
+        with pytest.raises(ValueError):
+            shared_indices[0] = 0
+        for step in range(3):
+            a.step(step)
+        assert all(n.id in a.graph.nodes for n in a.evil_nodes)
+        before = shared_indices.copy()
+        a.graph.rewire_peers(1.0)
+        own = a.graph.csr()[2]
+        assert own is not shared_indices and not np.array_equal(own, before)
+        assert np.array_equal(shared_indices, before)
+        assert b.graph.csr()[2] is shared_indices
+        with pytest.raises(ValueError):
+            SimulationRunner(num_nodes=10, shared_topology=topo)
@@ -0,0 +1,63 @@
+"""
+Тесты потоковых метрик: онлайн-агрегаты и приёмники на диске.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.runner import SimulationRunner
+from simulation.streaming import SeriesStats, iter_records
+
+
+def test_series_stats_match_numpy():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(3, 1) for _ in range(5000)] + [0.0] * 50
+    stats = SeriesStats(alpha=0.01)
+    for v in values:
+        stats.add(v)
+    summary = stats.summary()
+    arr = np.array(values)
+    assert summary["count"] == len(values)
+    assert abs(summary["mean"] - arr.mean()) < 1e-9 * arr.mean()
+    assert abs(summary["std"] - arr.std(ddof=1)) < 1e-6 * arr.std()
+    assert summary["max"] == arr.max() and summary["min"] == 0.0
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(arr, q, method="lower")
+        assert abs(summary[f"p{int(q * 100)}"] - exact) <= 0.02 * exact
+
+
+def _run(steps, **kwargs):
+    runner = SimulationRunner(num_nodes=30, num_evil=1, tx_per_step=3, seed=7, **kwargs)
+    runner.build_network()
+    for step in range(steps):
+        runner.step(step)
+    return runner
+
+
+def test_bounded_collector_streams_steps_to_disk(tmp_path):
+    full = _run(40).metrics.get_summary()
+    for kind in ("jsonl", "npz"):
+        directory = tmp_path / kind
+        runner = _run(40, metrics_sink=kind, metrics_dir=str(directory), metrics_history=5)
+        m = runner.metrics
+        assert len(m.tx_throughput) == len(m.reputation_history) == len(m.avg_reputation) == 5
+        summary = m.get_summary()
+        for key in ("peak_throughput", "bytes_transferred", "peak_bytes_per_step", "reputation_snapshots"):
+            assert summary[key] == full[key]
+        assert summary["step_stats"]["throughput"]["count"] == 40
+        runner.close()
+        records = list(iter_records(str(directory)))
+        assert [r["step"] for r in records] == list(range(40))
+        assert sum(r["bytes"] for r in records) == full["bytes_transferred"]
+        assert len(records[-1]["reputations"]) == 30
+
+
+def test_partial_run_survives_on_disk(tmp_path):
+    _run(12, metrics_sink="jsonl", metrics_dir=str(tmp_path))
+    # Прогон «упал» без close(): строки уже на диске
+    assert [r["step"] for r in iter_records(str(tmp_path))] == list(range(12))
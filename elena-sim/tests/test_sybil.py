@@ -0,0 +1,58 @@
+"""
+Тесты модели Сибил-атаки и детектора на случайных блужданиях.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from core.sybil import SybilDetector, precision_recall, random_walk_visits
+from core.topology import edges_to_csr, sybil_region_edges
+from simulation.scenarios import Scenario4_SybilAttack
+
+
+def test_detector_separates_sybil_region():
+    num_honest, num_sybil = 1800, 200
+    edges = sybil_region_edges(num_honest, num_sybil, attack_edges=20, rng=random.Random(5))
+    indptr, indices = edges_to_csr(num_honest + num_sybil, edges)
+    cross = [(i, j) for i, j in edges.tolist() if (i < num_honest) != (j < num_honest)]
+    assert 0 < len(cross) <= 20
+    walks = random_walk_visits(indptr, indices, np.arange(50), length=7, rng=np.random.default_rng(0))
+    assert walks.sum() == 50 * 7
+    is_sybil = np.arange(num_honest + num_sybil) >= num_honest
+    flagged = SybilDetector(seed=1).detect(indptr, indices, np.arange(0, num_honest, 97), num_sybil)
+    precision, recall = precision_recall(flagged, is_sybil)
+    assert precision > 0.9 and recall > 0.9
+
+
+def test_walks_on_edgeless_and_isolated_nodes():
+    rng = np.random.default_rng(0)
+    indptr, indices = edges_to_csr(5, np.zeros((0, 2), dtype=np.int64))
+    visits = random_walk_visits(indptr, indices, np.array([0, 0, 3]), length=4, rng=rng)
+    assert visits.tolist() == [8, 0, 0, 4, 0]
+    assert len(SybilDetector(seed=0).detect(indptr, indices, [0], 2)) == 2
+    # Изолированный узел 3 рядом с ребром 0–1: блуждание из него не двигается
+    indptr, indices = edges_to_csr(4, np.array([[0, 1]]))
+    visits = random_walk_visits(indptr, indices, np.array([3, 0]), length=3, rng=rng)
+    assert visits[3] == 3 and visits[0] + visits[1] == 3
+
+
+def test_scenario4_quarantines_sybils():
+    result = Scenario4_SybilAttack().run(
+        num_nodes=80, num_sybil=12, steps=12, detect_interval=6, vectorized_propagation=True, tx_per_step=3,
+        quarantine_fraction=0.1,
+    )
+    stats = result["summary"]["sybil_detection"]
+    # 92 узла без 3 доверенных, доля 0.1 — 9 помеченных, сколько бы ни было сибил-узлов
+    assert stats["rounds"] == 2 and stats["flagged"] == 9
+    assert stats["precision"] > 0.8
+    assert stats["sybil_reputation_after"] < stats["honest_reputation"]
+    fewer = Scenario4_SybilAttack().run(
+        num_nodes=86, num_sybil=6, steps=6, detect_interval=6, tx_per_step=3, quarantine_fraction=0.1
+    )
+    stats = fewer["summary"]["sybil_detection"]
+    assert stats["flagged"] == 9 and stats["recall"] > 0.8
@@ -0,0 +1,57 @@
+"""
+Тесты живых метрик в формате Prometheus.
+"""
+
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.runner import SimulationRunner
+from simulation.telemetry import Histogram, SimulationTelemetry
+
+
+def _parse(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("h", "тест", buckets=(1, 5))
+    for v in (0.5, 1, 3, 7, 100):
+        h.observe(v)
+    samples = {(name, labels.get("le")): value for name, labels, value in h.samples()}
+    assert samples[("h_bucket", "1.0")] == 2
+    assert samples[("h_bucket", "5.0")] == 3
+    assert samples[("h_bucket", "+Inf")] == 5
+    assert samples[("h_count", None)] == 5 and samples[("h_sum", None)] == 111.5
+
+
+def test_runner_updates_series_incrementally_and_serves_them():
+    telemetry = SimulationTelemetry()
+    runner = SimulationRunner(num_nodes=30, num_evil=1, tx_per_step=3, seed=5, telemetry=telemetry)
+    runner.build_network()
+    for step in range(15):
+        runner.step(step)
+    runner.metrics.record_detection(4.0)
+    port = telemetry.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            samples = _parse(response.read().decode("utf-8"))
+    finally:
+        telemetry.shutdown()
+    g = runner.graph
+    assert samples["elena_steps_total"] == 15
+    assert samples["elena_transactions_created_total"] == 45
+    assert samples["elena_transactions_accepted_total"] == g.deliveries_accepted
+    assert samples["elena_messages_total"] == g.messages_delivered
+    assert samples["elena_bytes_total"] == g.bytes_delivered
+    assert samples["elena_step_duration_seconds_count"] == 15
+    assert samples['elena_detection_latency_steps_bucket{le="5.0"}'] == 1
+    assert samples['elena_reputation{quantile="0.05"}'] <= samples['elena_reputation{quantile="0.95"}']
@@ -0,0 +1,76 @@
+"""
+Тесты шкалы состояний: восстановление шага из кадра и дельт, сохранение, история узла.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.runner import SimulationRunner
+from simulation.timeline import StateTimeline
+
+
+def _run(steps=40, interval=10):
+    """Прогон с rewiring; истинное состояние каждого шага записывается для сравнения."""
+    runner = SimulationRunner(
+        num_nodes=40, num_evil=1, tx_per_step=3, seed=5, rewiring_interval=2, rewiring_prob=0.3,
+        timeline_interval=interval,
+    )
+    runner.build_network()
+    truth = {}
+    for step in range(steps):
+        runner.step(step)
+        node_ids, indptr, indices = runner.graph.csr()
+        src = np.repeat(np.arange(len(node_ids)), np.diff(indptr))
+        keep = src < indices
+        truth[step] = (
+            np.array([runner.graph.nodes[nid].reputation for nid in node_ids]),
+            {(int(a), int(b)) for a, b in zip(src[keep], indices[keep])},
+        )
+    return runner, truth
+
+
+def _check(state, truth, tolerance):
+    reps, edges = truth[state["step"]]
+    assert {tuple(e) for e in state["edges"].tolist()} == edges
+    assert np.abs(state["reputations"] - reps).max() <= tolerance
+
+
+def test_state_matches_ground_truth_forward_and_backward():
+    runner, truth = _run()
+    timeline = runner.timeline
+    assert [f["step"] for f in timeline.keyframes] == [0, 10, 20, 30]
+    directions = set()
+    for step in range(40):
+        state = timeline.state(step)
+        directions.add(state["direction"])
+        assert state["deltas_applied"] <= (5 if step < 30 else 9)  # после последнего кадра — только вперёд
+        _check(state, truth, 2 * timeline.min_delta)
+    assert directions == {"forward", "backward"}
+
+
+def test_save_load_round_trip(tmp_path):
+    runner, truth = _run(steps=25, interval=8)
+    path = tmp_path / "timeline.npz"
+    runner.timeline.save(str(path))
+    loaded = StateTimeline.load(str(path))
+    assert loaded.steps == runner.timeline.steps
+    for step in (0, 5, 13, 24):
+        a, b = runner.timeline.state(step), loaded.state(step)
+        assert a["node_ids"] == b["node_ids"]
+        np.testing.assert_array_equal(a["reputations"], b["reputations"])
+        np.testing.assert_array_equal(a["edges"], b["edges"])
+        assert a["alerts"] == b["alerts"]
+
+
+def test_node_history_follows_reputation():
+    runner, truth = _run(steps=30)
+    node_ids = runner.timeline.rosters[0][0]
+    steps, values = runner.timeline.node_history(node_ids[3])
+    assert steps.tolist() == list(range(30))
+    expected = np.array([truth[s][0][3] for s in range(30)])
+    assert np.abs(values - expected).max() <= 2 * runner.timeline.min_delta
+    assert runner.timeline.first_step_below(node_ids[3], -1.0) is None
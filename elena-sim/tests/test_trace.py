@@ -0,0 +1,62 @@
+"""
+Тесты журнала событий и воспроизведения.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from simulation.runner import SimulationRunner
+from simulation.trace import TraceReplay
+
+
+def test_replay_rebuilds_metrics_and_seeks(tmp_path):
+    path = tmp_path / "run.elt"
+    runner = SimulationRunner(num_nodes=30, num_evil=1, tx_per_step=3, trace_path=str(path))
+    runner.recorder.chunk_events = 200  # несколько чанков
+    runner.build_network()
+    for step in range(12):
+        runner.step(step)
+    evil = runner.evil_nodes[0]
+    tx1, tx2 = evil.double_spend_attack("node_0", "node_1", 10.0)
+    runner.graph.propagate_transaction(tx1, evil)
+    runner.graph.propagate_transaction(tx2, evil)
+    for step in range(12, 20):
+        runner.step(step)
+    runner.close()
+
+    replay = TraceReplay(str(path))
+    assert len(replay.chunks) > 1
+    assert replay.steps == (0, 19)
+    m = replay.metrics()
+    assert m.tx_throughput == runner.metrics.tx_throughput
+    assert m.bytes_per_step == runner.metrics.bytes_per_step
+    assert np.allclose(m.avg_reputation, runner.metrics.avg_reputation, atol=1e-6)
+    assert replay.totals["tx"] == len(runner.graph.transactions)
+    assert replay.totals["alert"] == len(runner.graph.alerts) >= 1
+
+    state = replay.seek(19)
+    assert {k: state[k] for k in replay.totals} == replay.totals
+    assert state["reputations"].keys() == runner.graph.nodes.keys()
+    early = replay.seek(5)
+    assert early["alert"] == 0 and 0 < early["tx"] < state["tx"]
+    kinds = [kind for kind, _ in replay.events(11, 11)]
+    # Атака после шага 11 записана тем же шагом, после его итоговой записи
+    assert kinds[0] == "tx" and kinds.index("step") < kinds.index("alert")
+
+
+def test_unclosed_trace_is_readable(tmp_path):
+    path = tmp_path / "partial.elt"
+    runner = SimulationRunner(num_nodes=15, num_evil=0, tx_per_step=2, trace_path=str(path))
+    runner.build_network()
+    for step in range(4):
+        runner.step(step)
+    runner.recorder._flush()
+    runner.recorder._file.flush()
+    replay = TraceReplay(str(path))  # без индекса в конце — каталог по заголовкам чанков
+    assert replay.steps == (0, 3)
+    assert replay.metrics().tx_throughput == runner.metrics.tx_throughput
+    runner.close()
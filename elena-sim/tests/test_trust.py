@@ -0,0 +1,103 @@
+"""
+Тесты глобального доверия (core/trust.py).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from core import Node, NetworkGraph
+from core.trust import GlobalTrust, _popcount_table
+from simulation.runner import SimulationRunner
+
+
+def test_power_iteration_matches_dense_solution():
+    g = NetworkGraph()
+    nodes = [Node(f"n{i}") for i in range(6)]
+    for n in nodes:
+        g.add_node(n)
+    for i, j in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 0), (0, 3)]:
+        g.add_edge(f"n{i}", f"n{j}")
+    trust = GlobalTrust(g, tol=1e-12, max_iter=1000)
+    trust.observe_flood([f"n{i}" for i in range(6)])
+    trust.observe_flood(["n0", "n1", "n2", "n3"])
+    trust.observe_conflict("n4", "n5")
+    trust.update()
+
+    s = np.zeros((6, 6))
+    for i in range(6):
+        for peer in nodes[i].peers:
+            j = int(peer.id[1:])
+            s[i, j] = 2 if i < 4 and j < 4 else 1
+    s[4, 5] = 0.0
+    c = s / s.sum(axis=1, keepdims=True)
+    a, p = trust.alpha, np.full(6, 1 / 6)
+    m = (1 - a) * c.T + a * np.outer(p, np.ones(6))
+    vals, vecs = np.linalg.eig(m)
+    expected = np.real(vecs[:, np.argmax(np.real(vals))])
+    expected /= expected.sum()
+    assert np.allclose(trust.trust, expected, atol=1e-9)
+    # Шкала репутации: среднее доверие 1/n — 0.5, вдвое большее и выше — 1.0
+    assert np.allclose([trust.score(f"n{i}") for i in range(6)], np.minimum(3 * expected, 1.0))
+
+
+def _flooded_graph(edges, num_nodes):
+    g = NetworkGraph()
+    for i in range(num_nodes):
+        g.add_node(Node(f"n{i}"))
+    for i, j in edges:
+        g.add_edge(f"n{i}", f"n{j}")
+    trust = GlobalTrust(g, tol=1e-12, max_iter=1000)
+    g.trust = trust
+    trust.observe_flood([f"n{i}" for i in range(num_nodes)])
+    trust.update()
+    return g
+
+
+def test_arbiters_follow_absolute_trust_scale():
+    # Кольцо: доверие у всех среднее (1/n) — репутация 0.5, арбитров нет (не «все в 80% от лидера»)
+    ring = _flooded_graph([(i, (i + 1) % 8) for i in range(8)], 8)
+    assert np.allclose(ring.trust.scores, 0.5)
+    assert ring.arbiters(0.8) == []
+    # Две звезды, связанные центрами: доверие сосредоточено в центрах — только они арбитры
+    stars = [(0, j) for j in range(2, 7)] + [(1, j) for j in range(7, 12)] + [(0, 1)]
+    g = _flooded_graph(stars, 12)
+    assert sorted(g.arbiters(0.8)) == ["n0", "n1"]
+    assert all(g.reputation_of(f"n{j}") < 0.5 for j in range(2, 12))
+
+
+def test_trust_feeds_confidence_and_demotes_attacker():
+    runner = SimulationRunner(num_nodes=40, num_evil=1, tx_per_step=4, trust_interval=5)
+    runner.build_network()
+    for step in range(10):
+        runner.step(step)
+    evil = runner.evil_nodes[0]
+    tx1, tx2 = evil.double_spend_attack("node_0", "node_1", 5.0)
+    runner.graph.propagate_transaction(tx1, evil)
+    runner.graph.propagate_transaction(tx2, evil)
+    for step in range(10, 20):
+        runner.step(step)
+    g = runner.graph
+    scores = runner.trust.scores
+    assert g.reputation_of(evil.id) == scores.min() < np.median(scores)
+    assert runner.metrics.trust_stats["updates"] == 4
+    t = runner.trust.trust
+    assert runner.metrics.trust_stats["arbiters"] == len(g.arbiters(0.8)) == int((0.5 * len(t) * t >= 0.8).sum())
+    # Уверенность узла считается по глобальному доверию создателей дочерних транзакций
+    node = g.nodes["node_2"]
+    tx_id = next(t for t in node.local_graph if g.children.get(t) and t not in node.conflicting_tx_ids)
+    children = [c for c in g.children[tx_id] if c in node.local_graph]
+    expected = min(1.0, 0.5 + 0.1 * sum(g.reputation_of(g.transactions[c].from_id) for c in children))
+    assert abs(node.get_confidence(tx_id) - expected) < 1e-12
+
+
+def test_popcount_fallback_matches_bit_count():
+    # Запасной popcount для NumPy 1.x, где нет np.bitwise_count
+    words = np.random.default_rng(0).integers(0, 2**63, size=1000, dtype=np.uint64) | np.uint64(1 << 63)
+    words[:3] = [0, 1, 2**64 - 1]
+    expected = [bin(int(w)).count("1") for w in words]
+    assert _popcount_table(words).tolist() == expected
+    assert _popcount_table(words[::2]).tolist() == expected[::2]
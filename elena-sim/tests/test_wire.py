@@ -0,0 +1,61 @@
+"""
+Тесты проводного формата core.wire.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core import Node, Alert, NetworkGraph
+from core import wire
+from core.crypto import CRYPTO_BACKENDS, set_backend
+
+
+def _sample_tx():
+    g = NetworkGraph()
+    a, b = Node("a"), Node("b")
+    g.add_node(a)
+    g.add_node(b)
+    for _ in range(3):
+        tx = a.create_transaction("b", 12.5)
+    return tx
+
+
+def test_round_trip_all_backends():
+    try:
+        for name in CRYPTO_BACKENDS:
+            set_backend(name)
+            tx = _sample_tx()
+            tx.is_chaff = True
+            data = wire.encode(tx)
+            assert len(data) == wire.transaction_size(tx), name
+            assert wire.decode(data) == tx, name
+            alert = Alert(id="alert_x", conflicting_tx1=tx.id, conflicting_tx2=tx.parents[0],
+                          anchor=tx.anchor, discovered_by="b", propagation_count=7)
+            data = wire.encode(alert)
+            assert len(data) == wire.alert_size(alert)
+            assert wire.decode(data) == alert, name
+    finally:
+        set_backend("sha512")
+
+
+def test_view_and_batch_without_copies():
+    tx = _sample_tx()
+    buf = bytearray(wire.encode_batch([tx, tx], routes=["b", "c"]))
+    items = list(wire.iter_batch(buf))
+    assert [route for route, _ in items] == ["b", "c"]
+    view = wire.TransactionView(items[1][1])
+    assert view.id == tx.id and view.from_id == "a" and view.amount == 12.5
+    assert view._buf.obj is buf  # тело — срез исходного буфера, не копия
+    assert wire.decode_batch(bytes(buf)) == [tx, tx]
+
+
+def test_rejects_bad_buffers():
+    data = wire.encode(_sample_tx())
+    with pytest.raises(wire.WireError):
+        wire.decode(data[:-3])
+    with pytest.raises(wire.WireError):
+        wire.decode(b"\x09" + data[1:])
@@ -0,0 +1,61 @@
+"""
+Тесты генератора нагрузки: модели прихода и отправителей, chaff-поток, воспроизводимость прогона.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation.runner import SimulationRunner
+from simulation.workload import WorkloadGenerator
+
+
+def test_arrival_models_keep_mean_rate():
+    counts = {}
+    for arrival in ("uniform", "poisson", "mmpp"):
+        gen = WorkloadGenerator(20, arrival=arrival, block_steps=64, rng=random.Random(1))
+        counts[arrival] = np.array([len(gen.step(100).senders) for _ in range(4000)])
+    assert (counts["uniform"] == 20).all()
+    assert abs(counts["poisson"].mean() - 20) < 0.5 and abs(counts["poisson"].var() - 20) < 3
+    assert abs(counts["mmpp"].mean() - 20) < 2
+    assert counts["mmpp"].var() > 5 * counts["poisson"].var()  # всплески: дисперсия много больше пуассоновской
+
+
+def test_zipf_senders_and_pairs_follow_node_count():
+    gen = WorkloadGenerator(100_000, senders="zipf", zipf_exponent=1.2, rng=random.Random(2))
+    offsets, senders, receivers, amounts = gen.generate(10, 1000)
+    assert offsets[-1] == len(senders) == 1_000_000
+    assert senders.min() >= 0 and max(senders.max(), receivers.max()) < 1000
+    assert not (senders == receivers).any()
+    assert 1.0 <= amounts.min() and amounts.max() <= 50.0
+    freq = np.bincount(senders, minlength=1000)
+    assert freq[0] > freq[1] > freq[10] > freq[500]
+    assert freq[:10].sum() > 0.4 * len(senders)  # горячие отправители
+    # Индексы считаются по числу узлов на момент шага: сеть может расти и сжиматься
+    for n in (2, 7, 50):
+        batch = gen.step(n)
+        assert batch.senders.max() < n and batch.receivers.max() < n
+        assert not (batch.senders == batch.receivers).any()
+
+
+def test_runner_workload_and_chaff_stream():
+    def run(seed):
+        runner = SimulationRunner(num_nodes=50, num_evil=1, tx_per_step=4, chaff_prob=0.04, seed=seed,
+                                  workload_arrival="poisson", workload_senders="zipf")
+        runner.build_network()
+        for step in range(20):
+            runner.step(step)
+        return runner
+
+    a, b = run(3), run(3)
+    txs = list(a.graph.transactions.values())
+    chaff = [tx for tx in txs if tx.is_chaff]
+    assert 20 < len(chaff) < 70  # ~0.04 · 51 узел · 20 шагов
+    assert all(tx.from_id != tx.to_id and tx.from_id in a.graph.nodes for tx in txs)
+    assert not any(getattr(a.graph.nodes[tx.from_id], "is_evil", False) for tx in chaff)
+    key = lambda runner: [(tx.from_id, tx.to_id, tx.amount, tx.is_chaff) for tx in runner.graph.transactions.values()]
+    assert key(a) == key(b)
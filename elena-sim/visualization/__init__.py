@@ -1,6 +1,30 @@
-"""Visualization components for Elena network simulator."""
+"""Visualization components for Elena network simulator.
 
-from .plots import plot_metrics, plot_network_state, plot_reputation_history
-from .dashboard import create_app
+Подмодули загружаются при первом обращении: matplotlib и FastAPI не импортируются
+в безголовых прогонах, которые визуализацию не используют.
+"""
 
-__all__ = ["plot_metrics", "plot_network_state", "plot_reputation_history", "create_app"]
+import importlib
+
+_EXPORTS = {
+    "plot_metrics": "plots",
+    "plot_network_state": "plots",
+    "plot_reputation_history": "plots",
+    "create_app": "dashboard",
+    "ForceLayout": "layout",
+    "graph_layout": "layout",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
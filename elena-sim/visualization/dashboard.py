@@ -1,21 +1,51 @@
 """
 Простой веб-дашборд на FastAPI: граф, метрики, анимация распространения, WebSocket.
+При живой трансляции (simulation/live.py) /ws отдаёт снимок, затем бинарные дельты шагов
+и принимает команды pause / resume / step.
 """
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional, Dict, Any
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, FileResponse
+import numpy as np
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse, Response
+
+from simulation.telemetry import CONTENT_TYPE
+from .layout import graph_layout
+from .lod import GraphLOD, GraphSource
 
 # Глобальное состояние для дашборда (заполняется из main при --viz)
 dashboard_state: Dict[str, Any] = {
     "graph": None,
     "metrics": None,
     "runner": None,
+    "live": None,
+    "timeline": None,
 }
 
+# Укрупнённый граф: иерархия кластеров и кэш ответов по версии топологии
+graph_lod = GraphLOD()
+_sources: Dict[int, GraphSource] = {}
+LAYOUT_MAX_NODES = 5000  # больше — полная раскладка дорога, страница показывает укрупнённый граф
+
+
+def _graph_source():
+    """Источник топологии и репутаций: опубликованное состояние живой трансляции или граф прогона."""
+    live = dashboard_state.get("live")
+    if live is not None and live.graph is not None:
+        return live
+    state = dashboard_state.get("graph") or dashboard_state.get("runner")
+    if state is None:
+        return None
+    g = getattr(state, "graph", state)
+    if id(g) not in _sources:
+        _sources.clear()
+        _sources[id(g)] = GraphSource(g)
+    return _sources[id(g)]
+
 _DASHBOARD_HTML_PATH = Path(__file__).resolve().parent / "dashboard_page.html"
 
 
@@ -33,26 +63,24 @@ def create_app() -> FastAPI:
 
     @app.get("/graph")
     def get_graph():
-        """Возвращает текущее состояние графа в JSON."""
-        state = dashboard_state.get("graph") or dashboard_state.get("runner")
-        if state is None:
+        """Возвращает текущее состояние графа в JSON (для больших сетей — /graph/lod)."""
+        source = _graph_source()
+        if source is None:
             return {"nodes": [], "edges": [], "transactions_count": 0, "alerts_count": 0}
-        if hasattr(state, "graph"):
-            g = state.graph
-        else:
-            g = state
+        # Живой режим: граф меняется в потоке симуляции — отдаём опубликованное состояние трансляции
+        edges = graph_lod.edge_list(source)
+        h = graph_lod.hierarchy(source)
+        evil = h.evil[0].tolist()
         nodes = [
-            {"id": nid, "reputation": round(n.reputation, 2), "is_evil": getattr(n, "is_evil", False)}
-            for nid, n in g.nodes.items()
+            {"id": nid, "reputation": round(rep, 2), "is_evil": bool(bad)}
+            for nid, rep, bad in zip(h.node_ids, source.reputations().tolist(), evil)
         ]
-        edges = []
-        seen = set()
-        for nid, node in g.nodes.items():
-            for peer in node.peers:
-                key = tuple(sorted([nid, peer.id]))
-                if key not in seen:
-                    seen.add(key)
-                    edges.append({"source": nid, "target": peer.id})
+        if len(nodes) <= LAYOUT_MAX_NODES:
+            layout_ids, pos = graph_layout(source.graph).positions(source)
+            if layout_ids == h.node_ids:
+                for node, (x, y) in zip(nodes, np.round(pos, 2).tolist()):
+                    node["x"], node["y"] = x, y
+        g = source.graph
         return {
             "nodes": nodes,
             "edges": edges,
@@ -60,6 +88,44 @@ def create_app() -> FastAPI:
             "alerts_count": len(g.alerts),
         }
 
+    @app.get("/graph/layout")
+    def get_graph_layout():
+        """Позиции узлов из общей кэшированной раскладки (те же, что у plot_network_state)."""
+        source = _graph_source()
+        if source is None:
+            return {"version": None, "nodes": [], "x": [], "y": []}
+        if len(source.graph.nodes) > LAYOUT_MAX_NODES:
+            raise HTTPException(status_code=413, detail=f"Больше {LAYOUT_MAX_NODES} узлов — используйте /graph/lod")
+        layout = graph_layout(source.graph)
+        node_ids, pos = layout.positions(source)
+        return {
+            "version": source.topology_version,
+            "nodes": node_ids,
+            "x": np.round(pos[:, 0], 2).tolist(),
+            "y": np.round(pos[:, 1], 2).tolist(),
+            "relaxed": layout.relaxed,
+        }
+
+    @app.get("/graph/lod")
+    def get_graph_lod():
+        """Верхний уровень укрупнённого графа: суперузлы (size, evil) и суперрёбра с весами."""
+        source = _graph_source()
+        if source is None:
+            return {"graph": {"nodes": [], "edges": [], "levels": 0, "level": 0}, "reputation": []}
+        return Response(graph_lod.top(source), media_type="application/json")
+
+    @app.get("/graph/lod/{level}")
+    def get_graph_lod_level(level: int, clusters: str = ""):
+        """Раскрытие кластеров уровня level (?clusters=3,7): их дети, рёбра между ними и связи наружу."""
+        source = _graph_source()
+        if source is None:
+            raise HTTPException(status_code=404, detail="Нет графа")
+        try:
+            wanted = [int(c) for c in clusters.split(",") if c.strip()]
+            return Response(graph_lod.expand(source, level, wanted), media_type="application/json")
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
     @app.get("/metrics")
     def get_metrics():
         """Возвращает метрики симуляции."""
@@ -71,9 +137,64 @@ def create_app() -> FastAPI:
             return {}
         return m.get_summary()
 
+    @app.get("/metrics/prom")
+    def get_metrics_prom():
+        """Живые метрики в текстовом формате Prometheus (счётчики runner'а, без пересчёта сводки)."""
+        telemetry = getattr(dashboard_state.get("runner"), "telemetry", None)
+        body = telemetry.render() if telemetry is not None else ""
+        return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
+    @app.get("/state")
+    def get_state(step: int):
+        """Состояние сети на шаге step из шкалы состояний (ключевой кадр + дельты), не трогая живой граф."""
+        timeline = dashboard_state.get("timeline")
+        if timeline is None:
+            raise HTTPException(status_code=404, detail="Шкала состояний не записывается (--timeline K)")
+        try:
+            state = timeline.state(step)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return {
+            "step": state["step"],
+            "keyframe": state["keyframe"],
+            "direction": state["direction"],
+            "deltas_applied": state["deltas_applied"],
+            "nodes": [
+                {"id": nid, "reputation": round(rep, 4), "is_evil": bool(bad)}
+                for nid, rep, bad in zip(state["node_ids"], state["reputations"].tolist(), state["is_evil"].tolist())
+            ],
+            "edges": state["edges"].tolist(),
+            "alerts": state["alerts"],
+        }
+
+    @app.get("/state/node/{node_id}")
+    def get_node_history(node_id: str):
+        """Репутация узла по всем записанным шагам."""
+        timeline = dashboard_state.get("timeline")
+        if timeline is None:
+            raise HTTPException(status_code=404, detail="Шкала состояний не записывается (--timeline K)")
+        try:
+            steps, values = timeline.node_history(node_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Узел {node_id} не найден")
+        return {"node": node_id, "steps": steps.tolist(), "reputation": np.round(values, 4).tolist()}
+
+    @app.post("/control/{command}")
+    def control(command: str):
+        """Управление живым прогоном: pause | resume | step."""
+        live = dashboard_state.get("live")
+        if live is None or command not in ("pause", "resume", "step"):
+            return {"ok": False}
+        live.control(command)
+        return {"ok": True, "paused": live.paused, "step": live.step}
+
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
         await websocket.accept()
+        live = dashboard_state.get("live")
+        if live is not None:
+            await _stream_live(websocket, live)
+            return
         try:
             while True:
                 data = await websocket.receive_text()
@@ -89,13 +210,59 @@ def create_app() -> FastAPI:
     return app
 
 
-def set_dashboard_state(runner=None, graph=None, metrics=None):
+async def _stream_live(websocket: WebSocket, live) -> None:
+    """Снимок, затем дельты по мере накопления; пока клиент занят отправкой, дельты сливаются."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    sub = live.subscribe(lambda: loop.call_soon_threadsafe(wake.set))
+
+    async def sender():
+        await websocket.send_json(dict(sub.snapshot, type="snapshot"))
+        while True:
+            await wake.wait()
+            wake.clear()
+            message = sub.take()
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            elif message is not None:
+                await websocket.send_json(message)
+
+    async def receiver():
+        while True:
+            data = await websocket.receive_text()
+            if data in ("pause", "resume", "step"):
+                live.control(data)
+                await websocket.send_json({"type": "control", "paused": live.paused, "step": live.step})
+            elif data == "ping":
+                metrics = dashboard_state.get("metrics")
+                payload = metrics.get_summary() if metrics else {"step": live.step}
+                await websocket.send_json({"type": "metrics", "data": payload})
+
+    tasks = [asyncio.create_task(sender()), asyncio.create_task(receiver())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                task.exception()  # отключение клиента — штатное завершение
+            else:
+                task.cancel()
+        sub.close()
+
+
+def set_dashboard_state(runner=None, graph=None, metrics=None, live=None, timeline=None):
     """Устанавливает состояние для дашборда."""
     if runner:
         dashboard_state["runner"] = runner
         dashboard_state["graph"] = getattr(runner, "graph", None)
         dashboard_state["metrics"] = getattr(runner, "metrics", None)
+        if getattr(runner, "timeline", None) is not None:
+            dashboard_state["timeline"] = runner.timeline
     if graph is not None:
         dashboard_state["graph"] = graph
     if metrics is not None:
         dashboard_state["metrics"] = metrics
+    if live is not None:
+        dashboard_state["live"] = live
+    if timeline is not None:
+        dashboard_state["timeline"] = timeline
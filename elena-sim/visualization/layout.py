@@ -0,0 +1,188 @@
+"""
+Силовая раскладка графа сети на NumPy — общая для статических графиков (plots.py) и дашборда.
+Вариант Фрухтермана — Рейнгольда с сеточным приближением отталкивания: узлы раскладываются
+по ячейкам сетки, соседи по ячейке отталкиваются точно, дальние ячейки — как одна масса в
+центре. Шаг стоит O(n · ячеек + рёбер) вместо O(n²) у nx.spring_layout.
+Позиции кэшируются по версии топологии. После rewire_peers двигаются только концы
+изменившихся рёбер и новые узлы; остальная сеть остаётся на месте.
+"""
+
+import threading
+from typing import List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from core.topology import edge_keys
+
+_CHUNK = 1024  # узлов на блок при расчёте отталкивания от ячеек (память блок × ячейки)
+
+
+def _repulsion(pos: np.ndarray, movable: np.ndarray, grid: int) -> np.ndarray:
+    """Отталкивание 1/d для узлов movable: точное внутри ячейки, от центров масс остальных ячеек."""
+    n = len(pos)
+    lo = pos.min(axis=0)
+    span = float((pos.max(axis=0) - lo).max()) or 1.0
+    cell = np.minimum(((pos - lo) / span * grid).astype(np.int64), grid - 1)
+    cid = cell[:, 0] * grid + cell[:, 1]
+    mass = np.bincount(cid, minlength=grid * grid)
+    occupied = np.flatnonzero(mass)
+    m = mass[occupied].astype(float)
+    centers = np.stack([
+        np.bincount(cid, weights=pos[:, 0], minlength=grid * grid)[occupied],
+        np.bincount(cid, weights=pos[:, 1], minlength=grid * grid)[occupied],
+    ], axis=1) / m[:, None]
+    own = np.searchsorted(occupied, cid)
+    out = np.zeros((len(movable), 2))
+    cx, cy = centers[:, 0], centers[:, 1]
+    for start in range(0, len(movable), _CHUNK):
+        block = movable[start:start + _CHUNK]
+        dx = pos[block, 0, None] - cx
+        dy = pos[block, 1, None] - cy
+        inv = np.broadcast_to(m, dx.shape) / np.maximum(dx * dx + dy * dy, 1e-4)
+        inv[np.arange(len(block)), own[block]] = 0  # своя ячейка — точно, ниже
+        out[start:start + _CHUNK, 0] = (inv * dx).sum(axis=1)
+        out[start:start + _CHUNK, 1] = (inv * dy).sum(axis=1)
+    # Пары внутри ячейки: узлы отсортированы по ячейке, соседи i — отрезок своей ячейки
+    order = np.argsort(cid, kind="stable")
+    first = np.zeros(grid * grid, dtype=np.int64)
+    np.cumsum(mass[:-1], out=first[1:])
+    counts = mass[cid[movable]]
+    owner = np.repeat(np.arange(len(movable)), counts)
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    other = order[first[cid[movable]][owner] + offsets]
+    keep = other != movable[owner]
+    owner, other = owner[keep], other[keep]
+    delta = pos[movable[owner]] - pos[other]
+    d2 = np.maximum((delta ** 2).sum(axis=1), 1e-4)
+    near = delta / d2[:, None]
+    out[:, 0] += np.bincount(owner, weights=near[:, 0], minlength=len(movable))
+    out[:, 1] += np.bincount(owner, weights=near[:, 1], minlength=len(movable))
+    return out
+
+
+def force_layout(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    pos: Optional[np.ndarray] = None,
+    movable: Optional[np.ndarray] = None,
+    iterations: int = 100,
+    temperature: Optional[float] = None,
+    gravity: float = 0.02,
+    grid: Optional[int] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Позиции (n, 2) для симметричного CSR. pos — начальные позиции (иначе случайные в квадрате
+    со стороной √n, идеальная длина ребра — 1); movable — индексы узлов, которые можно двигать.
+    grid — сторона сетки; по умолчанию ~2·n^¼, чтобы точные пары в ячейке и ячейки стоили поровну.
+    """
+    n = len(indptr) - 1
+    rng = np.random.default_rng(seed)
+    side = max(1.0, np.sqrt(n))
+    pos = rng.random((n, 2)) * side if pos is None else np.array(pos, dtype=float)
+    if n < 2:
+        return pos
+    movable = np.arange(n) if movable is None else np.asarray(movable, dtype=np.int64)
+    if not len(movable) or iterations <= 0:
+        return pos
+    # Рёбра, у которых двигается источник (CSR симметричен — каждый конец получает свою силу)
+    mask = np.zeros(n, dtype=bool)
+    mask[movable] = True
+    slot = np.full(n, -1, dtype=np.int64)
+    slot[movable] = np.arange(len(movable))
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    dst = indices.astype(np.int64)
+    src, dst = src[mask[src]], dst[mask[src]]
+    grid = max(1, grid or int(round(2 * n ** 0.25)))
+    t0 = side / 10 if temperature is None else temperature
+    for it in range(iterations):
+        disp = _repulsion(pos, movable, grid)
+        delta = pos[dst] - pos[src]
+        dist = np.sqrt((delta ** 2).sum(axis=1))
+        pull = delta * dist[:, None]  # притяжение d² вдоль ребра
+        disp[:, 0] += np.bincount(slot[src], weights=pull[:, 0], minlength=len(movable))
+        disp[:, 1] += np.bincount(slot[src], weights=pull[:, 1], minlength=len(movable))
+        disp -= gravity * (pos[movable] - pos.mean(axis=0))
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        t = t0 * (1 - it / iterations) + 1e-3
+        pos[movable] += disp / length[:, None] * np.minimum(length, t)[:, None]
+    return pos
+
+
+class ForceLayout:
+    """Кэш раскладки одного графа: полный расчёт на первую версию топологии, затем только дорелаксация."""
+
+    def __init__(self, iterations: int = 100, relax_iterations: int = 30, grid: Optional[int] = None, seed: int = 0):
+        self.iterations = iterations
+        self.relax_iterations = relax_iterations
+        self.grid = grid
+        self.seed = seed
+        self.builds = 0
+        self.relaxed = 0  # узлов сдвинуто при последнем обновлении
+        self._lock = threading.Lock()
+        self._version = None
+        self._ids: List[str] = []
+        self._edges = np.empty(0, dtype=np.int64)
+        self._pos = np.empty((0, 2))
+
+    def positions(self, source) -> Tuple[List[str], np.ndarray]:
+        """(id узлов, позиции (n, 2)) для текущей топологии источника (интерфейс как у visualization/lod.py)."""
+        with self._lock:
+            version = source.topology_version
+            if self._version is None or version != self._version:
+                node_ids, indptr, indices = source.topology()
+                self._update(list(node_ids), indptr, indices)
+                self._version = version
+            return self._ids, self._pos
+
+    def _update(self, node_ids: List[str], indptr: np.ndarray, indices: np.ndarray) -> None:
+        n = len(node_ids)
+        edges = edge_keys(indptr, indices, n)
+        prev = {nid: i for i, nid in enumerate(self._ids)}
+        carry = np.fromiter((prev.get(nid, -1) for nid in node_ids), dtype=np.int64, count=n)
+        known = carry >= 0
+        if not known.any():
+            pos = force_layout(indptr, indices, iterations=self.iterations, grid=self.grid, seed=self.seed)
+            self.builds += 1
+            self.relaxed = n
+        else:
+            pos = np.zeros((n, 2))
+            pos[known] = self._pos[carry[known]]
+            # Старые рёбра в индексах новой раскладки: изменения — симметричная разность ключей
+            m = len(self._ids)
+            remap = np.full(m, -1, dtype=np.int64)
+            remap[carry[known]] = np.flatnonzero(known)
+            a, b = remap[self._edges // m], remap[self._edges % m]
+            ok = (a >= 0) & (b >= 0)
+            old = np.sort(np.minimum(a, b)[ok] * n + np.maximum(a, b)[ok])
+            changed = np.setxor1d(edges, old, assume_unique=True)
+            affected = np.union1d(np.concatenate([changed // n, changed % n]), np.flatnonzero(~known))
+            self._place_new(pos, known, indptr, indices)
+            pos = force_layout(
+                indptr, indices, pos=pos, movable=affected, iterations=self.relax_iterations,
+                temperature=1.0, grid=self.grid, seed=self.seed,
+            )
+            self.relaxed = len(affected)
+        pos.flags.writeable = False
+        self._ids, self._edges, self._pos = node_ids, edges, pos
+
+    def _place_new(self, pos: np.ndarray, known: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> None:
+        """Новый узел — в центр уже размещённых соседей (или центр сети) с небольшим сдвигом."""
+        rng = np.random.default_rng(self.seed + len(pos))
+        center = pos[known].mean(axis=0)
+        for i in np.flatnonzero(~known).tolist():
+            nbrs = indices[indptr[i]:indptr[i + 1]]
+            nbrs = nbrs[known[nbrs]]
+            pos[i] = (pos[nbrs].mean(axis=0) if len(nbrs) else center) + rng.normal(scale=0.5, size=2)
+
+
+_shared: "WeakKeyDictionary" = WeakKeyDictionary()
+
+
+def graph_layout(graph) -> ForceLayout:
+    """Раскладка, общая для всех потребителей одного графа (графики, дашборд, живой режим)."""
+    layout = _shared.get(graph)
+    if layout is None:
+        layout = _shared[graph] = ForceLayout()
+    return layout
@@ -0,0 +1,217 @@
+"""
+Укрупнённый граф (level of detail) для дашборда на больших сетях.
+Иерархия кластеров (core/clustering.py) строится один раз на версию топологии: уровень 0 —
+узлы, уровень l + 1 — кластеры уровня l, пока их не меньше top_size. Структура ответов
+(узлы, рёбра с весами) сериализуется один раз и кэшируется по (версия, запрос); репутации
+меняются каждый шаг и дописываются к кэшированному JSON отдельным массивом за O(n) NumPy.
+Запрос раскрытия возвращает только детей запрошенных кластеров и их связи наружу.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.clustering import aggregate, partition
+
+
+class GraphSource:
+    """Источник для LOD из NetworkGraph (синхронный прогон; в живом режиме — LiveStream)."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._order: Optional[Tuple[int, List[Any]]] = None
+
+    @property
+    def topology_version(self) -> int:
+        return self.graph._topology_version
+
+    def topology(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        return self.graph.csr()
+
+    def _nodes(self) -> List[Any]:
+        if self._order is None or self._order[0] != self.topology_version:
+            node_ids = self.graph.csr()[0]
+            self._order = (self.topology_version, [self.graph.nodes[nid] for nid in node_ids])
+        return self._order[1]
+
+    def reputations(self) -> np.ndarray:
+        nodes = self._nodes()
+        return np.fromiter((n.reputation for n in nodes), dtype=float, count=len(nodes))
+
+    def evil_mask(self) -> np.ndarray:
+        nodes = self._nodes()
+        return np.fromiter((bool(getattr(n, "is_evil", False)) for n in nodes), dtype=bool, count=len(nodes))
+
+
+class _Hierarchy:
+    """Уровни кластеров одной версии топологии."""
+
+    def __init__(self, version, node_ids: List[str], indptr: np.ndarray, indices: np.ndarray, evil: np.ndarray,
+                 cluster_size: int, fanout: int, top_size: int, seed: int):
+        self.version = version
+        self.node_ids = node_ids
+        # graphs[l] — CSR уровня l (indptr, indices, веса); labels[l] — кластер уровня l + 1 для элемента уровня l
+        self.graphs = [(indptr, indices.astype(np.int64), np.ones(len(indices)))]
+        self.labels: List[np.ndarray] = []
+        # members[l] — кластер уровня l для каждого узла (members[0] — сами узлы)
+        self.members = [np.arange(len(node_ids))]
+        while len(self.graphs[-1][0]) - 1 > top_size:
+            s_indptr, s_indices, weights = self.graphs[-1]
+            target = cluster_size if not self.labels else fanout
+            labels = partition(s_indptr, s_indices, target_size=target, seed=seed + len(self.labels), weights=weights)
+            if labels.max() + 1 >= len(labels):
+                break  # укрупнение больше не сокращает граф (например, только изолированные узлы)
+            _, c_indptr, c_indices, c_weights = aggregate(s_indptr, s_indices, labels, weights)
+            self.labels.append(labels)
+            self.graphs.append((c_indptr, c_indices.astype(np.int64), c_weights))
+            self.members.append(labels[self.members[-1]])
+        self.sizes = [np.bincount(m, minlength=len(g[0]) - 1) for m, g in zip(self.members, self.graphs)]
+        self.evil = [np.bincount(m, weights=evil, minlength=len(g[0]) - 1).astype(int)
+                     for m, g in zip(self.members, self.graphs)]
+
+    @property
+    def top(self) -> int:
+        return len(self.graphs) - 1
+
+    def node_id(self, level: int, i: int) -> str:
+        return self.node_ids[i] if level == 0 else f"c{level}_{i}"
+
+    def describe(self, level: int, items: np.ndarray, parent: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+        out = []
+        for k, i in enumerate(items.tolist()):
+            entry: Dict[str, Any] = {"id": self.node_id(level, i), "level": level, "index": i,
+                                     "size": int(self.sizes[level][i]), "evil": int(self.evil[level][i])}
+            if level == 0:
+                entry["is_evil"] = bool(self.evil[0][i])
+            if parent is not None:
+                entry["parent"] = self.node_id(level + 1, int(parent[k]))
+            out.append(entry)
+        return out
+
+
+class GraphLOD:
+    """Сервис укрупнённого графа: иерархия на версию топологии и LRU-кэш сериализованных ответов."""
+
+    def __init__(self, cluster_size: int = 64, fanout: int = 16, top_size: int = 400,
+                 max_edges: int = 20000, cache_size: int = 256, seed: int = 0):
+        self.cluster_size = cluster_size
+        self.fanout = fanout
+        self.top_size = top_size
+        self.max_edges = max_edges
+        self.cache_size = cache_size
+        self.seed = seed
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._hierarchy: Optional[_Hierarchy] = None
+        self._cache: "OrderedDict[tuple, Tuple[bytes, int, np.ndarray]]" = OrderedDict()
+
+    def hierarchy(self, source) -> _Hierarchy:
+        with self._lock:
+            version = source.topology_version
+            if self._hierarchy is None or self._version != version:
+                node_ids, indptr, indices = source.topology()
+                self._hierarchy = _Hierarchy(
+                    version, list(node_ids), indptr, indices, source.evil_mask(),
+                    self.cluster_size, self.fanout, self.top_size, self.seed,
+                )
+                self._version = version
+                self._cache.clear()
+                self.builds += 1
+            return self._hierarchy
+
+    def edge_list(self, source) -> List[Dict[str, str]]:
+        """Все рёбра уровня узлов (source/target), один раз на версию топологии."""
+        h = self.hierarchy(source)
+        with self._lock:
+            cached = self._cache.get((h.version, "edges"))
+        if cached is None:
+            indptr, indices, _ = h.graphs[0]
+            src = np.repeat(np.arange(len(h.node_ids)), np.diff(indptr))
+            keep = src < indices
+            ids = h.node_ids
+            cached = [{"source": ids[a], "target": ids[b]} for a, b in zip(src[keep].tolist(), indices[keep].tolist())]
+            with self._lock:
+                self._cache[(h.version, "edges")] = cached
+        return cached
+
+    # --- ответы ---
+
+    def top(self, source) -> bytes:
+        """Верхний уровень: суперузлы и суперрёбра (самые тяжёлые, не больше max_edges)."""
+        h = self.hierarchy(source)
+        return self._respond(source, h, (h.version, "top"), lambda: self._top(h))
+
+    def expand(self, source, level: int, clusters: Sequence[int]) -> bytes:
+        """Дети кластеров уровня level (узлы при level = 1) и их рёбра; связи наружу — к кластерам level."""
+        h = self.hierarchy(source)
+        if not 1 <= level <= h.top:
+            raise ValueError(f"Уровень {level} вне 1..{h.top}")
+        wanted = np.array(sorted(set(int(c) for c in clusters)), dtype=np.int64)
+        if len(wanted) and (wanted.min() < 0 or wanted.max() >= len(h.sizes[level])):
+            raise ValueError(f"Кластер вне 0..{len(h.sizes[level]) - 1}")
+        return self._respond(source, h, (h.version, "expand", level, tuple(wanted.tolist())), lambda: self._expand(h, level, wanted))
+
+    def _respond(self, source, h: _Hierarchy, key: tuple, build) -> bytes:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is None:
+            cached = build()
+            with self._lock:
+                self._cache[key] = cached
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        body, level, items = cached
+        reps = source.reputations()
+        if level > 0:
+            reps = np.bincount(h.members[level], weights=reps, minlength=len(h.sizes[level])) / np.maximum(h.sizes[level], 1)
+        reputation = json.dumps(np.round(reps[items], 4).tolist())
+        return b'{"graph":' + body + b',"reputation":' + reputation.encode("utf-8") + b"}"
+
+    def _edges(self, h: _Hierarchy, level: int, items: np.ndarray, inner: np.ndarray) -> Tuple[List[dict], int]:
+        """Рёбра уровня level из items: внутри набора inner (i < j) и наружу — к кластерам level + 1."""
+        indptr, indices, weights = h.graphs[level]
+        counts = indptr[items + 1] - indptr[items]
+        src = np.repeat(items, counts)
+        pos = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(indptr[items], counts)
+        dst, w = indices[pos], weights[pos]
+        inside = np.isin(dst, inner)
+        keep = inside & (src < dst)
+        edges = [(h.node_id(level, a), h.node_id(level, b), wt)
+                 for a, b, wt in zip(src[keep].tolist(), dst[keep].tolist(), w[keep].tolist())]
+        if level + 1 <= h.top:
+            # Связи наружу агрегируются до кластера уровня level + 1
+            out_src, out_dst, out_w = src[~inside], h.labels[level][dst[~inside]], w[~inside]
+            if len(out_src):
+                key = out_src * (int(out_dst.max()) + 1) + out_dst
+                order = np.argsort(key, kind="stable")
+                starts = np.flatnonzero(np.concatenate(([True], key[order][1:] != key[order][:-1])))
+                sums = np.add.reduceat(out_w[order], starts)
+                edges += [(h.node_id(level, a), h.node_id(level + 1, b), wt) for a, b, wt in zip(
+                    out_src[order][starts].tolist(), out_dst[order][starts].tolist(), sums.tolist())]
+        total = len(edges)
+        if total > self.max_edges:
+            edges = sorted(edges, key=lambda e: -e[2])[:self.max_edges]
+        return [{"source": a, "target": b, "weight": wt} for a, b, wt in edges], total - len(edges)
+
+    def _top(self, h: _Hierarchy) -> Tuple[bytes, int, np.ndarray]:
+        level = h.top
+        items = np.arange(len(h.sizes[level]))
+        edges, dropped = self._edges(h, level, items, items)
+        payload = {"version": h.version, "levels": h.top, "level": level, "nodes": h.describe(level, items, None),
+                   "edges": edges, "edges_dropped": dropped}
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8"), level, items
+
+    def _expand(self, h: _Hierarchy, level: int, wanted: np.ndarray) -> Tuple[bytes, int, np.ndarray]:
+        child = level - 1
+        parent = h.labels[child]
+        items = np.flatnonzero(np.isin(parent, wanted))
+        edges, dropped = self._edges(h, child, items, items)
+        payload = {"version": h.version, "levels": h.top, "level": child, "expanded": wanted.tolist(),
+                   "nodes": h.describe(child, items, parent[items]), "edges": edges, "edges_dropped": dropped}
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8"), child, items
@@ -50,22 +50,41 @@ def plot_network_state(
     nodes: Dict[str, Any],
     transactions: Dict[str, Any],
     save_path: Optional[Path] = None,
+    graph: Optional["NetworkGraph"] = None,
 ) -> None:
-    """Визуализирует состояние сети: узлы и количество транзакций."""
-    import networkx as nx
-    G = nx.Graph()
-    for nid, node in nodes.items():
-        G.add_node(nid, reputation=getattr(node, "reputation", 0.5))
-    for nid, node in nodes.items():
-        for peer in getattr(node, "peers", []):
-            if hasattr(peer, "id"):
-                G.add_edge(nid, peer.id)
-    pos = nx.spring_layout(G, seed=42, k=0.5)
+    """
+    Визуализирует состояние сети: узлы и количество транзакций. С graph позиции берутся из общей
+    кэшированной раскладки (visualization/layout.py) — те же, что в дашборде.
+    """
+    from matplotlib.collections import LineCollection
+
+    from core.topology import edges_to_csr
+    from .layout import force_layout, graph_layout
+    from .lod import GraphSource
+
+    if graph is not None:
+        node_ids, pos = graph_layout(graph).positions(GraphSource(graph))
+        _, indptr, indices = graph.csr()
+    else:
+        node_ids = list(nodes.keys())
+        index = {nid: i for i, nid in enumerate(node_ids)}
+        edges = [(i, index[peer.id]) for i, nid in enumerate(node_ids)
+                 for peer in getattr(nodes[nid], "peers", []) if getattr(peer, "id", None) in index]
+        indptr, indices = edges_to_csr(len(node_ids), edges)
+        pos = force_layout(indptr, indices)
+    src = np.repeat(np.arange(len(node_ids)), np.diff(indptr))
+    keep = src < indices
     fig, ax = plt.subplots(figsize=(10, 8))
-    reputations = [G.nodes[n].get("reputation", 0.5) for n in G.nodes()]
-    nx.draw(G, pos, node_color=reputations, cmap="RdYlGn", node_size=50, with_labels=False, ax=ax)
+    ax.add_collection(LineCollection(
+        np.stack([pos[src[keep]], pos[indices[keep]]], axis=1), colors="#999999", linewidths=0.3, alpha=0.5
+    ))
+    source = graph.nodes if graph is not None else nodes
+    reputations = [getattr(source[nid], "reputation", 0.5) for nid in node_ids]
+    ax.scatter(pos[:, 0], pos[:, 1], c=reputations, cmap="RdYlGn", vmin=0, vmax=1, s=min(50.0, max(4.0, 20000 / max(1, len(node_ids)))))
     plt.colorbar(plt.cm.ScalarMappable(cmap="RdYlGn", norm=plt.Normalize(0, 1)), ax=ax, label="Репутация")
     ax.set_title("Граф сети (цвет = репутация)")
+    ax.set_aspect("equal")
+    ax.axis("off")
     if save_path:
         plt.savefig(save_path, dpi=150)
     plt.close()